@@ -0,0 +1,194 @@
+"""Helper bersama script benchmark: app di subprocess uvicorn / in-process + beban async httpx.
+
+Semua benchmark menerima --app-dir agar angka sebelum/sesudah bisa diambil
+dari checkout lain (misal `git worktree add /tmp/before <commit>~1`).
+"""
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Awaitable, Callable, Dict, List, NamedTuple, Optional
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ADMIN_LOGIN = {"email": "admin@healthbridge.com", "password": "admin123"}
+
+# Layanan luar dimatikan agar yang terukur hanya app + database
+BASE_ENV = {
+    "JOB_WORKERS": "0",
+    "GEMINI_API_KEY": "",
+    "AWS_ACCESS_KEY_ID": "",
+    "AWS_SECRET_ACCESS_KEY": "",
+    "DIAGNOSIS_CACHE_REDIS_URL": "",
+    "AUTH_CACHE_REDIS_URL": "",
+}
+
+
+def add_app_args(parser, concurrency: int = 20, seconds: float = 10.0):
+    parser.add_argument("--app-dir", default=BACKEND_DIR, help="folder healthbridge-backend-main yang diukur")
+    parser.add_argument("--concurrency", type=int, default=concurrency)
+    parser.add_argument("--seconds", type=float, default=seconds)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def sqlite_url(path: str) -> str:
+    return f"sqlite:///{os.path.abspath(path)}"
+
+
+class Server(NamedTuple):
+    base_url: str
+    pid: int
+    log_path: str
+
+
+@contextmanager
+def server(app_dir: str = BACKEND_DIR, env: Optional[Dict[str, str]] = None, db_path: Optional[str] = None,
+           uvicorn_args=(), startup_timeout: float = 120.0):
+    """Jalankan `uvicorn main:app` di subprocess (working directory sementara), yield Server"""
+    workdir = tempfile.mkdtemp(prefix="hb-bench-")
+    port = free_port()
+    full_env = dict(os.environ, **BASE_ENV)
+    full_env["DATABASE_URL"] = sqlite_url(db_path or os.path.join(workdir, "bench.db"))
+    full_env.update(env or {})
+    log_path = os.path.join(workdir, "uvicorn.log")
+    with open(log_path, "w") as log:
+        proc = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--app-dir", os.path.abspath(app_dir),
+             "--port", str(port), "--log-level", "warning", "--no-access-log", *uvicorn_args],
+            cwd=workdir, env=full_env, stdout=log, stderr=subprocess.STDOUT,
+        )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + startup_timeout
+        while True:
+            if proc.poll() is not None:
+                raise RuntimeError(f"Server berhenti saat startup, lihat {log_path}")
+            try:
+                if httpx.get(base_url + "/", timeout=1).status_code == 200:
+                    break
+            except httpx.HTTPError:
+                pass
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"Server tidak siap dalam {startup_timeout:.0f}s, lihat {log_path}")
+            time.sleep(0.2)
+        yield Server(base_url, proc.pid, log_path)
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(15)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+
+
+def import_app(app_dir: str = BACKEND_DIR, db_path: Optional[str] = None, env: Optional[Dict[str, str]] = None):
+    """Import main.py in-process (untuk benchmark tanpa HTTP); env harus terpasang sebelum import"""
+    workdir = tempfile.mkdtemp(prefix="hb-bench-")
+    os.environ.update(BASE_ENV)
+    os.environ["DATABASE_URL"] = sqlite_url(db_path or os.path.join(workdir, "bench.db"))
+    os.environ.update(env or {})
+    sys.path.insert(0, os.path.abspath(app_dir))
+    os.chdir(workdir)
+    import main
+    return main
+
+
+def rss_mb(pid: int) -> float:
+    """Resident memory proses (Linux /proc)"""
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return float("nan")
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * pct / 100))]
+
+
+class LoadResult(NamedTuple):
+    seconds: float
+    latencies: List[float]
+    codes: Dict[str, int]
+
+    @property
+    def rps(self) -> float:
+        return len(self.latencies) / self.seconds
+
+    def rate(self, code: str) -> float:
+        """Request/detik dengan status tertentu (misal hanya yang "200")"""
+        return self.codes.get(code, 0) / self.seconds
+
+    def summary(self) -> str:
+        lat = sorted(self.latencies)
+        codes = " ".join(f"{code}={count}" for code, count in sorted(self.codes.items()))
+        return (f"{self.rps:8.1f} req/s  p50 {percentile(lat, 50) * 1000:7.1f} ms  "
+                f"p95 {percentile(lat, 95) * 1000:7.1f} ms  p99 {percentile(lat, 99) * 1000:7.1f} ms  [{codes}]")
+
+
+Request = Callable[[httpx.AsyncClient, int, int], Awaitable[httpx.Response]]
+
+
+async def run_load(client: httpx.AsyncClient, request: Request, concurrency: int, seconds: float,
+                   warmup: float = 1.0, pause: float = 0.0) -> LoadResult:
+    """`concurrency` worker memanggil request(client, worker_id, n) berulang selama `seconds` (+ warmup).
+
+    Setiap worker jeda `pause` detik antar request, atau selama header Retry-After jika ada.
+    """
+    latencies: List[float] = []
+    codes: Dict[str, int] = {}
+    recording = False
+    stop = False
+
+    async def worker(worker_id: int):
+        n = 0
+        while not stop:
+            n += 1
+            start = time.perf_counter()
+            retry_after = 0.0
+            try:
+                response = await request(client, worker_id, n)
+                code = str(response.status_code)
+                retry_after = float(response.headers.get("retry-after", 0))
+            except httpx.HTTPError as e:
+                code = type(e).__name__
+            if recording:
+                latencies.append(time.perf_counter() - start)
+                codes[code] = codes.get(code, 0) + 1
+            # Client yang sopan: tunggu sesuai Retry-After (429) sebelum mencoba lagi
+            if pause or retry_after:
+                await asyncio.sleep(max(pause, retry_after))
+
+    tasks = [asyncio.create_task(worker(i)) for i in range(concurrency)]
+    await asyncio.sleep(warmup)
+    recording = True
+    started = time.perf_counter()
+    await asyncio.sleep(seconds)
+    recording = False
+    elapsed = time.perf_counter() - started
+    stop = True
+    await asyncio.gather(*tasks)
+    return LoadResult(elapsed, latencies, codes)
+
+
+def client_for(base_url: str, concurrency: int, timeout: float = 60.0) -> httpx.AsyncClient:
+    return httpx.AsyncClient(base_url=base_url, timeout=timeout,
+                             limits=httpx.Limits(max_connections=concurrency + 5))
+
+
+async def admin_headers(client: httpx.AsyncClient) -> Dict[str, str]:
+    response = await client.post("/api/auth/login", json=ADMIN_LOGIN)
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
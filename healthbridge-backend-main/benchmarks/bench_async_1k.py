@@ -0,0 +1,137 @@
+"""Sync vs async (DB_ASYNC) dengan 1k koneksi keep-alive: req/s, latensi, memori & thread server.
+
+    python benchmarks/bench_async_1k.py
+    python benchmarks/bench_async_1k.py --connections 500 --seconds 30
+
+Client memakai socket asyncio mentah (HTTP/1.1 keep-alive, satu request per
+koneksi sekaligus) agar 1k koneksi tidak habis dimakan overhead client.
+Campuran endpoint: keranjang, detail & search obat, /api/auth/me.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from _harness import ADMIN_LOGIN, BACKEND_DIR, LoadResult, rss_mb, server  # noqa: E402
+
+MODES = {
+    "sync": {"DB_ASYNC": "false"},
+    "async": {"DB_ASYNC": "true"},
+}
+SEARCHES = ["flu", "demam", "vitamin", "batuk"]
+
+
+async def request(reader, writer, method: str, path: str, body=None, headers: str = ""):
+    data = json.dumps(body).encode() if body is not None else b""
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: bench\r\n{headers}Content-Type: application/json\r\n"
+                 f"Content-Length: {len(data)}\r\n\r\n".encode() + data)
+    head = await reader.readuntil(b"\r\n\r\n")
+    length = 0
+    for line in head.split(b"\r\n"):
+        if line.lower().startswith(b"content-length:"):
+            length = int(line.split(b":")[1])
+    return int(head.split(b" ", 2)[1]), await reader.readexactly(length)
+
+
+def thread_count(pid: int) -> int:
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("Threads:"):
+                return int(line.split()[1])
+    return 0
+
+
+async def measure(host: str, port: int, pid: int, connections: int, seconds: float, warmup: float = 3.0):
+    reader, writer = await asyncio.open_connection(host, port)
+    _, body = await request(reader, writer, "POST", "/api/auth/login", ADMIN_LOGIN)
+    auth = f"Authorization: Bearer {json.loads(body)['access_token']}\r\n"
+    writer.close()
+
+    latencies, codes = [], {}
+    peak = {"rss": 0.0, "threads": 0}
+    state = {"recording": False, "stop": False}
+
+    def count(code):
+        if state["recording"]:
+            codes[code] = codes.get(code, 0) + 1
+
+    async def worker(worker_id: int):
+        rng = random.Random(worker_id)
+        try:
+            reader, writer = await asyncio.open_connection(host, port)
+        except OSError as e:
+            count(type(e).__name__)
+            return
+        session_id = f"c1k-{worker_id}"
+        while not state["stop"]:
+            pick = rng.random()
+            start = time.perf_counter()
+            try:
+                if pick < 0.15:
+                    status, _ = await request(reader, writer, "POST", "/api/cart/add", {
+                        "session_id": session_id, "medicine_id": rng.randint(1, 40), "quantity": 1})
+                elif pick < 0.2:
+                    status, _ = await request(reader, writer, "DELETE", f"/api/cart/clear/{session_id}")
+                elif pick < 0.45:
+                    status, _ = await request(reader, writer, "GET", f"/api/cart/{session_id}")
+                elif pick < 0.7:
+                    status, _ = await request(reader, writer, "GET", f"/api/medicines/search?q={rng.choice(SEARCHES)}")
+                elif pick < 0.9:
+                    status, _ = await request(reader, writer, "GET", f"/api/medicines/{rng.randint(1, 40)}")
+                else:
+                    status, _ = await request(reader, writer, "GET", "/api/auth/me", headers=auth)
+            except (OSError, asyncio.IncompleteReadError) as e:
+                count(type(e).__name__)
+                return
+            if state["recording"]:
+                latencies.append(time.perf_counter() - start)
+            count(str(status))
+        writer.close()
+
+    async def sample():
+        while not state["stop"]:
+            peak["rss"] = max(peak["rss"], rss_mb(pid))
+            peak["threads"] = max(peak["threads"], thread_count(pid))
+            await asyncio.sleep(0.5)
+
+    idle_rss = rss_mb(pid)
+    tasks = [asyncio.create_task(worker(i)) for i in range(connections)]
+    sampler = asyncio.create_task(sample())
+    await asyncio.sleep(warmup)
+    state["recording"] = True
+    started = time.perf_counter()
+    await asyncio.sleep(seconds)
+    state["recording"] = False
+    elapsed = time.perf_counter() - started
+    state["stop"] = True
+    await asyncio.wait(tasks, timeout=60)
+    await sampler
+    return LoadResult(elapsed, latencies, codes), idle_rss, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--app-dir", default=BACKEND_DIR)
+    parser.add_argument("--connections", type=int, default=1000)
+    parser.add_argument("--seconds", type=float, default=20.0)
+    parser.add_argument("--only", choices=sorted(MODES))
+    args = parser.parse_args()
+
+    print(f"{args.connections} koneksi ({args.app_dir})")
+    for name, env in MODES.items():
+        if args.only and name != args.only:
+            continue
+        with server(args.app_dir, env, uvicorn_args=("--backlog", "4096")) as srv:
+            host, port = srv.base_url.split("//")[1].split(":")
+            result, idle_rss, peak = asyncio.run(measure(host, int(port), srv.pid, args.connections, args.seconds))
+        print(f"  {name:5s} {result.summary()}")
+        print(f"  {'':5s} RSS idle {idle_rss:.0f} MB, puncak {peak['rss']:.0f} MB, thread puncak {peak['threads']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""Throughput GET /api/auth/me di bawah beban, dengan dan tanpa cache principal.
+
+    python benchmarks/bench_auth_me.py
+    python benchmarks/bench_auth_me.py --app-dir /tmp/before/healthbridge-backend-main --only default
+
+`cache-off` memakai AUTH_CACHE_TTL_SECONDS=0 sehingga setiap request
+memeriksa user ke database seperti sebelum ada cache.
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from _harness import add_app_args, admin_headers, client_for, run_load, server  # noqa: E402
+
+MODES = {
+    "cache-off": {"AUTH_CACHE_TTL_SECONDS": "0"},
+    "default": {},
+}
+
+
+async def measure(base_url: str, concurrency: int, seconds: float):
+    async with client_for(base_url, concurrency) as client:
+        headers = await admin_headers(client)
+        return await run_load(client, lambda c, i, n: c.get("/api/auth/me", headers=headers), concurrency, seconds)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_app_args(parser)
+    parser.add_argument("--only", choices=sorted(MODES))
+    args = parser.parse_args()
+
+    print(f"GET /api/auth/me, {args.concurrency} koneksi ({args.app_dir})")
+    for name, env in MODES.items():
+        if args.only and name != args.only:
+            continue
+        with server(args.app_dir, env) as srv:
+            result = asyncio.run(measure(srv.base_url, args.concurrency, args.seconds))
+        print(f"  {name:9s} {result.summary()}")
+
+
+if __name__ == "__main__":
+    main()
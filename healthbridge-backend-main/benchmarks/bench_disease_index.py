@@ -0,0 +1,98 @@
+"""Microbenchmark DiseaseIndex vs scoring loop lama /api/diagnose (katalog sintetis).
+
+    python benchmarks/bench_disease_index.py              # 10k penyakit, 300 query
+    python benchmarks/bench_disease_index.py --diseases 2000 --queries 500
+
+Mencetak waktu build index, latensi per query keduanya, dan jumlah hasil
+yang berbeda (harus 0).
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from disease_index import DiseaseIndex  # noqa: E402
+
+WORDS = ("demam panas pusing kepala mual muntah nyeri dada sesak napas batuk pilek gatal kulit merah ruam "
+         "bengkak sakit gigi mata telinga diare lemas kejang berdenyut tenggorokan perut kembung sendi otot "
+         "punggung pinggang bersin hidung tersumbat lidah bibir kuku rambut").split()
+
+
+def legacy_best_match(diseases, symptoms, diagnosis_clean):
+    best_match = None
+    best_score = 0
+    for disease in diseases:
+        score = 0
+        if disease["name"].lower() in diagnosis_clean.lower() or diagnosis_clean.lower() in disease["name"].lower():
+            score += 10
+        disease_keywords = [k.strip().lower() for k in disease["symptoms"].split(',')]
+        symptom_words = [w.strip().lower() for w in symptoms.lower().split()]
+        for keyword in disease_keywords:
+            for word in symptom_words:
+                if len(word) > 3:
+                    if word in keyword or keyword in word:
+                        score += 2
+                    elif word[:4] == keyword[:4]:
+                        score += 1
+        if score > best_score:
+            best_score = score
+            best_match = disease
+    return (best_match["id"] if best_match else None), best_score
+
+
+def synthetic_catalog(size: int, queries: int, seed: int = 1):
+    rng = random.Random(seed)
+
+    def phrase(words: int) -> str:
+        return " ".join(rng.choice(WORDS) + rng.choice(["", "an", "nya", "kan"]) for _ in range(words))
+
+    diseases = [{
+        "id": i + 1,
+        "name": f"{phrase(2)} tipe {i}",
+        "symptoms": ", ".join(phrase(rng.randint(1, 3)) for _ in range(rng.randint(4, 8))),
+    } for i in range(size)]
+    # Diagnosa ala Gemini: kadang menyebut nama penyakit, kadang tidak
+    items = [(phrase(rng.randint(3, 8)), rng.choice([diseases[rng.randrange(size)]["name"], phrase(2), "Flu biasa"]))
+             for _ in range(queries)]
+    return diseases, items
+
+
+def timed(fn, items):
+    """(ms per query, hasil)"""
+    start = time.perf_counter()
+    results = [fn(symptoms, diagnosis) for symptoms, diagnosis in items]
+    return (time.perf_counter() - start) / len(items) * 1000, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--diseases", type=int, default=10000)
+    parser.add_argument("--queries", type=int, default=300)
+    args = parser.parse_args()
+
+    diseases, items = synthetic_catalog(args.diseases, args.queries)
+    index = DiseaseIndex()
+    start = time.perf_counter()
+    index.rebuild(diseases)
+    build_s = time.perf_counter() - start
+
+    legacy_ms, expected = timed(lambda s, d: legacy_best_match(diseases, s, d), items)
+    index_ms, single = timed(index.best_match, items)
+    start = time.perf_counter()
+    batch = index.best_matches(items)
+    batch_ms = (time.perf_counter() - start) / len(items) * 1000
+    mismatches = sum(a != b or a != c for a, b, c in zip(expected, single, batch))
+
+    print(f"{args.diseases} penyakit, {args.queries} query")
+    print(f"  build index        {build_s:8.2f} s")
+    print(f"  loop lama          {legacy_ms:8.2f} ms/query")
+    print(f"  index best_match   {index_ms:8.2f} ms/query  ({legacy_ms / index_ms:.1f}x)")
+    print(f"  index best_matches {batch_ms:8.2f} ms/query")
+    print(f"  hasil berbeda      {mismatches:8d}")
+
+
+if __name__ == "__main__":
+    main()
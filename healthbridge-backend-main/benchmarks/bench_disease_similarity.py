@@ -0,0 +1,111 @@
+"""Akurasi & latensi pencocokan penyakit: TF-IDF n-gram (DISEASE_MATCHER=tfidf) vs keyword.
+
+    python benchmarks/bench_disease_similarity.py
+    python benchmarks/bench_disease_similarity.py --per-disease 20
+
+Query dibuat dari gejala katalog seed: apa adanya, dengan imbuhan, dengan
+salah ketik, dan dengan sinonim. Akurasi = penyakit asal menjadi hasil top-1
+dan skornya lolos ambang yang dipakai /api/diagnose. Keluhan yang tidak
+berhubungan dengan penyakit dihitung sebagai false positive jika lolos.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from _harness import BACKEND_DIR, import_app  # noqa: E402
+
+# Diagnosa Gemini netral (tidak muncul di nama penyakit) agar yang diukur hanya pencocokan keluhan
+NEUTRAL_DIAGNOSIS = "?"
+KINDS = ("persis", "imbuhan", "typo", "sinonim")
+UNRELATED = ["mau beli vitamin untuk anak", "cek harga obat", "halo dokter", "jadwal praktek hari senin",
+             "apakah apotek buka sekarang", "terima kasih atas bantuannya"]
+
+
+def make_queries(diseases, per_disease: int, synonyms, rng: random.Random):
+    def typo(word):
+        if len(word) < 5:
+            return word
+        i = rng.randrange(1, len(word) - 1)
+        return rng.choice([word[:i] + word[i + 1:], word[:i] + word[i + 1] + word[i] + word[i + 2:],
+                           word[:i] + rng.choice("aiueo") + word[i + 1:]])
+
+    def affix(word):
+        return rng.choice([word + "nya", word + "an", "ter" + word, word + "2"])
+
+    def synonym(word):
+        options = sorted(synonyms.get(word, set()) - {word})
+        return rng.choice(options) if options else word
+
+    change = {"persis": lambda w: w, "imbuhan": affix, "typo": typo, "sinonim": synonym}
+    queries = []
+    for disease in diseases:
+        keywords = [k.strip().lower() for k in disease["symptoms"].split(",") if k.strip()]
+        for kind in KINDS:
+            for _ in range(per_disease):
+                words = " ".join(rng.sample(keywords, min(len(keywords), rng.randint(2, 3)))).split()
+                if kind != "persis":
+                    words = [change[kind](w) if kind == "sinonim" or rng.random() < 0.5 else w for w in words]
+                queries.append((disease["id"], kind, "saya " + " ".join(words) + " sejak kemarin"))
+    return queries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--app-dir", default=BACKEND_DIR)
+    parser.add_argument("--per-disease", type=int, default=10, help="query per penyakit per jenis")
+    args = parser.parse_args()
+
+    app = import_app(args.app_dir)
+    from disease_index import DiseaseIndex
+    from disease_similarity import DiseaseSimilarity
+    from search_service import SYNONYMS
+
+    db = app.WriteSessionLocal()
+    try:
+        app.seed_catalog(db)
+        diseases = [app.disease_to_dict(d) for d in db.query(app.Disease).order_by(app.Disease.id)]
+    finally:
+        db.close()
+
+    queries = make_queries(diseases, args.per_disease, SYNONYMS, random.Random(7))
+    keyword = DiseaseIndex()
+    keyword.rebuild(diseases)
+    directory = tempfile.mkdtemp(prefix="hb-tfidf-")
+    start = time.perf_counter()
+    DiseaseSimilarity(directory).load_or_build(diseases)
+    build_ms = (time.perf_counter() - start) * 1000
+    tfidf = DiseaseSimilarity(directory)
+    start = time.perf_counter()
+    tfidf.load_or_build(diseases)
+    load_ms = (time.perf_counter() - start) * 1000
+
+    matchers = {
+        f"keyword (skor >= {app.DISEASE_MATCH_MIN_SCORE})": (keyword, app.DISEASE_MATCH_MIN_SCORE),
+        f"tfidf (skor >= {app.DISEASE_TFIDF_MIN_SCORE})": (tfidf, app.DISEASE_TFIDF_MIN_SCORE),
+    }
+    print(f"{len(diseases)} penyakit, {len(queries)} query; tfidf build {build_ms:.0f} ms, load mmap {load_ms:.1f} ms")
+    print(f"  {'':24s} " + " ".join(f"{kind:>8s}" for kind in KINDS) + f" {'salah+':>7s} {'us/query':>9s}")
+    for name, (matcher, min_score) in matchers.items():
+        accuracy = []
+        for kind in KINDS:
+            subset = [(disease_id, q) for disease_id, k, q in queries if k == kind]
+            hits = 0
+            for disease_id, q in subset:
+                best_id, score = matcher.best_match(q, NEUTRAL_DIAGNOSIS)
+                hits += best_id == disease_id and score >= min_score
+            accuracy.append(hits / len(subset))
+        false_positive = sum(matcher.best_match(q, NEUTRAL_DIAGNOSIS)[1] >= min_score for q in UNRELATED)
+        start = time.perf_counter()
+        matcher.best_matches([(q, NEUTRAL_DIAGNOSIS) for _, _, q in queries])
+        per_query = (time.perf_counter() - start) / len(queries) * 1e6
+        print(f"  {name:24s} " + " ".join(f"{value:8.1%}" for value in accuracy)
+              + f" {false_positive:3d}/{len(UNRELATED)} {per_query:9.0f}")
+
+
+if __name__ == "__main__":
+    main()
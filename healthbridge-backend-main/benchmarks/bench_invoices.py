@@ -0,0 +1,85 @@
+"""Throughput render invoice PDF: invoice/detik/core untuk order 1, 10 dan 100 baris.
+
+    python benchmarks/bench_invoices.py
+    python benchmarks/bench_invoices.py --workers 0 1 2 4
+    python benchmarks/bench_invoices.py --app-dir /tmp/before/healthbridge-backend-main   # sebelum
+
+workers=0 merender langsung di proses ini (render_invoice), workers>=1 lewat
+InvoiceRenderer.render_many di process pool. Versi lama tanpa invoice_service
+diukur lewat AWSS3Manager.generate_and_upload_invoice dengan client S3 palsu.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from _harness import BACKEND_DIR  # noqa: E402
+
+SIZES = {1: 2000, 10: 1000, 100: 200}  # baris per order: jumlah invoice
+
+
+def make_order(lines: int, order_id: int) -> dict:
+    return {
+        "order_id": order_id, "customer_name": "Budi Santoso", "email": "budi@example.com",
+        "phone": "08123456789", "address": "Jl. Merdeka No. 1, Jakarta",
+        "created_at": "2026-10-18T05:00:00+00:00", "total_price": 15000.0 * lines, "status": "pending",
+        "items": [{"name": f"Paracetamol 500mg strip {i}", "quantity": 2, "price": 7500.0, "subtotal": 15000.0}
+                  for i in range(lines)],
+    }
+
+
+class _CaptureS3:
+    def put_object(self, **kwargs):
+        pass
+
+
+def legacy_renderer():
+    """Render lewat jalur upload lama (tanpa modul invoice_service)"""
+    import aws_service
+
+    manager = aws_service.AWSS3Manager()
+    manager.enabled, manager.s3_client = True, _CaptureS3()
+    aws_service.print = lambda *args, **kwargs: None
+    return lambda orders: [manager.generate_and_upload_invoice(order, order["order_id"]) for order in orders]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--app-dir", default=BACKEND_DIR)
+    parser.add_argument("--workers", type=int, nargs="+", default=[0, os.cpu_count() or 1])
+    parser.add_argument("--scale", type=float, default=1.0, help="pengali jumlah invoice per ukuran")
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.abspath(args.app_dir))
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "")
+    try:
+        from invoice_service import InvoiceRenderer, render_invoice
+    except ImportError:
+        InvoiceRenderer = None
+        print(f"invoice_service tidak ada di {args.app_dir}, memakai jalur lama (workers=0)")
+
+    print(f"{'baris':>5s} {'workers':>7s} {'invoice/s':>10s} {'/s/core':>8s}")
+    for lines, count in SIZES.items():
+        orders = [make_order(lines, i) for i in range(max(1, int(count * args.scale)))]
+        for workers in args.workers if InvoiceRenderer else [0]:
+            if InvoiceRenderer is None:
+                render, renderer = legacy_renderer(), None
+            elif workers == 0:
+                render, renderer = (lambda batch: [render_invoice(o, o["order_id"]) for o in batch]), None
+            else:
+                renderer = InvoiceRenderer(workers)
+                render = renderer.render_many
+            render(orders[:workers * 2 + 2])  # Pemanasan (termasuk start process pool)
+            start = time.perf_counter()
+            render(orders)
+            elapsed = time.perf_counter() - start
+            if renderer is not None:
+                renderer.shutdown()
+            rate = len(orders) / elapsed
+            print(f"{lines:5d} {workers:7d} {rate:10.0f} {rate / max(workers, 1):8.0f}")
+
+
+if __name__ == "__main__":
+    main()
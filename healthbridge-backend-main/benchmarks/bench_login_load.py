@@ -0,0 +1,52 @@
+"""Login storm: throughput login (bcrypt) dan tail latency endpoint lain yang tidak terkait.
+
+    python benchmarks/bench_login_load.py
+    python benchmarks/bench_login_load.py --app-dir /tmp/before/healthbridge-backend-main --only default
+
+Sejumlah koneksi terus-menerus login sebagai admin, sementara satu probe
+memanggil GET /api/medicines/1 tiap 20 ms. `threads` menjalankan bcrypt di
+threadpool (PASSWORD_HASH_WORKERS=0), `default` di process pool khusus.
+Login yang ditolak karena antrian penuh muncul sebagai kode 429.
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from _harness import ADMIN_LOGIN, add_app_args, client_for, run_load, server  # noqa: E402
+
+MODES = {
+    "threads": {"PASSWORD_HASH_WORKERS": "0"},
+    "default": {},
+}
+
+
+async def measure(base_url: str, concurrency: int, seconds: float):
+    async with client_for(base_url, concurrency + 1) as client:
+        return await asyncio.gather(
+            run_load(client, lambda c, i, n: c.post("/api/auth/login", json=ADMIN_LOGIN), concurrency, seconds),
+            run_load(client, lambda c, i, n: c.get("/api/medicines/1"), 1, seconds, pause=0.02),
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_app_args(parser)
+    parser.add_argument("--rounds", default="12", help="BCRYPT_ROUNDS")
+    parser.add_argument("--only", choices=sorted(MODES))
+    args = parser.parse_args()
+
+    print(f"{args.concurrency} koneksi login, BCRYPT_ROUNDS={args.rounds} ({args.app_dir})")
+    for name, env in MODES.items():
+        if args.only and name != args.only:
+            continue
+        with server(args.app_dir, dict(env, BCRYPT_ROUNDS=args.rounds)) as srv:
+            logins, probe = asyncio.run(measure(srv.base_url, args.concurrency, args.seconds))
+        print(f"  {name:8s} login {logins.summary()}  sukses {logins.rate('200'):.1f}/s")
+        print(f"  {'':8s} probe {probe.summary()}")
+
+
+if __name__ == "__main__":
+    main()
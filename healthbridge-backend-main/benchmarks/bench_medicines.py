@@ -0,0 +1,36 @@
+"""Latensi p50/p99 GET /api/medicines di bawah beban (seeding tidak lagi di get_db).
+
+    python benchmarks/bench_medicines.py
+    python benchmarks/bench_medicines.py --app-dir /tmp/before/healthbridge-backend-main   # sebelum
+
+Server uvicorn dijalankan di subprocess dengan database SQLite baru.
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from _harness import add_app_args, client_for, run_load, server  # noqa: E402
+
+
+async def measure(base_url: str, concurrency: int, seconds: float):
+    async with client_for(base_url, concurrency) as client:
+        for concurrent in (1, concurrency):
+            result = await run_load(client, lambda c, i, n: c.get("/api/medicines"), concurrent, seconds)
+            print(f"  {concurrent:3d} koneksi  {result.summary()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_app_args(parser)
+    args = parser.parse_args()
+
+    with server(args.app_dir) as srv:
+        print(f"GET /api/medicines ({args.app_dir})")
+        asyncio.run(measure(srv.base_url, args.concurrency, args.seconds))
+
+
+if __name__ == "__main__":
+    main()
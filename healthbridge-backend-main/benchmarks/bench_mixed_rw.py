@@ -0,0 +1,75 @@
+"""Throughput baca/tulis campuran di SQLite: WAL + antrean penulis vs tanpa.
+
+    python benchmarks/bench_mixed_rw.py
+    python benchmarks/bench_mixed_rw.py --app-dir /tmp/before/healthbridge-backend-main --only default
+
+Sebagian koneksi menulis (tambah ke keranjang & checkout), sisanya membaca
+(keranjang, detail & search obat). Error "database is locked" dihitung dari
+log server.
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from _harness import add_app_args, client_for, run_load, server  # noqa: E402
+
+MODES = {
+    "rollback journal": {"SQLITE_WAL": "false", "SQLITE_WRITE_QUEUE": "false"},
+    "WAL": {"SQLITE_WRITE_QUEUE": "false"},
+    "default": {},
+}
+SEARCHES = ["flu", "demam", "vitamin", "batuk"]
+
+
+def read(client, worker_id: int, n: int):
+    kind = n % 3
+    if kind == 0:
+        return client.get(f"/api/cart/mixed-{worker_id % 8}-{n % 5}")
+    if kind == 1:
+        return client.get(f"/api/medicines/{1 + (worker_id + n) % 40}")
+    return client.get("/api/medicines/search", params={"q": SEARCHES[n % len(SEARCHES)]})
+
+
+def write(client, worker_id: int, n: int):
+    # Dua kali tambah ke keranjang lalu checkout (transaksi tulis paling panjang)
+    session_id = f"mixed-{worker_id}-{n // 3}"
+    if n % 3:
+        return client.post("/api/cart/add", json={
+            "session_id": session_id, "medicine_id": random.randint(1, 40), "quantity": 1})
+    return client.post("/api/order/checkout", json={
+        "session_id": session_id, "customer_name": "Campuran", "phone": "0800", "address": "Jl. Campuran"})
+
+
+async def measure(base_url: str, readers: int, writers: int, seconds: float):
+    async with client_for(base_url, readers + writers) as client:
+        return await asyncio.gather(run_load(client, read, readers, seconds),
+                                    run_load(client, write, writers, seconds))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_app_args(parser, concurrency=40)
+    parser.add_argument("--write-ratio", type=float, default=0.2, help="porsi koneksi yang menulis")
+    parser.add_argument("--only", choices=sorted(MODES))
+    args = parser.parse_args()
+
+    writers = max(1, round(args.concurrency * args.write_ratio))
+    readers = args.concurrency - writers
+    print(f"{readers} koneksi baca + {writers} koneksi tulis ({args.app_dir})")
+    for name, env in MODES.items():
+        if args.only and name != args.only:
+            continue
+        with server(args.app_dir, env) as srv:
+            reads, writes = asyncio.run(measure(srv.base_url, readers, writers, args.seconds))
+            with open(srv.log_path) as log:
+                locked = log.read().count("database is locked")
+        print(f"  {name:16s} baca  {reads.summary()}")
+        print(f"  {'':16s} tulis {writes.summary()}  locked={locked}")
+
+
+if __name__ == "__main__":
+    main()
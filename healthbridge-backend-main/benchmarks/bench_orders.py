@@ -0,0 +1,141 @@
+"""Listing order admin & agregasi penjualan pada 1M baris order_items sintetis.
+
+    python benchmarks/bench_orders.py                     # 1M baris (3 item per order)
+    python benchmarks/bench_orders.py --lines 300000
+
+Setiap order juga menyimpan JSON item di kolom lama (`orders.items`) agar
+cara lama (json.loads per order, agregasi di Python) bisa diukur di data
+yang sama. Endpoint dipanggil lewat TestClient sebagai admin.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from _harness import ADMIN_LOGIN, BACKEND_DIR, import_app  # noqa: E402
+
+STATUSES = ["pending", "processing", "shipped", "delivered", "cancelled"]
+CHUNK = 20_000
+
+
+def fill(main, lines: int, rng: random.Random):
+    db = main.WriteSessionLocal()
+    try:
+        medicines = db.query(main.Medicine.id, main.Medicine.name, main.Medicine.category, main.Medicine.price).all()
+        start_date = datetime(2026, 1, 1)
+        next_id = (db.query(main.func.max(main.Order.id)).scalar() or 0) + 1
+        for first in range(0, lines // 3, CHUNK):
+            orders, order_lines = [], []
+            for i in range(first, min(lines // 3, first + CHUNK)):
+                order_id = next_id + i
+                items = []
+                for position, medicine in enumerate(rng.sample(medicines, 3)):
+                    quantity = rng.randint(1, 4)
+                    items.append({"medicine_id": medicine.id, "name": medicine.name, "price": medicine.price,
+                                  "quantity": quantity, "subtotal": medicine.price * quantity})
+                    order_lines.append(dict(items[-1], order_id=order_id, position=position,
+                                            category=medicine.category))
+                orders.append({
+                    "id": order_id, "customer_name": f"Pelanggan {i}", "phone": f"08{i % 50000:08d}",
+                    "address": "Jl. Benchmark", "legacy_items": json.dumps(items),
+                    "total_price": sum(item["subtotal"] for item in items), "status": rng.choice(STATUSES),
+                    "created_at": start_date + timedelta(minutes=i),
+                })
+            db.execute(insert(main.Order), orders)
+            db.execute(insert(main.OrderItem), order_lines)
+        db.commit()
+    finally:
+        db.close()
+
+
+def legacy_listing(main, limit: int):
+    """Cara lama: ambil order lalu json.loads kolom items tiap baris"""
+    db = main.SessionLocal()
+    try:
+        orders = db.query(main.Order).order_by(main.Order.id.desc()).limit(limit).all()
+        return [dict(id=order.id, items=json.loads(order.legacy_items)) for order in orders]
+    finally:
+        db.close()
+
+
+def listing(main, limit: int):
+    """Cara baru tanpa HTTP: ambil order lalu item semua order dalam satu query"""
+    db = main.SessionLocal()
+    try:
+        orders = db.query(main.Order).order_by(main.Order.id.desc()).limit(limit).all()
+        items = main.load_order_items(db, [order.id for order in orders])
+        return [dict(id=order.id, items=items[order.id]) for order in orders]
+    finally:
+        db.close()
+
+
+def legacy_top_medicines(main, limit: int = 10):
+    """Cara lama: tidak bisa agregasi di SQL, semua JSON item di-scan di Python"""
+    db = main.SessionLocal()
+    try:
+        totals = {}
+        for status, items in db.query(main.Order.status, main.Order.legacy_items).yield_per(5000):
+            if status in main.SALES_EXCLUDED_STATUSES:
+                continue
+            for item in json.loads(items):
+                totals[item["medicine_id"]] = totals.get(item["medicine_id"], 0) + item["quantity"]
+        return sorted(totals.items(), key=lambda row: -row[1])[:limit]
+    finally:
+        db.close()
+
+
+def p50(fn, repeat: int) -> float:
+    fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return sorted(samples)[len(samples) // 2] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--app-dir", default=BACKEND_DIR)
+    parser.add_argument("--lines", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    app = import_app(args.app_dir)
+    from fastapi.testclient import TestClient
+
+    with TestClient(app.app) as client:
+        start = time.perf_counter()
+        fill(app, args.lines, random.Random(1))
+        print(f"isi {args.lines // 3 * 3} baris order_items: {time.perf_counter() - start:.1f} s")
+        headers = {"Authorization": f"Bearer {client.post('/api/auth/login', json=ADMIN_LOGIN).json()['access_token']}"}
+
+        def get(url):
+            response = client.get(url, headers=headers)
+            assert response.status_code == 200, response.text
+            return response
+
+        assert len(get("/api/admin/orders?limit=200").json()["orders"][0]["items"]) == 3
+        rows = [
+            ("listing lama (json.loads) 200", lambda: legacy_listing(app, 200), args.repeat),
+            ("listing order_items 200", lambda: listing(app, 200), args.repeat),
+            ("GET /api/admin/orders?limit=200", lambda: get("/api/admin/orders?limit=200"), args.repeat),
+            ("  + status=shipped", lambda: get("/api/admin/orders?limit=200&status=shipped"), args.repeat),
+            ("top obat lama (scan JSON)", lambda: legacy_top_medicines(app), 3),
+            ("GET /api/admin/sales/top-medicines", lambda: get("/api/admin/sales/top-medicines"), 3),
+            ("  + 1 bulan", lambda: get("/api/admin/sales/top-medicines?date_from=2026-03-01&date_to=2026-03-31"), 3),
+            ("GET /api/admin/sales/categories", lambda: get("/api/admin/sales/categories"), 3),
+        ]
+        for label, fn, repeat in rows:
+            print(f"  {label:38s} p50 {p50(fn, repeat):9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Load test pool koneksi: threadpool AnyIO lebih besar dari pool database.
+
+    python benchmarks/bench_pool.py
+    python benchmarks/bench_pool.py --orders 20000 --concurrency 60
+
+Database diisi order sintetis sekali, lalu setiap skenario menjalankan server
+dengan salinan database yang sama dan memanggil agregasi penjualan admin
+(query yang menahan koneksi cukup lama). Statistik tunggu pool diambil dari
+/api/admin/db-pool setelah beban; pool yang habis dalam DB_POOL_TIMEOUT
+dijawab 503.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+from sqlalchemy import MetaData, create_engine
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from _harness import add_app_args, admin_headers, client_for, run_load, server, sqlite_url  # noqa: E402
+
+SCENARIOS = {
+    "threadpool 15 = pool 5+10": {"THREADPOOL_SIZE": "15", "DB_POOL_SIZE": "5", "DB_MAX_OVERFLOW": "10"},
+    "threadpool 40 > pool 5+0": {"THREADPOOL_SIZE": "40", "DB_POOL_SIZE": "5", "DB_MAX_OVERFLOW": "0"},
+    "  + DB_POOL_TIMEOUT=0.2": {"THREADPOOL_SIZE": "40", "DB_POOL_SIZE": "5", "DB_MAX_OVERFLOW": "0",
+                                "DB_POOL_TIMEOUT": "0.2"},
+}
+
+
+def fill_orders(db_path: str, orders: int, rng: random.Random):
+    """Isi order + order_items langsung ke tabel (skema dibuat app saat startup)"""
+    engine = create_engine(sqlite_url(db_path))
+    tables = MetaData()
+    tables.reflect(engine, only=["medicines", "orders", "order_items"])
+    with engine.begin() as conn:
+        medicines = conn.execute(tables.tables["medicines"].select()).all()
+        order_rows, line_rows = [], []
+        for order_id in range(1, orders + 1):
+            lines = []
+            for position, medicine in enumerate(rng.sample(medicines, 3)):
+                quantity = rng.randint(1, 4)
+                lines.append({"order_id": order_id, "position": position, "medicine_id": medicine.id,
+                              "name": medicine.name, "category": medicine.category, "price": medicine.price,
+                              "quantity": quantity, "subtotal": medicine.price * quantity})
+            line_rows += lines
+            order_rows.append({"id": order_id, "customer_name": f"Pelanggan {order_id}", "phone": "0800",
+                               "address": "Jl. Pool", "items": json.dumps([]),
+                               "total_price": sum(line["subtotal"] for line in lines),
+                               "status": rng.choice(["pending", "shipped", "delivered"]),
+                               "created_at": datetime(2026, 1, 1) + timedelta(minutes=order_id)})
+        conn.execute(tables.tables["orders"].insert(), order_rows)
+        conn.execute(tables.tables["order_items"].insert(), line_rows)
+    engine.dispose()
+
+
+async def measure(base_url: str, concurrency: int, seconds: float):
+    async with client_for(base_url, concurrency) as client:
+        headers = await admin_headers(client)
+        result = await run_load(client, lambda c, i, n: c.get("/api/admin/sales/categories", headers=headers),
+                                concurrency, seconds)
+        pool = (await client.get("/api/admin/db-pool", headers=headers)).json()
+    return result, pool
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_app_args(parser, concurrency=40)
+    parser.add_argument("--orders", type=int, default=50_000)
+    args = parser.parse_args()
+
+    template = os.path.join(tempfile.mkdtemp(prefix="hb-bench-"), "template.db")
+    with server(args.app_dir, db_path=template):
+        pass  # Startup membuat skema & seed katalog
+    fill_orders(template, args.orders, random.Random(1))
+
+    print(f"GET /api/admin/sales/categories, {args.orders * 3} baris order, {args.concurrency} koneksi")
+    for name, env in SCENARIOS.items():
+        db_path = os.path.join(tempfile.mkdtemp(prefix="hb-bench-"), "bench.db")
+        shutil.copy(template, db_path)
+        with server(args.app_dir, env, db_path=db_path) as srv:
+            result, pool = asyncio.run(measure(srv.base_url, args.concurrency, args.seconds))
+        wait = pool["wait_ms"]
+        print(f"  {name:27s} {result.summary()}")
+        print(f"  {'':27s} pool: checkouts={pool['checkouts']} timeouts={pool['timeouts']} "
+              f"wait p50 {wait['p50']:.1f} ms  p95 {wait['p95']:.1f} ms  max {wait['max']:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
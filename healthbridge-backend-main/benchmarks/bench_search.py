@@ -0,0 +1,106 @@
+"""Search full-text (FTS5) vs ILIKE substring pada 100k obat & 1M riwayat pasien sintetis.
+
+    python benchmarks/bench_search.py                                  # 100k obat, 1M pasien
+    python benchmarks/bench_search.py --medicines 20000 --patients 100000
+
+Data diisi langsung ke SQLite lalu index dibangun ulang (waktunya ikut dicetak).
+`ilike 50` = substring_records (fallback, limit 50), `ilike semua` = perilaku
+endpoint lama tanpa paginasi, `fts 50` = search_records (ranking + limit 50).
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+from sqlalchemy import insert, or_
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from _harness import BACKEND_DIR, import_app  # noqa: E402
+
+WORDS = ("demam batuk pilek pusing mual muntah diare nyeri sakit kepala perut dada sendi kulit gatal ruam sesak "
+         "napas lemas flu infeksi tablet sirup kapsul krim vitamin antibiotik salep tetes mata telinga").split()
+NAMES = "budi siti agus dewi rina andi joko sri wati eko".split()
+QUERIES = {
+    "medicines": ["sakit kepala", "vitamin", "Obat12345", "amol"],
+    "patients": ["demam", "nyeri dada", "54321", "amol"],
+}
+CHUNK = 100_000
+
+
+def fill(main, medicines: int, patients: int, rng: random.Random):
+    db = main.WriteSessionLocal()
+    try:
+        for start in range(0, medicines, CHUNK):
+            db.execute(insert(main.Medicine), [{
+                "name": f"Obat{i} {rng.choice(WORDS)}", "description": " ".join(rng.choices(WORDS, k=8)),
+                "category": rng.choice(WORDS), "price": 1000, "stock": 10,
+            } for i in range(start, min(medicines, start + CHUNK))])
+        for start in range(0, patients, CHUNK):
+            db.execute(insert(main.PatientRecord), [{
+                "name": f"{rng.choice(NAMES)} {i}", "symptoms": "-", "diagnosis": " ".join(rng.choices(WORDS, k=6)),
+                "advice": "-", "disease_name": rng.choice(WORDS),
+            } for i in range(start, min(patients, start + CHUNK))])
+        db.commit()
+    finally:
+        db.close()
+
+
+def timed(fn, repeat: int, budget: float = 5.0):
+    """(ms per panggilan, jumlah hasil); berhenti lebih awal jika melewati budget detik"""
+    rows = len(fn())
+    start = time.perf_counter()
+    runs = 0
+    while runs < repeat:
+        fn()
+        runs += 1
+        if time.perf_counter() - start > budget:
+            break
+    return (time.perf_counter() - start) / runs * 1000, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--app-dir", default=BACKEND_DIR)
+    parser.add_argument("--medicines", type=int, default=100_000)
+    parser.add_argument("--patients", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    app = import_app(args.app_dir)
+    start = time.perf_counter()
+    fill(app, args.medicines, args.patients, random.Random(1))
+    print(f"isi {args.medicines} obat + {args.patients} pasien: {time.perf_counter() - start:.1f} s")
+    db = app.WriteSessionLocal()
+    try:
+        start = time.perf_counter()
+        app.rebuild_search_index(db)
+        print(f"rebuild index: {time.perf_counter() - start:.1f} s")
+    finally:
+        db.close()
+
+    db = app.SessionLocal()
+    try:
+        print(f"{'':10s} {'query':14s} {'ilike 50':>16s} {'ilike semua':>20s} {'fts 50':>16s}")
+        for kind, queries in QUERIES.items():
+            model = app.search_index.sources[kind].model
+            fields = app.search_index.sources[kind].fields
+            for q in queries:
+                def old_endpoint():
+                    return db.query(model).filter(
+                        or_(*[getattr(model, field).ilike(f"%{q}%") for field in fields])).all()
+
+                cols = [timed(fn, args.repeat) for fn in (
+                    lambda: app.substring_records(db, kind, q, 50, 0),
+                    old_endpoint,
+                    lambda: app.search_records(db, kind, q, 50, 0),
+                )]
+                print(f"{kind:10s} {q!r:14s} " + " ".join(f"{ms:9.1f} ms {rows:>{6 if i != 1 else 9}d}"
+                                                          for i, (ms, rows) in enumerate(cols)))
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Kata umum yang tidak mengubah makna keluhan
+STOPWORDS = {
+    "dan", "atau", "yang", "di", "ke", "dari", "saya", "aku", "sudah", "sejak",
+    "ada", "dengan", "juga", "sangat", "agak", "tapi", "tetapi", "karena", "ini",
+    "itu", "untuk", "pada", "lagi", "terasa", "merasa", "mengalami",
+}
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def normalize_symptoms(symptoms: str) -> str:
+    """Bentuk kanonik keluhan: lowercase, tokenisasi, tanpa stopword, token diurutkan"""
+    tokens = {t for t in TOKEN_PATTERN.findall(symptoms.lower()) if t not in STOPWORDS}
+    return " ".join(sorted(tokens))
+
+
+class DiagnosisCache:
+    """Cache hasil diagnosa (LRU + TTL) dengan backend Redis opsional antar worker"""
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 3600, redis_url: Optional[str] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.shared_hits = 0
+        self.redis = None
+
+        if redis_url:
+            try:
+                import redis.asyncio as aioredis
+                self.redis = aioredis.from_url(redis_url)
+            except ImportError:
+                print("⚠️  Package redis tidak terpasang. Diagnosis cache hanya lokal.")
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl_seconds > 0
+
+    def make_key(self, symptoms: str) -> str:
+        return normalize_symptoms(symptoms)
+
+    def _redis_key(self, key: str) -> str:
+        return "healthbridge:diagnosis:" + hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+    def _get_local(self, key: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def _set_local(self, key: str, value: dict, ttl: float):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _record(self, hit: bool, shared: bool = False):
+        with self._lock:
+            if hit:
+                self.hits += 1
+                self.shared_hits += shared
+            else:
+                self.misses += 1
+
+    async def get(self, key: str) -> Optional[dict]:
+        if not self.enabled:
+            return None
+
+        value = self._get_local(key)
+        if value is not None:
+            self._record(True)
+            return value
+
+        if self.redis is not None:
+            try:
+                raw = await self.redis.get(self._redis_key(key))
+                if raw is not None:
+                    value = json.loads(raw)
+                    self._set_local(key, value, self.ttl_seconds)
+                    self._record(True, shared=True)
+                    return value
+            except Exception as e:
+                print(f"⚠️  Redis diagnosis cache error: {str(e)}")
+
+        self._record(False)
+        return None
+
+    async def set(self, key: str, value: dict):
+        if not self.enabled:
+            return
+
+        self._set_local(key, value, self.ttl_seconds)
+        if self.redis is not None:
+            try:
+                await self.redis.set(self._redis_key(key), json.dumps(value), ex=max(1, int(self.ttl_seconds)))
+            except Exception as e:
+                print(f"⚠️  Redis diagnosis cache error: {str(e)}")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries, hits, misses, shared_hits = len(self._entries), self.hits, self.misses, self.shared_hits
+        total = hits + misses
+        return {
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": hits,
+            "misses": misses,
+            "shared_hits": shared_hits,
+            "hit_rate": round(hits / total, 4) if total else 0.0,
+            "shared_backend": self.redis is not None,
+        }
+
+
+class PrincipalCache:
+    """Cache user terautentikasi per subject token (TTL pendek) agar auth tidak query DB tiap request.
+
+    Dengan Redis, tiap key punya nomor generasi bersama: invalidate() menaikkannya
+    sehingga entry lokal di semua worker dianggap basi pada request berikutnya.
+    Tanpa Redis invalidasi hanya berlaku di proses ini (worker lain menunggu TTL).
+    """
+
+    # Generasi tidak bisa dibaca (Redis error): jangan pakai maupun isi cache
+    UNKNOWN_GENERATION = -1
+
+    def __init__(self, max_entries: int = 4096, ttl_seconds: float = 60, redis_url: Optional[str] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        # Client sync: invalidate() dipanggil dari hook after_commit di thread session
+        self.redis = None
+
+        if redis_url:
+            try:
+                import redis
+                self.redis = redis.Redis.from_url(redis_url, socket_timeout=1)
+            except ImportError:
+                print("⚠️  Package redis tidak terpasang. Invalidasi cache auth hanya lokal.")
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl_seconds > 0
+
+    @property
+    def shared(self) -> bool:
+        return self.enabled and self.redis is not None
+
+    def _redis_key(self, key: Hashable) -> str:
+        return "healthbridge:principal:" + hashlib.sha1(str(key).encode("utf-8")).hexdigest()
+
+    def generation(self, key: Hashable) -> int:
+        """Generasi bersama key (selalu 0 tanpa Redis); ambil sebelum membaca user dari DB"""
+        if not self.shared:
+            return 0
+        try:
+            return int(self.redis.get(self._redis_key(key)) or 0)
+        except Exception as e:
+            print(f"⚠️  Redis principal cache error: {str(e)}")
+            return self.UNKNOWN_GENERATION
+
+    def get(self, key: Hashable, generation: int = 0) -> Optional[Any]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] >= time.monotonic() and entry[1] == generation:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[2]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def set(self, key: Hashable, value: Any, generation: int = 0):
+        if not self.enabled or generation == self.UNKNOWN_GENERATION:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, generation, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable):
+        with self._lock:
+            self._entries.pop(key, None)
+        if self.shared:
+            try:
+                redis_key = self._redis_key(key)
+                self.redis.incr(redis_key)
+                # Entry lokal paling lama hidup selama TTL, counter tidak perlu lebih lama dari itu
+                self.redis.expire(redis_key, int(self.ttl_seconds) + 1)
+            except Exception as e:
+                print(f"⚠️  Redis principal cache error: {str(e)}")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class CatalogSnapshotCache:
+    """Snapshot JSON katalog (bytes siap kirim) per versi, dipakai ulang sampai versinya berubah"""
+
+    def __init__(self):
+        self._snapshots: dict = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str, version: str) -> Optional[tuple]:
+        with self._lock:
+            snapshot = self._snapshots.get(name)
+        if snapshot is None or snapshot[0] != version:
+            return None
+        return snapshot[1], snapshot[2]
+
+    def set(self, name: str, version: str, body: bytes) -> tuple:
+        etag = f'"{name}-{version}"'
+        with self._lock:
+            self._snapshots[name] = (version, etag, body)
+        return etag, body
+
+    def clear(self):
+        with self._lock:
+            self._snapshots.clear()
+
+
+# Initialize diagnosis cache
+diagnosis_cache = DiagnosisCache(
+    max_entries=int(os.getenv("DIAGNOSIS_CACHE_SIZE", "1024")),
+    ttl_seconds=float(os.getenv("DIAGNOSIS_CACHE_TTL_SECONDS", "3600")),
+    redis_url=os.getenv("DIAGNOSIS_CACHE_REDIS_URL", "").strip() or None,
+)
+
+# Initialize principal cache
+principal_cache = PrincipalCache(
+    max_entries=int(os.getenv("AUTH_CACHE_SIZE", "4096")),
+    ttl_seconds=float(os.getenv("AUTH_CACHE_TTL_SECONDS", "60")),
+    redis_url=os.getenv("AUTH_CACHE_REDIS_URL", "").strip() or None,
+)
+
+# Initialize catalog snapshot cache
+catalog_cache = CatalogSnapshotCache()
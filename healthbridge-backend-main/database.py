@@ -0,0 +1,267 @@
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+
+from dotenv import load_dotenv
+from sqlalchemy import DateTime, TypeDecorator, create_engine, event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+load_dotenv()
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class UTCDateTime(TypeDecorator):
+    """DateTime timezone-aware, disimpan sebagai UTC (SQLite tidak menyimpan offset, jadi dinormalisasi di sini)"""
+    impl = DateTime(timezone=True)
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        value = value.astimezone(timezone.utc)
+        return value.replace(tzinfo=None) if dialect.name == "sqlite" else value
+
+    def process_result_value(self, value, dialect):
+        if value is not None and value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value
+
+
+class PoolMetrics:
+    """Statistik pengambilan koneksi dari pool (jumlah, timeout, lama menunggu)"""
+
+    def __init__(self, window: int = 1000):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self._recent = deque(maxlen=window)  # Lama tunggu terakhir, untuk p50/p95
+
+    def record(self, waited: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+                self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+            self._recent.append(waited)
+
+    def stats(self) -> dict:
+        with self._lock:
+            recent = sorted(self._recent)
+            checkouts, timeouts, total_wait, max_wait = self.checkouts, self.timeouts, self.total_wait, self.max_wait
+
+        def percentile(p: float) -> float:
+            return recent[min(len(recent) - 1, int(len(recent) * p))] if recent else 0.0
+
+        return {
+            "checkouts": checkouts,
+            "timeouts": timeouts,
+            "wait_ms": {
+                "avg": round(total_wait / checkouts * 1000, 3) if checkouts else 0.0,
+                "p50": round(percentile(0.5) * 1000, 3),
+                "p95": round(percentile(0.95) * 1000, 3),
+                "max": round(max_wait * 1000, 3),
+            },
+        }
+
+
+class MeteredQueuePool(QueuePool):
+    """QueuePool yang mencatat lama request menunggu koneksi (termasuk membuka koneksi baru)"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.record(time.perf_counter() - start, timed_out=True)
+            raise
+        self.metrics.record(time.perf_counter() - start)
+        return connection
+
+    def recreate(self):
+        # engine.dispose() membuat pool baru; statistik tetap dilanjutkan
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class MeteredAsyncQueuePool(MeteredQueuePool, AsyncAdaptedQueuePool):
+    """Versi asyncio dari MeteredQueuePool (untuk engine aiosqlite/asyncpg)"""
+
+
+# Driver async pengganti driver sync di DATABASE_URL
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+
+def async_database_url(url: str) -> str:
+    scheme, rest = url.split("://", 1)
+    dialect = scheme.split("+", 1)[0]
+    if dialect not in ASYNC_DRIVERS:
+        raise ValueError(f"Mode async tidak mendukung database '{dialect}'")
+    return f"{ASYNC_DRIVERS[dialect]}://{rest}"
+
+
+def env_flag(name: str, default: bool) -> bool:
+    value = os.getenv(name, "").strip().lower()
+    return default if not value else value in ("1", "true", "yes", "on")
+
+
+def is_sqlite_file(url: str) -> bool:
+    return url.startswith("sqlite") and ":memory:" not in url and url.rstrip("/") != "sqlite:"
+
+
+def apply_sqlite_pragmas(engine, begin_immediate: bool = False):
+    """PRAGMA per koneksi: WAL (pembaca tidak memblokir penulis), synchronous, busy_timeout, mmap, foreign_keys"""
+    wal = env_flag("SQLITE_WAL", True)
+    synchronous = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL").strip().upper()
+    busy_timeout = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+    mmap_size = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        if wal:
+            cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute(f"PRAGMA synchronous={synchronous}")
+        cursor.execute(f"PRAGMA busy_timeout={busy_timeout}")
+        cursor.execute(f"PRAGMA mmap_size={mmap_size}")
+        # SQLite mengabaikan ON DELETE CASCADE / SET NULL tanpa pragma ini (default off per koneksi)
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+        if begin_immediate:
+            # Transaksi dibuka sendiri lewat event "begin" di bawah, bukan oleh driver sqlite3
+            dbapi_connection.isolation_level = None
+
+    if begin_immediate:
+        @event.listens_for(engine, "begin")
+        def begin_immediate_transaction(connection):
+            # Kunci tulis diambil di awal transaksi: tidak ada upgrade read->write yang gagal "database is locked"
+            connection.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+def build_engine(url: str, use_async: bool, **options):
+    """create_engine biasa, atau create_async_engine (aiosqlite/asyncpg) jika use_async"""
+    if not use_async:
+        return create_engine(url, **options)
+    # Import di sini: mode async butuh paket tambahan (greenlet + aiosqlite/asyncpg)
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    return create_async_engine(async_database_url(url), **options)
+
+
+def create_engine_from_env(url: str, use_async: bool = False):
+    """Engine SQLAlchemy dengan pengaturan pool dari env.
+
+    DB_POOL_SIZE + DB_MAX_OVERFLOW adalah batas koneksi per proses; request
+    yang tidak kebagian menunggu maksimal DB_POOL_TIMEOUT detik. Koneksi
+    dicek sebelum dipakai (pre-ping) dan diganti setelah DB_POOL_RECYCLE detik
+    agar tidak memakai koneksi yang sudah diputus RDS/load balancer.
+    Dengan use_async hasilnya AsyncEngine dengan pengaturan yang sama.
+    """
+    connect_args = {}
+    options = {}
+    if url.startswith("sqlite"):
+        if not use_async:
+            connect_args["check_same_thread"] = False
+    elif url.startswith("postgresql"):
+        timeout_ms = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "30000"))
+        connect_timeout = int(os.getenv("DB_CONNECT_TIMEOUT", "10"))
+        if use_async:
+            # asyncpg memakai nama parameter yang berbeda dari psycopg2
+            if timeout_ms > 0:
+                connect_args["server_settings"] = {"statement_timeout": str(timeout_ms)}
+            connect_args["timeout"] = connect_timeout
+        else:
+            if timeout_ms > 0:
+                connect_args["options"] = f"-c statement_timeout={timeout_ms}"
+            connect_args["connect_timeout"] = connect_timeout
+
+    if is_sqlite_file(url) or not url.startswith("sqlite"):
+        options.update(
+            poolclass=MeteredAsyncQueuePool if use_async else MeteredQueuePool,
+            pool_size=int(os.getenv("DB_POOL_SIZE", "5")),
+            max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "10")),
+            pool_timeout=float(os.getenv("DB_POOL_TIMEOUT", "30")),
+            pool_recycle=int(os.getenv("DB_POOL_RECYCLE", "1800")),
+            pool_pre_ping=env_flag("DB_POOL_PRE_PING", True),
+        )
+    engine = build_engine(url, use_async, connect_args=connect_args, **options)
+    if is_sqlite_file(url):
+        apply_sqlite_pragmas(getattr(engine, "sync_engine", engine))
+    return engine
+
+
+def create_write_engine_from_env(url: str, engine, use_async: bool = False):
+    """SQLite: engine khusus tulis dengan satu koneksi, antrean pool-nya menjadi antrean penulis.
+
+    Semua penulis di proses ini dilayani bergiliran (BEGIN IMMEDIATE), pembaca
+    tetap paralel lewat `engine`. Selain SQLite file (atau SQLITE_WRITE_QUEUE=false),
+    `engine` yang sama dipakai untuk baca & tulis.
+    """
+    if not is_sqlite_file(url) or not env_flag("SQLITE_WRITE_QUEUE", True):
+        return engine
+    write_engine = build_engine(
+        url,
+        use_async,
+        connect_args={} if use_async else {"check_same_thread": False},
+        poolclass=MeteredAsyncQueuePool if use_async else MeteredQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=float(os.getenv("SQLITE_WRITE_TIMEOUT", "30")),
+    )
+    apply_sqlite_pragmas(getattr(write_engine, "sync_engine", write_engine), begin_immediate=True)
+    return write_engine
+
+
+class ReadWriteSession(Session):
+    """Session yang memakai engine utama (baca) atau write_engine (writer=True).
+
+    Transaksi tulis dibuka dengan writer=True sejak awal sehingga query baca
+    sebelum tulis pertama sudah memakai koneksi penulis (snapshot yang sama
+    dengan tulisannya). Session baca biasa tidak pernah pindah ke penulis.
+    """
+
+    def __init__(self, *args, write_engine=None, writer: bool = False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.write_engine = write_engine
+        self.writer = writer
+
+    def get_bind(self, mapper=None, *, clause=None, **kwargs):
+        if self.writer and self.write_engine is not None:
+            return self.write_engine
+        return super().get_bind(mapper, clause=clause, **kwargs)
+
+
+def pool_stats(engine) -> dict:
+    """Kondisi pool saat ini + statistik menunggu koneksi"""
+    pool = getattr(engine, "sync_engine", engine).pool
+    stats = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update(
+            pool_size=pool.size(),
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            # Negatif berarti koneksi inti pool belum semuanya dibuka
+            overflow=pool.overflow(),
+            max_overflow=pool._max_overflow,
+            timeout_seconds=pool.timeout(),
+        )
+    if isinstance(pool, MeteredQueuePool):
+        stats.update(pool.metrics.stats())
+    return stats
@@ -0,0 +1,219 @@
+import threading
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+PREFIX_LENGTH = 4
+MIN_WORD_LENGTH = 4  # Kata dengan panjang <= 3 tidak ikut dihitung
+
+
+class DiseaseIndex:
+    """Inverted index untuk scoring penyakit di /api/diagnose.
+
+    Hasil best_match() identik dengan scoring loop lama:
+    +10 jika nama penyakit dan diagnosa saling mengandung, +2 per pasangan
+    (kata keluhan, keyword gejala) yang saling mengandung, dan +1 jika hanya
+    4 huruf awalnya sama. Skor seri dimenangkan id penyakit terkecil.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self):
+        self.loaded = False
+        self.diseases: Dict[int, dict] = {}
+        # Keyword gejala (unik) -> kid, dan posting kid -> {disease_id: jumlah kemunculan}
+        self._keyword_ids: Dict[str, int] = {}
+        self._keywords: list = []
+        self._postings: list = []
+        self._disease_keywords: Dict[int, Counter] = {}
+        self._max_keyword_length = 0
+        # 4-gram -> kid (kandidat "kata ada di dalam keyword"), prefix 4 huruf -> kid
+        self._keyword_grams: Dict[str, Set[int]] = defaultdict(set)
+        self._prefixes: Dict[str, Set[int]] = defaultdict(set)
+        # Nama penyakit (lowercase) -> id
+        self._names: Dict[str, Set[int]] = defaultdict(set)
+        self._name_grams: Dict[str, Set[str]] = defaultdict(set)
+        self._name_lengths: Counter = Counter()
+        self._disease_names: Dict[int, str] = {}
+
+    @staticmethod
+    def _grams(text: str) -> Set[str]:
+        return {text[i:i + PREFIX_LENGTH] for i in range(len(text) - PREFIX_LENGTH + 1)}
+
+    def _keyword_id(self, keyword: str) -> int:
+        kid = self._keyword_ids.get(keyword)
+        if kid is None:
+            kid = len(self._keywords)
+            self._keyword_ids[keyword] = kid
+            self._keywords.append(keyword)
+            self._postings.append({})
+            self._max_keyword_length = max(self._max_keyword_length, len(keyword))
+            for gram in self._grams(keyword):
+                self._keyword_grams[gram].add(kid)
+            if len(keyword) >= PREFIX_LENGTH:
+                self._prefixes[keyword[:PREFIX_LENGTH]].add(kid)
+        return kid
+
+    def rebuild(self, diseases: Iterable[dict]):
+        with self._lock:
+            self._reset()
+            for disease in diseases:
+                self._add(disease)
+            self.loaded = True
+
+    def upsert(self, disease: dict):
+        with self._lock:
+            self._remove(disease["id"])
+            self._add(disease)
+
+    def remove(self, disease_id: int):
+        with self._lock:
+            self._remove(disease_id)
+
+    def get(self, disease_id: int) -> Optional[dict]:
+        return self.diseases.get(disease_id)
+
+    def all(self) -> List[dict]:
+        with self._lock:
+            return list(self.diseases.values())
+
+    def _add(self, disease: dict):
+        disease_id = disease["id"]
+        self.diseases[disease_id] = disease
+
+        keywords = Counter(k.strip().lower() for k in (disease["symptoms"] or "").split(','))
+        for keyword, count in keywords.items():
+            self._postings[self._keyword_id(keyword)][disease_id] = count
+        self._disease_keywords[disease_id] = keywords
+
+        name = (disease["name"] or "").lower()
+        self._disease_names[disease_id] = name
+        if not self._names[name]:
+            self._name_lengths[len(name)] += 1
+            for gram in self._grams(name):
+                self._name_grams[gram].add(name)
+        self._names[name].add(disease_id)
+
+    def _remove(self, disease_id: int):
+        if disease_id not in self.diseases:
+            return
+        del self.diseases[disease_id]
+
+        for keyword in self._disease_keywords.pop(disease_id):
+            self._postings[self._keyword_ids[keyword]].pop(disease_id, None)
+
+        name = self._disease_names.pop(disease_id)
+        self._names[name].discard(disease_id)
+        if not self._names[name]:
+            del self._names[name]
+            self._name_lengths[len(name)] -= 1
+            if not self._name_lengths[len(name)]:
+                del self._name_lengths[len(name)]
+            for gram in self._grams(name):
+                self._name_grams[gram].discard(name)
+
+    def _names_matching(self, diagnosis: str) -> Set[int]:
+        """Id penyakit yang namanya ada di dalam diagnosa atau sebaliknya"""
+        matched_names = set()
+
+        # Nama di dalam diagnosa: geser jendela untuk setiap panjang nama
+        for length in self._name_lengths:
+            for i in range(len(diagnosis) - length + 1):
+                window = diagnosis[i:i + length]
+                if window in self._names:
+                    matched_names.add(window)
+
+        # Diagnosa di dalam nama
+        if len(diagnosis) >= PREFIX_LENGTH:
+            candidates = self._name_grams.get(diagnosis[:PREFIX_LENGTH], ())
+        else:
+            candidates = self._names.keys()
+        for name in candidates:
+            if diagnosis in name:
+                matched_names.add(name)
+
+        ids = set()
+        for name in matched_names:
+            ids.update(self._names[name])
+        return ids
+
+    def _keywords_containing(self, word: str) -> Set[int]:
+        """Keyword yang mengandung kata ini atau terkandung di dalam kata ini"""
+        kids = set()
+        for kid in self._keyword_grams.get(word[:PREFIX_LENGTH], ()):
+            if word in self._keywords[kid]:
+                kids.add(kid)
+
+        max_length = min(len(word), self._max_keyword_length)
+        if "" in self._keyword_ids:
+            kids.add(self._keyword_ids[""])
+        for i in range(len(word)):
+            for j in range(i + 1, min(len(word), i + max_length) + 1):
+                kid = self._keyword_ids.get(word[i:j])
+                if kid is not None:
+                    kids.add(kid)
+        return kids
+
+    def _word_scores(self, word: str) -> Dict[int, int]:
+        """Skor per penyakit untuk satu kemunculan kata keluhan"""
+        scores: Dict[int, int] = defaultdict(int)
+        contained = self._keywords_containing(word)
+        for kid in contained:
+            for disease_id, count in self._postings[kid].items():
+                scores[disease_id] += 2 * count
+
+        for kid in self._prefixes.get(word[:PREFIX_LENGTH], ()):
+            if kid in contained:
+                continue
+            for disease_id, count in self._postings[kid].items():
+                scores[disease_id] += count
+        return scores
+
+    def _scores(self, symptoms: str, diagnosis: str, word_cache: dict, name_cache: dict) -> Dict[int, int]:
+        scores: Dict[int, int] = defaultdict(int)
+        diagnosis = diagnosis.lower()
+        if diagnosis not in name_cache:
+            name_cache[diagnosis] = self._names_matching(diagnosis)
+        for disease_id in name_cache[diagnosis]:
+            scores[disease_id] += 10
+
+        words = Counter(w.strip().lower() for w in symptoms.lower().split())
+        for word, word_count in words.items():
+            if len(word) < MIN_WORD_LENGTH:
+                continue
+            if word not in word_cache:
+                word_cache[word] = self._word_scores(word)
+            for disease_id, score in word_cache[word].items():
+                scores[disease_id] += score * word_count
+        return scores
+
+    def scores(self, symptoms: str, diagnosis: str) -> Dict[int, int]:
+        with self._lock:
+            return self._scores(symptoms, diagnosis, {}, {})
+
+    @staticmethod
+    def _best(scores: Dict[int, int]) -> Tuple[Optional[int], int]:
+        best_id = None
+        best_score = 0
+        for disease_id, score in scores.items():
+            if score > best_score or (score == best_score and score > 0 and disease_id < best_id):
+                best_id = disease_id
+                best_score = score
+        return best_id, best_score
+
+    def best_match(self, symptoms: str, diagnosis: str) -> Tuple[Optional[int], int]:
+        return self._best(self.scores(symptoms, diagnosis))
+
+    def best_matches(self, items: Iterable[Tuple[str, str]]) -> List[Tuple[Optional[int], int]]:
+        """best_match() untuk banyak (keluhan, diagnosa) sekaligus dalam satu lintasan.
+
+        Skor tiap kata keluhan dan tiap diagnosa unik dihitung sekali untuk
+        seluruh batch (keluhan massal banyak berulang), hasil identik dengan
+        memanggil best_match() per baris.
+        """
+        word_cache: Dict[str, Dict[int, int]] = {}
+        name_cache: Dict[str, Set[int]] = {}
+        with self._lock:
+            return [self._best(self._scores(symptoms, diagnosis, word_cache, name_cache))
+                    for symptoms, diagnosis in items]
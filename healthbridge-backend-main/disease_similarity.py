@@ -0,0 +1,217 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+from collections import Counter
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+
+from cache_service import STOPWORDS, TOKEN_PATTERN
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+FORMAT_VERSION = 1
+NGRAM_SIZES = (3, 4, 5)
+# Bobot tiap kolom penyakit di dokumen TF-IDF-nya
+FIELD_WEIGHTS = (("name", 1.0), ("symptoms", 2.0), ("description", 0.5))
+ARRAYS = ("grams", "idf", "indptr", "rows", "data", "ids")
+
+
+def ngrams(text: Optional[str], weight: float = 1.0, counts: Optional[Counter] = None) -> Counter:
+    """Hitungan n-gram karakter per kata (kata diberi batas spasi: " mual " -> " mu", "mua", ...)"""
+    counts = Counter() if counts is None else counts
+    for token in TOKEN_PATTERN.findall((text or "").lower()):
+        if token in STOPWORDS:
+            continue
+        padded = f" {token} "
+        for size in NGRAM_SIZES:
+            for i in range(len(padded) - size + 1):
+                counts[padded[i:i + size]] += weight
+    return counts
+
+
+def fingerprint(diseases: List[dict]) -> str:
+    """Hash isi katalog + parameter, dipakai sebagai nama folder matrix di disk"""
+    digest = hashlib.sha1(json.dumps([FORMAT_VERSION, NGRAM_SIZES, FIELD_WEIGHTS]).encode())
+    for disease in sorted(diseases, key=lambda d: d["id"]):
+        digest.update(json.dumps([disease["id"]] + [disease.get(f) for f, _ in FIELD_WEIGHTS]).encode())
+    return digest.hexdigest()[:16]
+
+
+class _Matrix(NamedTuple):
+    grams: "np.ndarray"   # Vocabulary n-gram, terurut (dicari dengan searchsorted)
+    idf: "np.ndarray"
+    indptr: "np.ndarray"  # Posting n-gram ke-i: rows/data[indptr[i]:indptr[i + 1]]
+    rows: "np.ndarray"    # Baris penyakit
+    data: "np.ndarray"    # Bobot TF-IDF ternormalisasi
+    ids: "np.ndarray"     # Baris -> disease id
+
+
+class DiseaseSimilarity:
+    """Kemiripan keluhan vs penyakit dengan TF-IDF n-gram karakter (butuh numpy).
+
+    Tiap penyakit (nama, gejala, deskripsi) menjadi satu vektor TF-IDF
+    ternormalisasi; skor sebuah keluhan adalah cosine similarity-nya, dihitung
+    dengan satu perkalian matrix sparse x vektor. N-gram karakter membuat
+    imbuhan & salah ketik ("pusingnya", "demem") tetap mirip.
+
+    Matrix disimpan per fingerprint katalog di `directory` (file .npy) dan
+    dibuka dengan memory mapping, jadi worker lain / restart cukup memuatnya
+    tanpa membangun ulang. Perubahan katalog menghasilkan fingerprint baru.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory
+        self.enabled = np is not None
+        self.loaded = False
+        self.fingerprint: Optional[str] = None
+        self._matrix: Optional[_Matrix] = None
+        self._lock = threading.Lock()
+        if not self.enabled:
+            print("⚠️  Package numpy tidak terpasang. Pencocokan penyakit memakai keyword.")
+
+    def invalidate(self):
+        """Katalog berubah: matrix dibangun/dimuat ulang saat load_or_build berikutnya"""
+        self.loaded = False
+
+    def load_or_build(self, diseases: Iterable[dict]) -> bool:
+        """Muat matrix katalog ini dari disk (mmap) atau bangun lalu simpan, return True jika dibangun"""
+        diseases = list(diseases)
+        key = fingerprint(diseases)
+        with self._lock:
+            if self.loaded and self.fingerprint == key:
+                return False
+            path = os.path.join(self.directory, key) if self.directory else None
+            built = False
+            matrix = self._load(path) if path else None
+            if matrix is None:
+                matrix = self._build(diseases)
+                built = True
+                if path:
+                    self._save(matrix, path)
+            self._matrix = matrix
+            self.fingerprint = key
+            self.loaded = True
+            return built
+
+    @staticmethod
+    def _load(path: str) -> Optional[_Matrix]:
+        try:
+            with open(os.path.join(path, "meta.json")) as f:
+                if json.load(f).get("version") != FORMAT_VERSION:
+                    return None
+            return _Matrix(*(np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r") for name in ARRAYS))
+        except (OSError, ValueError):
+            return None
+
+    def _save(self, matrix: _Matrix, path: str):
+        # Tulis ke folder sementara lalu rename: worker lain tidak pernah membaca file setengah jadi
+        os.makedirs(self.directory, exist_ok=True)
+        staging = tempfile.mkdtemp(dir=self.directory, prefix=".build-")
+        try:
+            for name, array in zip(ARRAYS, matrix):
+                np.save(os.path.join(staging, f"{name}.npy"), array)
+            with open(os.path.join(staging, "meta.json"), "w") as f:
+                json.dump({"version": FORMAT_VERSION, "diseases": len(matrix.ids), "grams": len(matrix.grams)}, f)
+            os.rename(staging, path)
+        except OSError as e:
+            # Folder sudah dibuat worker lain, atau disk read-only: matrix di memori tetap dipakai
+            shutil.rmtree(staging, ignore_errors=True)
+            if not os.path.isdir(path):
+                print(f"⚠️  Matrix TF-IDF penyakit gagal disimpan: {str(e)}")
+            return
+
+        # Matrix katalog lama tidak dipakai lagi (proses yang masih memetakannya tetap aman)
+        for entry in os.listdir(self.directory):
+            if entry != os.path.basename(path) and not entry.startswith("."):
+                shutil.rmtree(os.path.join(self.directory, entry), ignore_errors=True)
+
+    @staticmethod
+    def _build(diseases: List[dict]) -> _Matrix:
+        diseases = sorted(diseases, key=lambda d: d["id"])
+        documents = []
+        for disease in diseases:
+            counts = Counter()
+            for field, weight in FIELD_WEIGHTS:
+                ngrams(disease.get(field), weight, counts)
+            documents.append(counts)
+
+        grams = sorted({gram for counts in documents for gram in counts})
+        columns = {gram: column for column, gram in enumerate(grams)}
+        # Triplet (kolom n-gram, baris penyakit, tf), urut baris
+        cols = np.array([columns[gram] for counts in documents for gram in counts], dtype=np.int64)
+        rows = np.repeat(np.arange(len(documents), dtype=np.int32), [len(counts) for counts in documents])
+        tf = np.array([tf for counts in documents for tf in counts.values()], dtype=np.float64)
+
+        df = np.bincount(cols, minlength=len(grams))
+        idf = np.log((1 + len(documents)) / (1 + df)) + 1
+        # Sublinear tf x idf, dinormalisasi per penyakit (L2)
+        weights = (1 + np.log(tf)) * idf[cols]
+        norms = np.sqrt(np.bincount(rows, weights=weights * weights, minlength=len(documents)))
+        weights /= np.where(norms > 0, norms, 1.0)[rows]
+
+        # Kelompokkan per n-gram (stable: baris dalam satu posting tetap urut)
+        order = np.argsort(cols, kind="stable")
+        indptr = np.zeros(len(grams) + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum(df)
+        return _Matrix(
+            grams=np.array(grams, dtype=f"<U{max(NGRAM_SIZES)}"),
+            idf=idf.astype(np.float32),
+            indptr=indptr,
+            rows=rows[order],
+            data=weights[order].astype(np.float32),
+            ids=np.array([disease["id"] for disease in diseases], dtype=np.int64),
+        )
+
+    def scores(self, text: str) -> Tuple["np.ndarray", "np.ndarray"]:
+        """(disease ids, cosine similarity) untuk semua penyakit"""
+        matrix = self._matrix
+        counts = ngrams(text)
+        if matrix is None or not counts or not len(matrix.grams):
+            ids = matrix.ids if matrix is not None else np.zeros(0, dtype=np.int64)
+            return ids, np.zeros(len(ids), dtype=np.float32)
+
+        query = np.array(list(counts), dtype=matrix.grams.dtype)
+        columns = np.minimum(np.searchsorted(matrix.grams, query), len(matrix.grams) - 1)
+        known = matrix.grams[columns] == query
+        # Vektor query ternormalisasi seperti baris matrix. N-gram yang tidak dikenal katalog
+        # (df = 0) tetap ikut di norm dengan idf maksimum, bukan idf tetangga hasil searchsorted
+        tf = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+        unknown_idf = np.float32(np.log(1 + len(matrix.ids)) + 1)
+        weights = (1 + np.log(tf)) * np.where(known, matrix.idf[columns], unknown_idf)
+        norm = np.sqrt(np.dot(weights, weights))
+        columns, weights = columns[known], weights[known] / (norm or 1.0)
+
+        # Perkalian sparse: kumpulkan posting semua n-gram query, jumlahkan per baris penyakit
+        starts, ends = matrix.indptr[columns], matrix.indptr[columns + 1]
+        lengths = ends - starts
+        offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+        totals = np.bincount(matrix.rows[offsets], weights=matrix.data[offsets] * np.repeat(weights, lengths),
+                             minlength=len(matrix.ids))
+        return matrix.ids, totals.astype(np.float32)
+
+    def top_k(self, text: str, k: int = 5) -> List[Tuple[int, float]]:
+        """k penyakit paling mirip: [(disease_id, skor 0..1)], skor seri dimenangkan id terkecil"""
+        ids, totals = self.scores(text)
+        if not len(ids) or k <= 0:
+            return []
+        if k == 1:
+            # Baris urut id, argmax mengambil yang pertama saat seri
+            rows = np.array([np.argmax(totals)])
+        else:
+            cutoff = np.partition(totals, len(totals) - k)[len(totals) - k] if k < len(totals) else 0.0
+            rows = np.flatnonzero(totals >= cutoff)
+            rows = rows[np.argsort(-totals[rows], kind="stable")][:k]
+        return [(int(ids[row]), round(float(totals[row]), 4)) for row in rows if totals[row] > 0]
+
+    def best_match(self, symptoms: str, diagnosis: str) -> Tuple[Optional[int], float]:
+        """Padanan DiseaseIndex.best_match: keluhan + diagnosa digabung menjadi satu query"""
+        top = self.top_k(f"{symptoms} {diagnosis}", 1)
+        return top[0] if top else (None, 0.0)
+
+    def best_matches(self, items: Iterable[Tuple[str, str]]) -> List[Tuple[Optional[int], float]]:
+        return [self.best_match(symptoms, diagnosis) for symptoms, diagnosis in items]
@@ -0,0 +1,254 @@
+import asyncio
+import json
+import os
+import time
+from typing import AsyncIterator, Optional
+
+import httpx
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+class DiagnosisProviderError(Exception):
+    """Provider AI gagal menjawab, pemanggil harus pindah ke mode simulasi"""
+
+
+class CircuitOpenError(DiagnosisProviderError):
+    """Circuit breaker sedang terbuka, request tidak dikirim ke provider"""
+
+
+class CircuitBreaker:
+    """Circuit breaker sederhana: closed -> open -> half-open -> closed"""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._half_open_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow_request(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half-open" and not self._half_open_in_flight:
+            # Hanya satu request percobaan yang boleh lewat saat half-open
+            self._half_open_in_flight = True
+            return True
+        return False
+
+    def release_trial(self):
+        self._half_open_in_flight = False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._half_open_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._half_open_in_flight = False
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+
+class RateLimiter:
+    """Pembatas laju async (token bucket): rata-rata `rate` request per detik, burst sampai `burst`"""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.interval = 1.0 / rate
+        self.burst = max(1, burst)
+        self._next_slot = 0.0
+
+    async def acquire(self):
+        # Tanpa await di antara baca & tulis _next_slot: aman di satu event loop tanpa lock
+        now = time.monotonic()
+        slot = max(self._next_slot, now - (self.burst - 1) * self.interval)
+        self._next_slot = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+class GeminiProvider:
+    """Client async Gemini dengan connection pool keep-alive dan batas konkurensi"""
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str = "https://generativelanguage.googleapis.com/v1beta",
+        model: str = "gemini-pro",
+        timeout: float = 10.0,
+        max_connections: int = 20,
+        max_concurrency: int = 10,
+        breaker: Optional[CircuitBreaker] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.max_concurrency = max_concurrency
+        self.breaker = breaker or CircuitBreaker()
+        # Kuota API per key: batasi laju request (misal saat diagnosa batch), None = tanpa batas
+        self.rate_limiter = rate_limiter
+        # Transport httpx khusus (misal httpx.MockTransport untuk test), None = jaringan biasa
+        self.transport = transport
+        self.enabled = bool(api_key)
+        # Client & semaphore dibuat saat pertama dipakai agar terikat ke event loop yang benar
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+        if not self.enabled:
+            print("⚠️  GEMINI_API_KEY not found. Diagnosa memakai mode simulasi.")
+
+    @property
+    def url(self) -> str:
+        return f"{self.base_url}/models/{self.model}:generateContent"
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+                headers={"Content-Type": "application/json"},
+                transport=self.transport,
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._client
+
+    @property
+    def stream_url(self) -> str:
+        return f"{self.base_url}/models/{self.model}:streamGenerateContent"
+
+    def _check_available(self):
+        if not self.enabled:
+            raise DiagnosisProviderError("GEMINI_API_KEY kosong")
+        if not self.breaker.allow_request():
+            raise CircuitOpenError("Circuit breaker terbuka, Gemini sedang bermasalah")
+
+    async def generate(self, prompt: str) -> str:
+        """Kirim prompt ke Gemini dan kembalikan teks jawaban"""
+        self._check_available()
+        client = self._get_client()
+        payload = {"contents": [{"parts": [{"text": prompt}]}]}
+
+        try:
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire()
+            async with self._semaphore:
+                response = await client.post(self.url, params={"key": self.api_key}, json=payload)
+        except httpx.HTTPError as e:
+            self.breaker.record_failure()
+            raise DiagnosisProviderError(f"Koneksi Gagal: {e!r}")
+        except asyncio.CancelledError:
+            # Request dibatalkan (client disconnect), jangan biarkan half-open tersangkut
+            self.breaker.release_trial()
+            raise
+
+        if response.status_code != 200:
+            self.breaker.record_failure()
+            raise DiagnosisProviderError(f"Koneksi Gagal: {response.status_code}")
+
+        self.breaker.record_success()
+        try:
+            result = response.json()
+            if 'candidates' not in result:
+                raise DiagnosisProviderError("Google menolak menjawab (Safety Filter)")
+            return result['candidates'][0]['content']['parts'][0]['text']
+        except (ValueError, KeyError, IndexError) as e:
+            raise DiagnosisProviderError(f"Format jawaban Gemini tidak dikenali: {e!r}")
+
+    async def generate_stream(self, prompt: str) -> AsyncIterator[str]:
+        """Seperti generate(), tetapi teks jawaban di-yield per potongan begitu diterima.
+
+        Memakai streamGenerateContent dengan alt=sse (satu baris `data: {json}`
+        per potongan). Gagal di tengah stream juga menjadi DiagnosisProviderError;
+        potongan yang sudah di-yield tetap menjadi tanggung jawab pemanggil.
+        """
+        self._check_available()
+        client = self._get_client()
+        payload = {"contents": [{"parts": [{"text": prompt}]}]}
+
+        received = False
+        try:
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire()
+            async with self._semaphore:
+                async with client.stream("POST", self.stream_url, params={"key": self.api_key, "alt": "sse"},
+                                         json=payload) as response:
+                    if response.status_code != 200:
+                        self.breaker.record_failure()
+                        raise DiagnosisProviderError(f"Koneksi Gagal: {response.status_code}")
+                    self.breaker.record_success()
+
+                    async for line in response.aiter_lines():
+                        if not line.startswith("data:"):
+                            continue
+                        try:
+                            chunk = json.loads(line[5:])
+                            if 'candidates' not in chunk:
+                                raise DiagnosisProviderError("Google menolak menjawab (Safety Filter)")
+                            # Potongan terakhir bisa hanya berisi finishReason tanpa teks
+                            parts = chunk['candidates'][0].get('content', {}).get('parts', [])
+                            text = "".join(part.get('text', "") for part in parts)
+                        except (ValueError, KeyError, IndexError, AttributeError) as e:
+                            raise DiagnosisProviderError(f"Format jawaban Gemini tidak dikenali: {e!r}")
+                        if text:
+                            received = True
+                            yield text
+        except httpx.HTTPError as e:
+            self.breaker.record_failure()
+            raise DiagnosisProviderError(f"Koneksi Gagal: {e!r}")
+        except (asyncio.CancelledError, GeneratorExit):
+            # Stream dihentikan pemanggil (client disconnect), jangan biarkan half-open tersangkut
+            self.breaker.release_trial()
+            raise
+
+        if not received:
+            raise DiagnosisProviderError("Jawaban Gemini kosong")
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._semaphore = None
+
+
+def create_provider_from_env() -> GeminiProvider:
+    max_rps = float(os.getenv("GEMINI_MAX_RPS", "0"))
+    return GeminiProvider(
+        api_key=os.getenv("GEMINI_API_KEY", "").strip(),
+        base_url=os.getenv("GEMINI_BASE_URL", "https://generativelanguage.googleapis.com/v1beta"),
+        model=os.getenv("GEMINI_MODEL", "gemini-pro"),
+        timeout=float(os.getenv("GEMINI_TIMEOUT", "10")),
+        max_connections=int(os.getenv("GEMINI_MAX_CONNECTIONS", "20")),
+        max_concurrency=int(os.getenv("GEMINI_MAX_CONCURRENCY", "10")),
+        breaker=CircuitBreaker(
+            failure_threshold=int(os.getenv("GEMINI_BREAKER_THRESHOLD", "5")),
+            reset_timeout=float(os.getenv("GEMINI_BREAKER_RESET_SECONDS", "30")),
+        ),
+        rate_limiter=RateLimiter(max_rps, burst=int(os.getenv("GEMINI_BURST", "10"))) if max_rps > 0 else None,
+    )
+
+
+# Initialize Gemini provider
+diagnosis_provider = create_provider_from_env()
+
+
+def get_diagnosis_provider():
+    """Dependency FastAPI, bisa di-override (dependency_overrides) untuk testing"""
+    return diagnosis_provider
@@ -0,0 +1,176 @@
+from datetime import timedelta
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import case, delete
+
+from database import utcnow
+
+
+class StockShortage(Exception):
+    """Stok tidak cukup; shortfalls berisi detail per item"""
+
+    def __init__(self, shortfalls: List[dict]):
+        super().__init__("Stok tidak cukup")
+        self.shortfalls = shortfalls
+
+
+class InventoryManager:
+    """Pengurangan stok atomik + reservasi keranjang berbatas waktu.
+
+    Stok hanya diubah lewat UPDATE bersyarat (stock >= qty) atau setelah baris
+    obatnya dikunci (SELECT ... FOR UPDATE) sehingga tidak ada lost update
+    maupun oversell walau checkout berjalan paralel. Baris obat selalu dikunci
+    urut medicine_id agar transaksi paralel tidak saling deadlock.
+
+    Reservasi langsung memotong stok dan dikembalikan jika kedaluwarsa,
+    dihapus dari keranjang, atau dipakai saat checkout.
+    """
+
+    def __init__(
+        self,
+        medicine_model,
+        reservation_model,
+        hold_minutes: float = 15,
+    ):
+        self.medicine_model = medicine_model
+        self.reservation_model = reservation_model
+        self.hold_minutes = hold_minutes
+
+    def _take(self, db, medicine_id: int, quantity: int) -> bool:
+        Medicine = self.medicine_model
+        taken = db.query(Medicine).filter(
+            Medicine.id == medicine_id,
+            Medicine.stock >= quantity,
+        ).update({Medicine.stock: Medicine.stock - quantity}, synchronize_session=False)
+        return taken == 1
+
+    def _give(self, db, medicine_id: int, quantity: int):
+        Medicine = self.medicine_model
+        db.query(Medicine).filter(Medicine.id == medicine_id).update(
+            {Medicine.stock: Medicine.stock + quantity}, synchronize_session=False
+        )
+
+    def available(self, db, medicine_id: int) -> int:
+        Medicine = self.medicine_model
+        row = db.query(Medicine.stock).filter(Medicine.id == medicine_id).first()
+        return row.stock if row else 0
+
+    def _claim(self, db, reservation) -> int:
+        """Hapus satu reservasi, return jumlahnya (0 jika sudah diambil proses lain)"""
+        Reservation = self.reservation_model
+        deleted = db.query(Reservation).filter(Reservation.id == reservation.id).delete(synchronize_session=False)
+        return reservation.quantity if deleted == 1 else 0
+
+    def release_expired(self, db, medicine_ids: Optional[Iterable[int]] = None) -> int:
+        """Kembalikan stok dari reservasi yang kedaluwarsa (commit dilakukan pemanggil)"""
+        Reservation = self.reservation_model
+        query = db.query(Reservation).filter(Reservation.expires_at <= utcnow())
+        if medicine_ids is not None:
+            query = query.filter(Reservation.medicine_id.in_(list(medicine_ids)))
+
+        released = 0
+        for reservation in query.order_by(Reservation.medicine_id, Reservation.id).all():
+            quantity = self._claim(db, reservation)
+            if quantity:
+                self._give(db, reservation.medicine_id, quantity)
+                released += 1
+        return released
+
+    def reserve(self, db, session_id: str, medicine_id: int, quantity: int):
+        """Set reservasi (session, obat) menjadi `quantity` dan perpanjang waktunya"""
+        if quantity <= 0:
+            # Jumlah negatif akan menambah stok; hapus item memakai release()
+            raise ValueError(f"Jumlah reservasi harus positif, bukan {quantity}")
+        Reservation = self.reservation_model
+        self.release_expired(db, [medicine_id])
+
+        reservation = db.query(Reservation).filter(
+            Reservation.session_id == session_id,
+            Reservation.medicine_id == medicine_id,
+        ).first()
+        held = reservation.quantity if reservation else 0
+
+        delta = quantity - held
+        if delta > 0 and not self._take(db, medicine_id, delta):
+            raise StockShortage([{
+                "medicine_id": medicine_id,
+                "requested": quantity,
+                "available": self.available(db, medicine_id) + held,
+            }])
+        if delta < 0:
+            self._give(db, medicine_id, -delta)
+
+        expires_at = utcnow() + timedelta(minutes=self.hold_minutes)
+        if reservation is None:
+            reservation = Reservation(session_id=session_id, medicine_id=medicine_id,
+                                      quantity=quantity, expires_at=expires_at)
+            db.add(reservation)
+        else:
+            reservation.quantity = quantity
+            reservation.expires_at = expires_at
+        return reservation
+
+    def release(self, db, session_id: str, medicine_id: Optional[int] = None):
+        """Batalkan reservasi session (semua atau satu obat) dan kembalikan stoknya"""
+        Reservation = self.reservation_model
+        query = db.query(Reservation).filter(Reservation.session_id == session_id)
+        if medicine_id is not None:
+            query = query.filter(Reservation.medicine_id == medicine_id)
+
+        for reservation in query.order_by(Reservation.medicine_id).all():
+            quantity = self._claim(db, reservation)
+            if quantity:
+                self._give(db, reservation.medicine_id, quantity)
+
+    def adjust(self, db, medicine_id: int, delta: int):
+        """Koreksi stok tersedia sebesar delta (misal dari admin) tanpa menimpa reservasi yang berjalan"""
+        if delta < 0 and not self._take(db, medicine_id, -delta):
+            raise StockShortage([{
+                "medicine_id": medicine_id,
+                "requested": -delta,
+                "available": self.available(db, medicine_id),
+            }])
+        if delta > 0:
+            self._give(db, medicine_id, delta)
+
+    def commit_sale(self, db, session_id: str, lines: Dict[int, int]):
+        """Kurangi stok untuk checkout {medicine_id: qty}, memakai reservasi session jika ada.
+
+        Reservasi kedaluwarsa dilepas pemanggil (release_expired + commit) sebelum
+        ini, karena di sini semua baris obat dikunci sekali jalan urut medicine_id.
+        Jumlah query tetap, berapa pun isi keranjangnya. Melempar StockShortage
+        berisi semua item yang kurang; pemanggil wajib rollback agar stok &
+        reservasi kembali seperti semula.
+        """
+        Medicine = self.medicine_model
+        Reservation = self.reservation_model
+        held: Dict[int, int] = {}
+        claimed = db.execute(
+            delete(Reservation).where(Reservation.session_id == session_id)
+            .returning(Reservation.medicine_id, Reservation.quantity)
+        )
+        for medicine_id, quantity in claimed:
+            held[medicine_id] = held.get(medicine_id, 0) + quantity
+
+        needs = {}
+        for medicine_id in set(lines) | set(held):
+            need = lines.get(medicine_id, 0) - held.get(medicine_id, 0)
+            if need:
+                needs[medicine_id] = need
+        if not needs:
+            return
+
+        stock = dict(db.query(Medicine.id, Medicine.stock).filter(
+            Medicine.id.in_(list(needs))
+        ).order_by(Medicine.id).with_for_update().all())
+        shortfalls = [{
+            "medicine_id": medicine_id,
+            "requested": lines[medicine_id],
+            "available": stock.get(medicine_id, 0) + held.get(medicine_id, 0),
+        } for medicine_id in sorted(needs) if needs[medicine_id] > stock.get(medicine_id, 0)]
+        if shortfalls:
+            raise StockShortage(shortfalls)
+
+        db.query(Medicine).filter(Medicine.id.in_(list(needs))).update(
+            {Medicine.stock: Medicine.stock - case(needs, value=Medicine.id)}, synchronize_session=False
+        )
@@ -0,0 +1,193 @@
+import json
+import threading
+import time
+import traceback
+from datetime import timedelta
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import or_
+
+from database import utcnow
+
+
+class JobQueue:
+    """Antrian job berbasis tabel database (outbox) dengan worker thread.
+
+    Job ditulis di transaksi yang sama dengan data bisnisnya (misal order),
+    lalu worker mengambilnya dengan UPDATE bersyarat sehingga aman dijalankan
+    oleh beberapa proses sekaligus. Job yang gagal dicoba lagi dengan backoff
+    eksponensial sampai max_attempts.
+    """
+
+    def __init__(
+        self,
+        session_factory,
+        job_model,
+        handlers: Dict[str, Callable[[dict], None]],
+        workers: int = 2,
+        poll_interval: float = 2.0,
+        max_attempts: int = 5,
+        backoff_base: float = 5.0,
+        backoff_max: float = 600.0,
+        lease_seconds: float = 300.0,
+        maintenance: Optional[Callable[[], None]] = None,
+        maintenance_interval: float = 60.0,
+    ):
+        self.session_factory = session_factory
+        self.job_model = job_model
+        self.handlers = handlers
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.lease_seconds = lease_seconds
+        # Tugas periodik ringan (misal melepas reservasi stok kedaluwarsa), dijalankan satu worker per interval
+        self.maintenance = maintenance
+        self.maintenance_interval = maintenance_interval
+        self._next_maintenance = 0.0
+        self._maintenance_lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+
+    def enqueue(self, db, kind: str, order_id: int, payload: dict):
+        """Tambahkan job ke session (commit dilakukan pemanggil). Idempoten per (kind, order_id)."""
+        Job = self.job_model
+        existing = db.query(Job).filter(Job.kind == kind, Job.order_id == order_id).first()
+        if existing:
+            return existing
+
+        now = utcnow()
+        job = Job(
+            kind=kind,
+            order_id=order_id,
+            payload=json.dumps(payload),
+            status="pending",
+            attempts=0,
+            max_attempts=self.max_attempts,
+            next_run_at=now,
+            created_at=now,
+            updated_at=now,
+        )
+        db.add(job)
+        return job
+
+    def notify(self):
+        """Bangunkan worker setelah job baru di-commit"""
+        self._wake.set()
+
+    def backoff(self, attempts: int) -> float:
+        return min(self.backoff_max, self.backoff_base * (2 ** (attempts - 1)))
+
+    def _claim(self, db, job_id: int) -> bool:
+        Job = self.job_model
+        now = utcnow()
+        claimed = db.query(Job).filter(
+            Job.id == job_id,
+            Job.status.in_(["pending", "running"]),
+            Job.next_run_at <= now,
+        ).update({
+            Job.status: "running",
+            Job.attempts: Job.attempts + 1,
+            # Lease: job running yang prosesnya mati akan diambil ulang setelah lewat waktu ini
+            Job.next_run_at: now + timedelta(seconds=self.lease_seconds),
+            Job.updated_at: now,
+        }, synchronize_session=False)
+        db.commit()
+        return claimed == 1
+
+    def _execute(self, job_id: int):
+        Job = self.job_model
+        db = self.session_factory()
+        try:
+            if not self._claim(db, job_id):
+                return False
+
+            job = db.query(Job).filter(Job.id == job_id).first()
+            kind, payload = job.kind, job.payload
+            # Akhiri transaksi sebelum handler jalan agar koneksi (penulis) tidak ditahan selama upload
+            db.commit()
+            handler = self.handlers.get(kind)
+            try:
+                if handler is None:
+                    raise RuntimeError(f"Handler job '{kind}' tidak ditemukan")
+                handler(json.loads(payload))
+            except Exception as e:
+                now = utcnow()
+                job.last_error = f"{type(e).__name__}: {e}"
+                job.updated_at = now
+                if job.attempts >= job.max_attempts:
+                    job.status = "failed"
+                    print(f"❌ Job #{job.id} ({job.kind}) gagal permanen: {job.last_error}")
+                else:
+                    job.status = "pending"
+                    job.next_run_at = now + timedelta(seconds=self.backoff(job.attempts))
+                    print(f"⚠️  Job #{job.id} ({job.kind}) gagal, retry ke-{job.attempts}: {job.last_error}")
+            else:
+                job.status = "done"
+                job.last_error = None
+                job.updated_at = utcnow()
+            db.commit()
+            return True
+        finally:
+            db.close()
+
+    def run_pending(self, limit: int = 10) -> int:
+        """Proses satu batch job yang sudah jatuh tempo, return jumlah job yang dijalankan"""
+        Job = self.job_model
+        db = self.session_factory()
+        try:
+            now = utcnow()
+            job_ids = [row.id for row in db.query(Job.id).filter(
+                or_(Job.status == "pending", Job.status == "running"),
+                Job.next_run_at <= now,
+            ).order_by(Job.next_run_at, Job.id).limit(limit).all()]
+        finally:
+            db.close()
+
+        processed = 0
+        for job_id in job_ids:
+            if self._stop.is_set():
+                break
+            if self._execute(job_id):
+                processed += 1
+        return processed
+
+    def run_maintenance(self):
+        if self.maintenance is None:
+            return
+        with self._maintenance_lock:
+            now = time.monotonic()
+            if now < self._next_maintenance:
+                return
+            self._next_maintenance = now + self.maintenance_interval
+        self.maintenance()
+
+    def _worker_loop(self):
+        while not self._stop.is_set():
+            try:
+                self.run_maintenance()
+                processed = self.run_pending()
+            except Exception:
+                traceback.print_exc()
+                processed = 0
+            if not processed:
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+
+    def start(self):
+        if self._threads or self.workers <= 0:
+            return
+        self._stop.clear()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker_loop, name=f"job-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: Optional[float] = 10.0):
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
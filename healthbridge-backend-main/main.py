@@ -1,19 +1,39 @@
-from fastapi import FastAPI, Depends, Query, HTTPException, status, UploadFile, File, Form
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi import FastAPI, Depends, Query, HTTPException, Request, status, UploadFile, File, Form
+from fastapi.security import APIKeyHeader, HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.staticfiles import StaticFiles
-from pydantic import BaseModel, EmailStr
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import BaseModel, EmailStr, Field, TypeAdapter
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy import create_engine, Column, Integer, String, Text, Float
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import event, func, insert, inspect, or_, text, update, Column, DateTime, ForeignKey, Index, Integer, String, Text, Float, UniqueConstraint
+from sqlalchemy.exc import IntegrityError, TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, Session
-from typing import Optional, List
-import bcrypt
+from sqlalchemy.orm import sessionmaker, object_session, relationship, Session
+from sqlalchemy.schema import CreateIndex
+from typing import Dict, Optional, List, NamedTuple, Tuple
 from jose import JWTError, jwt
-from datetime import datetime, timedelta
-import requests 
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+import anyio
+import asyncio
+import heapq
+import hmac
 import json
 import os
+import uuid
 from dotenv import load_dotenv
+from cache_service import catalog_cache, diagnosis_cache, principal_cache
+from database import (ReadWriteSession, UTCDateTime, create_engine_from_env, create_write_engine_from_env, env_flag,
+                      pool_stats, utcnow)
+from disease_index import DiseaseIndex
+from disease_similarity import DiseaseSimilarity
+from suggest_index import SuggestIndex
+from job_queue import JobQueue
+from inventory_service import InventoryManager, StockShortage
+from rules_engine import triage_rules
+from search_service import SearchIndex
+from password_service import PasswordHasherBusy, password_hasher
+from gemini_service import DiagnosisProviderError, GeminiProvider, diagnosis_provider, get_diagnosis_provider
 
 # Load environment variables from .env file
 load_dotenv()
@@ -29,34 +49,80 @@ security = HTTPBearer()
 # ==========================================
 # 1. KONFIGURASI GEMINI (HYBRID)
 # ==========================================
-GOOGLE_API_KEY = os.getenv("GEMINI_API_KEY", "").strip()
-GEMINI_URL = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-pro:generateContent?key={GOOGLE_API_KEY}"
+# Client Gemini (connection pool, batas konkurensi, circuit breaker) ada di gemini_service.py
 
 # ==========================================
 # 2. DATABASE SETUP
 # ==========================================
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./healthbridge.db")
 
-# SQLite requires check_same_thread=False, PostgreSQL doesn't need it
-if DATABASE_URL.startswith("sqlite"):
-    engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
-else:
-    engine = create_engine(DATABASE_URL)
+# Pool koneksi, pre-ping, recycle & statement timeout diatur lewat env (database.py)
+engine = create_engine_from_env(DATABASE_URL)
+# SQLite: WAL + satu koneksi penulis (antrean tulis), baca tetap paralel lewat `engine`
+write_engine = create_write_engine_from_env(DATABASE_URL, engine)
+
+class AppSession(ReadWriteSession):
+    """Session aplikasi; event cache & index didaftarkan di class ini agar berlaku juga di AsyncSession"""
+
+SessionLocal = sessionmaker(
+    class_=AppSession, autocommit=False, autoflush=False, bind=engine, write_engine=write_engine
+)
+# Transaksi tulis: seluruh session (termasuk query baca sebelum tulis) di koneksi penulis
+WriteSessionLocal = sessionmaker(
+    class_=AppSession, autocommit=False, autoflush=False, bind=engine, write_engine=write_engine, writer=True
+)
+
+# DB_ASYNC=true: endpoint utama (katalog, keranjang, checkout, diagnosa, auth) memakai
+# AsyncSession (aiosqlite/asyncpg) tanpa threadpool; admin, worker job & CLI tetap sync
+DB_ASYNC = env_flag("DB_ASYNC", False)
+AsyncSessionLocal = None
+AsyncWriteSessionLocal = None
+if DB_ASYNC:
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+
+    async_engine = create_engine_from_env(DATABASE_URL, use_async=True)
+    async_write_engine = create_write_engine_from_env(DATABASE_URL, async_engine, use_async=True)
+    AsyncSessionLocal = async_sessionmaker(
+        async_engine,
+        sync_session_class=AppSession,
+        autoflush=False,
+        write_engine=async_write_engine.sync_engine,
+    )
+    AsyncWriteSessionLocal = async_sessionmaker(
+        async_engine,
+        sync_session_class=AppSession,
+        autoflush=False,
+        write_engine=async_write_engine.sync_engine,
+        writer=True,
+    )
+    # Batas query DB async yang berjalan bersamaan (padanan batas threadpool di mode sync);
+    # tanpa batas, ribuan request berebut pool & koneksi penulis dan latensi ekornya melonjak
+    async_db_concurrency = os.getenv("DB_ASYNC_CONCURRENCY", "").strip()
+    async_db_limiter = anyio.CapacityLimiter(int(async_db_concurrency) if async_db_concurrency else (
+        int(os.getenv("DB_POOL_SIZE", "5")) + int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    ))
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+# Zona waktu untuk filter tanggal & laporan harian/per jam (data selalu disimpan UTC)
+APP_TIMEZONE = ZoneInfo(os.getenv("APP_TIMEZONE", "Asia/Jakarta"))
+
+def format_timestamp(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
 class PatientRecord(Base):
     __tablename__ = "patients"
+    # Riwayat per nama pasien, urut id terbaru (keyset pagination /api/patients?name=)
+    __table_args__ = (Index("ix_patients_name_id", "name", "id"),)
     id = Column(Integer, primary_key=True, index=True)
-    name = Column(String, index=True)
+    name = Column(String)
     symptoms = Column(Text)
     diagnosis = Column(String)
     advice = Column(Text)
     disease_name = Column(String, nullable=True)  # Nama penyakit yang terdeteksi
     disease_category = Column(String, nullable=True)  # Kategori penyakit
     medicines = Column(Text, nullable=True)  # Obat yang direkomendasikan
-    created_at = Column(String, nullable=True)  # Waktu konsultasi
+    created_at = Column(UTCDateTime, nullable=True, index=True)  # Waktu konsultasi
 
 class Disease(Base):
     __tablename__ = "diseases"
@@ -86,19 +152,54 @@ class CartItem(Base):
     __tablename__ = "cart_items"
     id = Column(Integer, primary_key=True, index=True)
     session_id = Column(String, index=True)
-    medicine_id = Column(Integer)
+    medicine_id = Column(Integer, ForeignKey("medicines.id", ondelete="CASCADE"), index=True)
     quantity = Column(Integer, default=1)
 
+    medicine = relationship("Medicine")
+
+class StockReservation(Base):
+    __tablename__ = "stock_reservations"
+    __table_args__ = (UniqueConstraint("session_id", "medicine_id", name="uq_stock_reservations_session_medicine"),)
+    id = Column(Integer, primary_key=True, index=True)
+    session_id = Column(String, index=True)
+    medicine_id = Column(Integer, ForeignKey("medicines.id", ondelete="CASCADE"), index=True)
+    quantity = Column(Integer)
+    expires_at = Column(UTCDateTime, index=True)  # Stok dikembalikan setelah lewat
+
 class Order(Base):
     __tablename__ = "orders"
+    # Covering index untuk filter rentang waktu & laporan per hari (tanpa membaca baris tabel)
+    __table_args__ = (Index("ix_orders_created_report", "created_at", "status", "total_price"),)
     id = Column(Integer, primary_key=True, index=True)
     customer_name = Column(String)
-    phone = Column(String)
+    phone = Column(String, index=True)
     address = Column(Text)
-    items = Column(Text)  # JSON string of items
+    # JSON item versi lama; dipindah ke order_items saat startup lalu dikosongkan
+    legacy_items = Column("items", Text, nullable=True)
     total_price = Column(Float)
-    status = Column(String, default="pending")
-    created_at = Column(String)
+    status = Column(String, default="pending", index=True)
+    created_at = Column(UTCDateTime)
+
+    items = relationship("OrderItem", order_by="OrderItem.position", cascade="all, delete-orphan")
+
+class OrderItem(Base):
+    __tablename__ = "order_items"
+    __table_args__ = (
+        UniqueConstraint("order_id", "position", name="uq_order_items_order_position"),
+        # Covering index untuk agregasi penjualan per obat / kategori tanpa membaca baris tabel
+        Index("ix_order_items_medicine_sales", "medicine_id", "order_id", "quantity", "subtotal"),
+        Index("ix_order_items_category_sales", "category", "order_id", "quantity", "subtotal"),
+    )
+    id = Column(Integer, primary_key=True, index=True)
+    order_id = Column(Integer, ForeignKey("orders.id", ondelete="CASCADE"), index=True, nullable=False)
+    position = Column(Integer, nullable=False)  # Urutan item di keranjang saat checkout
+    # Nama, kategori & harga disalin saat checkout agar riwayat tidak berubah jika katalog diedit
+    medicine_id = Column(Integer, ForeignKey("medicines.id", ondelete="SET NULL"), nullable=True)
+    name = Column(String)
+    category = Column(String)
+    price = Column(Float)
+    quantity = Column(Integer)
+    subtotal = Column(Float)
 
 # ==========================================
 # 2.2 TABEL USER (AUTENTIKASI)
@@ -110,1000 +211,1262 @@ class User(Base):
     password = Column(String)  # Hashed password
     name = Column(String)
     role = Column(String, default="user")  # user or admin
-    created_at = Column(String)
+    created_at = Column(UTCDateTime, index=True)
+
+# ==========================================
+# 2.3 TABEL METADATA APLIKASI
+# ==========================================
+class AppMetadata(Base):
+    __tablename__ = "app_metadata"
+    key = Column(String, primary_key=True)
+    value = Column(String)
+
+# ==========================================
+# 2.4 TABEL BACKGROUND JOB (OUTBOX)
+# ==========================================
+class BackgroundJob(Base):
+    __tablename__ = "background_jobs"
+    __table_args__ = (UniqueConstraint("kind", "order_id", name="uq_background_jobs_kind_order"),)
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String)  # order_backup / order_invoice
+    order_id = Column(Integer, index=True)
+    payload = Column(Text)  # JSON data untuk handler
+    status = Column(String, default="pending", index=True)  # pending / running / done / failed
+    attempts = Column(Integer, default=0)
+    max_attempts = Column(Integer, default=5)
+    next_run_at = Column(UTCDateTime, index=True)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(UTCDateTime)
+    updated_at = Column(UTCDateTime)
+
+# ==========================================
+# 2.5 TABEL STATISTIK DASHBOARD (MATERIALIZED)
+# ==========================================
+class DashboardStat(Base):
+    __tablename__ = "dashboard_stats"
+    status = Column(String, primary_key=True)  # Satu baris per status order
+    order_count = Column(Integer, default=0)
+    total_revenue = Column(Float, default=0)
 
 Base.metadata.create_all(bind=engine)
 
+# Index full-text untuk endpoint search (FTS5 di SQLite, tsvector di PostgreSQL)
+search_index = SearchIndex(engine)
+search_index.register("diseases", Disease, title_fields=["name"], body_fields=["category", "symptoms"])
+search_index.register("medicines", Medicine, title_fields=["name"], body_fields=["category", "description"])
+search_index.register("patients", PatientRecord, title_fields=["name"], body_fields=["diagnosis", "disease_name"])
+search_index.create_all()
+
 # ==========================================
-# 3. SEED DATA PENYAKIT
+# 2.7 MIGRASI TIMESTAMP (STRING -> DATETIME UTC)
 # ==========================================
-def seed_diseases(db: Session):
-    if db.query(Disease).count() == 0:
-        diseases_data = [
-            {
-                "name": "Demam",
-                "category": "Infeksi",
-                "description": "Demam adalah kondisi ketika suhu tubuh naik di atas normal (di atas 37.5°C). Demam merupakan respons alami tubuh terhadap infeksi virus atau bakteri.",
-                "symptoms": "Suhu tubuh tinggi, menggigil, berkeringat, sakit kepala, nyeri otot, lemas, kehilangan nafsu makan",
-                "treatment": "Istirahat yang cukup, minum banyak cairan, kompres hangat, konsumsi obat penurun panas seperti Paracetamol",
-                "medicines": "Paracetamol 500mg, Ibuprofen 400mg, Sanmol, Tempra",
-                "image_url": "/static/images/demam.png"
-            },
-            {
-                "name": "Flu (Influenza)",
-                "category": "Infeksi Virus",
-                "description": "Flu adalah infeksi virus yang menyerang sistem pernapasan. Virus influenza menyebar melalui droplet saat batuk atau bersin.",
-                "symptoms": "Hidung tersumbat, pilek, batuk, sakit tenggorokan, demam, nyeri tubuh, kelelahan",
-                "treatment": "Istirahat total, minum air hangat, konsumsi vitamin C, gunakan masker, obat flu jika diperlukan",
-                "medicines": "Decolgen, Bodrex Flu & Batuk, Neozep Forte, Panadol Cold & Flu, Vitamin C 1000mg",
-                "image_url": "/static/images/flu.png"
-            },
-            {
-                "name": "Maag (Gastritis)",
-                "category": "Pencernaan",
-                "description": "Maag adalah peradangan pada lapisan lambung yang menyebabkan nyeri dan ketidaknyamanan di perut bagian atas.",
-                "symptoms": "Nyeri ulu hati, mual, muntah, kembung, perut terasa penuh, sendawa berlebihan",
-                "treatment": "Makan teratur dan porsi kecil, hindari makanan pedas dan asam, kurangi kafein, konsumsi antasida",
-                "medicines": "Promag, Mylanta, Polysilane, Omeprazole 20mg, Lansoprazole, Antasida DOEN",
-                "image_url": "/static/images/maag.png"
-            },
-            {
-                "name": "Migrain",
-                "category": "Neurologis",
-                "description": "Migrain adalah sakit kepala berdenyut yang intense, biasanya di satu sisi kepala. Dapat disertai mual dan sensitivitas terhadap cahaya.",
-                "symptoms": "Sakit kepala berdenyut, mual, muntah, sensitif terhadap cahaya dan suara, gangguan penglihatan",
-                "treatment": "Istirahat di ruangan gelap dan tenang, kompres dingin, obat pereda nyeri, hindari pemicu migrain",
-                "medicines": "Panadol Extra, Saridon, Bodrexin, Paramex, Antalgin",
-                "image_url": "/static/images/migrain.png"
-            },
-            {
-                "name": "Dermatitis Alergi",
-                "category": "Kulit",
-                "description": "Dermatitis alergi adalah reaksi kulit terhadap alergen yang menyebabkan ruam, gatal, dan kemerahan.",
-                "symptoms": "Kulit gatal, kemerahan, ruam, bengkak, kulit kering dan bersisik, lepuhan kecil",
-                "treatment": "Hindari alergen, gunakan krim kortikosteroid, lotion pelembab, antihistamin oral jika gatal parah",
-                "medicines": "Cetirizine 10mg, Loratadine, CTM (Chlorpheniramine), Hydrocortisone Cream, Calamine Lotion",
-                "image_url": "/static/images/dermatitis.png"
-            },
-            {
-                "name": "Hipertensi",
-                "category": "Kardiovaskular",
-                "description": "Hipertensi atau tekanan darah tinggi adalah kondisi ketika tekanan darah dalam arteri meningkat secara persisten di atas 140/90 mmHg.",
-                "symptoms": "Sering tanpa gejala, sakit kepala, sesak napas, mimisan, pusing, nyeri dada",
-                "treatment": "Diet rendah garam, olahraga teratur, kelola stres, hindari alkohol dan rokok, obat antihipertensi",
-                "medicines": "Amlodipine 5mg, Captopril, Lisinopril, Bisoprolol (dengan resep dokter)",
-                "image_url": "/static/images/hipertensi.png"
-            },
-            {
-                "name": "Diabetes Mellitus",
-                "category": "Metabolik",
-                "description": "Diabetes adalah penyakit metabolik kronis yang ditandai dengan kadar gula darah tinggi karena tubuh tidak dapat memproduksi atau menggunakan insulin dengan baik.",
-                "symptoms": "Sering buang air kecil, haus berlebihan, lapar terus-menerus, penurunan berat badan, luka sulit sembuh",
-                "treatment": "Diet seimbang rendah gula, olahraga teratur, monitor gula darah, obat diabetes atau insulin",
-                "medicines": "Metformin 500mg, Glibenclamide, Glimepiride (dengan resep dokter), Glucometer",
-                "image_url": "/static/images/diabetes.png"
-            },
-            {
-                "name": "Vertigo",
-                "category": "Neurologis",
-                "description": "Vertigo adalah sensasi pusing berputar yang membuat penderita merasa dirinya atau lingkungan sekitar berputar.",
-                "symptoms": "Pusing berputar, mual, muntah, kehilangan keseimbangan, nistagmus (gerakan mata abnormal)",
-                "treatment": "Istirahat, hindari gerakan kepala mendadak, manuver Epley, obat antivertigo jika diperlukan",
-                "medicines": "Betahistine (Mertigo), Dimenhidrinat (Antimo), Flunarizine, Cinnarizine",
-                "image_url": "/static/images/vertigo.png"
-            },
-            {
-                "name": "Asma",
-                "category": "Pernapasan",
-                "description": "Asma adalah penyakit kronis pada saluran pernapasan yang menyebabkan peradangan dan penyempitan bronkus.",
-                "symptoms": "Sesak napas, mengi (napas berbunyi), batuk terutama malam hari, dada terasa berat",
-                "treatment": "Hindari pemicu asma, gunakan inhaler, obat pengontrol asma, jaga kebersihan lingkungan",
-                "medicines": "Salbutamol Inhaler (Ventolin), Budesonide Inhaler, Aminofilin, Theophylline",
-                "image_url": "/static/images/asma.png"
-            },
-            {
-                "name": "Tifus (Demam Tifoid)",
-                "category": "Infeksi Bakteri",
-                "description": "Tifus adalah infeksi bakteri Salmonella typhi yang menyerang usus dan menyebar ke seluruh tubuh melalui aliran darah.",
-                "symptoms": "Demam tinggi bertahap, sakit kepala, nyeri perut, diare atau sembelit, ruam merah muda, lemas",
-                "treatment": "Antibiotik sesuai resep dokter, istirahat total, makan makanan lunak, minum banyak cairan",
-                "medicines": "Ciprofloxacin, Chloramphenicol, Amoxicillin (dengan resep dokter), Oralit",
-                "image_url": "/static/images/tifus.png"
-            },
-            {
-                "name": "Sakit Gigi",
-                "category": "Gigi & Mulut",
-                "description": "Sakit gigi adalah nyeri pada gigi atau sekitar rahang yang dapat disebabkan oleh gigi berlubang, infeksi gusi, atau kerusakan gigi.",
-                "symptoms": "Nyeri gigi, gigi ngilu, bengkak gusi, sakit saat mengunyah, sensitif panas dingin, bau mulut",
-                "treatment": "Kumur air garam hangat, kompres dingin, minum obat pereda nyeri, hindari makanan manis, segera ke dokter gigi",
-                "medicines": "Asam Mefenamat 500mg, Ibuprofen, Paracetamol, Minyak Cengkeh, Betadine Kumur",
-                "image_url": "/static/images/sakit_gigi.png"
-            },
-            {
-                "name": "Diare",
-                "category": "Pencernaan",
-                "description": "Diare adalah kondisi buang air besar dengan feses encer lebih dari 3 kali sehari, sering disertai kram perut.",
-                "symptoms": "BAB encer, sering ke toilet, kram perut, mual, dehidrasi, lemas",
-                "treatment": "Minum oralit, hindari makanan berminyak, makan pisang dan bubur, banyak minum air putih",
-                "medicines": "Oralit, Loperamide (Imodium), Entrostop, Diapet, Zinc Tablet",
-                "image_url": "/static/images/diare.png"
-            },
-            {
-                "name": "Sariawan",
-                "category": "Gigi & Mulut",
-                "description": "Sariawan adalah luka kecil di dalam mulut yang menyebabkan rasa perih terutama saat makan atau minum.",
-                "symptoms": "Luka di mulut, perih, sulit makan, bengkak bibir bagian dalam",
-                "treatment": "Oleskan obat sariawan, kumur antiseptik, makan makanan lembut, konsumsi vitamin C",
-                "medicines": "Aloclair Gel, Kenalog in Orabase, Albothyl, Enkasari, Vitamin C 500mg, Vitamin B Complex",
-                "image_url": "/static/images/sariawan.png"
-            },
-            {
-                "name": "Sakit Mata (Konjungtivitis)",
-                "category": "Mata",
-                "description": "Konjungtivitis adalah peradangan pada selaput mata yang menyebabkan mata merah, gatal, dan berair.",
-                "symptoms": "Mata merah, gatal, berair, belekan, sensitif cahaya, pandangan kabur",
-                "treatment": "Kompres dingin, tetes mata, jangan mengucek mata, cuci tangan sering, hindari kontak mata",
-                "medicines": "Cendo Xitrol, Tetes Mata Insto, Cendo Fenicol, Rohto Eye Drops, Visine",
-                "image_url": "/static/images/sakit_mata.png"
-            },
-            {
-                "name": "Sakit Telinga (Otitis)",
-                "category": "THT",
-                "description": "Otitis adalah infeksi atau peradangan pada telinga yang menyebabkan nyeri dan gangguan pendengaran.",
-                "symptoms": "Nyeri telinga, pendengaran berkurang, telinga berdengung, keluar cairan, demam",
-                "treatment": "Kompres hangat, obat tetes telinga, jangan mengorek telinga, segera ke dokter THT",
-                "medicines": "Otopain Ear Drops, Tarivid Otic, Paracetamol, Amoxicillin (dengan resep dokter)",
-                "image_url": "/static/images/sakit_telinga.png"
-            },
-            # === PENYAKIT PERNAPASAN ===
-            {
-                "name": "Bronkitis",
-                "category": "Pernapasan",
-                "description": "Bronkitis adalah peradangan pada saluran bronkus yang menyebabkan batuk berdahak.",
-                "symptoms": "Batuk berdahak, sesak napas ringan, dada tidak nyaman, kelelahan, demam ringan",
-                "treatment": "Istirahat, minum banyak air hangat, hindari asap rokok, gunakan pelembab udara",
-                "medicines": "Ambroxol, OBH Combi, Woods Peppermint, Bisolvon, Vicks Formula 44",
-                "image_url": "/static/images/bronkitis.png"
-            },
-            {
-                "name": "Pneumonia",
-                "category": "Pernapasan",
-                "description": "Pneumonia adalah infeksi paru-paru yang menyebabkan kantung udara terisi cairan atau nanah.",
-                "symptoms": "Demam tinggi, batuk berdahak, sesak napas berat, nyeri dada, menggigil",
-                "treatment": "Segera ke dokter, antibiotik sesuai resep, istirahat total, oksigen jika perlu",
-                "medicines": "Antibiotik (Amoxicillin, Azithromycin - HARUS resep dokter), Paracetamol",
-                "image_url": "/static/images/pneumonia.png"
-            },
-            {
-                "name": "TBC (Tuberkulosis)",
-                "category": "Pernapasan",
-                "description": "TBC adalah infeksi bakteri pada paru-paru yang menular melalui udara.",
-                "symptoms": "Batuk lebih dari 2 minggu, batuk berdarah, keringat malam, penurunan berat badan, demam",
-                "treatment": "Pengobatan 6 bulan dengan obat TBC, HARUS ke dokter dan rutin kontrol",
-                "medicines": "Obat TBC (Rifampicin, Isoniazid, Ethambutol - HARUS resep dokter dan kontrol rutin)",
-                "image_url": "/static/images/tbc.png"
-            },
-            {
-                "name": "Sinusitis",
-                "category": "THT",
-                "description": "Sinusitis adalah peradangan pada rongga sinus yang menyebabkan hidung tersumbat dan nyeri wajah.",
-                "symptoms": "Hidung tersumbat, nyeri wajah, sakit kepala, ingus kental, bau mulut",
-                "treatment": "Uap air hangat, irigasi hidung dengan air garam, kompres hangat pada wajah",
-                "medicines": "Pseudoephedrine (Rhinos), Nasonex Spray, Paracetamol, Amoxicillin (resep dokter)",
-                "image_url": "/static/images/sinusitis.png"
-            },
-            {
-                "name": "Radang Tenggorokan",
-                "category": "THT",
-                "description": "Radang tenggorokan adalah peradangan pada tenggorokan yang menyebabkan nyeri saat menelan.",
-                "symptoms": "Sakit tenggorokan, sulit menelan, suara serak, demam, pembengkakan kelenjar",
-                "treatment": "Kumur air garam, minum air hangat dengan madu, istirahat bicara",
-                "medicines": "FG Troches, Hexadol, Betadine Gargle, Strepsils, Degirol",
-                "image_url": "/static/images/radang_tenggorokan.png"
-            },
-            # === PENYAKIT PENCERNAAN ===
-            {
-                "name": "Wasir (Hemoroid)",
-                "category": "Pencernaan",
-                "description": "Wasir adalah pembengkakan pembuluh darah di area anus yang menyebabkan nyeri dan pendarahan.",
-                "symptoms": "Nyeri saat BAB, pendarahan saat BAB, benjolan di anus, gatal, tidak nyaman duduk",
-                "treatment": "Makan serat tinggi, banyak minum air, jangan terlalu lama duduk, hindari mengejan",
-                "medicines": "Faktu Suppositoria, Ultraproct, Ardium, Anusol, Preparation H",
-                "image_url": "/static/images/wasir.png"
-            },
-            {
-                "name": "Sembelit (Konstipasi)",
-                "category": "Pencernaan",
-                "description": "Sembelit adalah kondisi sulit buang air besar dengan feses keras.",
-                "symptoms": "Sulit BAB, feses keras, perut kembung, rasa tidak tuntas, kurang dari 3x BAB seminggu",
-                "treatment": "Makan sayur dan buah, minum banyak air, olahraga rutin, jangan menahan BAB",
-                "medicines": "Dulcolax, Microlax, Lactulax, Vegeta, Psyllium Husk",
-                "image_url": "/static/images/sembelit.png"
-            },
-            {
-                "name": "GERD (Asam Lambung)",
-                "category": "Pencernaan",
-                "description": "GERD adalah naiknya asam lambung ke kerongkongan yang menyebabkan rasa terbakar.",
-                "symptoms": "Nyeri ulu hati, rasa terbakar di dada, mual, mulut asam, sulit menelan",
-                "treatment": "Makan porsi kecil, hindari makanan pedas dan asam, jangan langsung tidur setelah makan",
-                "medicines": "Omeprazole, Lansoprazole, Antasida, Sucralfate, Domperidone",
-                "image_url": "/static/images/gerd.png"
-            },
-            {
-                "name": "Hepatitis",
-                "category": "Pencernaan",
-                "description": "Hepatitis adalah peradangan hati yang dapat disebabkan oleh virus, alkohol, atau obat.",
-                "symptoms": "Kulit dan mata menguning, urin gelap, lemas, mual, nyeri perut kanan atas",
-                "treatment": "SEGERA ke dokter, istirahat total, hindari alkohol, makan bergizi",
-                "medicines": "Harus konsultasi dokter - pengobatan tergantung jenis hepatitis",
-                "image_url": "/static/images/hepatitis.png"
-            },
-            {
-                "name": "Cacingan",
-                "category": "Pencernaan",
-                "description": "Cacingan adalah infeksi parasit cacing di usus yang sering terjadi pada anak-anak.",
-                "symptoms": "Gatal di anus terutama malam, perut buncit, nafsu makan menurun, lemas",
-                "treatment": "Minum obat cacing, cuci tangan sebelum makan, potong kuku, jaga kebersihan",
-                "medicines": "Combantrin, Vermox, Zentel, Albendazole, Pirantel Pamoat",
-                "image_url": "/static/images/cacingan.png"
-            },
-            # === PENYAKIT KULIT ===
-            {
-                "name": "Jerawat",
-                "category": "Kulit",
-                "description": "Jerawat adalah kondisi kulit dimana pori-pori tersumbat minyak dan sel kulit mati.",
-                "symptoms": "Bintik merah, komedo, pustula bernanah, kulit berminyak, bekas hitam",
-                "treatment": "Cuci muka 2x sehari, hindari pegang wajah, gunakan produk non-komedogenik",
-                "medicines": "Acnes, Oxy, Vitacid Gel, Erythromycin Gel, Benzoyl Peroxide",
-                "image_url": "/static/images/jerawat.png"
-            },
-            {
-                "name": "Kudis (Scabies)",
-                "category": "Kulit",
-                "description": "Kudis adalah infeksi kulit oleh tungau yang menyebabkan gatal hebat terutama malam hari.",
-                "symptoms": "Gatal hebat malam hari, ruam merah, lesi kulit, menyebar ke orang lain",
-                "treatment": "Oleskan obat kudis, cuci semua pakaian dan sprei, obati seluruh anggota keluarga",
-                "medicines": "Scabimite Cream, Permethrin 5%, Sulfur 10%, Antihistamin (CTM)",
-                "image_url": "/static/images/kudis.png"
-            },
-            {
-                "name": "Panu",
-                "category": "Kulit",
-                "description": "Panu adalah infeksi jamur kulit yang menyebabkan bercak putih atau coklat.",
-                "symptoms": "Bercak putih/coklat, gatal ringan, kulit bersisik halus, menyebar perlahan",
-                "treatment": "Jaga kulit tetap kering, gunakan obat antijamur, ganti pakaian jika berkeringat",
-                "medicines": "Miconazole Cream, Ketoconazole Cream, Kalpanax, Daktarin, Canesten",
-                "image_url": "/static/images/panu.png"
-            },
-            {
-                "name": "Kurap (Tinea)",
-                "category": "Kulit",
-                "description": "Kurap adalah infeksi jamur kulit yang membentuk ruam melingkar bersisik.",
-                "symptoms": "Ruam melingkar merah, bersisik, gatal, menyebar, tepi aktif",
-                "treatment": "Jaga kebersihan kulit, keringkan dengan baik, gunakan obat antijamur rutin",
-                "medicines": "Terbinafine Cream, Clotrimazole, Miconazole, Griseofulvin (resep dokter)",
-                "image_url": "/static/images/kurap.png"
-            },
-            {
-                "name": "Eksim",
-                "category": "Kulit",
-                "description": "Eksim adalah peradangan kulit kronis yang menyebabkan kulit kering, gatal, dan kemerahan.",
-                "symptoms": "Kulit kering, gatal, kemerahan, bersisik, pecah-pecah, lepuhan kecil",
-                "treatment": "Gunakan pelembab rutin, hindari sabun keras, jangan garuk, kendalikan alergen",
-                "medicines": "Hidrokortison Cream, Mometason, Pelembab Cetaphil, Antihistamin",
-                "image_url": "/static/images/eksim.png"
-            },
-            {
-                "name": "Biduran (Urtikaria)",
-                "category": "Kulit",
-                "description": "Biduran adalah reaksi alergi kulit yang menyebabkan bentol merah gatal.",
-                "symptoms": "Bentol merah, gatal hebat, bengkak tiba-tiba, berpindah lokasi",
-                "treatment": "Hindari pemicu alergi, kompres dingin, minum antihistamin",
-                "medicines": "Loratadine, Cetirizine, CTM, Diphenhydramine, Calamine Lotion",
-                "image_url": "/static/images/biduran.png"
-            },
-            {
-                "name": "Herpes",
-                "category": "Kulit",
-                "description": "Herpes adalah infeksi virus yang menyebabkan lepuhan berisi cairan pada kulit atau mulut.",
-                "symptoms": "Lepuhan berkelompok, nyeri, gatal, demam, lelah",
-                "treatment": "SEGERA ke dokter, jangan sentuh lesi, istirahat, hindari kontak langsung",
-                "medicines": "Acyclovir (HARUS resep dokter), Paracetamol untuk demam",
-                "image_url": "/static/images/herpes.png"
-            },
-            {
-                "name": "Cacar Air",
-                "category": "Kulit",
-                "description": "Cacar air adalah infeksi virus varicella yang menyebabkan ruam melepuh di seluruh tubuh.",
-                "symptoms": "Ruam merah berisi cairan, gatal, demam, lelah, ruam menyebar ke seluruh tubuh",
-                "treatment": "Istirahat, jangan garuk, mandikan dengan air hangat, potong kuku pendek",
-                "medicines": "Acyclovir (resep dokter), Calamine Lotion, Paracetamol, Bedak Salisil",
-                "image_url": "/static/images/cacar_air.png"
-            },
-            # === PENYAKIT TULANG & OTOT ===
-            {
-                "name": "Rematik (Arthritis)",
-                "category": "Tulang & Otot",
-                "description": "Rematik adalah peradangan sendi yang menyebabkan nyeri dan kaku pada persendian.",
-                "symptoms": "Nyeri sendi, kaku pagi hari, bengkak sendi, sulit bergerak, demam ringan",
-                "treatment": "Kompres hangat, olahraga ringan, istirahat cukup, kurangi aktivitas berat",
-                "medicines": "Piroxicam, Ibuprofen, Natrium Diklofenak, Glucosamine, Chondroitin",
-                "image_url": "/static/images/rematik.png"
-            },
-            {
-                "name": "Asam Urat (Gout)",
-                "category": "Tulang & Otot",
-                "description": "Asam urat adalah kondisi dimana kristal urat menumpuk di sendi menyebabkan nyeri hebat.",
-                "symptoms": "Nyeri sendi mendadak, bengkak merah, biasanya di jempol kaki, nyeri malam hari",
-                "treatment": "Hindari makanan tinggi purin (jeroan, seafood), minum banyak air, batasi alkohol",
-                "medicines": "Allopurinol, Colchicine, Piroxicam, Ibuprofen (HARUS konsultasi dokter)",
-                "image_url": "/static/images/asam_urat.png"
-            },
-            {
-                "name": "Encok (Lumbago)",
-                "category": "Tulang & Otot",
-                "description": "Encok adalah nyeri pada punggung bawah yang dapat menjalar ke kaki.",
-                "symptoms": "Nyeri punggung bawah, kaku, sulit berdiri, nyeri menjalar ke bokong/kaki",
-                "treatment": "Istirahat, kompres hangat, tidur di kasur keras, hindari angkat berat",
-                "medicines": "Paracetamol, Ibuprofen, Counterpain, Salonpas, Neurobion",
-                "image_url": "/static/images/encok.png"
-            },
-            {
-                "name": "Osteoporosis",
-                "category": "Tulang & Otot",
-                "description": "Osteoporosis adalah kondisi tulang menjadi rapuh dan mudah patah.",
-                "symptoms": "Nyeri tulang, postur bungkuk, tulang mudah patah, tinggi badan berkurang",
-                "treatment": "Konsumsi kalsium cukup, vitamin D, olahraga teratur, hindari jatuh",
-                "medicines": "Suplemen Kalsium, Vitamin D3, Alendronate (resep dokter), CDR",
-                "image_url": "/static/images/osteoporosis.png"
-            },
-            # === PENYAKIT JANTUNG & PEMBULUH DARAH ===
-            {
-                "name": "Kolesterol Tinggi",
-                "category": "Kardiovaskular",
-                "description": "Kolesterol tinggi adalah kondisi kadar lemak jahat tinggi dalam darah.",
-                "symptoms": "Sering tanpa gejala, nyeri dada, sesak napas, kelelahan, xanthoma (benjolan kulit)",
-                "treatment": "Diet rendah lemak, olahraga rutin, hindari gorengan, berhenti merokok",
-                "medicines": "Simvastatin, Atorvastatin (HARUS resep dokter), Omega-3",
-                "image_url": "/static/images/kolesterol.png"
-            },
-            {
-                "name": "Anemia",
-                "category": "Darah",
-                "description": "Anemia adalah kondisi kekurangan sel darah merah atau hemoglobin.",
-                "symptoms": "Pucat, lemas, pusing, jantung berdebar, sesak napas, mudah lelah",
-                "treatment": "Makan makanan kaya zat besi (daging, sayur hijau), vitamin C untuk penyerapan",
-                "medicines": "Sangobion, Ferrous Sulfate, Vitamin B12, Asam Folat",
-                "image_url": "/static/images/anemia.png"
-            },
-            {
-                "name": "Stroke Ringan (TIA)",
-                "category": "Kardiovaskular",
-                "description": "TIA adalah gangguan aliran darah ke otak yang bersifat sementara - TANDA BAHAYA STROKE.",
-                "symptoms": "Lemah separuh badan, bicara pelo, wajah mencong, pandangan kabur",
-                "treatment": "SEGERA ke IGD rumah sakit! Ini kondisi darurat!",
-                "medicines": "HARUS penanganan dokter SEGERA - Hubungi 119 atau IGD terdekat!",
-                "image_url": "/static/images/stroke.png"
-            },
-            # === PENYAKIT GINJAL & SALURAN KEMIH ===
-            {
-                "name": "ISK (Infeksi Saluran Kemih)",
-                "category": "Urologi",
-                "description": "ISK adalah infeksi bakteri pada saluran kemih termasuk kandung kemih.",
-                "symptoms": "Nyeri saat buang air kecil, sering BAK, urin keruh atau berbau, nyeri perut bawah",
-                "treatment": "Minum banyak air, jangan menahan BAK, jaga kebersihan, ke dokter untuk antibiotik",
-                "medicines": "Antibiotik (Ciprofloxacin, Amoxicillin - HARUS resep dokter), Ural",
-                "image_url": "/static/images/isk.png"
-            },
-            {
-                "name": "Batu Ginjal",
-                "category": "Urologi",
-                "description": "Batu ginjal adalah endapan mineral keras di ginjal atau saluran kemih.",
-                "symptoms": "Nyeri pinggang hebat, nyeri menjalar ke selangkangan, mual, darah di urin",
-                "treatment": "Minum banyak air (2-3 liter/hari), SEGERA ke dokter untuk evaluasi",
-                "medicines": "Perlu evaluasi dokter - tergantung ukuran batu (obat atau operasi)",
-                "image_url": "/static/images/batu_ginjal.png"
-            },
-            # === PENYAKIT SARAF ===
-            {
-                "name": "Epilepsi (Ayan)",
-                "category": "Neurologis",
-                "description": "Epilepsi adalah gangguan sistem saraf yang menyebabkan kejang berulang.",
-                "symptoms": "Kejang, kehilangan kesadaran, gerakan tidak terkontrol, bingung setelah kejang",
-                "treatment": "Minum obat teratur, hindari pemicu, tidur cukup, HARUS kontrol rutin ke dokter saraf",
-                "medicines": "Phenytoin, Carbamazepine, Asam Valproat (HARUS resep dokter saraf)",
-                "image_url": "/static/images/epilepsi.png"
-            },
-            {
-                "name": "Bell's Palsy",
-                "category": "Neurologis",
-                "description": "Bell's Palsy adalah kelumpuhan wajah sementara akibat peradangan saraf wajah.",
-                "symptoms": "Wajah mencong sebelah, tidak bisa menutup mata, mulut tertarik, sulit bicara",
-                "treatment": "SEGERA ke dokter saraf dalam 72 jam pertama untuk hasil terbaik",
-                "medicines": "Kortikosteroid, Acyclovir (HARUS resep dokter, makin cepat makin baik)",
-                "image_url": "/static/images/bells_palsy.png"
-            },
-            # === PENYAKIT MENTAL ===
-            {
-                "name": "Kecemasan (Anxiety)",
-                "category": "Mental",
-                "description": "Anxiety adalah gangguan kecemasan berlebihan yang mengganggu aktivitas sehari-hari.",
-                "symptoms": "Cemas berlebihan, jantung berdebar, sulit tidur, gelisah, tegang otot",
-                "treatment": "Latihan pernapasan, olahraga, kurangi kafein, konsultasi psikolog/psikiater",
-                "medicines": "Konsultasi dokter jiwa/psikiater untuk penanganan yang tepat",
-                "image_url": "/static/images/anxiety.png"
-            },
-            {
-                "name": "Depresi",
-                "category": "Mental",
-                "description": "Depresi adalah gangguan mood yang menyebabkan perasaan sedih berkepanjangan.",
-                "symptoms": "Sedih berkepanjangan, kehilangan minat, gangguan tidur, lelah, pikiran negatif",
-                "treatment": "Jangan dipendam sendiri - bicara dengan orang terdekat, konsultasi psikolog/psikiater",
-                "medicines": "HARUS konsultasi psikiater - butuh penanganan profesional",
-                "image_url": "/static/images/depresi.png"
-            },
-            {
-                "name": "Insomnia",
-                "category": "Mental",
-                "description": "Insomnia adalah gangguan tidur berupa sulit tidur atau tidak bisa tidur nyenyak.",
-                "symptoms": "Sulit tidur, bangun tengah malam, tidak segar saat bangun, mengantuk siang",
-                "treatment": "Atur jadwal tidur, hindari gadget sebelum tidur, ruangan gelap dan sejuk",
-                "medicines": "Lelap, Melatonin (jangka pendek), konsultasi dokter jika berlanjut",
-                "image_url": "/static/images/insomnia.png"
-            },
-            # === PENYAKIT LAINNYA ===
-            {
-                "name": "Alergi Makanan",
-                "category": "Alergi",
-                "description": "Alergi makanan adalah reaksi sistem imun berlebihan terhadap makanan tertentu.",
-                "symptoms": "Gatal kulit, bengkak bibir/lidah, mual, diare, sesak napas (berat)",
-                "treatment": "Hindari makanan pemicu, bawa obat alergi, segera ke IGD jika sesak napas",
-                "medicines": "Loratadine, Cetirizine, CTM, Epinefrin (untuk reaksi berat - IGD)",
-                "image_url": "/static/images/alergi_makanan.png"
-            },
-            {
-                "name": "DBD (Demam Berdarah)",
-                "category": "Infeksi Virus",
-                "description": "DBD adalah infeksi virus dengue melalui gigitan nyamuk Aedes aegypti.",
-                "symptoms": "Demam tinggi mendadak, nyeri belakang mata, nyeri otot, bintik merah, mimisan",
-                "treatment": "SEGERA ke dokter untuk cek trombosit, banyak minum, istirahat total",
-                "medicines": "Paracetamol saja (JANGAN Ibuprofen/Aspirin), oralit, HARUS kontrol dokter",
-                "image_url": "/static/images/dbd.png"
-            },
-            {
-                "name": "Malaria",
-                "category": "Infeksi Parasit",
-                "description": "Malaria adalah infeksi parasit melalui gigitan nyamuk Anopheles.",
-                "symptoms": "Demam tinggi berulang, menggigil, keringat, sakit kepala, lemas",
-                "treatment": "SEGERA ke dokter untuk pemeriksaan darah dan pengobatan malaria",
-                "medicines": "Obat antimalaria (HARUS resep dokter setelah konfirmasi lab)",
-                "image_url": "/static/images/malaria.png"
-            },
-            {
-                "name": "Chikungunya",
-                "category": "Infeksi Virus",
-                "description": "Chikungunya adalah infeksi virus melalui gigitan nyamuk yang menyebabkan nyeri sendi hebat.",
-                "symptoms": "Demam tinggi, nyeri sendi hebat, ruam kulit, sakit kepala, lemas",
-                "treatment": "Istirahat total, banyak minum, obat pereda nyeri, kompres hangat pada sendi",
-                "medicines": "Paracetamol, Ibuprofen untuk nyeri sendi, tidak ada antivirus khusus",
-                "image_url": "/static/images/chikungunya.png"
-            },
-            {
-                "name": "Gondok (Mumps)",
-                "category": "Infeksi Virus",
-                "description": "Gondok adalah infeksi virus yang menyebabkan pembengkakan kelenjar liur.",
-                "symptoms": "Bengkak di bawah telinga/rahang, nyeri saat mengunyah, demam, lemas",
-                "treatment": "Istirahat, kompres dingin, makan makanan lembut, hindari asam",
-                "medicines": "Paracetamol untuk nyeri dan demam, banyak minum",
-                "image_url": "/static/images/gondok.png"
-            },
-            {
-                "name": "Campak",
-                "category": "Infeksi Virus",
-                "description": "Campak adalah infeksi virus yang sangat menular dengan ruam khas di seluruh tubuh.",
-                "symptoms": "Demam tinggi, ruam merah menyebar, batuk, pilek, mata merah, bercak Koplik",
-                "treatment": "Istirahat total, banyak minum, vitamin A, isolasi untuk cegah penularan",
-                "medicines": "Paracetamol, Vitamin A dosis tinggi, tidak ada antivirus khusus",
-                "image_url": "/static/images/campak.png"
-            },
-            {
-                "name": "Keracunan Makanan",
-                "category": "Pencernaan",
-                "description": "Keracunan makanan adalah penyakit akibat mengonsumsi makanan terkontaminasi.",
-                "symptoms": "Mual, muntah, diare, kram perut, demam, lemas",
-                "treatment": "Banyak minum oralit, istirahat, makan bertahap, ke dokter jika parah",
-                "medicines": "Oralit, Norit (karbon aktif), Attapulgite, ke IGD jika dehidrasi berat",
-                "image_url": "/static/images/keracunan.png"
-            },
-            {
-                "name": "Kolik (Bayi Menangis)",
-                "category": "Pediatrik",
-                "description": "Kolik adalah kondisi bayi menangis berlebihan tanpa penyebab jelas.",
-                "symptoms": "Bayi menangis lebih dari 3 jam sehari, wajah merah, kaki ditekuk ke perut",
-                "treatment": "Gendong dan ayun pelan, pijat perut, suara white noise, posisi tegak setelah menyusu",
-                "medicines": "Simethicone drops (Mylicon), konsultasi dokter anak jika berlanjut",
-                "image_url": "/static/images/kolik.png"
-            },
-            {
-                "name": "Ruam Popok",
-                "category": "Pediatrik",
-                "description": "Ruam popok adalah iritasi kulit bayi di area popok akibat kelembaban.",
-                "symptoms": "Kulit merah di area popok, bintik merah, bayi rewel saat diganti popok",
-                "treatment": "Ganti popok sering, biarkan kulit terpapar udara, gunakan krim barrier",
-                "medicines": "Bepanthen, Zwitsal Baby Cream, Desitin, tepung maizena",
-                "image_url": "/static/images/ruam_popok.png"
-            },
-            # === PENYAKIT INFEKSI VIRUS BARU ===
-            {
-                "name": "COVID-19",
-                "category": "Infeksi Virus",
-                "description": "COVID-19 adalah penyakit pernapasan yang disebabkan oleh virus SARS-CoV-2.",
-                "symptoms": "Demam, batuk kering, kelelahan, kehilangan penciuman/pengecapan, sesak napas, nyeri otot",
-                "treatment": "Isolasi mandiri, istirahat, minum banyak cairan, pantau saturasi oksigen, segera ke RS jika sesak berat",
-                "medicines": "Paracetamol, Vitamin C, D, Zinc, Antivirus (jika diresepkan dokter)",
-                "image_url": "/static/images/covid19.png"
-            },
-            {
-                "name": "Rubella (Campak Jerman)",
-                "category": "Infeksi Virus",
-                "description": "Rubella adalah infeksi virus yang menyebabkan ruam merah dan berbahaya bagi ibu hamil.",
-                "symptoms": "Ruam merah mulai dari wajah, demam ringan, pembengkakan kelenjar getah bening, nyeri sendi",
-                "treatment": "Istirahat, obat pereda demam, SANGAT BERBAHAYA untuk ibu hamil - segera ke dokter",
-                "medicines": "Paracetamol untuk demam, pencegahan dengan vaksin MMR",
-                "image_url": "/static/images/rubella.png"
-            },
-            {
-                "name": "Herpes Zoster (Cacar Ular)",
-                "category": "Infeksi Virus",
-                "description": "Herpes zoster adalah reaktivasi virus varicella yang menyebabkan ruam nyeri di satu sisi tubuh.",
-                "symptoms": "Nyeri terbakar pada kulit, ruam melepuh mengikuti saraf, gatal, demam, sensitif sentuhan",
-                "treatment": "Segera ke dokter dalam 72 jam untuk antivirus, kompres dingin, jaga kebersihan lesi",
-                "medicines": "Acyclovir/Valacyclovir (HARUS resep dokter), Gabapentin untuk nyeri saraf",
-                "image_url": "/static/images/herpes_zoster.png"
-            },
-            {
-                "name": "Mononukleosis (Kissing Disease)",
-                "category": "Infeksi Virus",
-                "description": "Mononukleosis adalah infeksi virus Epstein-Barr yang menyebabkan kelelahan ekstrem.",
-                "symptoms": "Kelelahan ekstrem, demam, sakit tenggorokan parah, pembengkakan kelenjar, pembesaran limpa",
-                "treatment": "Istirahat total (bisa berminggu-minggu), hindari olahraga berat, minum banyak cairan",
-                "medicines": "Paracetamol/Ibuprofen untuk demam dan nyeri, tidak ada antivirus khusus",
-                "image_url": "/static/images/mono.png"
-            },
-            # === PENYAKIT KARDIOVASKULAR BARU ===
-            {
-                "name": "Aritmia (Gangguan Irama Jantung)",
-                "category": "Kardiovaskular",
-                "description": "Aritmia adalah kondisi dimana jantung berdetak tidak teratur, terlalu cepat, atau terlalu lambat.",
-                "symptoms": "Jantung berdebar kencang, detak jantung tidak teratur, pusing, sesak napas, nyeri dada",
-                "treatment": "Segera ke dokter jantung, hindari kafein dan alkohol, kelola stres",
-                "medicines": "Beta blocker, Antiaritmia (HARUS resep dokter spesialis jantung)",
-                "image_url": "/static/images/aritmia.png"
-            },
-            {
-                "name": "Gagal Jantung",
-                "category": "Kardiovaskular",
-                "description": "Gagal jantung adalah kondisi dimana jantung tidak dapat memompa darah dengan efektif.",
-                "symptoms": "Sesak napas saat aktivitas/berbaring, kaki bengkak, kelelahan, batuk malam hari",
-                "treatment": "HARUS kontrol rutin ke dokter jantung, batasi garam dan cairan, minum obat teratur",
-                "medicines": "ACE inhibitor, Diuretik, Beta blocker (HARUS resep dan kontrol dokter spesialis)",
-                "image_url": "/static/images/gagal_jantung.png"
-            },
-            {
-                "name": "Penyakit Jantung Koroner",
-                "category": "Kardiovaskular",
-                "description": "Penyakit jantung koroner adalah penyempitan pembuluh darah jantung akibat plak.",
-                "symptoms": "Nyeri dada saat aktivitas (angina), sesak napas, kelelahan, nyeri menjalar ke lengan/rahang",
-                "treatment": "Segera ke dokter jantung, diet rendah lemak, olahraga teratur, berhenti merokok",
-                "medicines": "Aspirin, Statin, Nitrat (HARUS resep dan pemantauan dokter)",
-                "image_url": "/static/images/jantung_koroner.png"
-            },
-            {
-                "name": "Serangan Jantung (DARURAT)",
-                "category": "Darurat",
-                "description": "Serangan jantung adalah kondisi darurat dimana aliran darah ke jantung terhenti mendadak.",
-                "symptoms": "Nyeri dada hebat seperti ditekan, menjalar ke lengan kiri/rahang, keringat dingin, mual, sesak",
-                "treatment": "SEGERA HUBUNGI 119! Kunyah Aspirin jika tersedia, jangan beraktivitas, tunggu ambulans",
-                "medicines": "DARURAT - Butuh penanganan IGD segera! Hubungi 119 atau bawa ke IGD terdekat!",
-                "image_url": "/static/images/serangan_jantung.png"
-            },
-            # === PENYAKIT NEUROLOGIS BARU ===
-            {
-                "name": "Parkinson",
-                "category": "Neurologis",
-                "description": "Parkinson adalah gangguan saraf progresif yang mempengaruhi gerakan tubuh.",
-                "symptoms": "Tremor/gemetar tangan, kekakuan otot, gerakan lambat, gangguan keseimbangan, wajah datar",
-                "treatment": "Kontrol rutin ke dokter saraf, fisioterapi, olahraga teratur, dukungan keluarga",
-                "medicines": "Levodopa, Dopamine agonist (HARUS resep dokter saraf)",
-                "image_url": "/static/images/parkinson.png"
-            },
-            {
-                "name": "Alzheimer",
-                "category": "Neurologis",
-                "description": "Alzheimer adalah penyakit otak progresif yang menyebabkan penurunan daya ingat dan fungsi kognitif.",
-                "symptoms": "Lupa kejadian baru, kesulitan menyelesaikan tugas familiar, bingung waktu/tempat, perubahan mood",
-                "treatment": "Konsultasi dokter saraf, stimulasi mental, dukungan keluarga, lingkungan aman",
-                "medicines": "Donepezil, Memantine (HARUS resep dokter saraf, tidak menyembuhkan tapi memperlambat)",
-                "image_url": "/static/images/alzheimer.png"
-            },
-            {
-                "name": "Meningitis",
-                "category": "Neurologis",
-                "description": "Meningitis adalah peradangan selaput otak dan sumsum tulang belakang yang mengancam jiwa.",
-                "symptoms": "Demam tinggi, sakit kepala hebat, leher kaku, mual muntah, sensitif cahaya, kebingungan",
-                "treatment": "DARURAT! Segera ke IGD, butuh antibiotik/antivirus IV, rawat inap intensif",
-                "medicines": "DARURAT - Antibiotik IV di rumah sakit (Ceftriaxone, Vancomycin)",
-                "image_url": "/static/images/meningitis.png"
-            },
-            {
-                "name": "Neuropati (Kerusakan Saraf)",
-                "category": "Neurologis",
-                "description": "Neuropati adalah kerusakan saraf tepi yang menyebabkan nyeri, kesemutan, atau mati rasa.",
-                "symptoms": "Kesemutan, mati rasa, nyeri seperti terbakar, lemah otot, sensitivitas berlebihan",
-                "treatment": "Konsultasi dokter saraf, kontrol penyebab (diabetes), terapi fisik",
-                "medicines": "Gabapentin, Pregabalin, Vitamin B kompleks (resep dokter)",
-                "image_url": "/static/images/neuropati.png"
-            },
-            # === PENYAKIT MATA BARU ===
-            {
-                "name": "Katarak",
-                "category": "Mata",
-                "description": "Katarak adalah kekeruhan lensa mata yang menyebabkan penglihatan kabur.",
-                "symptoms": "Penglihatan kabur seperti berkabut, sensitif silau, warna memudar, sulit melihat malam",
-                "treatment": "Konsultasi dokter mata, operasi katarak jika sudah mengganggu aktivitas",
-                "medicines": "Tidak ada obat - pengobatan dengan operasi penggantian lensa",
-                "image_url": "/static/images/katarak.png"
-            },
-            {
-                "name": "Glaukoma",
-                "category": "Mata",
-                "description": "Glaukoma adalah kerusakan saraf mata akibat tekanan tinggi yang dapat menyebabkan kebutaan.",
-                "symptoms": "Penglihatan tepi menyempit, nyeri mata, mual, melihat lingkaran cahaya, mata merah",
-                "treatment": "Segera ke dokter mata! Kontrol rutin, tetes mata penurun tekanan, mungkin perlu operasi",
-                "medicines": "Tetes mata Timolol, Latanoprost (HARUS resep dokter mata)",
-                "image_url": "/static/images/glaukoma.png"
-            },
-            {
-                "name": "Rabun Jauh (Miopia)",
-                "category": "Mata",
-                "description": "Rabun jauh adalah kondisi dimana objek jauh terlihat buram tetapi objek dekat terlihat jelas.",
-                "symptoms": "Sulit melihat jauh, sering memicingkan mata, sakit kepala, mata lelah",
-                "treatment": "Periksa ke dokter mata, gunakan kacamata/lensa kontak, batasi screen time",
-                "medicines": "Kacamata koreksi, Lensa kontak, LASIK (untuk kasus tertentu)",
-                "image_url": "/static/images/miopia.png"
-            },
-            {
-                "name": "Rabun Dekat (Hipermetropia)",
-                "category": "Mata",
-                "description": "Rabun dekat adalah kondisi dimana objek dekat terlihat buram tetapi objek jauh terlihat jelas.",
-                "symptoms": "Sulit melihat dekat/membaca, mata cepat lelah saat membaca, sakit kepala",
-                "treatment": "Periksa ke dokter mata, gunakan kacamata baca",
-                "medicines": "Kacamata koreksi plus, Lensa kontak",
-                "image_url": "/static/images/hipermetropia.png"
-            },
-            {
-                "name": "Mata Kering",
-                "category": "Mata",
-                "description": "Mata kering adalah kondisi dimana mata tidak memproduksi cukup air mata.",
-                "symptoms": "Mata terasa kering, perih, gatal, merah, sensitif cahaya, penglihatan kabur sesaat",
-                "treatment": "Gunakan tetes mata pelembab, istirahatkan mata dari layar, gunakan pelembab udara",
-                "medicines": "Insto Dry Eyes, Cendo Lyteers, Refresh Tears, Systane",
-                "image_url": "/static/images/mata_kering.png"
-            },
-            # === PENYAKIT GIZI & METABOLIK BARU ===
-            {
-                "name": "Obesitas",
-                "category": "Metabolik",
-                "description": "Obesitas adalah kondisi kelebihan berat badan dengan BMI di atas 30.",
-                "symptoms": "Berat badan berlebih, sulit beraktivitas, sesak napas, nyeri sendi, gangguan tidur",
-                "treatment": "Diet seimbang, olahraga teratur, konsultasi ahli gizi, evaluasi penyebab",
-                "medicines": "Konsultasi dokter - program diet, Orlistat (resep dokter), evaluasi hormonal",
-                "image_url": "/static/images/obesitas.png"
-            },
-            {
-                "name": "Malnutrisi (Kurang Gizi)",
-                "category": "Gizi",
-                "description": "Malnutrisi adalah kondisi kekurangan nutrisi penting yang dibutuhkan tubuh.",
-                "symptoms": "Berat badan rendah, lemas, mudah sakit, pertumbuhan terhambat (anak), rambut rontok",
-                "treatment": "Konsultasi ahli gizi, makan makanan bergizi seimbang, suplemen jika perlu",
-                "medicines": "Multivitamin, Suplemen zat besi, Vitamin A, program PMT (Pemberian Makanan Tambahan)",
-                "image_url": "/static/images/malnutrisi.png"
-            },
-            {
-                "name": "Hipotiroid",
-                "category": "Metabolik",
-                "description": "Hipotiroid adalah kondisi kelenjar tiroid tidak memproduksi cukup hormon tiroid.",
-                "symptoms": "Kelelahan, berat badan naik, sensitif dingin, kulit kering, sembelit, depresi",
-                "treatment": "Konsultasi dokter endokrin, terapi hormon tiroid seumur hidup",
-                "medicines": "Levothyroxine/Euthyrox (HARUS resep dokter, dosis disesuaikan)",
-                "image_url": "/static/images/hipotiroid.png"
-            },
-            {
-                "name": "Hipertiroid",
-                "category": "Metabolik",
-                "description": "Hipertiroid adalah kondisi kelenjar tiroid memproduksi hormon berlebihan.",
-                "symptoms": "Penurunan berat badan, jantung berdebar, gelisah, tremor tangan, sensitif panas, diare",
-                "treatment": "Konsultasi dokter endokrin, obat antitiroid, terapi radioiodine atau operasi",
-                "medicines": "PTU, Methimazole (HARUS resep dokter spesialis)",
-                "image_url": "/static/images/hipertiroid.png"
-            },
-            # === PENYAKIT PEDIATRIK BARU ===
-            {
-                "name": "Hand Foot Mouth Disease (HFMD)",
-                "category": "Pediatrik",
-                "description": "HFMD adalah infeksi virus pada anak yang menyebabkan luka di mulut, tangan, dan kaki.",
-                "symptoms": "Demam, luka di mulut, ruam merah di telapak tangan/kaki, tidak mau makan, rewel",
-                "treatment": "Istirahat, banyak minum, makanan lembut, obat pereda nyeri, isolasi untuk cegah penularan",
-                "medicines": "Paracetamol untuk demam, gel mulut untuk sariawan, banyak cairan",
-                "image_url": "/static/images/hfmd.png"
-            },
-            {
-                "name": "Batuk Rejan (Pertusis)",
-                "category": "Pediatrik",
-                "description": "Batuk rejan adalah infeksi bakteri yang menyebabkan batuk parah berkepanjangan.",
-                "symptoms": "Batuk keras beruntun dengan whoop, muntah setelah batuk, wajah merah/biru saat batuk",
-                "treatment": "Segera ke dokter untuk antibiotik, isolasi, rawat inap jika bayi",
-                "medicines": "Azithromycin, Erythromycin (HARUS resep dokter, makin cepat makin baik)",
-                "image_url": "/static/images/batuk_rejan.png"
-            },
-            {
-                "name": "Demam Scarlet",
-                "category": "Pediatrik",
-                "description": "Demam scarlet adalah infeksi bakteri streptokokus yang menyebabkan ruam merah.",
-                "symptoms": "Demam tinggi, ruam merah seperti amplas, lidah stroberi, sakit tenggorokan",
-                "treatment": "Segera ke dokter untuk antibiotik, istirahat, banyak minum",
-                "medicines": "Penisilin atau Amoxicillin (HARUS resep dokter)",
-                "image_url": "/static/images/scarlet_fever.png"
-            },
-            # === PENYAKIT KESEHATAN WANITA ===
-            {
-                "name": "PCOS (Polycystic Ovary Syndrome)",
-                "category": "Kesehatan Wanita",
-                "description": "PCOS adalah gangguan hormonal pada wanita yang mempengaruhi ovarium.",
-                "symptoms": "Haid tidak teratur, jerawat berlebihan, berat badan naik, sulit hamil, rambut tumbuh berlebihan",
-                "treatment": "Konsultasi dokter kandungan, diet sehat, olahraga teratur, kelola stres",
-                "medicines": "Pil KB untuk mengatur haid, Metformin (HARUS resep dokter SpOG)",
-                "image_url": "/static/images/pcos.png"
-            },
-            {
-                "name": "Endometriosis",
-                "category": "Kesehatan Wanita",
-                "description": "Endometriosis adalah kondisi dimana jaringan rahim tumbuh di luar rahim.",
-                "symptoms": "Nyeri haid hebat, nyeri saat berhubungan, nyeri panggul kronis, sulit hamil",
-                "treatment": "Konsultasi dokter kandungan, terapi hormonal, operasi jika perlu",
-                "medicines": "Obat anti nyeri, Pil KB, GnRH agonist (HARUS resep SpOG)",
-                "image_url": "/static/images/endometriosis.png"
-            },
-            {
-                "name": "Mastitis",
-                "category": "Kesehatan Wanita",
-                "description": "Mastitis adalah infeksi payudara yang sering terjadi pada ibu menyusui.",
-                "symptoms": "Payudara bengkak, merah, nyeri, demam, menggigil, seperti flu",
-                "treatment": "Tetap menyusui/pompa ASI, kompres hangat, istirahat, ke dokter untuk antibiotik",
-                "medicines": "Paracetamol, Ibuprofen, Antibiotik (resep dokter jika infeksi berat)",
-                "image_url": "/static/images/mastitis.png"
-            },
-            {
-                "name": "Pre-eklampsia (Kehamilan)",
-                "category": "Darurat",
-                "description": "Pre-eklampsia adalah tekanan darah tinggi pada kehamilan yang mengancam ibu dan janin.",
-                "symptoms": "Tekanan darah tinggi, protein di urin, bengkak wajah/tangan, sakit kepala hebat, pandangan kabur",
-                "treatment": "SEGERA ke dokter kandungan/IGD! Butuh pemantauan ketat, mungkin perlu melahirkan dini",
-                "medicines": "DARURAT KEHAMILAN - Butuh penanganan dokter SpOG segera!",
-                "image_url": "/static/images/preeklampsia.png"
-            },
-            # === PENYAKIT UROLOGI BARU ===
-            {
-                "name": "Pembesaran Prostat (BPH)",
-                "category": "Urologi",
-                "description": "BPH adalah pembesaran kelenjar prostat yang umum pada pria lanjut usia.",
-                "symptoms": "Sulit mulai buang air kecil, aliran lemah, sering BAK malam, rasa tidak tuntas",
-                "treatment": "Konsultasi dokter urologi, kurangi kafein dan alkohol, jangan menahan BAK",
-                "medicines": "Tamsulosin, Finasteride (HARUS resep dokter urologi)",
-                "image_url": "/static/images/bph.png"
-            },
-            {
-                "name": "Inkontinensia Urin",
-                "category": "Urologi",
-                "description": "Inkontinensia adalah ketidakmampuan menahan buang air kecil.",
-                "symptoms": "Tidak bisa menahan BAK, BAK saat batuk/bersin, sering BAK, BAK mendesak",
-                "treatment": "Latihan otot panggul (Kegel), konsultasi dokter urologi, terapi perilaku",
-                "medicines": "Konsultasi dokter - perlu evaluasi penyebab, mungkin perlu obat atau fisioterapi",
-                "image_url": "/static/images/inkontinensia.png"
-            },
-            # === PENYAKIT LAINNYA ===
-            {
-                "name": "Batu Empedu",
-                "category": "Pencernaan",
-                "description": "Batu empedu adalah endapan keras di kantung empedu yang menyebabkan nyeri perut.",
-                "symptoms": "Nyeri perut kanan atas mendadak, mual muntah, nyeri setelah makan berlemak, demam",
-                "treatment": "Konsultasi dokter bedah, diet rendah lemak, mungkin perlu operasi",
-                "medicines": "Obat pereda nyeri, operasi pengangkatan kantung empedu (laparoskopi)",
-                "image_url": "/static/images/batu_empedu.png"
-            },
-            {
-                "name": "Hernia",
-                "category": "Bedah",
-                "description": "Hernia adalah kondisi organ tubuh menonjol melalui dinding otot yang melemah.",
-                "symptoms": "Benjolan di perut/selangkangan, nyeri saat angkat beban, rasa berat, benjolan membesar",
-                "treatment": "Konsultasi dokter bedah, hindari angkat berat, operasi untuk perbaikan",
-                "medicines": "Pengobatan utama adalah operasi - konsultasi dokter bedah",
-                "image_url": "/static/images/hernia.png"
-            },
-            {
-                "name": "Varises",
-                "category": "Kardiovaskular",
-                "description": "Varises adalah pembengkakan dan pelebaran pembuluh darah vena, biasanya di kaki.",
-                "symptoms": "Vena menonjol kebiru-biruan, kaki berat/pegal, gatal, kram malam hari",
-                "treatment": "Elevasi kaki, kompresi stocking, jangan berdiri lama, olahraga ringan",
-                "medicines": "Diosmin/Hesperidin (Ardium), Stoking kompresi, skleroterapi jika parah",
-                "image_url": "/static/images/varises.png"
-            },
-            {
-                "name": "Fibromialgia",
-                "category": "Tulang & Otot",
-                "description": "Fibromialgia adalah kondisi nyeri kronis di seluruh tubuh dengan kelelahan.",
-                "symptoms": "Nyeri seluruh tubuh, kelelahan ekstrem, gangguan tidur, kabut otak, nyeri titik tender",
-                "treatment": "Konsultasi dokter, olahraga teratur, manajemen stres, terapi kognitif",
-                "medicines": "Pregabalin, Duloxetine (HARUS resep dokter)",
-                "image_url": "/static/images/fibromialgia.png"
-            },
-            {
-                "name": "Syok Anafilaksis (DARURAT)",
-                "category": "Darurat",
-                "description": "Anafilaksis adalah reaksi alergi berat yang mengancam jiwa.",
-                "symptoms": "Sesak napas mendadak, bengkak wajah/tenggorokan, tekanan darah turun, gatal hebat, pingsan",
-                "treatment": "DARURAT! Hubungi 119, suntik Epinefrin jika tersedia, baringkan dengan kaki diangkat",
-                "medicines": "Epinefrin/Adrenalin injeksi (EpiPen) - SEGERA ke IGD!",
-                "image_url": "/static/images/anafilaksis.png"
-            },
-            {
-                "name": "Ketoasidosis Diabetik (DARURAT)",
-                "category": "Darurat",
-                "description": "Ketoasidosis adalah komplikasi diabetes berat yang mengancam jiwa.",
-                "symptoms": "Mual muntah, nyeri perut, napas bau buah, lemas berat, bingung, dehidrasi berat",
-                "treatment": "SEGERA ke IGD! Butuh cairan IV dan insulin, rawat ICU",
-                "medicines": "DARURAT - Butuh penanganan IGD dengan insulin IV dan cairan!",
-                "image_url": "/static/images/ketoasidosis.png"
-            },
-            {
-                "name": "Apendiksitis (Usus Buntu)",
-                "category": "Darurat",
-                "description": "Apendiksitis adalah peradangan usus buntu yang memerlukan operasi darurat.",
-                "symptoms": "Nyeri perut kanan bawah, mual muntah, demam, nyeri makin berat saat bergerak",
-                "treatment": "SEGERA ke IGD! Butuh operasi pengangkatan usus buntu",
-                "medicines": "DARURAT BEDAH - Butuh operasi segera, jangan minum obat pereda nyeri dulu!",
-                "image_url": "/static/images/apendiksitis.png"
-            },
-            {
-                "name": "Psoriasis",
-                "category": "Kulit",
-                "description": "Psoriasis adalah penyakit autoimun kulit yang menyebabkan plak bersisik.",
-                "symptoms": "Plak merah bersisik putih, gatal, kulit kering pecah, nyeri, kuku berlubang",
-                "treatment": "Konsultasi dokter kulit, pelembab rutin, terapi cahaya, kelola stres",
-                "medicines": "Krim kortikosteroid, Calcipotriol, Methotrexate (HARUS resep dokter kulit)",
-                "image_url": "/static/images/psoriasis.png"
-            },
-            {
-                "name": "Lupus (SLE)",
-                "category": "Autoimun",
-                "description": "Lupus adalah penyakit autoimun yang dapat menyerang berbagai organ tubuh.",
-                "symptoms": "Ruam kupu-kupu di wajah, nyeri sendi, kelelahan, demam, sensitif matahari",
-                "treatment": "Konsultasi dokter reumatologi, hindari sinar matahari, kontrol rutin",
-                "medicines": "Hydroxychloroquine, Kortikosteroid, Imunosupresan (HARUS resep dokter spesialis)",
-                "image_url": "/static/images/lupus.png"
-            },
-            {
-                "name": "Alergi Musiman (Rhinitis Alergi)",
-                "category": "Alergi",
-                "description": "Rhinitis alergi adalah reaksi alergi pada hidung terhadap serbuk sari atau alergen lain.",
-                "symptoms": "Bersin-bersin, hidung gatal dan berair, mata gatal, hidung tersumbat",
-                "treatment": "Hindari alergen, gunakan masker, bersihkan rumah, antihistamin",
-                "medicines": "Cetirizine, Loratadine, Flixonase Nasal Spray, Tetes mata antihistamin",
-                "image_url": "/static/images/rhinitis_alergi.png"
-            },
-            {
-                "name": "Gangguan Panik",
-                "category": "Mental",
-                "description": "Gangguan panik adalah serangan kecemasan intens yang terjadi mendadak.",
-                "symptoms": "Jantung berdebar kencang, sesak napas, gemetar, keringat, takut mati, pusing",
-                "treatment": "Latihan pernapasan, terapi kognitif perilaku, konsultasi psikiater",
-                "medicines": "SSRI, Benzodiazepin (HARUS resep psikiater)",
-                "image_url": "/static/images/panik.png"
-            },
-            {
-                "name": "Gangguan Bipolar",
-                "category": "Mental",
-                "description": "Bipolar adalah gangguan mood dengan episode mania dan depresi bergantian.",
-                "symptoms": "Episode sangat bersemangat (mania), episode sangat sedih (depresi), perubahan tidur dan energi",
-                "treatment": "HARUS konsultasi psikiater, terapi rutin, dukungan keluarga",
-                "medicines": "Mood stabilizer, Antipsikotik (HARUS resep dan kontrol psikiater)",
-                "image_url": "/static/images/bipolar.png"
-            }
-        ]
-        
-        for disease_data in diseases_data:
-            disease = Disease(**disease_data)
-            db.add(disease)
+# Versi lama menyimpan created_at sebagai string datetime.now() (waktu lokal server)
+TIMESTAMP_MIGRATION_KEY = "timestamps_utc_migrated"
+TIMESTAMP_MODELS = [Order, PatientRecord, User]
+LEGACY_TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+def migrate_legacy_timestamps(db: Session, model) -> int:
+    """Ubah created_at string lama di satu tabel menjadi timestamp UTC, lalu buat index-nya"""
+    table = model.__table__
+    column = next(c for c in inspect(db.connection()).get_columns(table.name) if c["name"] == "created_at")
+    if isinstance(column["type"], DateTime):
+        converted = 0  # Tabel dibuat versi baru, sudah bertipe DateTime
+    elif engine.dialect.name == "postgresql":
+        # String waktu lokal server -> timestamptz: kurangi offset lokal lalu tandai sebagai UTC
+        offset = int(datetime.now().astimezone().utcoffset().total_seconds())
+        db.execute(text(
+            f"ALTER TABLE {table.name} ALTER COLUMN created_at TYPE TIMESTAMP WITH TIME ZONE "
+            f"USING (NULLIF(created_at, '')::timestamp - make_interval(secs => {offset})) AT TIME ZONE 'UTC'"
+        ))
+        converted = db.query(func.count(model.id)).filter(model.created_at.isnot(None)).scalar()
+    else:
+        # SQLite tidak bisa ALTER tipe kolom, tapi nilainya bisa ditulis ulang dalam format DateTime
+        updates = []
+        for row_id, raw in db.execute(text(f"SELECT id, created_at FROM {table.name} WHERE created_at IS NOT NULL")):
+            try:
+                local_time = datetime.strptime(raw[:19], LEGACY_TIMESTAMP_FORMAT)
+            except (TypeError, ValueError):
+                print(f"⚠️  {table.name} #{row_id}: created_at '{raw}' tidak valid, dikosongkan")
+                local_time = None
+            updates.append({"id": row_id, "created_at": local_time.astimezone(timezone.utc) if local_time else None})
+        if updates:
+            db.execute(update(model), updates)
+        converted = len(updates)
+
+    for index in table.indexes:
+        index.create(db.connection(), checkfirst=True)
+    return converted
+
+# Kolom yang dulu DateTime naive berisi UTC: di PostgreSQL diubah ke timestamptz (SQLite formatnya sama)
+UTC_COLUMNS_MIGRATION_KEY = "utc_columns_migrated"
+UTC_COLUMNS = [(StockReservation, "expires_at"), (BackgroundJob, "next_run_at"),
+               (BackgroundJob, "created_at"), (BackgroundJob, "updated_at")]
+
+def ensure_utc_columns(db: Session):
+    if engine.dialect.name != "postgresql" or db.get(AppMetadata, UTC_COLUMNS_MIGRATION_KEY):
+        return
+    try:
+        db.add(AppMetadata(key=UTC_COLUMNS_MIGRATION_KEY, value=utcnow().isoformat()))
+        db.flush()
+        inspector = inspect(db.connection())
+        for model, name in UTC_COLUMNS:
+            column = next(c for c in inspector.get_columns(model.__tablename__) if c["name"] == name)
+            if not getattr(column["type"], "timezone", False):
+                db.execute(text(
+                    f"ALTER TABLE {model.__tablename__} ALTER COLUMN {name} "
+                    f"TYPE TIMESTAMP WITH TIME ZONE USING {name} AT TIME ZONE 'UTC'"
+                ))
         db.commit()
+    except IntegrityError:
+        db.rollback()
+
+def ensure_typed_timestamps(db: Session):
+    """Migrasi sekali; kunci metadata diklaim dulu agar worker lain tidak mengonversi dua kali"""
+    ensure_utc_columns(db)
+    if db.get(AppMetadata, TIMESTAMP_MIGRATION_KEY):
+        return
+    try:
+        db.add(AppMetadata(key=TIMESTAMP_MIGRATION_KEY, value=utcnow().isoformat()))
+        db.flush()
+        converted = sum(migrate_legacy_timestamps(db, model) for model in TIMESTAMP_MODELS)
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        return
+    if converted:
+        print(f"✅ {converted} timestamp lama dikonversi ke UTC")
+
+# ==========================================
+# 3. SEED DATA PENYAKIT
+# ==========================================
+DISEASES_DATA = [
+    {
+        "name": "Demam",
+        "category": "Infeksi",
+        "description": "Demam adalah kondisi ketika suhu tubuh naik di atas normal (di atas 37.5°C). Demam merupakan respons alami tubuh terhadap infeksi virus atau bakteri.",
+        "symptoms": "Suhu tubuh tinggi, menggigil, berkeringat, sakit kepala, nyeri otot, lemas, kehilangan nafsu makan",
+        "treatment": "Istirahat yang cukup, minum banyak cairan, kompres hangat, konsumsi obat penurun panas seperti Paracetamol",
+        "medicines": "Paracetamol 500mg, Ibuprofen 400mg, Sanmol, Tempra",
+        "image_url": "/static/images/demam.png"
+    },
+    {
+        "name": "Flu (Influenza)",
+        "category": "Infeksi Virus",
+        "description": "Flu adalah infeksi virus yang menyerang sistem pernapasan. Virus influenza menyebar melalui droplet saat batuk atau bersin.",
+        "symptoms": "Hidung tersumbat, pilek, batuk, sakit tenggorokan, demam, nyeri tubuh, kelelahan",
+        "treatment": "Istirahat total, minum air hangat, konsumsi vitamin C, gunakan masker, obat flu jika diperlukan",
+        "medicines": "Decolgen, Bodrex Flu & Batuk, Neozep Forte, Panadol Cold & Flu, Vitamin C 1000mg",
+        "image_url": "/static/images/flu.png"
+    },
+    {
+        "name": "Maag (Gastritis)",
+        "category": "Pencernaan",
+        "description": "Maag adalah peradangan pada lapisan lambung yang menyebabkan nyeri dan ketidaknyamanan di perut bagian atas.",
+        "symptoms": "Nyeri ulu hati, mual, muntah, kembung, perut terasa penuh, sendawa berlebihan",
+        "treatment": "Makan teratur dan porsi kecil, hindari makanan pedas dan asam, kurangi kafein, konsumsi antasida",
+        "medicines": "Promag, Mylanta, Polysilane, Omeprazole 20mg, Lansoprazole, Antasida DOEN",
+        "image_url": "/static/images/maag.png"
+    },
+    {
+        "name": "Migrain",
+        "category": "Neurologis",
+        "description": "Migrain adalah sakit kepala berdenyut yang intense, biasanya di satu sisi kepala. Dapat disertai mual dan sensitivitas terhadap cahaya.",
+        "symptoms": "Sakit kepala berdenyut, mual, muntah, sensitif terhadap cahaya dan suara, gangguan penglihatan",
+        "treatment": "Istirahat di ruangan gelap dan tenang, kompres dingin, obat pereda nyeri, hindari pemicu migrain",
+        "medicines": "Panadol Extra, Saridon, Bodrexin, Paramex, Antalgin",
+        "image_url": "/static/images/migrain.png"
+    },
+    {
+        "name": "Dermatitis Alergi",
+        "category": "Kulit",
+        "description": "Dermatitis alergi adalah reaksi kulit terhadap alergen yang menyebabkan ruam, gatal, dan kemerahan.",
+        "symptoms": "Kulit gatal, kemerahan, ruam, bengkak, kulit kering dan bersisik, lepuhan kecil",
+        "treatment": "Hindari alergen, gunakan krim kortikosteroid, lotion pelembab, antihistamin oral jika gatal parah",
+        "medicines": "Cetirizine 10mg, Loratadine, CTM (Chlorpheniramine), Hydrocortisone Cream, Calamine Lotion",
+        "image_url": "/static/images/dermatitis.png"
+    },
+    {
+        "name": "Hipertensi",
+        "category": "Kardiovaskular",
+        "description": "Hipertensi atau tekanan darah tinggi adalah kondisi ketika tekanan darah dalam arteri meningkat secara persisten di atas 140/90 mmHg.",
+        "symptoms": "Sering tanpa gejala, sakit kepala, sesak napas, mimisan, pusing, nyeri dada",
+        "treatment": "Diet rendah garam, olahraga teratur, kelola stres, hindari alkohol dan rokok, obat antihipertensi",
+        "medicines": "Amlodipine 5mg, Captopril, Lisinopril, Bisoprolol (dengan resep dokter)",
+        "image_url": "/static/images/hipertensi.png"
+    },
+    {
+        "name": "Diabetes Mellitus",
+        "category": "Metabolik",
+        "description": "Diabetes adalah penyakit metabolik kronis yang ditandai dengan kadar gula darah tinggi karena tubuh tidak dapat memproduksi atau menggunakan insulin dengan baik.",
+        "symptoms": "Sering buang air kecil, haus berlebihan, lapar terus-menerus, penurunan berat badan, luka sulit sembuh",
+        "treatment": "Diet seimbang rendah gula, olahraga teratur, monitor gula darah, obat diabetes atau insulin",
+        "medicines": "Metformin 500mg, Glibenclamide, Glimepiride (dengan resep dokter), Glucometer",
+        "image_url": "/static/images/diabetes.png"
+    },
+    {
+        "name": "Vertigo",
+        "category": "Neurologis",
+        "description": "Vertigo adalah sensasi pusing berputar yang membuat penderita merasa dirinya atau lingkungan sekitar berputar.",
+        "symptoms": "Pusing berputar, mual, muntah, kehilangan keseimbangan, nistagmus (gerakan mata abnormal)",
+        "treatment": "Istirahat, hindari gerakan kepala mendadak, manuver Epley, obat antivertigo jika diperlukan",
+        "medicines": "Betahistine (Mertigo), Dimenhidrinat (Antimo), Flunarizine, Cinnarizine",
+        "image_url": "/static/images/vertigo.png"
+    },
+    {
+        "name": "Asma",
+        "category": "Pernapasan",
+        "description": "Asma adalah penyakit kronis pada saluran pernapasan yang menyebabkan peradangan dan penyempitan bronkus.",
+        "symptoms": "Sesak napas, mengi (napas berbunyi), batuk terutama malam hari, dada terasa berat",
+        "treatment": "Hindari pemicu asma, gunakan inhaler, obat pengontrol asma, jaga kebersihan lingkungan",
+        "medicines": "Salbutamol Inhaler (Ventolin), Budesonide Inhaler, Aminofilin, Theophylline",
+        "image_url": "/static/images/asma.png"
+    },
+    {
+        "name": "Tifus (Demam Tifoid)",
+        "category": "Infeksi Bakteri",
+        "description": "Tifus adalah infeksi bakteri Salmonella typhi yang menyerang usus dan menyebar ke seluruh tubuh melalui aliran darah.",
+        "symptoms": "Demam tinggi bertahap, sakit kepala, nyeri perut, diare atau sembelit, ruam merah muda, lemas",
+        "treatment": "Antibiotik sesuai resep dokter, istirahat total, makan makanan lunak, minum banyak cairan",
+        "medicines": "Ciprofloxacin, Chloramphenicol, Amoxicillin (dengan resep dokter), Oralit",
+        "image_url": "/static/images/tifus.png"
+    },
+    {
+        "name": "Sakit Gigi",
+        "category": "Gigi & Mulut",
+        "description": "Sakit gigi adalah nyeri pada gigi atau sekitar rahang yang dapat disebabkan oleh gigi berlubang, infeksi gusi, atau kerusakan gigi.",
+        "symptoms": "Nyeri gigi, gigi ngilu, bengkak gusi, sakit saat mengunyah, sensitif panas dingin, bau mulut",
+        "treatment": "Kumur air garam hangat, kompres dingin, minum obat pereda nyeri, hindari makanan manis, segera ke dokter gigi",
+        "medicines": "Asam Mefenamat 500mg, Ibuprofen, Paracetamol, Minyak Cengkeh, Betadine Kumur",
+        "image_url": "/static/images/sakit_gigi.png"
+    },
+    {
+        "name": "Diare",
+        "category": "Pencernaan",
+        "description": "Diare adalah kondisi buang air besar dengan feses encer lebih dari 3 kali sehari, sering disertai kram perut.",
+        "symptoms": "BAB encer, sering ke toilet, kram perut, mual, dehidrasi, lemas",
+        "treatment": "Minum oralit, hindari makanan berminyak, makan pisang dan bubur, banyak minum air putih",
+        "medicines": "Oralit, Loperamide (Imodium), Entrostop, Diapet, Zinc Tablet",
+        "image_url": "/static/images/diare.png"
+    },
+    {
+        "name": "Sariawan",
+        "category": "Gigi & Mulut",
+        "description": "Sariawan adalah luka kecil di dalam mulut yang menyebabkan rasa perih terutama saat makan atau minum.",
+        "symptoms": "Luka di mulut, perih, sulit makan, bengkak bibir bagian dalam",
+        "treatment": "Oleskan obat sariawan, kumur antiseptik, makan makanan lembut, konsumsi vitamin C",
+        "medicines": "Aloclair Gel, Kenalog in Orabase, Albothyl, Enkasari, Vitamin C 500mg, Vitamin B Complex",
+        "image_url": "/static/images/sariawan.png"
+    },
+    {
+        "name": "Sakit Mata (Konjungtivitis)",
+        "category": "Mata",
+        "description": "Konjungtivitis adalah peradangan pada selaput mata yang menyebabkan mata merah, gatal, dan berair.",
+        "symptoms": "Mata merah, gatal, berair, belekan, sensitif cahaya, pandangan kabur",
+        "treatment": "Kompres dingin, tetes mata, jangan mengucek mata, cuci tangan sering, hindari kontak mata",
+        "medicines": "Cendo Xitrol, Tetes Mata Insto, Cendo Fenicol, Rohto Eye Drops, Visine",
+        "image_url": "/static/images/sakit_mata.png"
+    },
+    {
+        "name": "Sakit Telinga (Otitis)",
+        "category": "THT",
+        "description": "Otitis adalah infeksi atau peradangan pada telinga yang menyebabkan nyeri dan gangguan pendengaran.",
+        "symptoms": "Nyeri telinga, pendengaran berkurang, telinga berdengung, keluar cairan, demam",
+        "treatment": "Kompres hangat, obat tetes telinga, jangan mengorek telinga, segera ke dokter THT",
+        "medicines": "Otopain Ear Drops, Tarivid Otic, Paracetamol, Amoxicillin (dengan resep dokter)",
+        "image_url": "/static/images/sakit_telinga.png"
+    },
+    # === PENYAKIT PERNAPASAN ===
+    {
+        "name": "Bronkitis",
+        "category": "Pernapasan",
+        "description": "Bronkitis adalah peradangan pada saluran bronkus yang menyebabkan batuk berdahak.",
+        "symptoms": "Batuk berdahak, sesak napas ringan, dada tidak nyaman, kelelahan, demam ringan",
+        "treatment": "Istirahat, minum banyak air hangat, hindari asap rokok, gunakan pelembab udara",
+        "medicines": "Ambroxol, OBH Combi, Woods Peppermint, Bisolvon, Vicks Formula 44",
+        "image_url": "/static/images/bronkitis.png"
+    },
+    {
+        "name": "Pneumonia",
+        "category": "Pernapasan",
+        "description": "Pneumonia adalah infeksi paru-paru yang menyebabkan kantung udara terisi cairan atau nanah.",
+        "symptoms": "Demam tinggi, batuk berdahak, sesak napas berat, nyeri dada, menggigil",
+        "treatment": "Segera ke dokter, antibiotik sesuai resep, istirahat total, oksigen jika perlu",
+        "medicines": "Antibiotik (Amoxicillin, Azithromycin - HARUS resep dokter), Paracetamol",
+        "image_url": "/static/images/pneumonia.png"
+    },
+    {
+        "name": "TBC (Tuberkulosis)",
+        "category": "Pernapasan",
+        "description": "TBC adalah infeksi bakteri pada paru-paru yang menular melalui udara.",
+        "symptoms": "Batuk lebih dari 2 minggu, batuk berdarah, keringat malam, penurunan berat badan, demam",
+        "treatment": "Pengobatan 6 bulan dengan obat TBC, HARUS ke dokter dan rutin kontrol",
+        "medicines": "Obat TBC (Rifampicin, Isoniazid, Ethambutol - HARUS resep dokter dan kontrol rutin)",
+        "image_url": "/static/images/tbc.png"
+    },
+    {
+        "name": "Sinusitis",
+        "category": "THT",
+        "description": "Sinusitis adalah peradangan pada rongga sinus yang menyebabkan hidung tersumbat dan nyeri wajah.",
+        "symptoms": "Hidung tersumbat, nyeri wajah, sakit kepala, ingus kental, bau mulut",
+        "treatment": "Uap air hangat, irigasi hidung dengan air garam, kompres hangat pada wajah",
+        "medicines": "Pseudoephedrine (Rhinos), Nasonex Spray, Paracetamol, Amoxicillin (resep dokter)",
+        "image_url": "/static/images/sinusitis.png"
+    },
+    {
+        "name": "Radang Tenggorokan",
+        "category": "THT",
+        "description": "Radang tenggorokan adalah peradangan pada tenggorokan yang menyebabkan nyeri saat menelan.",
+        "symptoms": "Sakit tenggorokan, sulit menelan, suara serak, demam, pembengkakan kelenjar",
+        "treatment": "Kumur air garam, minum air hangat dengan madu, istirahat bicara",
+        "medicines": "FG Troches, Hexadol, Betadine Gargle, Strepsils, Degirol",
+        "image_url": "/static/images/radang_tenggorokan.png"
+    },
+    # === PENYAKIT PENCERNAAN ===
+    {
+        "name": "Wasir (Hemoroid)",
+        "category": "Pencernaan",
+        "description": "Wasir adalah pembengkakan pembuluh darah di area anus yang menyebabkan nyeri dan pendarahan.",
+        "symptoms": "Nyeri saat BAB, pendarahan saat BAB, benjolan di anus, gatal, tidak nyaman duduk",
+        "treatment": "Makan serat tinggi, banyak minum air, jangan terlalu lama duduk, hindari mengejan",
+        "medicines": "Faktu Suppositoria, Ultraproct, Ardium, Anusol, Preparation H",
+        "image_url": "/static/images/wasir.png"
+    },
+    {
+        "name": "Sembelit (Konstipasi)",
+        "category": "Pencernaan",
+        "description": "Sembelit adalah kondisi sulit buang air besar dengan feses keras.",
+        "symptoms": "Sulit BAB, feses keras, perut kembung, rasa tidak tuntas, kurang dari 3x BAB seminggu",
+        "treatment": "Makan sayur dan buah, minum banyak air, olahraga rutin, jangan menahan BAB",
+        "medicines": "Dulcolax, Microlax, Lactulax, Vegeta, Psyllium Husk",
+        "image_url": "/static/images/sembelit.png"
+    },
+    {
+        "name": "GERD (Asam Lambung)",
+        "category": "Pencernaan",
+        "description": "GERD adalah naiknya asam lambung ke kerongkongan yang menyebabkan rasa terbakar.",
+        "symptoms": "Nyeri ulu hati, rasa terbakar di dada, mual, mulut asam, sulit menelan",
+        "treatment": "Makan porsi kecil, hindari makanan pedas dan asam, jangan langsung tidur setelah makan",
+        "medicines": "Omeprazole, Lansoprazole, Antasida, Sucralfate, Domperidone",
+        "image_url": "/static/images/gerd.png"
+    },
+    {
+        "name": "Hepatitis",
+        "category": "Pencernaan",
+        "description": "Hepatitis adalah peradangan hati yang dapat disebabkan oleh virus, alkohol, atau obat.",
+        "symptoms": "Kulit dan mata menguning, urin gelap, lemas, mual, nyeri perut kanan atas",
+        "treatment": "SEGERA ke dokter, istirahat total, hindari alkohol, makan bergizi",
+        "medicines": "Harus konsultasi dokter - pengobatan tergantung jenis hepatitis",
+        "image_url": "/static/images/hepatitis.png"
+    },
+    {
+        "name": "Cacingan",
+        "category": "Pencernaan",
+        "description": "Cacingan adalah infeksi parasit cacing di usus yang sering terjadi pada anak-anak.",
+        "symptoms": "Gatal di anus terutama malam, perut buncit, nafsu makan menurun, lemas",
+        "treatment": "Minum obat cacing, cuci tangan sebelum makan, potong kuku, jaga kebersihan",
+        "medicines": "Combantrin, Vermox, Zentel, Albendazole, Pirantel Pamoat",
+        "image_url": "/static/images/cacingan.png"
+    },
+    # === PENYAKIT KULIT ===
+    {
+        "name": "Jerawat",
+        "category": "Kulit",
+        "description": "Jerawat adalah kondisi kulit dimana pori-pori tersumbat minyak dan sel kulit mati.",
+        "symptoms": "Bintik merah, komedo, pustula bernanah, kulit berminyak, bekas hitam",
+        "treatment": "Cuci muka 2x sehari, hindari pegang wajah, gunakan produk non-komedogenik",
+        "medicines": "Acnes, Oxy, Vitacid Gel, Erythromycin Gel, Benzoyl Peroxide",
+        "image_url": "/static/images/jerawat.png"
+    },
+    {
+        "name": "Kudis (Scabies)",
+        "category": "Kulit",
+        "description": "Kudis adalah infeksi kulit oleh tungau yang menyebabkan gatal hebat terutama malam hari.",
+        "symptoms": "Gatal hebat malam hari, ruam merah, lesi kulit, menyebar ke orang lain",
+        "treatment": "Oleskan obat kudis, cuci semua pakaian dan sprei, obati seluruh anggota keluarga",
+        "medicines": "Scabimite Cream, Permethrin 5%, Sulfur 10%, Antihistamin (CTM)",
+        "image_url": "/static/images/kudis.png"
+    },
+    {
+        "name": "Panu",
+        "category": "Kulit",
+        "description": "Panu adalah infeksi jamur kulit yang menyebabkan bercak putih atau coklat.",
+        "symptoms": "Bercak putih/coklat, gatal ringan, kulit bersisik halus, menyebar perlahan",
+        "treatment": "Jaga kulit tetap kering, gunakan obat antijamur, ganti pakaian jika berkeringat",
+        "medicines": "Miconazole Cream, Ketoconazole Cream, Kalpanax, Daktarin, Canesten",
+        "image_url": "/static/images/panu.png"
+    },
+    {
+        "name": "Kurap (Tinea)",
+        "category": "Kulit",
+        "description": "Kurap adalah infeksi jamur kulit yang membentuk ruam melingkar bersisik.",
+        "symptoms": "Ruam melingkar merah, bersisik, gatal, menyebar, tepi aktif",
+        "treatment": "Jaga kebersihan kulit, keringkan dengan baik, gunakan obat antijamur rutin",
+        "medicines": "Terbinafine Cream, Clotrimazole, Miconazole, Griseofulvin (resep dokter)",
+        "image_url": "/static/images/kurap.png"
+    },
+    {
+        "name": "Eksim",
+        "category": "Kulit",
+        "description": "Eksim adalah peradangan kulit kronis yang menyebabkan kulit kering, gatal, dan kemerahan.",
+        "symptoms": "Kulit kering, gatal, kemerahan, bersisik, pecah-pecah, lepuhan kecil",
+        "treatment": "Gunakan pelembab rutin, hindari sabun keras, jangan garuk, kendalikan alergen",
+        "medicines": "Hidrokortison Cream, Mometason, Pelembab Cetaphil, Antihistamin",
+        "image_url": "/static/images/eksim.png"
+    },
+    {
+        "name": "Biduran (Urtikaria)",
+        "category": "Kulit",
+        "description": "Biduran adalah reaksi alergi kulit yang menyebabkan bentol merah gatal.",
+        "symptoms": "Bentol merah, gatal hebat, bengkak tiba-tiba, berpindah lokasi",
+        "treatment": "Hindari pemicu alergi, kompres dingin, minum antihistamin",
+        "medicines": "Loratadine, Cetirizine, CTM, Diphenhydramine, Calamine Lotion",
+        "image_url": "/static/images/biduran.png"
+    },
+    {
+        "name": "Herpes",
+        "category": "Kulit",
+        "description": "Herpes adalah infeksi virus yang menyebabkan lepuhan berisi cairan pada kulit atau mulut.",
+        "symptoms": "Lepuhan berkelompok, nyeri, gatal, demam, lelah",
+        "treatment": "SEGERA ke dokter, jangan sentuh lesi, istirahat, hindari kontak langsung",
+        "medicines": "Acyclovir (HARUS resep dokter), Paracetamol untuk demam",
+        "image_url": "/static/images/herpes.png"
+    },
+    {
+        "name": "Cacar Air",
+        "category": "Kulit",
+        "description": "Cacar air adalah infeksi virus varicella yang menyebabkan ruam melepuh di seluruh tubuh.",
+        "symptoms": "Ruam merah berisi cairan, gatal, demam, lelah, ruam menyebar ke seluruh tubuh",
+        "treatment": "Istirahat, jangan garuk, mandikan dengan air hangat, potong kuku pendek",
+        "medicines": "Acyclovir (resep dokter), Calamine Lotion, Paracetamol, Bedak Salisil",
+        "image_url": "/static/images/cacar_air.png"
+    },
+    # === PENYAKIT TULANG & OTOT ===
+    {
+        "name": "Rematik (Arthritis)",
+        "category": "Tulang & Otot",
+        "description": "Rematik adalah peradangan sendi yang menyebabkan nyeri dan kaku pada persendian.",
+        "symptoms": "Nyeri sendi, kaku pagi hari, bengkak sendi, sulit bergerak, demam ringan",
+        "treatment": "Kompres hangat, olahraga ringan, istirahat cukup, kurangi aktivitas berat",
+        "medicines": "Piroxicam, Ibuprofen, Natrium Diklofenak, Glucosamine, Chondroitin",
+        "image_url": "/static/images/rematik.png"
+    },
+    {
+        "name": "Asam Urat (Gout)",
+        "category": "Tulang & Otot",
+        "description": "Asam urat adalah kondisi dimana kristal urat menumpuk di sendi menyebabkan nyeri hebat.",
+        "symptoms": "Nyeri sendi mendadak, bengkak merah, biasanya di jempol kaki, nyeri malam hari",
+        "treatment": "Hindari makanan tinggi purin (jeroan, seafood), minum banyak air, batasi alkohol",
+        "medicines": "Allopurinol, Colchicine, Piroxicam, Ibuprofen (HARUS konsultasi dokter)",
+        "image_url": "/static/images/asam_urat.png"
+    },
+    {
+        "name": "Encok (Lumbago)",
+        "category": "Tulang & Otot",
+        "description": "Encok adalah nyeri pada punggung bawah yang dapat menjalar ke kaki.",
+        "symptoms": "Nyeri punggung bawah, kaku, sulit berdiri, nyeri menjalar ke bokong/kaki",
+        "treatment": "Istirahat, kompres hangat, tidur di kasur keras, hindari angkat berat",
+        "medicines": "Paracetamol, Ibuprofen, Counterpain, Salonpas, Neurobion",
+        "image_url": "/static/images/encok.png"
+    },
+    {
+        "name": "Osteoporosis",
+        "category": "Tulang & Otot",
+        "description": "Osteoporosis adalah kondisi tulang menjadi rapuh dan mudah patah.",
+        "symptoms": "Nyeri tulang, postur bungkuk, tulang mudah patah, tinggi badan berkurang",
+        "treatment": "Konsumsi kalsium cukup, vitamin D, olahraga teratur, hindari jatuh",
+        "medicines": "Suplemen Kalsium, Vitamin D3, Alendronate (resep dokter), CDR",
+        "image_url": "/static/images/osteoporosis.png"
+    },
+    # === PENYAKIT JANTUNG & PEMBULUH DARAH ===
+    {
+        "name": "Kolesterol Tinggi",
+        "category": "Kardiovaskular",
+        "description": "Kolesterol tinggi adalah kondisi kadar lemak jahat tinggi dalam darah.",
+        "symptoms": "Sering tanpa gejala, nyeri dada, sesak napas, kelelahan, xanthoma (benjolan kulit)",
+        "treatment": "Diet rendah lemak, olahraga rutin, hindari gorengan, berhenti merokok",
+        "medicines": "Simvastatin, Atorvastatin (HARUS resep dokter), Omega-3",
+        "image_url": "/static/images/kolesterol.png"
+    },
+    {
+        "name": "Anemia",
+        "category": "Darah",
+        "description": "Anemia adalah kondisi kekurangan sel darah merah atau hemoglobin.",
+        "symptoms": "Pucat, lemas, pusing, jantung berdebar, sesak napas, mudah lelah",
+        "treatment": "Makan makanan kaya zat besi (daging, sayur hijau), vitamin C untuk penyerapan",
+        "medicines": "Sangobion, Ferrous Sulfate, Vitamin B12, Asam Folat",
+        "image_url": "/static/images/anemia.png"
+    },
+    {
+        "name": "Stroke Ringan (TIA)",
+        "category": "Kardiovaskular",
+        "description": "TIA adalah gangguan aliran darah ke otak yang bersifat sementara - TANDA BAHAYA STROKE.",
+        "symptoms": "Lemah separuh badan, bicara pelo, wajah mencong, pandangan kabur",
+        "treatment": "SEGERA ke IGD rumah sakit! Ini kondisi darurat!",
+        "medicines": "HARUS penanganan dokter SEGERA - Hubungi 119 atau IGD terdekat!",
+        "image_url": "/static/images/stroke.png"
+    },
+    # === PENYAKIT GINJAL & SALURAN KEMIH ===
+    {
+        "name": "ISK (Infeksi Saluran Kemih)",
+        "category": "Urologi",
+        "description": "ISK adalah infeksi bakteri pada saluran kemih termasuk kandung kemih.",
+        "symptoms": "Nyeri saat buang air kecil, sering BAK, urin keruh atau berbau, nyeri perut bawah",
+        "treatment": "Minum banyak air, jangan menahan BAK, jaga kebersihan, ke dokter untuk antibiotik",
+        "medicines": "Antibiotik (Ciprofloxacin, Amoxicillin - HARUS resep dokter), Ural",
+        "image_url": "/static/images/isk.png"
+    },
+    {
+        "name": "Batu Ginjal",
+        "category": "Urologi",
+        "description": "Batu ginjal adalah endapan mineral keras di ginjal atau saluran kemih.",
+        "symptoms": "Nyeri pinggang hebat, nyeri menjalar ke selangkangan, mual, darah di urin",
+        "treatment": "Minum banyak air (2-3 liter/hari), SEGERA ke dokter untuk evaluasi",
+        "medicines": "Perlu evaluasi dokter - tergantung ukuran batu (obat atau operasi)",
+        "image_url": "/static/images/batu_ginjal.png"
+    },
+    # === PENYAKIT SARAF ===
+    {
+        "name": "Epilepsi (Ayan)",
+        "category": "Neurologis",
+        "description": "Epilepsi adalah gangguan sistem saraf yang menyebabkan kejang berulang.",
+        "symptoms": "Kejang, kehilangan kesadaran, gerakan tidak terkontrol, bingung setelah kejang",
+        "treatment": "Minum obat teratur, hindari pemicu, tidur cukup, HARUS kontrol rutin ke dokter saraf",
+        "medicines": "Phenytoin, Carbamazepine, Asam Valproat (HARUS resep dokter saraf)",
+        "image_url": "/static/images/epilepsi.png"
+    },
+    {
+        "name": "Bell's Palsy",
+        "category": "Neurologis",
+        "description": "Bell's Palsy adalah kelumpuhan wajah sementara akibat peradangan saraf wajah.",
+        "symptoms": "Wajah mencong sebelah, tidak bisa menutup mata, mulut tertarik, sulit bicara",
+        "treatment": "SEGERA ke dokter saraf dalam 72 jam pertama untuk hasil terbaik",
+        "medicines": "Kortikosteroid, Acyclovir (HARUS resep dokter, makin cepat makin baik)",
+        "image_url": "/static/images/bells_palsy.png"
+    },
+    # === PENYAKIT MENTAL ===
+    {
+        "name": "Kecemasan (Anxiety)",
+        "category": "Mental",
+        "description": "Anxiety adalah gangguan kecemasan berlebihan yang mengganggu aktivitas sehari-hari.",
+        "symptoms": "Cemas berlebihan, jantung berdebar, sulit tidur, gelisah, tegang otot",
+        "treatment": "Latihan pernapasan, olahraga, kurangi kafein, konsultasi psikolog/psikiater",
+        "medicines": "Konsultasi dokter jiwa/psikiater untuk penanganan yang tepat",
+        "image_url": "/static/images/anxiety.png"
+    },
+    {
+        "name": "Depresi",
+        "category": "Mental",
+        "description": "Depresi adalah gangguan mood yang menyebabkan perasaan sedih berkepanjangan.",
+        "symptoms": "Sedih berkepanjangan, kehilangan minat, gangguan tidur, lelah, pikiran negatif",
+        "treatment": "Jangan dipendam sendiri - bicara dengan orang terdekat, konsultasi psikolog/psikiater",
+        "medicines": "HARUS konsultasi psikiater - butuh penanganan profesional",
+        "image_url": "/static/images/depresi.png"
+    },
+    {
+        "name": "Insomnia",
+        "category": "Mental",
+        "description": "Insomnia adalah gangguan tidur berupa sulit tidur atau tidak bisa tidur nyenyak.",
+        "symptoms": "Sulit tidur, bangun tengah malam, tidak segar saat bangun, mengantuk siang",
+        "treatment": "Atur jadwal tidur, hindari gadget sebelum tidur, ruangan gelap dan sejuk",
+        "medicines": "Lelap, Melatonin (jangka pendek), konsultasi dokter jika berlanjut",
+        "image_url": "/static/images/insomnia.png"
+    },
+    # === PENYAKIT LAINNYA ===
+    {
+        "name": "Alergi Makanan",
+        "category": "Alergi",
+        "description": "Alergi makanan adalah reaksi sistem imun berlebihan terhadap makanan tertentu.",
+        "symptoms": "Gatal kulit, bengkak bibir/lidah, mual, diare, sesak napas (berat)",
+        "treatment": "Hindari makanan pemicu, bawa obat alergi, segera ke IGD jika sesak napas",
+        "medicines": "Loratadine, Cetirizine, CTM, Epinefrin (untuk reaksi berat - IGD)",
+        "image_url": "/static/images/alergi_makanan.png"
+    },
+    {
+        "name": "DBD (Demam Berdarah)",
+        "category": "Infeksi Virus",
+        "description": "DBD adalah infeksi virus dengue melalui gigitan nyamuk Aedes aegypti.",
+        "symptoms": "Demam tinggi mendadak, nyeri belakang mata, nyeri otot, bintik merah, mimisan",
+        "treatment": "SEGERA ke dokter untuk cek trombosit, banyak minum, istirahat total",
+        "medicines": "Paracetamol saja (JANGAN Ibuprofen/Aspirin), oralit, HARUS kontrol dokter",
+        "image_url": "/static/images/dbd.png"
+    },
+    {
+        "name": "Malaria",
+        "category": "Infeksi Parasit",
+        "description": "Malaria adalah infeksi parasit melalui gigitan nyamuk Anopheles.",
+        "symptoms": "Demam tinggi berulang, menggigil, keringat, sakit kepala, lemas",
+        "treatment": "SEGERA ke dokter untuk pemeriksaan darah dan pengobatan malaria",
+        "medicines": "Obat antimalaria (HARUS resep dokter setelah konfirmasi lab)",
+        "image_url": "/static/images/malaria.png"
+    },
+    {
+        "name": "Chikungunya",
+        "category": "Infeksi Virus",
+        "description": "Chikungunya adalah infeksi virus melalui gigitan nyamuk yang menyebabkan nyeri sendi hebat.",
+        "symptoms": "Demam tinggi, nyeri sendi hebat, ruam kulit, sakit kepala, lemas",
+        "treatment": "Istirahat total, banyak minum, obat pereda nyeri, kompres hangat pada sendi",
+        "medicines": "Paracetamol, Ibuprofen untuk nyeri sendi, tidak ada antivirus khusus",
+        "image_url": "/static/images/chikungunya.png"
+    },
+    {
+        "name": "Gondok (Mumps)",
+        "category": "Infeksi Virus",
+        "description": "Gondok adalah infeksi virus yang menyebabkan pembengkakan kelenjar liur.",
+        "symptoms": "Bengkak di bawah telinga/rahang, nyeri saat mengunyah, demam, lemas",
+        "treatment": "Istirahat, kompres dingin, makan makanan lembut, hindari asam",
+        "medicines": "Paracetamol untuk nyeri dan demam, banyak minum",
+        "image_url": "/static/images/gondok.png"
+    },
+    {
+        "name": "Campak",
+        "category": "Infeksi Virus",
+        "description": "Campak adalah infeksi virus yang sangat menular dengan ruam khas di seluruh tubuh.",
+        "symptoms": "Demam tinggi, ruam merah menyebar, batuk, pilek, mata merah, bercak Koplik",
+        "treatment": "Istirahat total, banyak minum, vitamin A, isolasi untuk cegah penularan",
+        "medicines": "Paracetamol, Vitamin A dosis tinggi, tidak ada antivirus khusus",
+        "image_url": "/static/images/campak.png"
+    },
+    {
+        "name": "Keracunan Makanan",
+        "category": "Pencernaan",
+        "description": "Keracunan makanan adalah penyakit akibat mengonsumsi makanan terkontaminasi.",
+        "symptoms": "Mual, muntah, diare, kram perut, demam, lemas",
+        "treatment": "Banyak minum oralit, istirahat, makan bertahap, ke dokter jika parah",
+        "medicines": "Oralit, Norit (karbon aktif), Attapulgite, ke IGD jika dehidrasi berat",
+        "image_url": "/static/images/keracunan.png"
+    },
+    {
+        "name": "Kolik (Bayi Menangis)",
+        "category": "Pediatrik",
+        "description": "Kolik adalah kondisi bayi menangis berlebihan tanpa penyebab jelas.",
+        "symptoms": "Bayi menangis lebih dari 3 jam sehari, wajah merah, kaki ditekuk ke perut",
+        "treatment": "Gendong dan ayun pelan, pijat perut, suara white noise, posisi tegak setelah menyusu",
+        "medicines": "Simethicone drops (Mylicon), konsultasi dokter anak jika berlanjut",
+        "image_url": "/static/images/kolik.png"
+    },
+    {
+        "name": "Ruam Popok",
+        "category": "Pediatrik",
+        "description": "Ruam popok adalah iritasi kulit bayi di area popok akibat kelembaban.",
+        "symptoms": "Kulit merah di area popok, bintik merah, bayi rewel saat diganti popok",
+        "treatment": "Ganti popok sering, biarkan kulit terpapar udara, gunakan krim barrier",
+        "medicines": "Bepanthen, Zwitsal Baby Cream, Desitin, tepung maizena",
+        "image_url": "/static/images/ruam_popok.png"
+    },
+    # === PENYAKIT INFEKSI VIRUS BARU ===
+    {
+        "name": "COVID-19",
+        "category": "Infeksi Virus",
+        "description": "COVID-19 adalah penyakit pernapasan yang disebabkan oleh virus SARS-CoV-2.",
+        "symptoms": "Demam, batuk kering, kelelahan, kehilangan penciuman/pengecapan, sesak napas, nyeri otot",
+        "treatment": "Isolasi mandiri, istirahat, minum banyak cairan, pantau saturasi oksigen, segera ke RS jika sesak berat",
+        "medicines": "Paracetamol, Vitamin C, D, Zinc, Antivirus (jika diresepkan dokter)",
+        "image_url": "/static/images/covid19.png"
+    },
+    {
+        "name": "Rubella (Campak Jerman)",
+        "category": "Infeksi Virus",
+        "description": "Rubella adalah infeksi virus yang menyebabkan ruam merah dan berbahaya bagi ibu hamil.",
+        "symptoms": "Ruam merah mulai dari wajah, demam ringan, pembengkakan kelenjar getah bening, nyeri sendi",
+        "treatment": "Istirahat, obat pereda demam, SANGAT BERBAHAYA untuk ibu hamil - segera ke dokter",
+        "medicines": "Paracetamol untuk demam, pencegahan dengan vaksin MMR",
+        "image_url": "/static/images/rubella.png"
+    },
+    {
+        "name": "Herpes Zoster (Cacar Ular)",
+        "category": "Infeksi Virus",
+        "description": "Herpes zoster adalah reaktivasi virus varicella yang menyebabkan ruam nyeri di satu sisi tubuh.",
+        "symptoms": "Nyeri terbakar pada kulit, ruam melepuh mengikuti saraf, gatal, demam, sensitif sentuhan",
+        "treatment": "Segera ke dokter dalam 72 jam untuk antivirus, kompres dingin, jaga kebersihan lesi",
+        "medicines": "Acyclovir/Valacyclovir (HARUS resep dokter), Gabapentin untuk nyeri saraf",
+        "image_url": "/static/images/herpes_zoster.png"
+    },
+    {
+        "name": "Mononukleosis (Kissing Disease)",
+        "category": "Infeksi Virus",
+        "description": "Mononukleosis adalah infeksi virus Epstein-Barr yang menyebabkan kelelahan ekstrem.",
+        "symptoms": "Kelelahan ekstrem, demam, sakit tenggorokan parah, pembengkakan kelenjar, pembesaran limpa",
+        "treatment": "Istirahat total (bisa berminggu-minggu), hindari olahraga berat, minum banyak cairan",
+        "medicines": "Paracetamol/Ibuprofen untuk demam dan nyeri, tidak ada antivirus khusus",
+        "image_url": "/static/images/mono.png"
+    },
+    # === PENYAKIT KARDIOVASKULAR BARU ===
+    {
+        "name": "Aritmia (Gangguan Irama Jantung)",
+        "category": "Kardiovaskular",
+        "description": "Aritmia adalah kondisi dimana jantung berdetak tidak teratur, terlalu cepat, atau terlalu lambat.",
+        "symptoms": "Jantung berdebar kencang, detak jantung tidak teratur, pusing, sesak napas, nyeri dada",
+        "treatment": "Segera ke dokter jantung, hindari kafein dan alkohol, kelola stres",
+        "medicines": "Beta blocker, Antiaritmia (HARUS resep dokter spesialis jantung)",
+        "image_url": "/static/images/aritmia.png"
+    },
+    {
+        "name": "Gagal Jantung",
+        "category": "Kardiovaskular",
+        "description": "Gagal jantung adalah kondisi dimana jantung tidak dapat memompa darah dengan efektif.",
+        "symptoms": "Sesak napas saat aktivitas/berbaring, kaki bengkak, kelelahan, batuk malam hari",
+        "treatment": "HARUS kontrol rutin ke dokter jantung, batasi garam dan cairan, minum obat teratur",
+        "medicines": "ACE inhibitor, Diuretik, Beta blocker (HARUS resep dan kontrol dokter spesialis)",
+        "image_url": "/static/images/gagal_jantung.png"
+    },
+    {
+        "name": "Penyakit Jantung Koroner",
+        "category": "Kardiovaskular",
+        "description": "Penyakit jantung koroner adalah penyempitan pembuluh darah jantung akibat plak.",
+        "symptoms": "Nyeri dada saat aktivitas (angina), sesak napas, kelelahan, nyeri menjalar ke lengan/rahang",
+        "treatment": "Segera ke dokter jantung, diet rendah lemak, olahraga teratur, berhenti merokok",
+        "medicines": "Aspirin, Statin, Nitrat (HARUS resep dan pemantauan dokter)",
+        "image_url": "/static/images/jantung_koroner.png"
+    },
+    {
+        "name": "Serangan Jantung (DARURAT)",
+        "category": "Darurat",
+        "description": "Serangan jantung adalah kondisi darurat dimana aliran darah ke jantung terhenti mendadak.",
+        "symptoms": "Nyeri dada hebat seperti ditekan, menjalar ke lengan kiri/rahang, keringat dingin, mual, sesak",
+        "treatment": "SEGERA HUBUNGI 119! Kunyah Aspirin jika tersedia, jangan beraktivitas, tunggu ambulans",
+        "medicines": "DARURAT - Butuh penanganan IGD segera! Hubungi 119 atau bawa ke IGD terdekat!",
+        "image_url": "/static/images/serangan_jantung.png"
+    },
+    # === PENYAKIT NEUROLOGIS BARU ===
+    {
+        "name": "Parkinson",
+        "category": "Neurologis",
+        "description": "Parkinson adalah gangguan saraf progresif yang mempengaruhi gerakan tubuh.",
+        "symptoms": "Tremor/gemetar tangan, kekakuan otot, gerakan lambat, gangguan keseimbangan, wajah datar",
+        "treatment": "Kontrol rutin ke dokter saraf, fisioterapi, olahraga teratur, dukungan keluarga",
+        "medicines": "Levodopa, Dopamine agonist (HARUS resep dokter saraf)",
+        "image_url": "/static/images/parkinson.png"
+    },
+    {
+        "name": "Alzheimer",
+        "category": "Neurologis",
+        "description": "Alzheimer adalah penyakit otak progresif yang menyebabkan penurunan daya ingat dan fungsi kognitif.",
+        "symptoms": "Lupa kejadian baru, kesulitan menyelesaikan tugas familiar, bingung waktu/tempat, perubahan mood",
+        "treatment": "Konsultasi dokter saraf, stimulasi mental, dukungan keluarga, lingkungan aman",
+        "medicines": "Donepezil, Memantine (HARUS resep dokter saraf, tidak menyembuhkan tapi memperlambat)",
+        "image_url": "/static/images/alzheimer.png"
+    },
+    {
+        "name": "Meningitis",
+        "category": "Neurologis",
+        "description": "Meningitis adalah peradangan selaput otak dan sumsum tulang belakang yang mengancam jiwa.",
+        "symptoms": "Demam tinggi, sakit kepala hebat, leher kaku, mual muntah, sensitif cahaya, kebingungan",
+        "treatment": "DARURAT! Segera ke IGD, butuh antibiotik/antivirus IV, rawat inap intensif",
+        "medicines": "DARURAT - Antibiotik IV di rumah sakit (Ceftriaxone, Vancomycin)",
+        "image_url": "/static/images/meningitis.png"
+    },
+    {
+        "name": "Neuropati (Kerusakan Saraf)",
+        "category": "Neurologis",
+        "description": "Neuropati adalah kerusakan saraf tepi yang menyebabkan nyeri, kesemutan, atau mati rasa.",
+        "symptoms": "Kesemutan, mati rasa, nyeri seperti terbakar, lemah otot, sensitivitas berlebihan",
+        "treatment": "Konsultasi dokter saraf, kontrol penyebab (diabetes), terapi fisik",
+        "medicines": "Gabapentin, Pregabalin, Vitamin B kompleks (resep dokter)",
+        "image_url": "/static/images/neuropati.png"
+    },
+    # === PENYAKIT MATA BARU ===
+    {
+        "name": "Katarak",
+        "category": "Mata",
+        "description": "Katarak adalah kekeruhan lensa mata yang menyebabkan penglihatan kabur.",
+        "symptoms": "Penglihatan kabur seperti berkabut, sensitif silau, warna memudar, sulit melihat malam",
+        "treatment": "Konsultasi dokter mata, operasi katarak jika sudah mengganggu aktivitas",
+        "medicines": "Tidak ada obat - pengobatan dengan operasi penggantian lensa",
+        "image_url": "/static/images/katarak.png"
+    },
+    {
+        "name": "Glaukoma",
+        "category": "Mata",
+        "description": "Glaukoma adalah kerusakan saraf mata akibat tekanan tinggi yang dapat menyebabkan kebutaan.",
+        "symptoms": "Penglihatan tepi menyempit, nyeri mata, mual, melihat lingkaran cahaya, mata merah",
+        "treatment": "Segera ke dokter mata! Kontrol rutin, tetes mata penurun tekanan, mungkin perlu operasi",
+        "medicines": "Tetes mata Timolol, Latanoprost (HARUS resep dokter mata)",
+        "image_url": "/static/images/glaukoma.png"
+    },
+    {
+        "name": "Rabun Jauh (Miopia)",
+        "category": "Mata",
+        "description": "Rabun jauh adalah kondisi dimana objek jauh terlihat buram tetapi objek dekat terlihat jelas.",
+        "symptoms": "Sulit melihat jauh, sering memicingkan mata, sakit kepala, mata lelah",
+        "treatment": "Periksa ke dokter mata, gunakan kacamata/lensa kontak, batasi screen time",
+        "medicines": "Kacamata koreksi, Lensa kontak, LASIK (untuk kasus tertentu)",
+        "image_url": "/static/images/miopia.png"
+    },
+    {
+        "name": "Rabun Dekat (Hipermetropia)",
+        "category": "Mata",
+        "description": "Rabun dekat adalah kondisi dimana objek dekat terlihat buram tetapi objek jauh terlihat jelas.",
+        "symptoms": "Sulit melihat dekat/membaca, mata cepat lelah saat membaca, sakit kepala",
+        "treatment": "Periksa ke dokter mata, gunakan kacamata baca",
+        "medicines": "Kacamata koreksi plus, Lensa kontak",
+        "image_url": "/static/images/hipermetropia.png"
+    },
+    {
+        "name": "Mata Kering",
+        "category": "Mata",
+        "description": "Mata kering adalah kondisi dimana mata tidak memproduksi cukup air mata.",
+        "symptoms": "Mata terasa kering, perih, gatal, merah, sensitif cahaya, penglihatan kabur sesaat",
+        "treatment": "Gunakan tetes mata pelembab, istirahatkan mata dari layar, gunakan pelembab udara",
+        "medicines": "Insto Dry Eyes, Cendo Lyteers, Refresh Tears, Systane",
+        "image_url": "/static/images/mata_kering.png"
+    },
+    # === PENYAKIT GIZI & METABOLIK BARU ===
+    {
+        "name": "Obesitas",
+        "category": "Metabolik",
+        "description": "Obesitas adalah kondisi kelebihan berat badan dengan BMI di atas 30.",
+        "symptoms": "Berat badan berlebih, sulit beraktivitas, sesak napas, nyeri sendi, gangguan tidur",
+        "treatment": "Diet seimbang, olahraga teratur, konsultasi ahli gizi, evaluasi penyebab",
+        "medicines": "Konsultasi dokter - program diet, Orlistat (resep dokter), evaluasi hormonal",
+        "image_url": "/static/images/obesitas.png"
+    },
+    {
+        "name": "Malnutrisi (Kurang Gizi)",
+        "category": "Gizi",
+        "description": "Malnutrisi adalah kondisi kekurangan nutrisi penting yang dibutuhkan tubuh.",
+        "symptoms": "Berat badan rendah, lemas, mudah sakit, pertumbuhan terhambat (anak), rambut rontok",
+        "treatment": "Konsultasi ahli gizi, makan makanan bergizi seimbang, suplemen jika perlu",
+        "medicines": "Multivitamin, Suplemen zat besi, Vitamin A, program PMT (Pemberian Makanan Tambahan)",
+        "image_url": "/static/images/malnutrisi.png"
+    },
+    {
+        "name": "Hipotiroid",
+        "category": "Metabolik",
+        "description": "Hipotiroid adalah kondisi kelenjar tiroid tidak memproduksi cukup hormon tiroid.",
+        "symptoms": "Kelelahan, berat badan naik, sensitif dingin, kulit kering, sembelit, depresi",
+        "treatment": "Konsultasi dokter endokrin, terapi hormon tiroid seumur hidup",
+        "medicines": "Levothyroxine/Euthyrox (HARUS resep dokter, dosis disesuaikan)",
+        "image_url": "/static/images/hipotiroid.png"
+    },
+    {
+        "name": "Hipertiroid",
+        "category": "Metabolik",
+        "description": "Hipertiroid adalah kondisi kelenjar tiroid memproduksi hormon berlebihan.",
+        "symptoms": "Penurunan berat badan, jantung berdebar, gelisah, tremor tangan, sensitif panas, diare",
+        "treatment": "Konsultasi dokter endokrin, obat antitiroid, terapi radioiodine atau operasi",
+        "medicines": "PTU, Methimazole (HARUS resep dokter spesialis)",
+        "image_url": "/static/images/hipertiroid.png"
+    },
+    # === PENYAKIT PEDIATRIK BARU ===
+    {
+        "name": "Hand Foot Mouth Disease (HFMD)",
+        "category": "Pediatrik",
+        "description": "HFMD adalah infeksi virus pada anak yang menyebabkan luka di mulut, tangan, dan kaki.",
+        "symptoms": "Demam, luka di mulut, ruam merah di telapak tangan/kaki, tidak mau makan, rewel",
+        "treatment": "Istirahat, banyak minum, makanan lembut, obat pereda nyeri, isolasi untuk cegah penularan",
+        "medicines": "Paracetamol untuk demam, gel mulut untuk sariawan, banyak cairan",
+        "image_url": "/static/images/hfmd.png"
+    },
+    {
+        "name": "Batuk Rejan (Pertusis)",
+        "category": "Pediatrik",
+        "description": "Batuk rejan adalah infeksi bakteri yang menyebabkan batuk parah berkepanjangan.",
+        "symptoms": "Batuk keras beruntun dengan whoop, muntah setelah batuk, wajah merah/biru saat batuk",
+        "treatment": "Segera ke dokter untuk antibiotik, isolasi, rawat inap jika bayi",
+        "medicines": "Azithromycin, Erythromycin (HARUS resep dokter, makin cepat makin baik)",
+        "image_url": "/static/images/batuk_rejan.png"
+    },
+    {
+        "name": "Demam Scarlet",
+        "category": "Pediatrik",
+        "description": "Demam scarlet adalah infeksi bakteri streptokokus yang menyebabkan ruam merah.",
+        "symptoms": "Demam tinggi, ruam merah seperti amplas, lidah stroberi, sakit tenggorokan",
+        "treatment": "Segera ke dokter untuk antibiotik, istirahat, banyak minum",
+        "medicines": "Penisilin atau Amoxicillin (HARUS resep dokter)",
+        "image_url": "/static/images/scarlet_fever.png"
+    },
+    # === PENYAKIT KESEHATAN WANITA ===
+    {
+        "name": "PCOS (Polycystic Ovary Syndrome)",
+        "category": "Kesehatan Wanita",
+        "description": "PCOS adalah gangguan hormonal pada wanita yang mempengaruhi ovarium.",
+        "symptoms": "Haid tidak teratur, jerawat berlebihan, berat badan naik, sulit hamil, rambut tumbuh berlebihan",
+        "treatment": "Konsultasi dokter kandungan, diet sehat, olahraga teratur, kelola stres",
+        "medicines": "Pil KB untuk mengatur haid, Metformin (HARUS resep dokter SpOG)",
+        "image_url": "/static/images/pcos.png"
+    },
+    {
+        "name": "Endometriosis",
+        "category": "Kesehatan Wanita",
+        "description": "Endometriosis adalah kondisi dimana jaringan rahim tumbuh di luar rahim.",
+        "symptoms": "Nyeri haid hebat, nyeri saat berhubungan, nyeri panggul kronis, sulit hamil",
+        "treatment": "Konsultasi dokter kandungan, terapi hormonal, operasi jika perlu",
+        "medicines": "Obat anti nyeri, Pil KB, GnRH agonist (HARUS resep SpOG)",
+        "image_url": "/static/images/endometriosis.png"
+    },
+    {
+        "name": "Mastitis",
+        "category": "Kesehatan Wanita",
+        "description": "Mastitis adalah infeksi payudara yang sering terjadi pada ibu menyusui.",
+        "symptoms": "Payudara bengkak, merah, nyeri, demam, menggigil, seperti flu",
+        "treatment": "Tetap menyusui/pompa ASI, kompres hangat, istirahat, ke dokter untuk antibiotik",
+        "medicines": "Paracetamol, Ibuprofen, Antibiotik (resep dokter jika infeksi berat)",
+        "image_url": "/static/images/mastitis.png"
+    },
+    {
+        "name": "Pre-eklampsia (Kehamilan)",
+        "category": "Darurat",
+        "description": "Pre-eklampsia adalah tekanan darah tinggi pada kehamilan yang mengancam ibu dan janin.",
+        "symptoms": "Tekanan darah tinggi, protein di urin, bengkak wajah/tangan, sakit kepala hebat, pandangan kabur",
+        "treatment": "SEGERA ke dokter kandungan/IGD! Butuh pemantauan ketat, mungkin perlu melahirkan dini",
+        "medicines": "DARURAT KEHAMILAN - Butuh penanganan dokter SpOG segera!",
+        "image_url": "/static/images/preeklampsia.png"
+    },
+    # === PENYAKIT UROLOGI BARU ===
+    {
+        "name": "Pembesaran Prostat (BPH)",
+        "category": "Urologi",
+        "description": "BPH adalah pembesaran kelenjar prostat yang umum pada pria lanjut usia.",
+        "symptoms": "Sulit mulai buang air kecil, aliran lemah, sering BAK malam, rasa tidak tuntas",
+        "treatment": "Konsultasi dokter urologi, kurangi kafein dan alkohol, jangan menahan BAK",
+        "medicines": "Tamsulosin, Finasteride (HARUS resep dokter urologi)",
+        "image_url": "/static/images/bph.png"
+    },
+    {
+        "name": "Inkontinensia Urin",
+        "category": "Urologi",
+        "description": "Inkontinensia adalah ketidakmampuan menahan buang air kecil.",
+        "symptoms": "Tidak bisa menahan BAK, BAK saat batuk/bersin, sering BAK, BAK mendesak",
+        "treatment": "Latihan otot panggul (Kegel), konsultasi dokter urologi, terapi perilaku",
+        "medicines": "Konsultasi dokter - perlu evaluasi penyebab, mungkin perlu obat atau fisioterapi",
+        "image_url": "/static/images/inkontinensia.png"
+    },
+    # === PENYAKIT LAINNYA ===
+    {
+        "name": "Batu Empedu",
+        "category": "Pencernaan",
+        "description": "Batu empedu adalah endapan keras di kantung empedu yang menyebabkan nyeri perut.",
+        "symptoms": "Nyeri perut kanan atas mendadak, mual muntah, nyeri setelah makan berlemak, demam",
+        "treatment": "Konsultasi dokter bedah, diet rendah lemak, mungkin perlu operasi",
+        "medicines": "Obat pereda nyeri, operasi pengangkatan kantung empedu (laparoskopi)",
+        "image_url": "/static/images/batu_empedu.png"
+    },
+    {
+        "name": "Hernia",
+        "category": "Bedah",
+        "description": "Hernia adalah kondisi organ tubuh menonjol melalui dinding otot yang melemah.",
+        "symptoms": "Benjolan di perut/selangkangan, nyeri saat angkat beban, rasa berat, benjolan membesar",
+        "treatment": "Konsultasi dokter bedah, hindari angkat berat, operasi untuk perbaikan",
+        "medicines": "Pengobatan utama adalah operasi - konsultasi dokter bedah",
+        "image_url": "/static/images/hernia.png"
+    },
+    {
+        "name": "Varises",
+        "category": "Kardiovaskular",
+        "description": "Varises adalah pembengkakan dan pelebaran pembuluh darah vena, biasanya di kaki.",
+        "symptoms": "Vena menonjol kebiru-biruan, kaki berat/pegal, gatal, kram malam hari",
+        "treatment": "Elevasi kaki, kompresi stocking, jangan berdiri lama, olahraga ringan",
+        "medicines": "Diosmin/Hesperidin (Ardium), Stoking kompresi, skleroterapi jika parah",
+        "image_url": "/static/images/varises.png"
+    },
+    {
+        "name": "Fibromialgia",
+        "category": "Tulang & Otot",
+        "description": "Fibromialgia adalah kondisi nyeri kronis di seluruh tubuh dengan kelelahan.",
+        "symptoms": "Nyeri seluruh tubuh, kelelahan ekstrem, gangguan tidur, kabut otak, nyeri titik tender",
+        "treatment": "Konsultasi dokter, olahraga teratur, manajemen stres, terapi kognitif",
+        "medicines": "Pregabalin, Duloxetine (HARUS resep dokter)",
+        "image_url": "/static/images/fibromialgia.png"
+    },
+    {
+        "name": "Syok Anafilaksis (DARURAT)",
+        "category": "Darurat",
+        "description": "Anafilaksis adalah reaksi alergi berat yang mengancam jiwa.",
+        "symptoms": "Sesak napas mendadak, bengkak wajah/tenggorokan, tekanan darah turun, gatal hebat, pingsan",
+        "treatment": "DARURAT! Hubungi 119, suntik Epinefrin jika tersedia, baringkan dengan kaki diangkat",
+        "medicines": "Epinefrin/Adrenalin injeksi (EpiPen) - SEGERA ke IGD!",
+        "image_url": "/static/images/anafilaksis.png"
+    },
+    {
+        "name": "Ketoasidosis Diabetik (DARURAT)",
+        "category": "Darurat",
+        "description": "Ketoasidosis adalah komplikasi diabetes berat yang mengancam jiwa.",
+        "symptoms": "Mual muntah, nyeri perut, napas bau buah, lemas berat, bingung, dehidrasi berat",
+        "treatment": "SEGERA ke IGD! Butuh cairan IV dan insulin, rawat ICU",
+        "medicines": "DARURAT - Butuh penanganan IGD dengan insulin IV dan cairan!",
+        "image_url": "/static/images/ketoasidosis.png"
+    },
+    {
+        "name": "Apendiksitis (Usus Buntu)",
+        "category": "Darurat",
+        "description": "Apendiksitis adalah peradangan usus buntu yang memerlukan operasi darurat.",
+        "symptoms": "Nyeri perut kanan bawah, mual muntah, demam, nyeri makin berat saat bergerak",
+        "treatment": "SEGERA ke IGD! Butuh operasi pengangkatan usus buntu",
+        "medicines": "DARURAT BEDAH - Butuh operasi segera, jangan minum obat pereda nyeri dulu!",
+        "image_url": "/static/images/apendiksitis.png"
+    },
+    {
+        "name": "Psoriasis",
+        "category": "Kulit",
+        "description": "Psoriasis adalah penyakit autoimun kulit yang menyebabkan plak bersisik.",
+        "symptoms": "Plak merah bersisik putih, gatal, kulit kering pecah, nyeri, kuku berlubang",
+        "treatment": "Konsultasi dokter kulit, pelembab rutin, terapi cahaya, kelola stres",
+        "medicines": "Krim kortikosteroid, Calcipotriol, Methotrexate (HARUS resep dokter kulit)",
+        "image_url": "/static/images/psoriasis.png"
+    },
+    {
+        "name": "Lupus (SLE)",
+        "category": "Autoimun",
+        "description": "Lupus adalah penyakit autoimun yang dapat menyerang berbagai organ tubuh.",
+        "symptoms": "Ruam kupu-kupu di wajah, nyeri sendi, kelelahan, demam, sensitif matahari",
+        "treatment": "Konsultasi dokter reumatologi, hindari sinar matahari, kontrol rutin",
+        "medicines": "Hydroxychloroquine, Kortikosteroid, Imunosupresan (HARUS resep dokter spesialis)",
+        "image_url": "/static/images/lupus.png"
+    },
+    {
+        "name": "Alergi Musiman (Rhinitis Alergi)",
+        "category": "Alergi",
+        "description": "Rhinitis alergi adalah reaksi alergi pada hidung terhadap serbuk sari atau alergen lain.",
+        "symptoms": "Bersin-bersin, hidung gatal dan berair, mata gatal, hidung tersumbat",
+        "treatment": "Hindari alergen, gunakan masker, bersihkan rumah, antihistamin",
+        "medicines": "Cetirizine, Loratadine, Flixonase Nasal Spray, Tetes mata antihistamin",
+        "image_url": "/static/images/rhinitis_alergi.png"
+    },
+    {
+        "name": "Gangguan Panik",
+        "category": "Mental",
+        "description": "Gangguan panik adalah serangan kecemasan intens yang terjadi mendadak.",
+        "symptoms": "Jantung berdebar kencang, sesak napas, gemetar, keringat, takut mati, pusing",
+        "treatment": "Latihan pernapasan, terapi kognitif perilaku, konsultasi psikiater",
+        "medicines": "SSRI, Benzodiazepin (HARUS resep psikiater)",
+        "image_url": "/static/images/panik.png"
+    },
+    {
+        "name": "Gangguan Bipolar",
+        "category": "Mental",
+        "description": "Bipolar adalah gangguan mood dengan episode mania dan depresi bergantian.",
+        "symptoms": "Episode sangat bersemangat (mania), episode sangat sedih (depresi), perubahan tidur dan energi",
+        "treatment": "HARUS konsultasi psikiater, terapi rutin, dukungan keluarga",
+        "medicines": "Mood stabilizer, Antipsikotik (HARUS resep dan kontrol psikiater)",
+        "image_url": "/static/images/bipolar.png"
+    }
+]
 
 # ==========================================
 # 3.1 SEED DATA OBAT (BARU)
 # ==========================================
+MEDICINES_DATA = [
+    # Obat Demam & Flu
+    {"name": "Paracetamol 500mg", "description": "Obat penurun demam dan pereda nyeri", "category": "Analgesik", "price": 5000, "stock": 200},
+    {"name": "Ibuprofen 400mg", "description": "Anti-inflamasi dan pereda nyeri", "category": "Anti-inflamasi", "price": 8000, "stock": 150},
+    {"name": "Sanmol Tablet", "description": "Paracetamol untuk dewasa", "category": "Analgesik", "price": 12000, "stock": 100},
+    {"name": "Tempra Syrup", "description": "Paracetamol sirup untuk anak", "category": "Analgesik", "price": 35000, "stock": 80},
+    {"name": "Decolgen", "description": "Obat flu dan pilek", "category": "Flu", "price": 15000, "stock": 120},
+    {"name": "Bodrex Flu & Batuk", "description": "Meredakan gejala flu dan batuk", "category": "Flu", "price": 18000, "stock": 100},
+    {"name": "Neozep Forte", "description": "Obat flu dan hidung tersumbat", "category": "Flu", "price": 20000, "stock": 90},
+    {"name": "Panadol Cold & Flu", "description": "Meredakan demam dan gejala flu", "category": "Flu", "price": 25000, "stock": 85},
+    
+    # Obat Pencernaan
+    {"name": "Promag Tablet", "description": "Obat maag dan asam lambung", "category": "Pencernaan", "price": 8000, "stock": 200},
+    {"name": "Mylanta Syrup", "description": "Antasida cair untuk maag", "category": "Pencernaan", "price": 35000, "stock": 100},
+    {"name": "Polysilane", "description": "Obat kembung dan maag", "category": "Pencernaan", "price": 28000, "stock": 90},
+    {"name": "Omeprazole 20mg", "description": "Menurunkan produksi asam lambung", "category": "Pencernaan", "price": 15000, "stock": 120},
+    {"name": "Oralit", "description": "Larutan rehidrasi untuk diare", "category": "Pencernaan", "price": 3000, "stock": 300},
+    {"name": "Entrostop", "description": "Obat diare untuk dewasa", "category": "Pencernaan", "price": 12000, "stock": 150},
+    {"name": "Diapet", "description": "Obat diare herbal", "category": "Pencernaan", "price": 10000, "stock": 130},
+    
+    # Obat Sakit Kepala
+    {"name": "Panadol Extra", "description": "Pereda sakit kepala ekstra kuat", "category": "Analgesik", "price": 18000, "stock": 100},
+    {"name": "Saridon", "description": "Obat sakit kepala triple action", "category": "Analgesik", "price": 15000, "stock": 110},
+    {"name": "Bodrexin", "description": "Pereda nyeri dan demam", "category": "Analgesik", "price": 8000, "stock": 150},
+    {"name": "Paramex", "description": "Obat sakit kepala", "category": "Analgesik", "price": 10000, "stock": 140},
+    
+    # Obat Alergi & Kulit
+    {"name": "Cetirizine 10mg", "description": "Antihistamin untuk alergi", "category": "Alergi", "price": 5000, "stock": 180},
+    {"name": "Loratadine 10mg", "description": "Antihistamin non-kantuk", "category": "Alergi", "price": 8000, "stock": 160},
+    {"name": "CTM 4mg", "description": "Chlorpheniramine antihistamin", "category": "Alergi", "price": 3000, "stock": 200},
+    {"name": "Hydrocortisone Cream", "description": "Krim anti gatal dan radang", "category": "Kulit", "price": 25000, "stock": 80},
+    {"name": "Calamine Lotion", "description": "Mengurangi gatal dan iritasi kulit", "category": "Kulit", "price": 20000, "stock": 90},
+    
+    # Obat Batuk
+    {"name": "OBH Combi", "description": "Obat batuk berdahak", "category": "Batuk", "price": 22000, "stock": 100},
+    {"name": "Woods Peppermint", "description": "Obat batuk dan pelega tenggorokan", "category": "Batuk", "price": 18000, "stock": 110},
+    {"name": "Bisolvon", "description": "Pengencer dahak", "category": "Batuk", "price": 35000, "stock": 80},
+    {"name": "Vicks Formula 44", "description": "Obat batuk kering dan berdahak", "category": "Batuk", "price": 30000, "stock": 85},
+    
+    # Obat Tenggorokan & Mulut
+    {"name": "FG Troches", "description": "Tablet hisap radang tenggorokan", "category": "THT", "price": 25000, "stock": 90},
+    {"name": "Strepsils", "description": "Lozenges untuk sakit tenggorokan", "category": "THT", "price": 18000, "stock": 120},
+    {"name": "Betadine Gargle", "description": "Obat kumur antiseptik", "category": "THT", "price": 35000, "stock": 70},
+    {"name": "Aloclair Gel", "description": "Gel obat sariawan", "category": "Mulut", "price": 45000, "stock": 60},
+    
+    # Vitamin & Suplemen
+    {"name": "Vitamin C 1000mg", "description": "Meningkatkan daya tahan tubuh", "category": "Vitamin", "price": 50000, "stock": 150},
+    {"name": "Vitamin B Complex", "description": "Menjaga kesehatan saraf", "category": "Vitamin", "price": 35000, "stock": 120},
+    {"name": "Sangobion", "description": "Suplemen zat besi untuk anemia", "category": "Vitamin", "price": 45000, "stock": 100},
+    {"name": "CDR", "description": "Kalsium untuk tulang", "category": "Vitamin", "price": 55000, "stock": 90},
+    {"name": "Neurobion", "description": "Vitamin B1, B6, B12", "category": "Vitamin", "price": 65000, "stock": 80},
+    
+    # Obat Mata
+    {"name": "Insto Regular", "description": "Tetes mata untuk mata merah", "category": "Mata", "price": 18000, "stock": 100},
+    {"name": "Cendo Xitrol", "description": "Tetes mata antibiotik", "category": "Mata", "price": 35000, "stock": 70},
+    {"name": "Visine", "description": "Tetes mata pelembab", "category": "Mata", "price": 45000, "stock": 60},
+    
+    # Obat Nyeri Otot
+    {"name": "Counterpain", "description": "Krim pereda nyeri otot", "category": "Otot", "price": 35000, "stock": 100},
+    {"name": "Salonpas", "description": "Koyo pereda nyeri", "category": "Otot", "price": 25000, "stock": 120},
+    {"name": "Hot In Cream", "description": "Krim penghangat otot", "category": "Otot", "price": 20000, "stock": 110},
+    
+    # Obat Kulit Jamur
+    {"name": "Miconazole Cream", "description": "Antijamur untuk kulit", "category": "Kulit", "price": 25000, "stock": 80},
+    {"name": "Kalpanax", "description": "Obat panu dan kurap", "category": "Kulit", "price": 15000, "stock": 100},
+    {"name": "Canesten Cream", "description": "Krim antijamur", "category": "Kulit", "price": 55000, "stock": 60},
+]
+
+# ==========================================
+# 3.2 SEEDING KATALOG (VERSIONED)
+# ==========================================
+# Naikkan versi ini setiap kali isi DISEASES_DATA / MEDICINES_DATA diubah
+SEED_VERSION = "1"
+SEED_VERSION_KEY = "seed_version"
+
+def get_seed_version(db: Session) -> Optional[str]:
+    row = db.query(AppMetadata).filter(AppMetadata.key == SEED_VERSION_KEY).first()
+    return row.value if row else None
+
+def seed_diseases(db: Session):
+    """Upsert data penyakit berdasarkan nama"""
+    existing = {d.name: d for d in db.query(Disease).all()}
+    for disease_data in DISEASES_DATA:
+        disease = existing.get(disease_data["name"])
+        if disease is None:
+            db.add(Disease(**disease_data))
+        else:
+            for field, value in disease_data.items():
+                setattr(disease, field, value)
+
 def seed_medicines(db: Session):
-    if db.query(Medicine).count() == 0:
-        medicines_data = [
-            # Obat Demam & Flu
-            {"name": "Paracetamol 500mg", "description": "Obat penurun demam dan pereda nyeri", "category": "Analgesik", "price": 5000, "stock": 200},
-            {"name": "Ibuprofen 400mg", "description": "Anti-inflamasi dan pereda nyeri", "category": "Anti-inflamasi", "price": 8000, "stock": 150},
-            {"name": "Sanmol Tablet", "description": "Paracetamol untuk dewasa", "category": "Analgesik", "price": 12000, "stock": 100},
-            {"name": "Tempra Syrup", "description": "Paracetamol sirup untuk anak", "category": "Analgesik", "price": 35000, "stock": 80},
-            {"name": "Decolgen", "description": "Obat flu dan pilek", "category": "Flu", "price": 15000, "stock": 120},
-            {"name": "Bodrex Flu & Batuk", "description": "Meredakan gejala flu dan batuk", "category": "Flu", "price": 18000, "stock": 100},
-            {"name": "Neozep Forte", "description": "Obat flu dan hidung tersumbat", "category": "Flu", "price": 20000, "stock": 90},
-            {"name": "Panadol Cold & Flu", "description": "Meredakan demam dan gejala flu", "category": "Flu", "price": 25000, "stock": 85},
-            
-            # Obat Pencernaan
-            {"name": "Promag Tablet", "description": "Obat maag dan asam lambung", "category": "Pencernaan", "price": 8000, "stock": 200},
-            {"name": "Mylanta Syrup", "description": "Antasida cair untuk maag", "category": "Pencernaan", "price": 35000, "stock": 100},
-            {"name": "Polysilane", "description": "Obat kembung dan maag", "category": "Pencernaan", "price": 28000, "stock": 90},
-            {"name": "Omeprazole 20mg", "description": "Menurunkan produksi asam lambung", "category": "Pencernaan", "price": 15000, "stock": 120},
-            {"name": "Oralit", "description": "Larutan rehidrasi untuk diare", "category": "Pencernaan", "price": 3000, "stock": 300},
-            {"name": "Entrostop", "description": "Obat diare untuk dewasa", "category": "Pencernaan", "price": 12000, "stock": 150},
-            {"name": "Diapet", "description": "Obat diare herbal", "category": "Pencernaan", "price": 10000, "stock": 130},
-            
-            # Obat Sakit Kepala
-            {"name": "Panadol Extra", "description": "Pereda sakit kepala ekstra kuat", "category": "Analgesik", "price": 18000, "stock": 100},
-            {"name": "Saridon", "description": "Obat sakit kepala triple action", "category": "Analgesik", "price": 15000, "stock": 110},
-            {"name": "Bodrexin", "description": "Pereda nyeri dan demam", "category": "Analgesik", "price": 8000, "stock": 150},
-            {"name": "Paramex", "description": "Obat sakit kepala", "category": "Analgesik", "price": 10000, "stock": 140},
-            
-            # Obat Alergi & Kulit
-            {"name": "Cetirizine 10mg", "description": "Antihistamin untuk alergi", "category": "Alergi", "price": 5000, "stock": 180},
-            {"name": "Loratadine 10mg", "description": "Antihistamin non-kantuk", "category": "Alergi", "price": 8000, "stock": 160},
-            {"name": "CTM 4mg", "description": "Chlorpheniramine antihistamin", "category": "Alergi", "price": 3000, "stock": 200},
-            {"name": "Hydrocortisone Cream", "description": "Krim anti gatal dan radang", "category": "Kulit", "price": 25000, "stock": 80},
-            {"name": "Calamine Lotion", "description": "Mengurangi gatal dan iritasi kulit", "category": "Kulit", "price": 20000, "stock": 90},
-            
-            # Obat Batuk
-            {"name": "OBH Combi", "description": "Obat batuk berdahak", "category": "Batuk", "price": 22000, "stock": 100},
-            {"name": "Woods Peppermint", "description": "Obat batuk dan pelega tenggorokan", "category": "Batuk", "price": 18000, "stock": 110},
-            {"name": "Bisolvon", "description": "Pengencer dahak", "category": "Batuk", "price": 35000, "stock": 80},
-            {"name": "Vicks Formula 44", "description": "Obat batuk kering dan berdahak", "category": "Batuk", "price": 30000, "stock": 85},
-            
-            # Obat Tenggorokan & Mulut
-            {"name": "FG Troches", "description": "Tablet hisap radang tenggorokan", "category": "THT", "price": 25000, "stock": 90},
-            {"name": "Strepsils", "description": "Lozenges untuk sakit tenggorokan", "category": "THT", "price": 18000, "stock": 120},
-            {"name": "Betadine Gargle", "description": "Obat kumur antiseptik", "category": "THT", "price": 35000, "stock": 70},
-            {"name": "Aloclair Gel", "description": "Gel obat sariawan", "category": "Mulut", "price": 45000, "stock": 60},
-            
-            # Vitamin & Suplemen
-            {"name": "Vitamin C 1000mg", "description": "Meningkatkan daya tahan tubuh", "category": "Vitamin", "price": 50000, "stock": 150},
-            {"name": "Vitamin B Complex", "description": "Menjaga kesehatan saraf", "category": "Vitamin", "price": 35000, "stock": 120},
-            {"name": "Sangobion", "description": "Suplemen zat besi untuk anemia", "category": "Vitamin", "price": 45000, "stock": 100},
-            {"name": "CDR", "description": "Kalsium untuk tulang", "category": "Vitamin", "price": 55000, "stock": 90},
-            {"name": "Neurobion", "description": "Vitamin B1, B6, B12", "category": "Vitamin", "price": 65000, "stock": 80},
-            
-            # Obat Mata
-            {"name": "Insto Regular", "description": "Tetes mata untuk mata merah", "category": "Mata", "price": 18000, "stock": 100},
-            {"name": "Cendo Xitrol", "description": "Tetes mata antibiotik", "category": "Mata", "price": 35000, "stock": 70},
-            {"name": "Visine", "description": "Tetes mata pelembab", "category": "Mata", "price": 45000, "stock": 60},
-            
-            # Obat Nyeri Otot
-            {"name": "Counterpain", "description": "Krim pereda nyeri otot", "category": "Otot", "price": 35000, "stock": 100},
-            {"name": "Salonpas", "description": "Koyo pereda nyeri", "category": "Otot", "price": 25000, "stock": 120},
-            {"name": "Hot In Cream", "description": "Krim penghangat otot", "category": "Otot", "price": 20000, "stock": 110},
-            
-            # Obat Kulit Jamur
-            {"name": "Miconazole Cream", "description": "Antijamur untuk kulit", "category": "Kulit", "price": 25000, "stock": 80},
-            {"name": "Kalpanax", "description": "Obat panu dan kurap", "category": "Kulit", "price": 15000, "stock": 100},
-            {"name": "Canesten Cream", "description": "Krim antijamur", "category": "Kulit", "price": 55000, "stock": 60},
-        ]
-        
-        for med_data in medicines_data:
-            medicine = Medicine(**med_data)
-            db.add(medicine)
+    """Upsert data obat berdasarkan nama (stok hanya diisi saat insert)"""
+    existing = {m.name: m for m in db.query(Medicine).all()}
+    for med_data in MEDICINES_DATA:
+        medicine = existing.get(med_data["name"])
+        if medicine is None:
+            db.add(Medicine(**med_data))
+        else:
+            for field, value in med_data.items():
+                if field != "stock":
+                    setattr(medicine, field, value)
+
+def seed_catalog(db: Session, force: bool = False) -> bool:
+    """Seed katalog sekali per SEED_VERSION. Return True jika seed dijalankan."""
+    current_version = get_seed_version(db)
+    if current_version == SEED_VERSION and not force:
+        return False
+
+    try:
+        seed_diseases(db)
+        seed_medicines(db)
+        db.merge(AppMetadata(key=SEED_VERSION_KEY, value=SEED_VERSION))
         db.commit()
+    except IntegrityError:
+        # Worker lain sudah menjalankan seed yang sama secara bersamaan
+        db.rollback()
+        return False
+
+    print(f"✅ Katalog di-seed: versi {current_version or '-'} -> {SEED_VERSION}")
+    return True
+
+# ==========================================
+# 3.3 INDEX FULL-TEXT SEARCH
+# ==========================================
+# Naikkan versi ini jika field yang di-index atau cara tokenisasinya berubah
+SEARCH_INDEX_VERSION = "1"
+SEARCH_INDEX_KEY = "search_index_version"
+
+def rebuild_search_index(db: Session):
+    for kind in search_index.sources:
+        total = search_index.rebuild(db, kind)
+        print(f"✅ Index search {kind}: {total} dokumen")
+    db.merge(AppMetadata(key=SEARCH_INDEX_KEY, value=SEARCH_INDEX_VERSION))
+    db.commit()
+
+def ensure_search_index(db: Session):
+    """Bangun index search jika belum ada / versinya berubah (database lama)"""
+    if not search_index.enabled:
+        return
+    row = db.query(AppMetadata).filter(AppMetadata.key == SEARCH_INDEX_KEY).first()
+    if row and row.value == SEARCH_INDEX_VERSION:
+        return
+    try:
+        rebuild_search_index(db)
+    except IntegrityError:
+        # Worker lain sudah membangun index secara bersamaan
+        db.rollback()
+
+def substring_records(db: Session, kind: str, q: str, limit: int, offset: int) -> list:
+    """Pencarian substring (ILIKE) di semua field yang di-index, tanpa urutan relevansi"""
+    source = search_index.sources[kind]
+    model = source.model
+    # Riwayat pasien terbaru dulu, katalog urut id
+    order = model.id.desc() if kind == "patients" else model.id
+    return db.query(model).filter(
+        or_(*[getattr(model, field).icontains(q, autoescape=True) for field in source.fields])
+    ).order_by(order).offset(offset).limit(limit).all()
+
+def search_records(db: Session, kind: str, q: str, limit: int, offset: int) -> list:
+    """Cari lewat index full-text, return objek ORM sesuai urutan relevansi.
+
+    Jika full-text tidak menemukan apa pun (potongan di tengah kata seperti
+    "amol", atau query yang hanya berisi stopword), hasilnya memakai
+    pencarian substring ILIKE seperti sebelum ada index.
+    """
+    if not search_index.enabled:
+        return substring_records(db, kind, q, limit, offset)
+    model = search_index.sources[kind].model
+    ids = search_index.search(db, kind, q, limit=limit, offset=offset)
+    if not ids:
+        # Halaman lanjutan yang kosong karena hasil full-text sudah habis tetap kosong
+        if offset == 0 or not search_index.search(db, kind, q, limit=1):
+            return substring_records(db, kind, q, limit, offset)
+        return []
+    records = {record.id: record for record in db.query(model).filter(model.id.in_(ids)).all()}
+    return [records[record_id] for record_id in ids if record_id in records]
+
+# ==========================================
+# 3.4 VERSI KATALOG (UNTUK CACHE & ETAG)
+# ==========================================
+CATALOG_VERSION_KEYS = {Medicine: "catalog_version:medicines", Disease: "catalog_version:diseases"}
+CATALOG_MAX_AGE = int(os.getenv("CATALOG_MAX_AGE", "0"))
+
+@event.listens_for(AppSession, "before_flush")
+def bump_catalog_versions(session, flush_context, instances):
+    """Ganti versi katalog di transaksi yang sama dengan perubahan obat/penyakit"""
+    changed = set()
+    for obj in list(session.new) + list(session.deleted):
+        if type(obj) in CATALOG_VERSION_KEYS:
+            changed.add(type(obj))
+    for obj in session.dirty:
+        if type(obj) in CATALOG_VERSION_KEYS and session.is_modified(obj):
+            changed.add(type(obj))
+    for model in changed:
+        bump_catalog_version(session, model)
+
+def bump_catalog_version(session, model):
+    # Stok yang berubah karena keranjang/checkout sengaja tidak mengganti versi:
+    # snapshot tetap valid, stok terkini diambil dari /api/medicines/stock
+    session.merge(AppMetadata(key=CATALOG_VERSION_KEYS[model], value=uuid.uuid4().hex))
+
+def catalog_response(db: Session, request: Request, model, schema) -> Response:
+    """Response JSON katalog dari snapshot cache, 304 jika ETag klien masih sama"""
+    key = CATALOG_VERSION_KEYS[model]
+    # Versi dibaca sebelum data: snapshot paling buruk lebih baru dari versinya, tidak pernah lebih lama
+    row = db.get(AppMetadata, key)
+    version = row.value if row else "0"
+
+    name = model.__tablename__
+    snapshot = catalog_cache.get(name, version)
+    if snapshot is None:
+        adapter = TypeAdapter(List[schema])
+        records = db.query(model).order_by(model.id).all()
+        body = adapter.dump_json(adapter.validate_python(records, from_attributes=True))
+        snapshot = catalog_cache.set(name, version, body)
+
+    etag, body = snapshot
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={CATALOG_MAX_AGE}, must-revalidate"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*":
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 # ==========================================
 # 4. SETUP APLIKASI
@@ -1125,13 +1488,50 @@ app.mount("/static", StaticFiles(directory="static"), name="static")
 def get_db():
     db = SessionLocal()
     try:
-        # Seed data on first connection
-        seed_diseases(db)
-        seed_medicines(db)
         yield db
     finally:
         db.close()
 
+def get_write_db():
+    """Session untuk endpoint yang mengubah data: koneksi penulis sejak query pertama"""
+    db = WriteSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def get_async_write_db():
+    async with AsyncWriteSessionLocal() as db:
+        yield db
+
+# Session endpoint utama: AsyncSession jika DB_ASYNC, selain itu Session biasa (dipakai lewat run_db)
+get_request_db = get_async_db if DB_ASYNC else get_db
+get_request_write_db = get_async_write_db if DB_ASYNC else get_write_db
+
+async def run_db(db, fn, *args):
+    """Jalankan fungsi DB sync `fn(session, *args)` tanpa memblokir event loop.
+
+    Session biasa dijalankan di threadpool; AsyncSession lewat run_sync sehingga
+    query yang sama memakai driver async dan tidak memakan thread.
+    """
+    if isinstance(db, Session):
+        return await run_in_threadpool(fn, db, *args)
+    async with async_db_limiter:
+        return await db.run_sync(fn, *args)
+
+@app.exception_handler(PoolTimeoutError)
+async def db_pool_timeout_handler(request, exc: PoolTimeoutError):
+    # Semua koneksi pool terpakai lebih lama dari DB_POOL_TIMEOUT: tolak cepat, jangan 500
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Database sedang sibuk, silakan coba lagi sebentar"},
+        headers={"Retry-After": "1"},
+    )
+
 class SymptomCheck(BaseModel):
     patient_name: str
     symptoms: str
@@ -1155,7 +1555,7 @@ class PatientRecordResponse(BaseModel):
     disease_name: Optional[str] = None
     disease_category: Optional[str] = None
     medicines: Optional[str] = None
-    created_at: Optional[str] = None
+    created_at: Optional[datetime] = None
 
 # Pydantic models untuk Toko Obat
 class MedicineResponse(BaseModel):
@@ -1167,10 +1567,14 @@ class MedicineResponse(BaseModel):
     stock: int
     image_url: Optional[str] = None
 
+class MedicineStockResponse(BaseModel):
+    id: int
+    stock: int
+
 class CartAddRequest(BaseModel):
     session_id: str
     medicine_id: int
-    quantity: int = 1
+    quantity: int = Field(1, ge=1)
 
 class CartItemResponse(BaseModel):
     id: int
@@ -1195,7 +1599,7 @@ class OrderResponse(BaseModel):
     items: str
     total_price: float
     status: str
-    created_at: str
+    created_at: datetime
 
 # ==========================================
 # AUTH PYDANTIC MODELS
@@ -1214,7 +1618,7 @@ class UserResponse(BaseModel):
     email: str
     name: str
     role: str
-    created_at: Optional[str] = None
+    created_at: Optional[datetime] = None
 
 class Token(BaseModel):
     access_token: str
@@ -1224,25 +1628,52 @@ class Token(BaseModel):
 # ==========================================
 # AUTH HELPER FUNCTIONS
 # ==========================================
+# Bcrypt dijalankan di process pool (password_service.py), fungsi sync ini untuk seed/CLI
 def hash_password(password: str) -> str:
-    password_bytes = password.encode('utf-8')
-    salt = bcrypt.gensalt()
-    hashed = bcrypt.hashpw(password_bytes, salt)
-    return hashed.decode('utf-8')
+    return password_hasher.hash_sync(password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    password_bytes = plain_password.encode('utf-8')
-    hashed_bytes = hashed_password.encode('utf-8')
-    return bcrypt.checkpw(password_bytes, hashed_bytes)
+    return password_hasher.verify_sync(plain_password, hashed_password)
+
+def get_user_by_email(db: Session, email: str) -> Optional[User]:
+    return db.query(User).filter(User.email == email).first()
+
+def save_user(db: Session, user: User) -> User:
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+def update_password_hash(db: Session, user_id: int, password_hash: str):
+    db.query(User).filter(User.id == user_id).update({User.password: password_hash}, synchronize_session=False)
+    db.commit()
 
 def create_access_token(data: dict):
     to_encode = data.copy()
-    expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    expire = utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode.update({"exp": expire})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)):
+class Principal(NamedTuple):
+    """User terautentikasi (salinan ringan, aman di-cache antar request)"""
+    id: int
+    email: str
+    name: str
+    role: str
+    created_at: Optional[datetime]
+
+def principal_from_user(user: User) -> Principal:
+    return Principal(id=user.id, email=user.email, name=user.name, role=user.role, created_at=user.created_at)
+
+def load_token_user(db: Session, email: str, user_id: Optional[int]) -> Optional[User]:
+    # Token baru membawa id user (lookup primary key), token lama hanya email
+    if user_id is not None:
+        user = db.get(User, user_id)
+        return user if user is not None and user.email == email else None
+    return db.query(User).filter(User.email == email).first()
+
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db=Depends(get_request_db)):
     token = credentials.credentials
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
@@ -1252,38 +1683,74 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
     except JWTError:
         raise HTTPException(status_code=401, detail="Token tidak valid atau kadaluarsa")
     
-    user = db.query(User).filter(User.email == email).first()
+    # Generasi bersama (Redis) dibaca sebelum query user: invalidasi dari worker lain di antaranya tetap terlihat
+    generation = await run_in_threadpool(principal_cache.generation, email) if principal_cache.shared else 0
+    principal = principal_cache.get(email, generation)
+    if principal is not None:
+        return principal
+
+    user = await run_db(db, load_token_user, email, payload.get("uid"))
     if user is None:
         raise HTTPException(status_code=401, detail="User tidak ditemukan")
-    return user
 
-def get_admin_user(current_user: User = Depends(get_current_user)):
+    principal = principal_from_user(user)
+    principal_cache.set(email, principal, generation)
+    return principal
+
+async def get_admin_user(current_user: Principal = Depends(get_current_user)):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Akses ditolak. Hanya admin yang bisa mengakses.")
     return current_user
 
+# Cache principal dibuang setelah commit yang mengubah/menghapus user (misal ganti role),
+# diteruskan ke worker lain lewat AUTH_CACHE_REDIS_URL jika diisi
+PRINCIPAL_CACHE_INVALIDATIONS = "principal_cache_invalidations"
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def queue_principal_invalidation(mapper, connection, target):
+    emails = object_session(target).info.setdefault(PRINCIPAL_CACHE_INVALIDATIONS, set())
+    emails.add(target.email)
+    emails.update(inspect(target).attrs.email.history.deleted or ())
+
+@event.listens_for(AppSession, "after_commit")
+def apply_principal_invalidations(session):
+    for email in session.info.pop(PRINCIPAL_CACHE_INVALIDATIONS, ()):
+        principal_cache.invalidate(email)
+
+@event.listens_for(AppSession, "after_rollback")
+def discard_principal_invalidations(session):
+    session.info.pop(PRINCIPAL_CACHE_INVALIDATIONS, None)
+
 # ==========================================
 # AUTH ENDPOINTS
 # ==========================================
+@app.exception_handler(PasswordHasherBusy)
+async def password_hasher_busy_handler(request, exc: PasswordHasherBusy):
+    return JSONResponse(
+        status_code=429,
+        content={"detail": "Server sedang sibuk, silakan coba lagi sebentar"},
+        headers={"Retry-After": "1"},
+    )
+
 @app.post("/api/auth/register")
-def register(data: UserRegister, db: Session = Depends(get_db)):
+async def register(data: UserRegister, db=Depends(get_request_db)):
     """Registrasi user baru"""
     # Cek apakah email sudah terdaftar
-    existing_user = db.query(User).filter(User.email == data.email).first()
+    existing_user = await run_db(db, get_user_by_email, data.email)
     if existing_user:
         raise HTTPException(status_code=400, detail="Email sudah terdaftar")
     
     # Buat user baru
     new_user = User(
         email=data.email,
-        password=hash_password(data.password),
+        password=await password_hasher.hash(data.password),
         name=data.name,
         role="user",
-        created_at=datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        created_at=utcnow()
     )
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    # Session tulis baru: koneksi penulis tidak ikut tertahan selama hashing password di atas
+    await run_in_new_session(save_user, new_user, writer=True)
     
     return {
         "status": "success",
@@ -1297,15 +1764,21 @@ def register(data: UserRegister, db: Session = Depends(get_db)):
     }
 
 @app.post("/api/auth/login", response_model=Token)
-def login(data: UserLogin, db: Session = Depends(get_db)):
+async def login(data: UserLogin, db=Depends(get_request_db)):
     """Login dan dapatkan JWT token"""
-    user = db.query(User).filter(User.email == data.email).first()
+    user = await run_db(db, get_user_by_email, data.email)
     
-    if not user or not verify_password(data.password, user.password):
+    if not user or not await password_hasher.verify(data.password, user.password):
         raise HTTPException(status_code=401, detail="Email atau password salah")
     
+    # Cost factor (BCRYPT_ROUNDS) berubah: simpan ulang hash dengan cost baru
+    if password_hasher.needs_rehash(user.password):
+        await run_in_new_session(update_password_hash, user.id, await password_hasher.hash(data.password), writer=True)
+    
     # Buat access token
-    access_token = create_access_token(data={"sub": user.email})
+    # Id & role ikut di klaim token, role tetap dicek ulang dari cache/DB saat otorisasi
+    # Role tidak ikut di token: selalu dibaca dari user/cache agar penurunan role tidak menunggu token kedaluwarsa
+    access_token = create_access_token(data={"sub": user.email, "uid": user.id})
     
     return {
         "access_token": access_token,
@@ -1315,19 +1788,19 @@ def login(data: UserLogin, db: Session = Depends(get_db)):
             "email": user.email,
             "name": user.name,
             "role": user.role,
-            "created_at": user.created_at
+            "created_at": format_timestamp(user.created_at)
         }
     }
 
 @app.get("/api/auth/me", response_model=UserResponse)
-def get_me(current_user: User = Depends(get_current_user)):
+async def get_me(current_user: Principal = Depends(get_current_user)):
     """Mendapatkan info user yang sedang login"""
     return {
         "id": current_user.id,
         "email": current_user.email,
         "name": current_user.name,
         "role": current_user.role,
-        "created_at": current_user.created_at
+        "created_at": format_timestamp(current_user.created_at)
     }
 
 @app.get("/")
@@ -1337,26 +1810,51 @@ def read_root():
 # ==========================================
 # 5. API PENYAKIT (BARU)
 # ==========================================
+def get_record(db: Session, model, record_id: int):
+    return db.query(model).filter(model.id == record_id).first()
+
+def find_diseases(db: Session, q: str, limit: int, offset: int):
+    return search_records(db, "diseases", q, limit, offset)
+
 @app.get("/api/diseases", response_model=List[DiseaseResponse])
-def get_all_diseases(db: Session = Depends(get_db)):
-    """Mengambil semua data penyakit"""
-    diseases = db.query(Disease).all()
-    return diseases
+async def get_all_diseases(request: Request, db=Depends(get_request_db)):
+    """Mengambil semua data penyakit (snapshot ber-ETag)"""
+    return await run_db(db, catalog_response, request, Disease, DiseaseResponse)
 
 @app.get("/api/diseases/search")
-def search_diseases(q: str = Query(..., min_length=1), db: Session = Depends(get_db)):
-    """Mencari penyakit berdasarkan keyword"""
-    diseases = db.query(Disease).filter(
-        Disease.name.ilike(f"%{q}%") | 
-        Disease.symptoms.ilike(f"%{q}%") |
-        Disease.category.ilike(f"%{q}%")
-    ).all()
-    return diseases
+async def search_diseases(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = Query(0, ge=0),
+    db=Depends(get_request_db)
+):
+    """Mencari penyakit berdasarkan keyword (urut relevansi)"""
+    return await run_db(db, find_diseases, q, limit, offset)
+
+def top_diseases(db: Session, symptoms: str, limit: int) -> List[dict]:
+    ensure_disease_index(db)
+    if disease_similarity is not None:
+        ranked = disease_similarity.top_k(symptoms, limit)
+    else:
+        scores = disease_index.scores(symptoms, symptoms)
+        ranked = heapq.nsmallest(limit, [(disease_id, score) for disease_id, score in scores.items() if score > 0],
+                                 key=lambda item: (-item[1], item[0]))
+    return [{"score": score, "disease": disease_index.get(disease_id)} for disease_id, score in ranked]
+
+@app.get("/api/diseases/match")
+async def match_diseases(
+    symptoms: str = Query(..., min_length=1),
+    limit: int = Query(5, ge=1, le=50),
+    db=Depends(get_request_db)
+):
+    """Penyakit paling mirip dengan keluhan beserta skornya (tanpa AI, tanpa disimpan)"""
+    results = await run_db(db, top_diseases, symptoms, limit)
+    return {"matcher": "tfidf" if disease_similarity is not None else "keyword", "results": results}
 
 @app.get("/api/diseases/{disease_id}", response_model=DiseaseResponse)
-def get_disease_by_id(disease_id: int, db: Session = Depends(get_db)):
+async def get_disease_by_id(disease_id: int, db=Depends(get_request_db)):
     """Mengambil detail penyakit berdasarkan ID"""
-    disease = db.query(Disease).filter(Disease.id == disease_id).first()
+    disease = await run_db(db, get_record, Disease, disease_id)
     if not disease:
         return {"error": "Penyakit tidak ditemukan"}
     return disease
@@ -1364,21 +1862,81 @@ def get_disease_by_id(disease_id: int, db: Session = Depends(get_db)):
 # ==========================================
 # 6. API RIWAYAT PASIEN (BARU)
 # ==========================================
-@app.get("/api/patients", response_model=List[PatientRecordResponse])
-def get_all_patients(db: Session = Depends(get_db)):
-    """Mengambil semua riwayat konsultasi pasien"""
-    patients = db.query(PatientRecord).order_by(PatientRecord.id.desc()).all()
-    return patients
+PATIENT_FIELDS = list(PatientRecordResponse.model_fields)
+# Tampilan daftar tanpa kolom teks panjang; minta lewat ?fields= jika perlu
+PATIENT_LIST_FIELDS = [field for field in PATIENT_FIELDS if field not in ("symptoms", "advice")]
+PATIENT_PAGE_BATCH_SIZE = 200
+
+def ensure_patient_indexes(db: Session):
+    """create_all tidak menambah index baru ke tabel patients yang sudah ada (database lama)"""
+    for index in PatientRecord.__table__.indexes:
+        db.execute(CreateIndex(index, if_not_exists=True))
+    db.commit()
+
+def parse_patient_fields(fields: Optional[str]) -> List[str]:
+    if not fields:
+        return PATIENT_LIST_FIELDS
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in requested if field not in PATIENT_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Field tidak dikenal: {', '.join(unknown)}")
+    # id selalu ikut karena dipakai sebagai cursor
+    return ["id"] + [field for field in PATIENT_FIELDS if field in requested and field != "id"]
+
+@app.get("/api/patients")
+def get_all_patients(
+    cursor: Optional[int] = Query(None, description="id pasien terakhir dari halaman sebelumnya"),
+    limit: int = Query(50, ge=1, le=1000),
+    name: Optional[str] = Query(None, description="Riwayat satu pasien (nama persis)"),
+    fields: Optional[str] = Query(None, description="Kolom dipisah koma, default tanpa symptoms & advice"),
+):
+    """Riwayat konsultasi per halaman (keyset pada id, terbaru dulu), di-serialize secara streaming"""
+    columns = parse_patient_fields(fields)
+
+    def generate_page():
+        # Session sendiri karena generator tetap berjalan setelah handler selesai
+        db = SessionLocal()
+        try:
+            query = db.query(*[getattr(PatientRecord, column) for column in columns])
+            if name is not None:
+                query = query.filter(PatientRecord.name == name)
+            if cursor is not None:
+                query = query.filter(PatientRecord.id < cursor)
+            # Satu baris ekstra untuk mengetahui apakah masih ada halaman berikutnya
+            rows = query.order_by(PatientRecord.id.desc()).limit(limit + 1).yield_per(PATIENT_PAGE_BATCH_SIZE)
+
+            chunk = ['{"patients": [']
+            next_cursor = None
+            last_id = None
+            for position, row in enumerate(rows):
+                if position == limit:
+                    next_cursor = last_id
+                    break
+                record = dict(zip(columns, row))
+                if "created_at" in record:
+                    record["created_at"] = format_timestamp(record["created_at"])
+                last_id = record["id"]
+                chunk.append(("," if position else "") + json.dumps(record))
+                # Kirim per batch, bukan per baris (satu pesan ASGI per yield)
+                if len(chunk) >= PATIENT_PAGE_BATCH_SIZE:
+                    yield "".join(chunk)
+                    chunk = []
+            chunk.append(f'], "next_cursor": {json.dumps(next_cursor)}}}')
+            yield "".join(chunk)
+        finally:
+            db.close()
+
+    return StreamingResponse(generate_page(), media_type="application/json")
 
 @app.get("/api/patients/search")
-def search_patients(q: str = Query(..., min_length=1), db: Session = Depends(get_db)):
-    """Mencari riwayat pasien berdasarkan nama atau diagnosa"""
-    patients = db.query(PatientRecord).filter(
-        PatientRecord.name.ilike(f"%{q}%") | 
-        PatientRecord.diagnosis.ilike(f"%{q}%") |
-        PatientRecord.disease_name.ilike(f"%{q}%")
-    ).order_by(PatientRecord.id.desc()).all()
-    return patients
+def search_patients(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db)
+):
+    """Mencari riwayat pasien berdasarkan nama atau diagnosa (urut relevansi)"""
+    return search_records(db, "patients", q, limit, offset)
 
 @app.get("/api/patients/{patient_id}", response_model=PatientRecordResponse)
 def get_patient_by_id(patient_id: int, db: Session = Depends(get_db)):
@@ -1391,178 +1949,210 @@ def get_patient_by_id(patient_id: int, db: Session = Depends(get_db)):
 # ==========================================
 # 7. API DIAGNOSA (UPGRADED)
 # ==========================================
-@app.post("/api/diagnose")
-def diagnose_symptoms(data: SymptomCheck, db: Session = Depends(get_db)):
-    
-    diagnosis_clean = "Analisa Umum"
-    advice_clean = "Istirahat yang cukup dan perbanyak minum air putih."
-    matched_disease = None
+# Nama pasien tidak pernah dikirim ke Gemini: prompt memakai placeholder dan jawaban
+# (yang juga disimpan di cache) baru diisi nama pasien saat disimpan/dikirim
+PATIENT_PLACEHOLDER = "{{nama_pasien}}"
+
+def build_diagnosis_prompt(symptoms: str) -> str:
+    return f"Kamu adalah dokter AI profesional. Pasien bernama {PATIENT_PLACEHOLDER} memiliki keluhan: '{symptoms}'. Berikan diagnosa medis kemungkinan (nama penyakit) dan saran pengobatan praktis. Jawab singkat padat. Jika menyebut nama pasien, tulis persis {PATIENT_PLACEHOLDER}."
+
+def personalize(text: str, patient_name: str) -> str:
+    return text.replace(PATIENT_PLACEHOLDER, patient_name)
+
+def split_placeholder_tail(text: str) -> Tuple[str, str]:
+    """(teks siap kirim, ekor yang mungkin awal placeholder yang terpotong antar chunk stream)"""
+    for size in range(min(len(PATIENT_PLACEHOLDER) - 1, len(text)), 0, -1):
+        if text.endswith(PATIENT_PLACEHOLDER[:size]):
+            return text[:-size], text[-size:]
+    return text, ""
+
+def parse_diagnosis_text(full_text: str):
+    """Pecah jawaban AI menjadi (diagnosa, saran)"""
+    sentences = full_text.split('.')
+    diagnosis_clean = sentences[0]
+    advice_clean = " ".join(sentences[1:]).strip()
+    if len(advice_clean) < 5: advice_clean = full_text
+    return diagnosis_clean, advice_clean
+
+def disease_to_dict(disease: Disease) -> dict:
+    return {
+        "id": disease.id,
+        "name": disease.name,
+        "category": disease.category,
+        "description": disease.description,
+        "symptoms": disease.symptoms,
+        "treatment": disease.treatment,
+        "medicines": disease.medicines,
+        "image_url": disease.image_url
+    }
 
-    # --- OTAK 1: REAL AI (GEMINI) ---
-    try:
-        headers = {"Content-Type": "application/json"}
-        payload = {
-            "contents": [{
-                "parts": [{"text": f"Kamu adalah dokter AI profesional. Pasien bernama {data.patient_name} memiliki keluhan: '{data.symptoms}'. Berikan diagnosa medis kemungkinan (nama penyakit) dan saran pengobatan praktis. Jawab singkat padat."}]
-            }]
-        }
-        
-        response = requests.post(GEMINI_URL, headers=headers, json=payload, timeout=10)
-        
-        if response.status_code == 200:
-            result = response.json()
-            if 'candidates' in result:
-                full_text = result['candidates'][0]['content']['parts'][0]['text']
-                sentences = full_text.split('.')
-                diagnosis_clean = sentences[0]
-                advice_clean = " ".join(sentences[1:]).strip()
-                if len(advice_clean) < 5: advice_clean = full_text
-            else:
-                raise Exception("Google menolak menjawab (Safety Filter)")
+# Index penyakit di memori, dibangun sekali lalu di-update per commit
+disease_index = DiseaseIndex()
+DISEASE_INDEX_CHANGES = "disease_index_changes"
+
+# Pencocokan penyakit: "keyword" (inverted index) atau "tfidf" (n-gram karakter, butuh numpy)
+DISEASE_MATCHER = os.getenv("DISEASE_MATCHER", "keyword").strip().lower()
+disease_similarity = None
+if DISEASE_MATCHER == "tfidf":
+    disease_similarity = DiseaseSimilarity(os.getenv("DISEASE_TFIDF_DIR", "data/disease_tfidf"))
+    if not disease_similarity.enabled:
+        disease_similarity = None
+DISEASE_TFIDF_MIN_SCORE = float(os.getenv("DISEASE_TFIDF_MIN_SCORE", "0.15"))
+
+def ensure_disease_index(db: Session):
+    if not disease_index.loaded:
+        disease_index.rebuild(disease_to_dict(d) for d in db.query(Disease).order_by(Disease.id).all())
+    if disease_similarity is not None and not disease_similarity.loaded:
+        # Matrix TF-IDF dimuat dari disk jika katalognya sama, tanpa dibangun ulang
+        built = disease_similarity.load_or_build(disease_index.all())
+        print(f"✅ Matrix TF-IDF penyakit {disease_similarity.fingerprint}: {'dibangun' if built else 'dimuat dari disk'}")
+
+@event.listens_for(Disease, "after_insert")
+@event.listens_for(Disease, "after_update")
+def queue_disease_index_upsert(mapper, connection, target):
+    object_session(target).info.setdefault(DISEASE_INDEX_CHANGES, {})[target.id] = disease_to_dict(target)
+
+@event.listens_for(Disease, "after_delete")
+def queue_disease_index_delete(mapper, connection, target):
+    object_session(target).info.setdefault(DISEASE_INDEX_CHANGES, {})[target.id] = None
+
+@event.listens_for(AppSession, "after_commit")
+def apply_disease_index_changes(session):
+    changes = session.info.pop(DISEASE_INDEX_CHANGES, None)
+    if not changes or not disease_index.loaded:
+        return
+    for disease_id, disease in changes.items():
+        if disease is None:
+            disease_index.remove(disease_id)
         else:
-            raise Exception(f"Koneksi Gagal: {response.status_code}")
+            disease_index.upsert(disease)
+    if disease_similarity is not None:
+        disease_similarity.invalidate()
 
-    except Exception as e:
+@event.listens_for(AppSession, "after_rollback")
+def discard_disease_index_changes(session):
+    session.info.pop(DISEASE_INDEX_CHANGES, None)
+
+DISEASE_MATCH_MIN_SCORE = 4  # Minimal ada 2 keyword match
+EMERGENCY_WARNING = "⚠️ PERHATIAN: Gejala Anda mungkin memerlukan penanganan DARURAT! Segera hubungi 119 atau pergi ke IGD rumah sakit terdekat!"
+
+class DiagnosisDraft(NamedTuple):
+    """Hasil triage + cache/Gemini untuk satu keluhan, sebelum dicocokkan & disimpan"""
+    diagnosis: str  # Teks template (nama pasien masih PATIENT_PLACEHOLDER)
+    advice: str
+    is_emergency: bool
+    cache_key: str
+    cached: bool  # True: disease sudah ikut tersimpan di cache
+    disease: Optional[dict]
+    from_provider: bool
+
+async def cached_draft(data: SymptomCheck, is_emergency: bool, cache_key: str) -> Optional[DiagnosisDraft]:
+    cached = await diagnosis_cache.get(cache_key)
+    if cached is None:
+        return None
+    return DiagnosisDraft(cached["diagnosis"], cached["advice"], is_emergency, cache_key, True, cached["disease"], False)
+
+async def draft_diagnosis(data: SymptomCheck, provider: GeminiProvider) -> DiagnosisDraft:
+    # Satu scan keluhan untuk rule mode simulasi sekaligus keyword darurat
+    triage = triage_rules.scan(data.symptoms)
+
+    # Cache dikunci dengan keluhan kanonik, nama pasien tidak ikut menjadi key
+    cache_key = diagnosis_cache.make_key(data.symptoms)
+    draft = await cached_draft(data, triage.is_emergency, cache_key)
+    if draft is not None:
+        return draft
+
+    # --- OTAK 1: REAL AI (GEMINI) ---
+    from_provider = True
+    try:
+        full_text = await provider.generate(build_diagnosis_prompt(data.symptoms))
+        diagnosis_clean, advice_clean = parse_diagnosis_text(full_text)
+    except DiagnosisProviderError as e:
         # --- OTAK 2: MODE SIMULASI (AUTO-DETECT) ---
         print(f"[WARNING] Pindah ke Mode Simulasi karena: {e}")
-        
-        s_lower = data.symptoms.lower()
-        
-        if "demam" in s_lower or "panas" in s_lower:
-            diagnosis_clean = "Demam (Viral Infection)"
-            advice_clean = "Minum Paracetamol, kompres hangat, cek suhu berkala."
-        elif "perut" in s_lower or "mual" in s_lower or "lambung" in s_lower:
-            diagnosis_clean = "Dispepsia / Maag"
-            advice_clean = "Hindari makanan pedas/asam, makan teratur, minum obat lambung."
-        elif "kepala" in s_lower or "pusing" in s_lower or "migrain" in s_lower:
-            diagnosis_clean = "Cephalgia (Sakit Kepala)"
-            advice_clean = "Istirahat di ruang gelap, hindari layar HP, minum obat pereda nyeri."
-        elif "gatal" in s_lower or "kulit" in s_lower or "merah" in s_lower:
-            diagnosis_clean = "Dermatitis / Alergi Kulit"
-            advice_clean = "Jangan digaruk, gunakan bedak salisil atau salep gatal."
-        elif "batuk" in s_lower or "pilek" in s_lower or "flu" in s_lower:
-            diagnosis_clean = "Common Cold (ISPA Ringan)"
-            advice_clean = "Istirahat total, minum vitamin C, gunakan masker."
-        elif "tulang" in s_lower or "nyeri" in s_lower or "pegal" in s_lower:
-            diagnosis_clean = "Myalgia (Nyeri Otot)"
-            advice_clean = "Pijat ringan, gunakan krim otot panas, istirahat."
-        elif "sesak" in s_lower or "napas" in s_lower or "mengi" in s_lower:
-            diagnosis_clean = "Asma / Gangguan Pernapasan"
-            advice_clean = "Hindari pemicu, gunakan inhaler jika tersedia, segera ke dokter jika parah."
-        elif "gula" in s_lower or "kencing" in s_lower or "haus" in s_lower:
-            diagnosis_clean = "Suspek Diabetes Mellitus"
-            advice_clean = "Cek gula darah, kurangi konsumsi gula, konsultasi dokter."
-        elif "darah tinggi" in s_lower or "hipertensi" in s_lower:
-            diagnosis_clean = "Hipertensi (Tekanan Darah Tinggi)"
-            advice_clean = "Kurangi garam, olahraga ringan, hindari stres, cek tekanan darah rutin."
-        elif "berputar" in s_lower or "vertigo" in s_lower:
-            diagnosis_clean = "Vertigo"
-            advice_clean = "Istirahat, hindari gerakan mendadak, minum obat antivertigo."
-        elif "gigi" in s_lower or "ngilu" in s_lower or "gusi" in s_lower:
-            diagnosis_clean = "Sakit Gigi"
-            advice_clean = "Kumur air garam hangat, minum obat pereda nyeri, segera ke dokter gigi."
-        elif "diare" in s_lower or "mencret" in s_lower or "bab encer" in s_lower:
-            diagnosis_clean = "Diare"
-            advice_clean = "Minum oralit, hindari makanan berminyak, banyak minum air putih."
-        elif "sariawan" in s_lower or "luka mulut" in s_lower:
-            diagnosis_clean = "Sariawan"
-            advice_clean = "Oleskan obat sariawan, kumur antiseptik, konsumsi vitamin C."
-        elif "mata" in s_lower or "belekan" in s_lower:
-            diagnosis_clean = "Sakit Mata (Konjungtivitis)"
-            advice_clean = "Kompres dingin, gunakan tetes mata, jangan mengucek mata."
-        elif "telinga" in s_lower or "pendengaran" in s_lower:
-            diagnosis_clean = "Sakit Telinga (Otitis)"
-            advice_clean = "Kompres hangat, jangan mengorek telinga, segera ke dokter THT."
-        else:
-            diagnosis_clean = "Gejala Umum / Kelelahan"
-            advice_clean = f"Keluhan '{data.symptoms}' membutuhkan observasi lebih lanjut. Sarankan istirahat total dan kunjungi dokter jika berlanjut 3 hari."
-
-    # Cari penyakit yang cocok di database dengan scoring system
-    diseases = db.query(Disease).all()
-    best_match = None
-    best_score = 0
-    
-    for disease in diseases:
-        score = 0
-        
-        # Check if disease name matches diagnosis
-        if disease.name.lower() in diagnosis_clean.lower() or diagnosis_clean.lower() in disease.name.lower():
-            score += 10
-            
-        # Check keywords match with symptoms
-        disease_keywords = [k.strip().lower() for k in disease.symptoms.split(',')]
-        symptom_words = [w.strip().lower() for w in data.symptoms.lower().split()]
-        
-        for keyword in disease_keywords:
-            for word in symptom_words:
-                if len(word) > 3:  # Avoid matching short words
-                    if word in keyword or keyword in word:
-                        score += 2
-                    elif word[:4] == keyword[:4]:  # Prefix match
-                        score += 1
-        
-        if score > best_score:
-            best_score = score
-            best_match = disease
-    
-    # Hanya assign jika score cukup tinggi (minimal ada 2 keyword match)
-    matched_disease = best_match if best_score >= 4 else None
-    
-    # Deteksi kondisi DARURAT
-    is_emergency = False
-    emergency_keywords = ["nyeri dada hebat", "sesak napas berat", "pingsan", "kejang", "tidak sadar", 
-                          "pendarahan", "kecelakaan", "lumpuh", "stroke", "serangan jantung"]
-    s_lower = data.symptoms.lower()
-    for keyword in emergency_keywords:
-        if keyword in s_lower:
-            is_emergency = True
-            break
-    
-    # Jika matched disease adalah kategori Darurat
-    if matched_disease and matched_disease.category == "Darurat":
-        is_emergency = True
+        diagnosis_clean, advice_clean = triage_rules.simulate(data.symptoms, triage)
+        from_provider = False
+    return DiagnosisDraft(diagnosis_clean, advice_clean, triage.is_emergency, cache_key,
+                          False, None, from_provider)
+
+async def remember_diagnosis(data: SymptomCheck, draft: DiagnosisDraft, matched_disease: Optional[dict]):
+    # Hasil mode simulasi tidak di-cache agar jawaban Gemini dipakai lagi begitu pulih
+    if not draft.from_provider:
+        return
+    # Teks template: Gemini tidak pernah menerima nama pasien, jadi aman dipakai pasien lain
+    await diagnosis_cache.set(draft.cache_key, {
+        "diagnosis": draft.diagnosis,
+        "advice": draft.advice,
+        "disease": matched_disease
+    })
+
+@app.post("/api/diagnose")
+async def diagnose_symptoms(data: SymptomCheck, db=Depends(get_request_write_db),
+                            provider: GeminiProvider = Depends(get_diagnosis_provider)):
+    draft = await draft_diagnosis(data, provider)
+    if draft.cached:
+        matched_disease = draft.disease
+    else:
+        # Query database lewat run_db agar event loop tidak terblokir (threadpool atau driver async)
+        matched_disease = await run_db(db, match_disease, data.symptoms, draft.diagnosis)
+        await remember_diagnosis(data, draft, matched_disease)
+
+    return await run_db(db, record_diagnosis, data, draft.diagnosis, draft.advice,
+                        matched_disease, draft.is_emergency)
+
+def match_disease(db: Session, symptoms: str, diagnosis_clean: str) -> Optional[dict]:
+    """Cari penyakit yang cocok dengan scoring system (via inverted index)"""
+    ensure_disease_index(db)
+    return best_disease(symptoms, diagnosis_clean)
+
+def best_disease(symptoms: str, diagnosis_clean: str) -> Optional[dict]:
+    return best_diseases([(symptoms, diagnosis_clean)])[0]
+
+def best_diseases(items: List[Tuple[str, str]]) -> List[Optional[dict]]:
+    """Penyakit terbaik per (keluhan, diagnosa); index sudah dimuat (ensure_disease_index), tanpa query"""
+    items = [(symptoms, personalize(diagnosis, " ")) for symptoms, diagnosis in items]
+    if disease_similarity is not None:
+        matches, min_score = disease_similarity.best_matches(items), DISEASE_TFIDF_MIN_SCORE
+    else:
+        matches, min_score = disease_index.best_matches(items), DISEASE_MATCH_MIN_SCORE
+
+    # Hanya assign jika score cukup tinggi
+    return [disease_index.get(best_id) if best_score >= min_score else None for best_id, best_score in matches]
 
-    # Simpan dengan data lengkap
-    from datetime import datetime
-    new_record = PatientRecord(
+def new_patient_record(data: SymptomCheck, diagnosis_clean: str, advice_clean: str,
+                       matched_disease: Optional[dict]) -> PatientRecord:
+    return PatientRecord(
         name=data.patient_name,
         symptoms=data.symptoms,
-        diagnosis=diagnosis_clean,
-        advice=advice_clean,
-        disease_name=matched_disease.name if matched_disease else None,
-        disease_category=matched_disease.category if matched_disease else None,
-        medicines=matched_disease.medicines if matched_disease else None,
-        created_at=datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        diagnosis=personalize(diagnosis_clean, data.patient_name),
+        advice=personalize(advice_clean, data.patient_name),
+        disease_name=matched_disease["name"] if matched_disease else None,
+        disease_category=matched_disease["category"] if matched_disease else None,
+        medicines=matched_disease["medicines"] if matched_disease else None,
+        created_at=utcnow()
     )
-    db.add(new_record)
-    db.commit()
-    db.refresh(new_record)
-    
+
+def diagnosis_response(record: PatientRecord, matched_disease: Optional[dict], is_emergency: bool) -> dict:
+    # Jika matched disease adalah kategori Darurat
+    if matched_disease and matched_disease["category"] == "Darurat":
+        is_emergency = True
+
     response_data = {
         "status": "success",
-        "id": new_record.id,
-        "patient": new_record.name,
-        "ai_diagnosis": new_record.diagnosis,
-        "suggestion": new_record.advice,
+        "id": record.id,
+        "patient": record.name,
+        "ai_diagnosis": record.diagnosis,
+        "suggestion": record.advice,
         "is_emergency": is_emergency
     }
     
     # Tambahkan peringatan darurat jika diperlukan
     if is_emergency:
-        response_data["emergency_warning"] = "⚠️ PERHATIAN: Gejala Anda mungkin memerlukan penanganan DARURAT! Segera hubungi 119 atau pergi ke IGD rumah sakit terdekat!"
+        response_data["emergency_warning"] = EMERGENCY_WARNING
     
     # Tambahkan info penyakit jika ditemukan
     if matched_disease:
-        response_data["disease"] = {
-            "id": matched_disease.id,
-            "name": matched_disease.name,
-            "category": matched_disease.category,
-            "description": matched_disease.description,
-            "symptoms": matched_disease.symptoms,
-            "treatment": matched_disease.treatment,
-            "medicines": matched_disease.medicines,
-            "image_url": matched_disease.image_url
-        }
+        response_data["disease"] = matched_disease
     else:
         # FALLBACK: Jika tidak ada penyakit yang cocok, sarankan ke dokter
         response_data["doctor_recommendation"] = {
@@ -1585,49 +2175,376 @@ def diagnose_symptoms(data: SymptomCheck, db: Session = Depends(get_db)):
     
     return response_data
 
+def record_diagnosis(db: Session, data: SymptomCheck, diagnosis_clean: str, advice_clean: str,
+                     matched_disease: Optional[dict], is_emergency: bool):
+    """Simpan PatientRecord dan susun response"""
+    new_record = new_patient_record(data, diagnosis_clean, advice_clean, matched_disease)
+    db.add(new_record)
+    db.commit()
+    db.refresh(new_record)
+    if matched_disease:
+        suggest_index.add_popularity("disease", matched_disease["id"])
+    return diagnosis_response(new_record, matched_disease, is_emergency)
+
+# Diagnosa massal (import triage dari klinik mitra)
+DIAGNOSE_BATCH_MAX_ROWS = int(os.getenv("DIAGNOSE_BATCH_MAX_ROWS", "5000"))
+DIAGNOSE_BATCH_CHUNK = max(int(os.getenv("DIAGNOSE_BATCH_CHUNK", "100")), 1)
+# API key klinik mitra (dipisah koma); kosong = endpoint batch tertutup
+PARTNER_API_KEYS = [key.strip() for key in os.getenv("PARTNER_API_KEYS", "").split(",") if key.strip()]
+partner_api_key = APIKeyHeader(name="X-API-Key", auto_error=False)
+
+async def get_partner_key(api_key: Optional[str] = Depends(partner_api_key)) -> str:
+    """Klinik mitra terautentikasi lewat header X-API-Key"""
+    # compare_digest per kunci agar waktu respons tidak membocorkan prefix yang benar
+    if not api_key or not any(hmac.compare_digest(api_key.encode(), key.encode()) for key in PARTNER_API_KEYS):
+        raise HTTPException(status_code=401, detail="API key mitra tidak valid")
+    return api_key
+
+def record_diagnosis_chunk(db: Session, rows: List[SymptomCheck], drafts: List[DiagnosisDraft]):
+    """Cocokkan penyakit satu chunk sekaligus lalu simpan dalam satu transaksi.
+
+    Return (response, matched_disease) per baris, urut sesuai input.
+    """
+    ensure_disease_index(db)
+    pending = [(row.symptoms, draft.diagnosis) for row, draft in zip(rows, drafts) if not draft.cached]
+    best = iter(best_diseases(pending))
+    matches = [draft.disease if draft.cached else next(best) for draft in drafts]
+
+    records = [new_patient_record(row, draft.diagnosis, draft.advice, matched)
+               for row, draft, matched in zip(rows, drafts, matches)]
+    db.add_all(records)
+    db.flush()
+    # Response disusun sebelum commit: setelah commit atribut expired dan akan di-refresh satu per satu
+    responses = [diagnosis_response(record, matched, draft.is_emergency)
+                 for record, draft, matched in zip(records, drafts, matches)]
+    db.commit()
+
+    for matched in matches:
+        if matched:
+            suggest_index.add_popularity("disease", matched["id"])
+    return list(zip(responses, matches))
+
+async def run_in_new_session(fn, *args, writer: bool = False):
+    """run_db dengan session baru, untuk generator streaming yang hidup lebih lama dari request"""
+    if DB_ASYNC:
+        async with (AsyncWriteSessionLocal if writer else AsyncSessionLocal)() as db:
+            return await run_db(db, fn, *args)
+    db = (WriteSessionLocal if writer else SessionLocal)()
+    try:
+        return await run_db(db, fn, *args)
+    finally:
+        db.close()
+
+async def diagnose_batch(rows: List[SymptomCheck], provider: GeminiProvider):
+    """Diagnosa banyak keluhan per chunk, hasil di-yield per baris (dengan nomor "row").
+
+    Baris dengan keluhan kanonik sama (diagnosis_cache.make_key) berbagi satu
+    draft, jadi Gemini dipanggil sekali per key di seluruh batch. Panggilan satu
+    chunk berjalan bersamaan (dibatasi semaphore provider dan GEMINI_MAX_RPS),
+    skor penyakitnya dihitung dalam satu lintasan, dan PatientRecord-nya
+    disimpan dalam satu transaksi per chunk.
+    """
+    drafts_by_key: Dict[str, DiagnosisDraft] = {}
+    for start in range(0, len(rows), DIAGNOSE_BATCH_CHUNK):
+        chunk = rows[start:start + DIAGNOSE_BATCH_CHUNK]
+        keys = [diagnosis_cache.make_key(row.symptoms) for row in chunk]
+        # Baris pertama tiap key baru mewakili key-nya untuk provider & cache
+        fresh: Dict[str, SymptomCheck] = {}
+        for key, row in zip(keys, chunk):
+            if key not in drafts_by_key:
+                fresh.setdefault(key, row)
+        drafts_by_key.update(zip(fresh, await asyncio.gather(*(draft_diagnosis(row, provider)
+                                                                for row in fresh.values()))))
+
+        drafts = []
+        for key, row in zip(keys, chunk):
+            draft = drafts_by_key[key]
+            if fresh.get(key) is not row:
+                # Keyword darurat tetap dicek dari teks baris ini sendiri (urutan kata bisa beda)
+                draft = draft._replace(is_emergency=triage_rules.scan(row.symptoms).is_emergency)
+            drafts.append(draft)
+
+        results = await run_in_new_session(record_diagnosis_chunk, chunk, drafts, writer=True)
+        for offset, (key, row, draft, (response, matched)) in enumerate(zip(keys, chunk, drafts, results)):
+            if not draft.cached and fresh.get(key) is row:
+                await remember_diagnosis(row, draft, matched)
+            yield {"row": start + offset, **response}
+
+@app.post("/api/diagnose/batch")
+async def diagnose_symptoms_batch(rows: List[SymptomCheck], partner_key: str = Depends(get_partner_key),
+                                  provider: GeminiProvider = Depends(get_diagnosis_provider)):
+    """Diagnosa massal, hasil di-stream sebagai NDJSON (satu baris JSON per keluhan)"""
+    if len(rows) > DIAGNOSE_BATCH_MAX_ROWS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Maksimal {DIAGNOSE_BATCH_MAX_ROWS} keluhan per batch"
+        )
+
+    async def generate_lines():
+        async for result in diagnose_batch(rows, provider):
+            yield json.dumps(result) + "\n"
+
+    return StreamingResponse(generate_lines(), media_type="application/x-ndjson")
+
+def read_symptom_csv(path: str) -> List[SymptomCheck]:
+    """Baris CSV (kolom patient_name, symptoms) menjadi SymptomCheck; ValueError jika kolom kurang"""
+    import csv
+
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        missing = {"patient_name", "symptoms"} - set(reader.fieldnames or [])
+        if missing:
+            raise ValueError(f"Kolom CSV tidak ditemukan: {', '.join(sorted(missing))}")
+        return [SymptomCheck(patient_name=line["patient_name"], symptoms=line["symptoms"]) for line in reader]
+
+async def write_diagnose_batch(rows: List[SymptomCheck], provider: GeminiProvider, output: str) -> int:
+    """Hasil diagnose_batch ke file NDJSON, return jumlah keluhan darurat"""
+    emergencies = 0
+    with open(output, "w", encoding="utf-8") as out:
+        async for result in diagnose_batch(rows, provider):
+            emergencies += result["is_emergency"]
+            out.write(json.dumps(result) + "\n")
+    return emergencies
+
+# Diagnosa streaming (Server-Sent Events)
+def sse_event(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+async def stream_diagnosis(data: SymptomCheck, provider: GeminiProvider):
+    """Event SSE satu diagnosa, diakhiri `done` setelah PatientRecord tersimpan.
+
+    - emergency: dikirim begitu terdeteksi (keyword di keluhan, atau penyakit kategori Darurat)
+    - delta: potongan teks Gemini apa adanya, untuk pratinjau
+    - disease: penyakit yang cocok; final=false selama kalimat diagnosa belum selesai
+    - fallback: Gemini gagal, pratinjau dibuang dan diganti hasil mode simulasi
+    - done: response lengkap, sama dengan /api/diagnose
+    """
+    triage = triage_rules.scan(data.symptoms)
+    emergency = triage.is_emergency
+    if emergency:
+        yield sse_event("emergency", {"source": "symptoms", "emergency_warning": EMERGENCY_WARNING})
+
+    def final_disease_events(matched: Optional[dict]) -> List[str]:
+        nonlocal emergency
+        events = [sse_event("disease", {"final": True, "disease": matched})]
+        if not emergency and matched and matched["category"] == "Darurat":
+            emergency = True
+            events.append(sse_event("emergency", {"source": "disease", "emergency_warning": EMERGENCY_WARNING}))
+        return events
+
+    # Index dimuat sekali di awal; pencocokan selama stream cukup di memori
+    await run_in_new_session(ensure_disease_index)
+    cache_key = diagnosis_cache.make_key(data.symptoms)
+    draft = await cached_draft(data, triage.is_emergency, cache_key)
+    matched_final = False
+    if draft is None:
+        from_provider = True
+        parts = []
+        held = ""  # Ekor chunk yang mungkin potongan placeholder nama pasien
+        interim_id = None
+        try:
+            async for text in provider.generate_stream(build_diagnosis_prompt(data.symptoms)):
+                parts.append(text)
+                ready, held = split_placeholder_tail(held + text)
+                if ready:
+                    yield sse_event("delta", {"text": personalize(ready, data.patient_name)})
+                if matched_final:
+                    continue
+                full_text = "".join(parts)
+                if "." in full_text:
+                    # Kalimat diagnosa (sebelum titik pertama) sudah utuh: hasil cocok final
+                    matched = best_disease(data.symptoms, full_text.split(".")[0])
+                    matched_final = True
+                    for event in final_disease_events(matched):
+                        yield event
+                    continue
+                # Kata terakhir mungkin masih terpotong, cocokkan sampai spasi terakhir saja
+                complete = full_text if full_text[-1].isspace() else full_text[:max(full_text.rfind(" "), 0)]
+                if complete.strip():
+                    interim = best_disease(data.symptoms, complete)
+                    if (interim["id"] if interim else None) != interim_id:
+                        interim_id = interim["id"] if interim else None
+                        yield sse_event("disease", {"final": False, "disease": interim})
+            if held:
+                yield sse_event("delta", {"text": personalize(held, data.patient_name)})
+            diagnosis_clean, advice_clean = parse_diagnosis_text("".join(parts))
+        except DiagnosisProviderError as e:
+            print(f"[WARNING] Pindah ke Mode Simulasi karena: {e}")
+            yield sse_event("fallback", {"reason": str(e)})
+            diagnosis_clean, advice_clean = triage_rules.simulate(data.symptoms, triage)
+            from_provider = False
+            matched_final = False
+        if not matched_final:
+            matched = best_disease(data.symptoms, diagnosis_clean)
+        draft = DiagnosisDraft(diagnosis_clean, advice_clean, triage.is_emergency, cache_key,
+                               False, None, from_provider)
+        await remember_diagnosis(data, draft, matched)
+    else:
+        matched = draft.disease
+
+    if not matched_final:
+        for event in final_disease_events(matched):
+            yield event
+    response = await run_in_new_session(record_diagnosis, data, draft.diagnosis, draft.advice,
+                                        matched, draft.is_emergency, writer=True)
+    yield sse_event("done", response)
+
+@app.post("/api/diagnose/stream")
+async def diagnose_symptoms_stream(data: SymptomCheck, provider: GeminiProvider = Depends(get_diagnosis_provider)):
+    """/api/diagnose versi streaming: teks Gemini diteruskan sebagai Server-Sent Events"""
+    return StreamingResponse(
+        stream_diagnosis(data, provider),
+        media_type="text/event-stream",
+        # Matikan buffering proxy (nginx) agar event langsung sampai ke client
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 # ==========================================
 # 8. API TOKO OBAT (BARU)
 # ==========================================
+def find_medicines(db: Session, q: str, limit: int, offset: int):
+    return search_records(db, "medicines", q, limit, offset)
+
+def find_medicines_by_category(db: Session, category: str):
+    return db.query(Medicine).filter(Medicine.category.ilike(f"%{category}%")).all()
+
 @app.get("/api/medicines", response_model=List[MedicineResponse])
-def get_all_medicines(db: Session = Depends(get_db)):
-    """Mengambil semua data obat"""
-    medicines = db.query(Medicine).all()
-    return medicines
+async def get_all_medicines(request: Request, db=Depends(get_request_db)):
+    """Mengambil semua data obat (snapshot ber-ETag)"""
+    return await run_db(db, catalog_response, request, Medicine, MedicineResponse)
+
+def get_medicine_stock(db: Session):
+    return db.query(Medicine.id, Medicine.stock).order_by(Medicine.id).all()
+
+@app.get("/api/medicines/stock", response_model=List[MedicineStockResponse])
+async def get_all_medicine_stock(response: Response, db=Depends(get_request_db)):
+    """Stok terkini semua obat (kecil & tidak di-cache; snapshot /api/medicines tidak ikut berubah tiap checkout)"""
+    response.headers["Cache-Control"] = "no-store"
+    return await run_db(db, get_medicine_stock)
 
 @app.get("/api/medicines/search")
-def search_medicines(q: str = Query(..., min_length=1), db: Session = Depends(get_db)):
-    """Mencari obat berdasarkan keyword"""
-    medicines = db.query(Medicine).filter(
-        Medicine.name.ilike(f"%{q}%") | 
-        Medicine.description.ilike(f"%{q}%") |
-        Medicine.category.ilike(f"%{q}%")
-    ).all()
-    return medicines
+async def search_medicines(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = Query(0, ge=0),
+    db=Depends(get_request_db)
+):
+    """Mencari obat berdasarkan keyword (urut relevansi)"""
+    return await run_db(db, find_medicines, q, limit, offset)
 
 @app.get("/api/medicines/category/{category}")
-def get_medicines_by_category(category: str, db: Session = Depends(get_db)):
+async def get_medicines_by_category(category: str, db=Depends(get_request_db)):
     """Mengambil obat berdasarkan kategori"""
-    medicines = db.query(Medicine).filter(Medicine.category.ilike(f"%{category}%")).all()
-    return medicines
+    return await run_db(db, find_medicines_by_category, category)
 
 @app.get("/api/medicines/{medicine_id}", response_model=MedicineResponse)
-def get_medicine_by_id(medicine_id: int, db: Session = Depends(get_db)):
+async def get_medicine_by_id(medicine_id: int, db=Depends(get_request_db)):
     """Mengambil detail obat berdasarkan ID"""
-    medicine = db.query(Medicine).filter(Medicine.id == medicine_id).first()
+    medicine = await run_db(db, get_record, Medicine, medicine_id)
     if not medicine:
         return {"error": "Obat tidak ditemukan"}
     return medicine
 
+# ==========================================
+# 8.1 AUTOCOMPLETE (SUGGEST)
+# ==========================================
+# Index autocomplete di memori, dibangun sekali lalu di-update per commit
+suggest_index = SuggestIndex()
+SUGGEST_INDEX_CHANGES = "suggest_index_changes"
+# Popularitas obat dihitung dari sejumlah order terakhir saat index dibangun
+SUGGEST_POPULARITY_ORDERS = 5000
+
+def load_suggest_popularity(db: Session) -> dict:
+    popularity = {}
+    disease_ids = {name: disease_id for disease_id, name in db.query(Disease.id, Disease.name).all()}
+    for disease_name, total in db.query(PatientRecord.disease_name, func.count(PatientRecord.id)).filter(
+        PatientRecord.disease_name.isnot(None)
+    ).group_by(PatientRecord.disease_name).all():
+        if disease_name in disease_ids:
+            popularity[("disease", disease_ids[disease_name])] = total
+
+    recent_orders = db.query(Order.id).order_by(Order.id.desc()).limit(SUGGEST_POPULARITY_ORDERS).subquery()
+    for medicine_id, total in db.query(OrderItem.medicine_id, func.sum(OrderItem.quantity)).filter(
+        OrderItem.order_id.in_(db.query(recent_orders.c.id)),
+        OrderItem.medicine_id.isnot(None),
+    ).group_by(OrderItem.medicine_id).all():
+        popularity[("medicine", medicine_id)] = total
+    return popularity
+
+def ensure_suggest_index(db: Session):
+    if suggest_index.loaded:
+        return
+    items = [("medicine", m.id, m.name, m.category)
+             for m in db.query(Medicine.id, Medicine.name, Medicine.category).all()]
+    items += [("disease", d.id, d.name, d.category)
+              for d in db.query(Disease.id, Disease.name, Disease.category).all()]
+    suggest_index.rebuild(items, load_suggest_popularity(db))
+
+@event.listens_for(Medicine, "after_insert")
+@event.listens_for(Medicine, "after_update")
+@event.listens_for(Disease, "after_insert")
+@event.listens_for(Disease, "after_update")
+def queue_suggest_index_upsert(mapper, connection, target):
+    kind = "medicine" if isinstance(target, Medicine) else "disease"
+    object_session(target).info.setdefault(SUGGEST_INDEX_CHANGES, {})[(kind, target.id)] = (target.name, target.category)
+
+@event.listens_for(Medicine, "after_delete")
+@event.listens_for(Disease, "after_delete")
+def queue_suggest_index_delete(mapper, connection, target):
+    kind = "medicine" if isinstance(target, Medicine) else "disease"
+    object_session(target).info.setdefault(SUGGEST_INDEX_CHANGES, {})[(kind, target.id)] = None
+
+@event.listens_for(AppSession, "after_commit")
+def apply_suggest_index_changes(session):
+    changes = session.info.pop(SUGGEST_INDEX_CHANGES, None)
+    if not changes or not suggest_index.loaded:
+        return
+    for (kind, ref_id), value in changes.items():
+        if value is None:
+            suggest_index.remove(kind, ref_id)
+        else:
+            suggest_index.upsert(kind, ref_id, *value)
+
+@event.listens_for(AppSession, "after_rollback")
+def discard_suggest_index_changes(session):
+    session.info.pop(SUGGEST_INDEX_CHANGES, None)
+
+@app.get("/api/suggest")
+def suggest(q: str = Query(..., min_length=1), limit: int = Query(8, ge=1, le=20)):
+    """Saran autocomplete nama/kategori obat & penyakit (tanpa query database)"""
+    return suggest_index.suggest(q, limit)
+
 # ==========================================
 # 9. API KERANJANG BELANJA (BARU)
 # ==========================================
-@app.post("/api/cart/add")
-def add_to_cart(data: CartAddRequest, db: Session = Depends(get_db)):
-    """Menambahkan obat ke keranjang"""
+# Item di keranjang menahan stok selama CART_RESERVATION_MINUTES (diperpanjang tiap kali diubah)
+inventory = InventoryManager(
+    Medicine,
+    StockReservation,
+    hold_minutes=float(os.getenv("CART_RESERVATION_MINUTES", "15")),
+)
+
+def release_expired_reservations():
+    """Kembalikan stok reservasi yang kedaluwarsa (dijalankan berkala oleh worker job)"""
+    db = WriteSessionLocal()
+    try:
+        released = inventory.release_expired(db)
+        db.commit()
+        if released:
+            print(f"📦 {released} reservasi stok kedaluwarsa dilepas")
+    finally:
+        db.close()
+
+def stock_error(medicine_name: str, available: int) -> dict:
+    return {"status": "error", "message": f"Stok {medicine_name} tidak cukup (tersisa {available})"}
+
+def add_cart_item(db: Session, data: CartAddRequest):
     # Cek apakah obat ada
     medicine = db.query(Medicine).filter(Medicine.id == data.medicine_id).first()
     if not medicine:
         return {"status": "error", "message": "Obat tidak ditemukan"}
+    # Disalin sebelum commit/rollback: membaca atribut expired membuka BEGIN IMMEDIATE baru di penulis
+    medicine_name = medicine.name
     
     # Cek apakah item sudah ada di keranjang
     existing_item = db.query(CartItem).filter(
@@ -1635,8 +2552,15 @@ def add_to_cart(data: CartAddRequest, db: Session = Depends(get_db)):
         CartItem.medicine_id == data.medicine_id
     ).first()
     
+    quantity = data.quantity + (existing_item.quantity if existing_item else 0)
+    try:
+        inventory.reserve(db, data.session_id, data.medicine_id, quantity)
+    except StockShortage as e:
+        db.rollback()
+        return stock_error(medicine_name, e.shortfalls[0]["available"])
+    
     if existing_item:
-        existing_item.quantity += data.quantity
+        existing_item.quantity = quantity
     else:
         new_item = CartItem(
             session_id=data.session_id,
@@ -1645,38 +2569,49 @@ def add_to_cart(data: CartAddRequest, db: Session = Depends(get_db)):
         )
         db.add(new_item)
     
-    db.commit()
-    
-    # Hitung total items di keranjang
+    # Hitung total items di keranjang (autoflush, masih di transaksi yang sama)
     total_items = db.query(CartItem).filter(CartItem.session_id == data.session_id).count()
+    db.commit()
     
     return {
         "status": "success",
-        "message": f"{medicine.name} ditambahkan ke keranjang",
+        "message": f"{medicine_name} ditambahkan ke keranjang",
         "cart_count": total_items
     }
 
-@app.get("/api/cart/{session_id}")
-def get_cart(session_id: str, db: Session = Depends(get_db)):
-    """Mengambil isi keranjang berdasarkan session"""
-    cart_items = db.query(CartItem).filter(CartItem.session_id == session_id).all()
-    
+@app.post("/api/cart/add")
+async def add_to_cart(data: CartAddRequest, db=Depends(get_request_write_db)):
+    """Menambahkan obat ke keranjang"""
+    return await run_db(db, add_cart_item, data)
+
+def load_cart_lines(db: Session, session_id: str):
+    """Isi keranjang beserta nama & harga obat dalam satu query JOIN"""
+    return db.query(
+        CartItem.id,
+        CartItem.quantity,
+        Medicine.id.label("medicine_id"),
+        Medicine.name.label("medicine_name"),
+        Medicine.price.label("medicine_price"),
+        Medicine.category.label("medicine_category")
+    ).join(Medicine, CartItem.medicine_id == Medicine.id).filter(
+        CartItem.session_id == session_id
+    ).order_by(CartItem.id).all()
+
+def cart_summary(db: Session, session_id: str):
     items = []
     total_price = 0
     
-    for item in cart_items:
-        medicine = db.query(Medicine).filter(Medicine.id == item.medicine_id).first()
-        if medicine:
-            subtotal = medicine.price * item.quantity
-            total_price += subtotal
-            items.append({
-                "id": item.id,
-                "medicine_id": medicine.id,
-                "medicine_name": medicine.name,
-                "medicine_price": medicine.price,
-                "quantity": item.quantity,
-                "subtotal": subtotal
-            })
+    for line in load_cart_lines(db, session_id):
+        subtotal = line.medicine_price * line.quantity
+        total_price += subtotal
+        items.append({
+            "id": line.id,
+            "medicine_id": line.medicine_id,
+            "medicine_name": line.medicine_name,
+            "medicine_price": line.medicine_price,
+            "quantity": line.quantity,
+            "subtotal": subtotal
+        })
     
     return {
         "items": items,
@@ -1684,158 +2619,419 @@ def get_cart(session_id: str, db: Session = Depends(get_db)):
         "total_price": total_price
     }
 
-@app.put("/api/cart/update/{item_id}")
-def update_cart_item(item_id: int, quantity: int = Query(..., ge=1), db: Session = Depends(get_db)):
-    """Update jumlah item di keranjang"""
+@app.get("/api/cart/{session_id}")
+async def get_cart(session_id: str, db=Depends(get_request_db)):
+    """Mengambil isi keranjang berdasarkan session"""
+    return await run_db(db, cart_summary, session_id)
+
+def set_cart_quantity(db: Session, item_id: int, quantity: int):
     item = db.query(CartItem).filter(CartItem.id == item_id).first()
     if not item:
         return {"status": "error", "message": "Item tidak ditemukan"}
     
+    medicine_name = item.medicine.name
+    try:
+        inventory.reserve(db, item.session_id, item.medicine_id, quantity)
+    except StockShortage as e:
+        db.rollback()
+        return stock_error(medicine_name, e.shortfalls[0]["available"])
+    
     item.quantity = quantity
     db.commit()
     
     return {"status": "success", "message": "Keranjang diupdate"}
 
-@app.delete("/api/cart/remove/{item_id}")
-def remove_from_cart(item_id: int, db: Session = Depends(get_db)):
-    """Menghapus item dari keranjang"""
+@app.put("/api/cart/update/{item_id}")
+async def update_cart_item(item_id: int, quantity: int = Query(..., ge=1), db=Depends(get_request_write_db)):
+    """Update jumlah item di keranjang"""
+    return await run_db(db, set_cart_quantity, item_id, quantity)
+
+def remove_cart_item(db: Session, item_id: int):
     item = db.query(CartItem).filter(CartItem.id == item_id).first()
     if not item:
         return {"status": "error", "message": "Item tidak ditemukan"}
     
+    inventory.release(db, item.session_id, item.medicine_id)
     db.delete(item)
     db.commit()
     
     return {"status": "success", "message": "Item dihapus dari keranjang"}
 
-@app.delete("/api/cart/clear/{session_id}")
-def clear_cart(session_id: str, db: Session = Depends(get_db)):
-    """Mengosongkan keranjang"""
+@app.delete("/api/cart/remove/{item_id}")
+async def remove_from_cart(item_id: int, db=Depends(get_request_write_db)):
+    """Menghapus item dari keranjang"""
+    return await run_db(db, remove_cart_item, item_id)
+
+def clear_cart_items(db: Session, session_id: str):
+    inventory.release(db, session_id)
     db.query(CartItem).filter(CartItem.session_id == session_id).delete()
     db.commit()
     
     return {"status": "success", "message": "Keranjang dikosongkan"}
 
+@app.delete("/api/cart/clear/{session_id}")
+async def clear_cart(session_id: str, db=Depends(get_request_write_db)):
+    """Mengosongkan keranjang"""
+    return await run_db(db, clear_cart_items, session_id)
+
 # ==========================================
 # 10. API CHECKOUT & ORDER (BARU)
 # ==========================================
-@app.post("/api/order/checkout")
-def checkout(data: CheckoutRequest, db: Session = Depends(get_db)):
-    """Proses checkout dan buat pesanan + backup ke AWS S3"""
-    from datetime import datetime
+JOB_ORDER_BACKUP = "order_backup"
+JOB_ORDER_INVOICE = "order_invoice"
+
+def run_order_backup_job(order_data: dict):
+    from aws_service import s3_manager
+    if not s3_manager.upload_order_json(order_data, order_data["order_id"]):
+        raise RuntimeError("Upload order JSON ke S3 gagal")
+
+def run_order_invoice_job(order_data: dict):
+    from aws_service import s3_manager
+    if not s3_manager.generate_and_upload_invoice(order_data, order_data["order_id"]):
+        raise RuntimeError("Generate/upload invoice PDF ke S3 gagal")
+
+INVOICE_BATCH_SIZE = 200
+
+def regenerate_invoices(db: Session, failed_only: bool = True, batch_size: int = INVOICE_BATCH_SIZE) -> int:
+    """Render ulang & upload invoice dari payload job per batch (render di process pool), return jumlah yang ter-upload"""
+    from aws_service import s3_manager
+    last_id = 0
+    total = 0
+    while True:
+        query = db.query(BackgroundJob.id, BackgroundJob.order_id, BackgroundJob.payload).filter(
+            BackgroundJob.kind == JOB_ORDER_INVOICE, BackgroundJob.id > last_id
+        )
+        if failed_only:
+            query = query.filter(BackgroundJob.status == "failed")
+        jobs = query.order_by(BackgroundJob.id).limit(batch_size).all()
+        # Akhiri transaksi baca: koneksi penulis tidak ditahan selama render & upload
+        db.commit()
+        if not jobs:
+            return total
+        last_id = jobs[-1].id
+
+        uploaded = set(s3_manager.generate_and_upload_invoices([json.loads(job.payload) for job in jobs]))
+        done_ids = [job.id for job in jobs if job.order_id in uploaded]
+        if done_ids:
+            # Job gagal permanen yang invoicenya kini ter-upload dianggap selesai
+            db.query(BackgroundJob).filter(
+                BackgroundJob.id.in_(done_ids), BackgroundJob.status == "failed"
+            ).update({
+                BackgroundJob.status: "done",
+                BackgroundJob.last_error: None,
+                BackgroundJob.updated_at: utcnow(),
+            }, synchronize_session=False)
+            db.commit()
+        total += len(uploaded)
+
+job_queue = JobQueue(
+    WriteSessionLocal,
+    BackgroundJob,
+    handlers={
+        JOB_ORDER_BACKUP: run_order_backup_job,
+        JOB_ORDER_INVOICE: run_order_invoice_job,
+    },
+    workers=int(os.getenv("JOB_WORKERS", "2")),
+    max_attempts=int(os.getenv("JOB_MAX_ATTEMPTS", "5")),
+    backoff_base=float(os.getenv("JOB_BACKOFF_SECONDS", "5")),
+    maintenance=release_expired_reservations,
+    maintenance_interval=float(os.getenv("RESERVATION_SWEEP_SECONDS", "60")),
+)
+
+def create_order(db: Session, data: CheckoutRequest):
     from aws_service import s3_manager
     
     # Ambil isi keranjang
-    cart_items = db.query(CartItem).filter(CartItem.session_id == data.session_id).all()
+    cart_lines = load_cart_lines(db, data.session_id)
     
-    if not cart_items:
+    if not cart_lines:
         return {"status": "error", "message": "Keranjang kosong"}
     
+    # Reservasi kedaluwarsa dilepas di transaksi sendiri, sebelum commit_sale mengunci baris obat
+    if inventory.release_expired(db, [line.medicine_id for line in cart_lines]):
+        db.commit()
+    
+    # Potong stok (memakai reservasi keranjang) sebelum order dibuat; gagal = tidak ada yang berubah
+    try:
+        inventory.commit_sale(db, data.session_id, {line.medicine_id: line.quantity for line in cart_lines})
+    except StockShortage as e:
+        db.rollback()
+        names = {line.medicine_id: line.medicine_name for line in cart_lines}
+        return {
+            "status": "error",
+            "message": "Stok tidak cukup untuk beberapa item",
+            "shortfalls": [{**shortfall, "name": names.get(shortfall["medicine_id"])} for shortfall in e.shortfalls],
+        }
+    
     # Hitung total dan buat list items
     items_list = []
+    order_items = []
     total_price = 0
     
-    for item in cart_items:
-        medicine = db.query(Medicine).filter(Medicine.id == item.medicine_id).first()
-        if medicine:
-            subtotal = medicine.price * item.quantity
-            total_price += subtotal
-            items_list.append({
-                "medicine_id": medicine.id,
-                "name": medicine.name,
-                "price": medicine.price,
-                "quantity": item.quantity,
-                "subtotal": subtotal
-            })
+    for position, line in enumerate(cart_lines):
+        subtotal = line.medicine_price * line.quantity
+        total_price += subtotal
+        items_list.append({
+            "medicine_id": line.medicine_id,
+            "name": line.medicine_name,
+            "price": line.medicine_price,
+            "quantity": line.quantity,
+            "subtotal": subtotal
+        })
+        order_items.append({
+            "position": position,
+            "medicine_id": line.medicine_id,
+            "name": line.medicine_name,
+            "category": line.medicine_category,
+            "price": line.medicine_price,
+            "quantity": line.quantity,
+            "subtotal": subtotal
+        })
     
     # Buat order baru
     new_order = Order(
         customer_name=data.customer_name,
         phone=data.phone,
         address=data.address,
-        items=json.dumps(items_list),
         total_price=total_price,
         status="pending",
-        created_at=datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        created_at=utcnow()
     )
     db.add(new_order)
+    db.flush()  # Dapatkan id order untuk item & job backup
+    # Semua item dalam satu executemany, bukan INSERT per item
+    db.execute(insert(OrderItem), [{**item, "order_id": new_order.id} for item in order_items])
+    bump_dashboard_stats(db, new_order.status, 1, total_price)
     
     # Kosongkan keranjang
     db.query(CartItem).filter(CartItem.session_id == data.session_id).delete()
     
-    db.commit()
-    db.refresh(new_order)
-    
-    # Upload ke AWS S3 (jika tersedia)
-    order_data = {
-        "order_id": new_order.id,
-        "customer_name": new_order.customer_name,
-        "email": data.email if hasattr(data, 'email') else "N/A",
-        "phone": new_order.phone,
-        "address": new_order.address,
-        "items": items_list,
-        "total_price": new_order.total_price,
-        "status": new_order.status,
-        "created_at": new_order.created_at
-    }
+    # Dibentuk sebelum commit: setelah commit atribut order kedaluwarsa dan perlu SELECT ulang
+    order = order_to_dict(new_order, items_list)
     
-    # Backup data order ke S3 JSON
-    s3_manager.upload_order_json(order_data, new_order.id)
+    # Backup ke AWS S3 (jika tersedia) dicatat sebagai job di transaksi yang sama,
+    # upload JSON & pembuatan invoice PDF dikerjakan worker di luar request
+    if s3_manager.enabled:
+        order_data = {
+            "order_id": order["id"],
+            "customer_name": order["customer_name"],
+            "email": data.email if hasattr(data, 'email') else "N/A",
+            "phone": order["phone"],
+            "address": order["address"],
+            "items": items_list,
+            "total_price": order["total_price"],
+            "status": order["status"],
+            "created_at": order["created_at"]
+        }
+        job_queue.enqueue(db, JOB_ORDER_BACKUP, order["id"], order_data)
+        job_queue.enqueue(db, JOB_ORDER_INVOICE, order["id"], order_data)
     
-    # Generate dan upload invoice PDF
-    s3_manager.generate_and_upload_invoice(order_data, new_order.id)
+    db.commit()
+    job_queue.notify()
+    for item in items_list:
+        suggest_index.add_popularity("medicine", item["medicine_id"], item["quantity"])
     
     return {
         "status": "success",
-        "message": "Pesanan berhasil dibuat! Data di-backup ke AWS S3.",
-        "order": {
-            "id": new_order.id,
-            "customer_name": new_order.customer_name,
-            "phone": new_order.phone,
-            "address": new_order.address,
-            "items": items_list,
-            "total_price": new_order.total_price,
-            "status": new_order.status,
-            "created_at": new_order.created_at
-        }
+        "message": "Pesanan berhasil dibuat! Backup ke AWS S3 sedang diproses.",
+        "order": order
+    }
+
+@app.post("/api/order/checkout")
+async def checkout(data: CheckoutRequest, db=Depends(get_request_write_db)):
+    """Proses checkout dan buat pesanan + antrekan backup ke AWS S3"""
+    return await run_db(db, create_order, data)
+
+def load_order_items(db: Session, order_ids: List[int]) -> dict:
+    """Item banyak order sekaligus dalam satu query (tanpa objek ORM per item), {order_id: [item]}"""
+    items = {order_id: [] for order_id in order_ids}
+    if not order_ids:
+        return items
+    rows = db.query(
+        OrderItem.order_id,
+        OrderItem.medicine_id,
+        OrderItem.name,
+        OrderItem.price,
+        OrderItem.quantity,
+        OrderItem.subtotal
+    ).filter(OrderItem.order_id.in_(order_ids)).order_by(OrderItem.order_id, OrderItem.position)
+    for order_id, medicine_id, name, price, quantity, subtotal in rows:
+        items[order_id].append({
+            "medicine_id": medicine_id,
+            "name": name,
+            "price": price,
+            "quantity": quantity,
+            "subtotal": subtotal
+        })
+    return items
+
+def order_to_dict(order: Order, items: List[dict]) -> dict:
+    return {
+        "id": order.id,
+        "customer_name": order.customer_name,
+        "phone": order.phone,
+        "address": order.address,
+        "items": items,
+        "total_price": order.total_price,
+        "status": order.status,
+        "created_at": format_timestamp(order.created_at)
     }
 
+def orders_to_dicts(db: Session, orders: List[Order]) -> List[dict]:
+    items = load_order_items(db, [order.id for order in orders])
+    return [order_to_dict(order, items[order.id]) for order in orders]
+
+ORDER_ITEMS_BACKFILL_KEY = "order_items_backfilled"
+
+def backfill_order_items(db: Session, batch_size: int = 1000) -> int:
+    """Pindahkan JSON Order.items lama ke tabel order_items per batch (commit tiap batch, bisa dilanjutkan)"""
+    categories = dict(db.query(Medicine.id, Medicine.category).all())
+    last_id = 0
+    total = 0
+    while True:
+        orders = db.query(Order.id, Order.legacy_items).filter(
+            Order.id > last_id, Order.legacy_items.isnot(None)
+        ).order_by(Order.id).limit(batch_size).all()
+        if not orders:
+            return total
+        last_id = orders[-1].id
+
+        rows = []
+        migrated = []
+        for order_id, legacy_items in orders:
+            try:
+                items = json.loads(legacy_items)
+            except ValueError:
+                print(f"⚠️  Order #{order_id}: JSON items tidak valid, dilewati")
+                continue
+            if not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+                # Misal "null" atau satu objek: biarkan di legacy_items untuk dicek manual
+                print(f"⚠️  Order #{order_id}: items bukan list item ({type(items).__name__}), dilewati")
+                continue
+            for position, item in enumerate(items):
+                # Obat yang sudah dihapus tetap tercatat namanya, tanpa medicine_id
+                medicine_id = item.get("medicine_id") if item.get("medicine_id") in categories else None
+                quantity = item.get("quantity", 1)
+                rows.append({
+                    "order_id": order_id,
+                    "position": position,
+                    "medicine_id": medicine_id,
+                    "name": item.get("name"),
+                    "category": categories.get(medicine_id),
+                    "price": item.get("price"),
+                    "quantity": quantity,
+                    "subtotal": item.get("subtotal", (item.get("price") or 0) * quantity),
+                })
+            migrated.append(order_id)
+
+        if rows:
+            db.execute(insert(OrderItem), rows)
+        if migrated:
+            db.query(Order).filter(Order.id.in_(migrated)).update({Order.legacy_items: None}, synchronize_session=False)
+        db.commit()
+        total += len(rows)
+
+def ensure_order_items(db: Session):
+    """Migrasi sekali untuk database lama yang masih menyimpan item order sebagai JSON"""
+    if db.get(AppMetadata, ORDER_ITEMS_BACKFILL_KEY):
+        return
+    try:
+        total = backfill_order_items(db)
+        db.merge(AppMetadata(key=ORDER_ITEMS_BACKFILL_KEY, value=utcnow().isoformat()))
+        db.commit()
+    except IntegrityError:
+        # Worker lain sedang/sudah memindahkan batch yang sama
+        db.rollback()
+        return
+    if total:
+        print(f"✅ {total} item order dipindah ke tabel order_items")
+
 @app.get("/api/orders/{phone}")
 def get_orders_by_phone(phone: str, db: Session = Depends(get_db)):
     """Mengambil riwayat pesanan berdasarkan nomor telepon"""
     orders = db.query(Order).filter(Order.phone == phone).order_by(Order.id.desc()).all()
-    
-    result = []
-    for order in orders:
-        result.append({
-            "id": order.id,
-            "customer_name": order.customer_name,
-            "phone": order.phone,
-            "address": order.address,
-            "items": json.loads(order.items),
-            "total_price": order.total_price,
-            "status": order.status,
-            "created_at": order.created_at
-        })
+    result = orders_to_dicts(db, orders)
     
     return {"orders": result}
 
+@app.get("/api/order/{order_id}/jobs")
+def get_order_jobs(order_id: int, db: Session = Depends(get_db)):
+    """Status job backup S3 & invoice untuk sebuah order"""
+    jobs = db.query(BackgroundJob).filter(BackgroundJob.order_id == order_id).order_by(BackgroundJob.id).all()
+    return {
+        "order_id": order_id,
+        "jobs": [{
+            "id": job.id,
+            "kind": job.kind,
+            "status": job.status,
+            "attempts": job.attempts,
+            "max_attempts": job.max_attempts,
+            "last_error": job.last_error,
+            "next_run_at": format_timestamp(job.next_run_at) if job.status == "pending" else None,
+            "updated_at": format_timestamp(job.updated_at)
+        } for job in jobs]
+    }
+
 # ==========================================
 # 11. ADMIN ENDPOINTS (PROTECTED)
 # ==========================================
+DASHBOARD_STATS_KEY = "dashboard_stats_built"
+
+def rebuild_dashboard_stats(db: Session):
+    """Hitung ulang dashboard_stats dari tabel orders (satu query GROUP BY status)"""
+    rows = db.query(
+        Order.status,
+        func.count(Order.id),
+        func.coalesce(func.sum(Order.total_price), 0),
+    ).group_by(Order.status).all()
+
+    db.query(DashboardStat).delete()
+    for order_status, order_count, total_revenue in rows:
+        db.add(DashboardStat(status=order_status, order_count=order_count, total_revenue=total_revenue))
+    db.merge(AppMetadata(key=DASHBOARD_STATS_KEY, value=utcnow().isoformat()))
+    db.commit()
+
+def ensure_dashboard_stats(db: Session):
+    """Backfill dashboard_stats sekali (database lama yang belum punya tabel statistik)"""
+    if db.query(AppMetadata).filter(AppMetadata.key == DASHBOARD_STATS_KEY).first():
+        return
+    try:
+        rebuild_dashboard_stats(db)
+    except IntegrityError:
+        # Worker lain sudah mengisi tabel statistik secara bersamaan
+        db.rollback()
+        return
+    print("✅ Statistik dashboard diisi dari data order")
+
+def bump_dashboard_stats(db: Session, order_status: str, count_delta: int, revenue_delta: float):
+    """Update counter statistik di transaksi pemanggil (atomic, tanpa read-modify-write)"""
+    updated = db.query(DashboardStat).filter(DashboardStat.status == order_status).update({
+        DashboardStat.order_count: DashboardStat.order_count + count_delta,
+        DashboardStat.total_revenue: DashboardStat.total_revenue + revenue_delta,
+    }, synchronize_session=False)
+    if updated:
+        return
+
+    # Status baru: buat barisnya, savepoint menangani insert bersamaan dari request lain
+    try:
+        with db.begin_nested():
+            db.add(DashboardStat(status=order_status, order_count=count_delta, total_revenue=revenue_delta))
+    except IntegrityError:
+        bump_dashboard_stats(db, order_status, count_delta, revenue_delta)
+
 @app.get("/api/admin/dashboard")
-def admin_dashboard(admin: User = Depends(get_admin_user), db: Session = Depends(get_db)):
+def admin_dashboard(admin: Principal = Depends(get_admin_user), db: Session = Depends(get_db)):
     """Dashboard admin dengan statistik"""
-    total_users = db.query(User).count()
-    total_orders = db.query(Order).count()
-    total_medicines = db.query(Medicine).count()
-    
-    # Hitung total revenue
-    orders = db.query(Order).all()
-    total_revenue = sum([order.total_price for order in orders])
-    
-    # Order pending
-    pending_orders = db.query(Order).filter(Order.status == "pending").count()
+    # Jumlah user & obat dalam satu query, statistik order dari tabel dashboard_stats
+    total_users, total_medicines = db.query(
+        db.query(func.count(User.id)).scalar_subquery(),
+        db.query(func.count(Medicine.id)).scalar_subquery(),
+    ).one()
+    order_stats = {row.status: row for row in db.query(DashboardStat).all()}
+
+    total_orders = sum(row.order_count for row in order_stats.values())
+    total_revenue = sum(row.total_revenue for row in order_stats.values())
+    pending_orders = order_stats["pending"].order_count if "pending" in order_stats else 0
     
     # Order terbaru
     recent_orders = db.query(Order).order_by(Order.id.desc()).limit(5).all()
@@ -1846,7 +3042,7 @@ def admin_dashboard(admin: User = Depends(get_admin_user), db: Session = Depends
             "customer_name": order.customer_name,
             "total_price": order.total_price,
             "status": order.status,
-            "created_at": order.created_at
+            "created_at": format_timestamp(order.created_at)
         })
     
     return {
@@ -1860,8 +3056,25 @@ def admin_dashboard(admin: User = Depends(get_admin_user), db: Session = Depends
         "recent_orders": recent_list
     }
 
+@app.get("/api/admin/diagnosis-cache")
+def admin_diagnosis_cache_stats(admin: Principal = Depends(get_admin_user)):
+    """Statistik cache diagnosa (hit/miss)"""
+    return diagnosis_cache.stats()
+
+@app.get("/api/admin/db-pool")
+def admin_db_pool_stats(admin: Principal = Depends(get_admin_user)):
+    """Statistik pool koneksi database (koneksi terpakai, overflow, lama menunggu)"""
+    stats = pool_stats(engine)
+    if write_engine is not engine:
+        stats["writer"] = pool_stats(write_engine)
+    if DB_ASYNC:
+        stats["async"] = pool_stats(async_engine)
+        if async_write_engine is not async_engine:
+            stats["async"]["writer"] = pool_stats(async_write_engine)
+    return stats
+
 @app.get("/api/admin/users")
-def admin_get_users(admin: User = Depends(get_admin_user), db: Session = Depends(get_db)):
+def admin_get_users(admin: Principal = Depends(get_admin_user), db: Session = Depends(get_db)):
     """Mendapatkan semua user"""
     users = db.query(User).all()
     return [{
@@ -1869,42 +3082,294 @@ def admin_get_users(admin: User = Depends(get_admin_user), db: Session = Depends
         "email": u.email,
         "name": u.name,
         "role": u.role,
-        "created_at": u.created_at
+        "created_at": format_timestamp(u.created_at)
     } for u in users]
 
+def parse_date_range(date_from: Optional[str], date_to: Optional[str]):
+    """Rentang tanggal YYYY-MM-DD (inklusif, zona APP_TIMEZONE) menjadi (awal, akhir eksklusif)"""
+    try:
+        start = datetime.strptime(date_from, "%Y-%m-%d").replace(tzinfo=APP_TIMEZONE) if date_from else None
+        end = datetime.strptime(date_to, "%Y-%m-%d").replace(tzinfo=APP_TIMEZONE) + timedelta(days=1) if date_to else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Format tanggal harus YYYY-MM-DD")
+    return start, end
+
+def filter_orders(query, order_status: Optional[str], phone: Optional[str],
+                  start: Optional[datetime], end: Optional[datetime]):
+    """Filter order berdasarkan status, telepon dan rentang waktu"""
+    if order_status:
+        query = query.filter(Order.status == order_status)
+    if phone:
+        query = query.filter(Order.phone == phone)
+    if start:
+        query = query.filter(Order.created_at >= start)
+    if end:
+        query = query.filter(Order.created_at < end)
+    return query
+
 @app.get("/api/admin/orders")
-def admin_get_orders(admin: User = Depends(get_admin_user), db: Session = Depends(get_db)):
-    """Mendapatkan semua order"""
-    orders = db.query(Order).order_by(Order.id.desc()).all()
-    result = []
-    for order in orders:
-        result.append({
-            "id": order.id,
-            "customer_name": order.customer_name,
-            "phone": order.phone,
-            "address": order.address,
-            "items": json.loads(order.items),
-            "total_price": order.total_price,
-            "status": order.status,
-            "created_at": order.created_at
-        })
-    return result
+def admin_get_orders(
+    cursor: Optional[int] = Query(None, description="id order terakhir dari halaman sebelumnya"),
+    limit: int = Query(50, ge=1, le=200),
+    order_status: Optional[str] = Query(None, alias="status"),
+    phone: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    admin: Principal = Depends(get_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Mendapatkan order per halaman (keyset pagination pada id, terbaru dulu)"""
+    start, end = parse_date_range(date_from, date_to)
+    query = filter_orders(db.query(Order), order_status, phone, start, end)
+    if cursor is not None:
+        query = query.filter(Order.id < cursor)
+    
+    # Ambil satu baris ekstra untuk mengetahui apakah masih ada halaman berikutnya
+    orders = query.order_by(Order.id.desc()).limit(limit + 1).all()
+    has_more = len(orders) > limit
+    orders = orders[:limit]
+    
+    return {
+        # Item semua order di halaman ini dimuat dengan satu query tambahan (bukan per order)
+        "orders": orders_to_dicts(db, orders),
+        "next_cursor": orders[-1].id if has_more else None
+    }
+
+EXPORT_COLUMNS = ["id", "customer_name", "phone", "address", "items", "total_price", "status", "created_at"]
+EXPORT_BATCH_SIZE = 500
+
+def iter_order_dicts(db: Session, query):
+    """Stream order per batch, item tiap batch dimuat dengan satu query"""
+    batch = []
+    for order in query:
+        batch.append(order)
+        if len(batch) >= EXPORT_BATCH_SIZE:
+            yield from orders_to_dicts(db, batch)
+            batch = []
+    if batch:
+        yield from orders_to_dicts(db, batch)
+
+@app.get("/api/admin/orders/export")
+def admin_export_orders(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    order_status: Optional[str] = Query(None, alias="status"),
+    phone: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    admin: Principal = Depends(get_admin_user)
+):
+    """Export order sebagai NDJSON/CSV secara streaming (server-side cursor)"""
+    import csv
+    import io
+
+    # Validasi filter sebelum response mulai dikirim
+    start, end = parse_date_range(date_from, date_to)
+
+    def generate_rows():
+        # Session sendiri karena generator tetap berjalan setelah handler selesai
+        db = SessionLocal()
+        try:
+            query = filter_orders(db.query(Order), order_status, phone, start, end)
+            query = query.order_by(Order.id.desc()).execution_options(stream_results=True).yield_per(EXPORT_BATCH_SIZE)
+            if format == "csv":
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                writer.writerow(EXPORT_COLUMNS)
+                for row in iter_order_dicts(db, query):
+                    row["items"] = json.dumps(row["items"])
+                    writer.writerow([row[column] for column in EXPORT_COLUMNS])
+                    yield buffer.getvalue()
+                    buffer.seek(0)
+                    buffer.truncate(0)
+                yield buffer.getvalue()
+            else:
+                for row in iter_order_dicts(db, query):
+                    yield json.dumps(row) + "\n"
+        finally:
+            db.close()
+
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    filename = f"orders_{utcnow().astimezone(APP_TIMEZONE).strftime('%Y%m%d_%H%M%S')}.{format}"
+    return StreamingResponse(
+        generate_rows(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
 
 class UpdateOrderStatus(BaseModel):
     status: str
 
 @app.put("/api/admin/orders/{order_id}")
-def admin_update_order(order_id: int, data: UpdateOrderStatus, admin: User = Depends(get_admin_user), db: Session = Depends(get_db)):
+def admin_update_order(order_id: int, data: UpdateOrderStatus, admin: Principal = Depends(get_admin_user), db: Session = Depends(get_write_db)):
     """Update status order"""
     order = db.query(Order).filter(Order.id == order_id).first()
     if not order:
         raise HTTPException(status_code=404, detail="Order tidak ditemukan")
     
-    order.status = data.status
-    db.commit()
+    old_status = order.status
+    if old_status != data.status:
+        # Update bersyarat agar perubahan bersamaan tidak menghitung statistik dua kali
+        updated = db.query(Order).filter(Order.id == order_id, Order.status == old_status).update(
+            {Order.status: data.status}, synchronize_session=False
+        )
+        if not updated:
+            db.rollback()
+            raise HTTPException(status_code=409, detail="Status order baru saja diubah, muat ulang data")
+        bump_dashboard_stats(db, old_status, -1, -order.total_price)
+        bump_dashboard_stats(db, data.status, 1, order.total_price)
+        db.commit()
     
     return {"status": "success", "message": f"Status order diubah ke {data.status}"}
 
+# Order batal tidak dihitung sebagai penjualan kecuali difilter eksplisit lewat ?status=
+SALES_EXCLUDED_STATUSES = ("cancelled",)
+
+def sales_query(db: Session, columns, order_status: Optional[str], date_from: Optional[str], date_to: Optional[str]):
+    """Query agregasi order_items; filter order lewat subquery id (semi-join) agar covering index tetap terpakai"""
+    start, end = parse_date_range(date_from, date_to)
+    query = db.query(*columns)
+    if order_status or start or end:
+        order_ids = filter_orders(db.query(Order.id), order_status, None, start, end)
+        if not order_status:
+            order_ids = order_ids.filter(Order.status.notin_(SALES_EXCLUDED_STATUSES))
+        return query.filter(OrderItem.order_id.in_(order_ids))
+    # Tanpa filter: cukup buang order batal (jauh lebih sedikit dari order valid)
+    return query.filter(OrderItem.order_id.notin_(
+        db.query(Order.id).filter(Order.status.in_(SALES_EXCLUDED_STATUSES))
+    ))
+
+@app.get("/api/admin/sales/top-medicines")
+def admin_top_medicines(
+    limit: int = Query(10, ge=1, le=100),
+    order_status: Optional[str] = Query(None, alias="status"),
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    admin: Principal = Depends(get_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Obat terlaris berdasarkan jumlah terjual (agregasi SQL di order_items)"""
+    quantity = func.sum(OrderItem.quantity).label("quantity")
+    rows = sales_query(db, [
+        OrderItem.medicine_id,
+        quantity,
+        func.sum(OrderItem.subtotal).label("revenue"),
+        func.count(func.distinct(OrderItem.order_id)).label("order_count"),
+    ], order_status, date_from, date_to).group_by(OrderItem.medicine_id).order_by(quantity.desc()).limit(limit).all()
+    # Nama diambil dari katalog setelah agregasi; item obat yang sudah dihapus punya medicine_id None
+    names = dict(db.query(Medicine.id, Medicine.name).filter(
+        Medicine.id.in_([row.medicine_id for row in rows if row.medicine_id is not None])
+    ).all())
+    return [{
+        "medicine_id": row.medicine_id,
+        "name": names.get(row.medicine_id),
+        "quantity": row.quantity,
+        "revenue": row.revenue,
+        "order_count": row.order_count
+    } for row in rows]
+
+@app.get("/api/admin/sales/categories")
+def admin_sales_by_category(
+    order_status: Optional[str] = Query(None, alias="status"),
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    admin: Principal = Depends(get_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Pendapatan & jumlah terjual per kategori obat"""
+    revenue = func.sum(OrderItem.subtotal).label("revenue")
+    rows = sales_query(db, [
+        OrderItem.category,
+        func.sum(OrderItem.quantity).label("quantity"),
+        revenue,
+        func.count(func.distinct(OrderItem.order_id)).label("order_count"),
+    ], order_status, date_from, date_to).group_by(OrderItem.category).order_by(revenue.desc()).all()
+    return [{
+        "category": row.category or "Lainnya",
+        "quantity": row.quantity,
+        "revenue": row.revenue,
+        "order_count": row.order_count
+    } for row in rows]
+
+# Batas rentang laporan agar jumlah bucket tetap kecil
+REPORT_MAX_DAYS_DAILY = 366
+REPORT_MAX_DAYS_HOURLY = 31
+
+def parse_report_range(date_from: str, date_to: str, max_days: int):
+    start, end = parse_date_range(date_from, date_to)
+    if end <= start:
+        raise HTTPException(status_code=400, detail="date_to harus sama atau setelah date_from")
+    if (end - start).days > max_days:
+        raise HTTPException(status_code=400, detail=f"Rentang laporan maksimal {max_days} hari")
+    return start, end
+
+def hour_bucket(column):
+    """Awal jam (UTC) dari kolom timestamp, dihitung di database"""
+    if engine.dialect.name == "sqlite":
+        return func.strftime("%Y-%m-%d %H:00:00", column)
+    return func.date_trunc("hour", func.timezone("UTC", column))
+
+def aggregate_by_hour(db: Session, column, start: datetime, end: datetime, aggregates: list, filters: list = ()):
+    """Agregat per jam UTC dalam [start, end); filter rentang memakai index B-tree kolom waktu.
+
+    Bucket per jam UTC lalu digabung per zona APP_TIMEZONE di Python, sehingga
+    benar untuk zona dengan DST (zona dengan offset setengah jam dibulatkan ke jam UTC).
+    """
+    bucket = hour_bucket(column).label("bucket")
+    rows = db.query(bucket, *aggregates).filter(column >= start, column < end, *filters).group_by(bucket).all()
+    result = []
+    for row in rows:
+        hour = datetime.strptime(row[0], "%Y-%m-%d %H:%M:%S") if isinstance(row[0], str) else row[0]
+        result.append((hour.replace(tzinfo=timezone.utc), row[1:]))
+    return result
+
+@app.get("/api/admin/reports/orders-per-day")
+def admin_orders_per_day(
+    date_from: str,
+    date_to: str,
+    order_status: Optional[str] = Query(None, alias="status"),
+    admin: Principal = Depends(get_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Jumlah order & pendapatan per hari (zona APP_TIMEZONE), hari tanpa order tetap ditampilkan"""
+    start, end = parse_report_range(date_from, date_to, REPORT_MAX_DAYS_DAILY)
+    filters = [Order.status == order_status] if order_status else [Order.status.notin_(SALES_EXCLUDED_STATUSES)]
+
+    days = {}
+    day = start
+    while day < end:
+        days[day.date()] = {"date": day.date().isoformat(), "orders": 0, "revenue": 0.0}
+        day += timedelta(days=1)
+    for hour, (order_count, revenue) in aggregate_by_hour(
+        db, Order.created_at, start, end,
+        [func.count(Order.id), func.coalesce(func.sum(Order.total_price), 0)], filters
+    ):
+        bucket = days.get(hour.astimezone(APP_TIMEZONE).date())
+        if bucket is not None:
+            bucket["orders"] += order_count
+            bucket["revenue"] += revenue
+    return {"timezone": APP_TIMEZONE.key, "days": list(days.values())}
+
+@app.get("/api/admin/reports/consultations-per-hour")
+def admin_consultations_per_hour(
+    date_from: str,
+    date_to: str,
+    admin: Principal = Depends(get_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Jumlah konsultasi (diagnosa) per jam, jam ditampilkan dalam zona APP_TIMEZONE"""
+    start, end = parse_report_range(date_from, date_to, REPORT_MAX_DAYS_HOURLY)
+    counts = dict(aggregate_by_hour(db, PatientRecord.created_at, start, end, [func.count(PatientRecord.id)]))
+
+    hours = []
+    hour = start.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    while hour < end:
+        hours.append({
+            "hour": hour.astimezone(APP_TIMEZONE).isoformat(),
+            "consultations": counts[hour][0] if hour in counts else 0
+        })
+        hour += timedelta(hours=1)
+    return {"timezone": APP_TIMEZONE.key, "hours": hours}
+
 class MedicineCreate(BaseModel):
     name: str
     description: str
@@ -1914,7 +3379,7 @@ class MedicineCreate(BaseModel):
     image_url: Optional[str] = None
 
 @app.post("/api/admin/medicines")
-def admin_add_medicine(data: MedicineCreate, admin: User = Depends(get_admin_user), db: Session = Depends(get_db)):
+def admin_add_medicine(data: MedicineCreate, admin: Principal = Depends(get_admin_user), db: Session = Depends(get_write_db)):
     """Tambah obat baru"""
     existing = db.query(Medicine).filter(Medicine.name == data.name).first()
     if existing:
@@ -1934,18 +3399,33 @@ def admin_add_medicine(data: MedicineCreate, admin: User = Depends(get_admin_use
     
     return {"status": "success", "message": "Obat berhasil ditambahkan", "medicine_id": new_medicine.id}
 
+class MedicineUpdate(MedicineCreate):
+    # Stok yang dilihat admin saat membuka form; perubahan stok diterapkan sebagai selisihnya
+    previous_stock: Optional[int] = None
+
 @app.put("/api/admin/medicines/{medicine_id}")
-def admin_update_medicine(medicine_id: int, data: MedicineCreate, admin: User = Depends(get_admin_user), db: Session = Depends(get_db)):
+def admin_update_medicine(medicine_id: int, data: MedicineUpdate, admin: Principal = Depends(get_admin_user), db: Session = Depends(get_write_db)):
     """Update obat"""
     medicine = db.query(Medicine).filter(Medicine.id == medicine_id).first()
     if not medicine:
         raise HTTPException(status_code=404, detail="Obat tidak ditemukan")
     
+    # Stok = stok fisik dikurangi reservasi keranjang, jadi jangan ditimpa langsung:
+    # reservasi/checkout yang terjadi sejak form dibuka tetap terhitung
+    previous_stock = data.previous_stock if data.previous_stock is not None else medicine.stock
+    try:
+        inventory.adjust(db, medicine_id, data.stock - previous_stock)
+    except StockShortage as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=400,
+            detail=f"Stok tersedia tinggal {e.shortfalls[0]['available']}, sisanya sedang di keranjang pembeli"
+        )
+    
     medicine.name = data.name
     medicine.description = data.description
     medicine.category = data.category
     medicine.price = data.price
-    medicine.stock = data.stock
     if data.image_url:
         medicine.image_url = data.image_url
     
@@ -1954,7 +3434,7 @@ def admin_update_medicine(medicine_id: int, data: MedicineCreate, admin: User =
     return {"status": "success", "message": "Obat berhasil diupdate"}
 
 @app.delete("/api/admin/medicines/{medicine_id}")
-def admin_delete_medicine(medicine_id: int, admin: User = Depends(get_admin_user), db: Session = Depends(get_db)):
+def admin_delete_medicine(medicine_id: int, admin: Principal = Depends(get_admin_user), db: Session = Depends(get_write_db)):
     """Hapus obat"""
     medicine = db.query(Medicine).filter(Medicine.id == medicine_id).first()
     if not medicine:
@@ -2046,7 +3526,7 @@ def list_available_images():
     return {"images": images, "total": len(images)}
 
 @app.get("/api/admin/images-usage")
-def get_images_usage(admin: User = Depends(get_admin_user), db: Session = Depends(get_db)):
+def get_images_usage(admin: Principal = Depends(get_admin_user), db: Session = Depends(get_db)):
     """Get mapping of images to products for admin"""
     import os
     images_dir = "static/images"
@@ -2094,7 +3574,7 @@ def seed_admin(db: Session):
             password=hash_password("admin123"),
             name="Administrator",
             role="admin",
-            created_at=datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            created_at=utcnow()
         )
         db.add(admin_user)
         db.commit()
@@ -2103,10 +3583,114 @@ def seed_admin(db: Session):
 # Jalankan seed saat startup
 @app.on_event("startup")
 def startup_event():
-    db = SessionLocal()
+    # Endpoint sync berjalan di threadpool AnyIO (default 40 thread); samakan dengan
+    # DB_POOL_SIZE + DB_MAX_OVERFLOW agar request tidak antre di pool koneksi
+    threadpool_size = os.getenv("THREADPOOL_SIZE", "").strip()
+    if threadpool_size:
+        anyio.to_thread.current_default_thread_limiter().total_tokens = int(threadpool_size)
+
+    db = WriteSessionLocal()
     try:
-        seed_diseases(db)
-        seed_medicines(db)
+        ensure_typed_timestamps(db)
+        seed_catalog(db)
         seed_admin(db)
+        ensure_order_items(db)
+        ensure_patient_indexes(db)
+        ensure_search_index(db)
+        ensure_disease_index(db)
+        ensure_suggest_index(db)
+        ensure_dashboard_stats(db)
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+    job_queue.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await run_in_threadpool(job_queue.stop)
+    password_hasher.shutdown()
+    await diagnosis_provider.aclose()
+    if DB_ASYNC:
+        await async_engine.dispose()
+        await async_write_engine.dispose()
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="HealthBridge backend management")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    seed_parser = subparsers.add_parser("seed", help="Seed katalog penyakit & obat")
+    seed_parser.add_argument("--force", action="store_true", help="Jalankan upsert walaupun versi seed sudah sama")
+    worker_parser = subparsers.add_parser("worker", help="Jalankan worker background job (backup S3 & invoice)")
+    worker_parser.add_argument("--workers", type=int, default=None, help="Jumlah thread worker (default: JOB_WORKERS)")
+    subparsers.add_parser("reindex", help="Bangun ulang index full-text search")
+    subparsers.add_parser("rebuild-stats", help="Hitung ulang tabel dashboard_stats dari data order")
+    batch_parser = subparsers.add_parser("diagnose-batch", help="Diagnosa massal dari CSV (kolom patient_name, symptoms)")
+    batch_parser.add_argument("csv_file", help="File CSV keluhan pasien")
+    batch_parser.add_argument("output", help="File hasil NDJSON (satu baris JSON per keluhan)")
+    invoices_parser = subparsers.add_parser("invoices", help="Render ulang & upload invoice PDF order ke S3 secara batch")
+    invoices_parser.add_argument("--all", action="store_true",
+                                 help="Render ulang semua invoice (default: hanya job invoice yang gagal permanen)")
+    args = parser.parse_args()
+
+    if args.command == "seed":
+        db = WriteSessionLocal()
+        try:
+            ensure_typed_timestamps(db)
+            if not seed_catalog(db, force=args.force):
+                print(f"ℹ️  Katalog sudah versi {SEED_VERSION}, tidak ada perubahan")
+            seed_admin(db)
+        finally:
+            db.close()
+    elif args.command == "reindex":
+        db = WriteSessionLocal()
+        try:
+            rebuild_search_index(db)
+        finally:
+            db.close()
+    elif args.command == "rebuild-stats":
+        db = WriteSessionLocal()
+        try:
+            rebuild_dashboard_stats(db)
+            print("✅ Statistik dashboard dihitung ulang")
+        finally:
+            db.close()
+    elif args.command == "diagnose-batch":
+        try:
+            rows = read_symptom_csv(args.csv_file)
+        except ValueError as e:
+            parser.error(str(e))
+
+        async def run_diagnose_batch():
+            try:
+                return await write_diagnose_batch(rows, diagnosis_provider, args.output)
+            finally:
+                await diagnosis_provider.aclose()
+
+        emergencies = asyncio.run(run_diagnose_batch())
+        print(f"✅ {len(rows)} keluhan didiagnosa ({emergencies} darurat) -> {args.output}")
+    elif args.command == "invoices":
+        from aws_service import s3_manager
+        from invoice_service import invoice_renderer
+
+        if not s3_manager.enabled:
+            parser.error("AWS S3 tidak aktif (AWS_ACCESS_KEY_ID / AWS_SECRET_ACCESS_KEY kosong)")
+        db = WriteSessionLocal()
+        try:
+            uploaded = regenerate_invoices(db, failed_only=not args.all)
+            print(f"✅ {uploaded} invoice dirender ulang & di-upload")
+        finally:
+            db.close()
+            invoice_renderer.shutdown()
+    elif args.command == "worker":
+        import time
+
+        if args.workers is not None:
+            job_queue.workers = args.workers
+        job_queue.workers = max(job_queue.workers, 1)
+        job_queue.start()
+        print(f"✅ Job worker berjalan ({job_queue.workers} thread), Ctrl+C untuk berhenti")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            job_queue.stop()
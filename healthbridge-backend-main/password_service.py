@@ -0,0 +1,113 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+import bcrypt
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+class PasswordHasherBusy(Exception):
+    """Antrian hashing penuh, request harus ditolak (HTTP 429)"""
+
+
+def _hash(password: str, rounds: int) -> str:
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=rounds)).decode('utf-8')
+
+
+def _verify(password: str, hashed_password: str) -> bool:
+    return bcrypt.checkpw(password.encode('utf-8'), hashed_password.encode('utf-8'))
+
+
+def pool_context():
+    """Start method process pool: worker baru tidak di-fork dari proses app yang multi-thread.
+
+    fork menyalin lock yang sedang dipegang thread lain (logging, pool koneksi DB,
+    client HTTP) sehingga worker bisa macet; forkserver/spawn memulai proses bersih.
+    """
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+class PasswordHasher:
+    """Hash & verifikasi bcrypt di process pool khusus agar tidak memakan threadpool/event loop.
+
+    Jumlah job yang sedang jalan + mengantri dibatasi max_pending. Jika penuh,
+    PasswordHasherBusy dilempar supaya request langsung ditolak daripada
+    menumpuk latensi untuk endpoint lain.
+    """
+
+    def __init__(self, rounds: int = 12, workers: Optional[int] = None, max_pending: Optional[int] = None):
+        self.rounds = rounds
+        self.workers = workers if workers is not None else (os.cpu_count() or 1)
+        self.max_pending = max_pending if max_pending is not None else max(self.workers, 1) * 8
+        self.pending = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+        # Pool dibuat saat pertama dipakai, bukan saat import (aman untuk fork worker uvicorn)
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _get_pool(self) -> Optional[ProcessPoolExecutor]:
+        if self.workers <= 0:
+            return None  # Tanpa process pool: jalan di threadpool default event loop
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=pool_context())
+            return self._pool
+
+    async def _submit(self, func, *args):
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise PasswordHasherBusy("Antrian hashing password penuh")
+            self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_pool(), func, *args)
+        finally:
+            with self._lock:
+                self.pending -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._submit(_hash, password, self.rounds)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await self._submit(_verify, password, hashed_password)
+
+    def hash_sync(self, password: str) -> str:
+        """Versi sync untuk seed/CLI (di luar request)"""
+        return _hash(password, self.rounds)
+
+    def verify_sync(self, password: str, hashed_password: str) -> bool:
+        return _verify(password, hashed_password)
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        """True jika hash dibuat dengan cost factor berbeda dari konfigurasi sekarang"""
+        try:
+            return int(hashed_password.split("$")[2]) != self.rounds
+        except (IndexError, ValueError):
+            return False
+
+    def shutdown(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+def create_hasher_from_env() -> PasswordHasher:
+    workers = os.getenv("PASSWORD_HASH_WORKERS", "").strip()
+    max_pending = os.getenv("PASSWORD_HASH_MAX_PENDING", "").strip()
+    return PasswordHasher(
+        rounds=int(os.getenv("BCRYPT_ROUNDS", "12")),
+        workers=int(workers) if workers else None,
+        max_pending=int(max_pending) if max_pending else None,
+    )
+
+
+# Initialize password hasher
+password_hasher = create_hasher_from_env()
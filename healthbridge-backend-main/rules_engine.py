@@ -0,0 +1,127 @@
+import json
+import os
+import re
+from typing import Dict, Hashable, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+EMERGENCY = "emergency"
+
+
+class KeywordMatcher:
+    """Cari semua keyword (termasuk yang overlap) dalam satu scan teks.
+
+    Satu regex terkompilasi (berbentuk trie) mencari kemunculan keyword dalam
+    satu scan. Keyword yang overlap pasti dimulai di dalam rentang match regex,
+    jadi hanya posisi di dalam rentang itu yang diperiksa ulang lewat trie.
+    Biaya scan tidak bertambah per rule seperti rantai `in` sebelumnya.
+    """
+
+    def __init__(self, keywords: Iterable[Tuple[str, Hashable]]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._out: List[Set[Hashable]] = [set()]
+
+        keywords = list(keywords)
+        for keyword, label in keywords:
+            state = 0
+            for ch in keyword:
+                next_state = self._goto[state].get(ch)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][ch] = next_state
+                    self._goto.append({})
+                    self._out.append(set())
+                state = next_state
+            self._out[state].add(label)
+
+        pattern = self._trie_pattern(0)
+        self._pattern = re.compile(pattern) if pattern else None
+
+    def _trie_pattern(self, state: int) -> str:
+        """Regex berbentuk trie (de(?:mam|...)) agar regex tidak mencoba tiap keyword satu per satu"""
+        branches = []
+        for ch, next_state in sorted(self._goto[state].items()):
+            if self._out[next_state]:
+                branches.append(re.escape(ch))  # keyword cukup sampai sini
+            else:
+                branches.append(re.escape(ch) + self._trie_pattern(next_state))
+        if not branches:
+            return ""
+        if len(branches) == 1:
+            return branches[0]
+        return "(?:%s)" % "|".join(branches)
+
+    def scan(self, text: str) -> Set[Hashable]:
+        goto, out = self._goto, self._out
+        found = set(out[0])  # keyword kosong selalu cocok
+        if self._pattern is None:
+            return found
+        length = len(text)
+        for match in self._pattern.finditer(text):
+            for start in range(match.start(), match.end()):
+                state = 0
+                position = start
+                while position < length:
+                    state = goto[state].get(text[position])
+                    if state is None:
+                        break
+                    if out[state]:
+                        found |= out[state]
+                    position += 1
+        return found
+
+
+class TriageResult(NamedTuple):
+    rule: Optional[dict]
+    is_emergency: bool
+
+
+class TriageRules:
+    """Rule mode simulasi + keyword darurat, dikompilasi sekali menjadi satu matcher.
+
+    Rule simulasi dievaluasi berurutan: rule pertama yang salah satu keyword-nya
+    muncul di keluhan yang dipakai, sama seperti rantai if/elif sebelumnya.
+    """
+
+    def __init__(self, simulation_rules: List[dict], default: dict, emergency_keywords: List[str]):
+        self.simulation_rules = simulation_rules
+        self.default = default
+        self.emergency_keywords = emergency_keywords
+
+        labels = [(keyword.lower(), index)
+                  for index, rule in enumerate(simulation_rules)
+                  for keyword in rule["keywords"]]
+        labels += [(keyword.lower(), EMERGENCY) for keyword in emergency_keywords]
+        self.matcher = KeywordMatcher(labels)
+
+    @classmethod
+    def from_file(cls, path: str) -> "TriageRules":
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(
+            simulation_rules=data["simulation"]["rules"],
+            default=data["simulation"]["default"],
+            emergency_keywords=data["emergency"]["keywords"],
+        )
+
+    def scan(self, symptoms: str) -> TriageResult:
+        found = self.matcher.scan(symptoms.lower())
+        rule_indexes = [label for label in found if label != EMERGENCY]
+        rule = self.simulation_rules[min(rule_indexes)] if rule_indexes else None
+        return TriageResult(rule=rule, is_emergency=EMERGENCY in found)
+
+    def simulate(self, symptoms: str, result: Optional[TriageResult] = None) -> Tuple[str, str]:
+        """OTAK 2: MODE SIMULASI (AUTO-DETECT), return (diagnosa, saran)"""
+        if result is None:
+            result = self.scan(symptoms)
+        if result.rule is not None:
+            return result.rule["diagnosis"], result.rule["advice"]
+        return self.default["diagnosis"], self.default["advice"].format(symptoms=symptoms)
+
+
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "diagnosis_rules.json")
+
+# Initialize triage rules
+triage_rules = TriageRules.from_file(os.getenv("DIAGNOSIS_RULES_PATH", DEFAULT_RULES_PATH))
@@ -0,0 +1,228 @@
+import re
+from typing import Dict, List, NamedTuple, Optional, Sequence, Set
+
+from sqlalchemy import event, inspect, text
+from sqlalchemy.exc import OperationalError
+
+from cache_service import STOPWORDS
+
+# Huruf & angka Unicode (nama obat/pasien bisa memakai huruf non-ASCII, misal "é")
+SEARCH_TOKEN_PATTERN = re.compile(r"[^\W_]+")
+
+# Varian kata yang dianggap sama saat mencari (keluhan pasien sering memakai sinonim)
+SYNONYM_GROUPS = [
+    ("sakit", "nyeri", "ngilu"),
+    ("pusing", "pening"),
+    ("demam", "meriang"),
+    ("mual", "enek"),
+    ("gatal", "gatel"),
+]
+SYNONYMS: Dict[str, Set[str]] = {word: set(group) for group in SYNONYM_GROUPS for word in group}
+
+PARTICLES = ("lah", "kah", "tah", "pun")
+POSSESSIVES = ("nya", "ku", "mu")
+SUFFIXES = ("kan", "an")
+# Prefix beserta huruf awal kata dasar yang luluh (meny+akit -> sakit)
+PREFIXES = (
+    ("meny", "s"), ("peny", "s"), ("meng", ""), ("peng", ""), ("mem", ""), ("pem", ""),
+    ("men", ""), ("pen", ""), ("ber", ""), ("ter", ""), ("me", ""), ("pe", ""),
+    ("di", ""), ("ke", ""), ("se", ""),
+)
+MIN_SUFFIX_STEM = 4
+MIN_PREFIX_STEM = 5
+
+
+def stem(word: str) -> str:
+    """Stemmer ringan bahasa Indonesia (partikel, kepemilikan, sufiks, lalu prefiks)"""
+    for group in (PARTICLES, POSSESSIVES, SUFFIXES):
+        for suffix in group:
+            if word.endswith(suffix) and len(word) - len(suffix) >= MIN_SUFFIX_STEM:
+                word = word[:-len(suffix)]
+                break
+    for prefix, restore in PREFIXES:
+        if word.startswith(prefix) and len(word) - len(prefix) + len(restore) >= MIN_PREFIX_STEM:
+            return restore + word[len(prefix):]
+    return word
+
+
+def tokenize(value: Optional[str]) -> List[str]:
+    return SEARCH_TOKEN_PATTERN.findall((value or "").lower())
+
+
+def index_text(value: Optional[str]) -> str:
+    """Teks yang disimpan di index: token asli + bentuk dasarnya"""
+    terms = []
+    seen = set()
+    for token in tokenize(value):
+        for term in (token, stem(token)):
+            if term not in seen:
+                seen.add(term)
+                terms.append(term)
+    return " ".join(terms)
+
+
+def query_terms(q: str) -> List[Set[str]]:
+    """Satu set varian per kata query; semua kata harus cocok (AND), varian cukup salah satu (OR)"""
+    terms = []
+    for token in tokenize(q):
+        if token in STOPWORDS:
+            continue
+        variants = {token, stem(token)}
+        for variant in list(variants):
+            variants |= SYNONYMS.get(variant, set())
+        terms.append(variants)
+    return terms
+
+
+class SearchSource(NamedTuple):
+    model: type
+    title_fields: Sequence[str]
+    body_fields: Sequence[str]
+
+    @property
+    def fields(self) -> Sequence[str]:
+        return tuple(self.title_fields) + tuple(self.body_fields)
+
+
+class SearchIndex:
+    """Index full-text per tabel: FTS5 di SQLite, tsvector + GIN di PostgreSQL.
+
+    Dokumen ditulis lewat mapper event di koneksi flush yang sama, jadi index
+    ikut commit/rollback bersama datanya. Update massal (query.update) tidak
+    memicu event; jalankan `python main.py reindex` setelahnya.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.dialect = engine.dialect.name
+        self.sources: Dict[str, SearchSource] = {}
+        self.enabled = self.dialect in ("sqlite", "postgresql")
+
+    def table(self, kind: str) -> str:
+        return f"search_{kind}"
+
+    def register(self, kind: str, model, title_fields: Sequence[str], body_fields: Sequence[str]):
+        source = SearchSource(model, title_fields, body_fields)
+        self.sources[kind] = source
+
+        @event.listens_for(model, "after_insert")
+        def index_inserted(mapper, connection, target):
+            self.upsert(connection, kind, target)
+
+        @event.listens_for(model, "after_update")
+        def index_updated(mapper, connection, target):
+            state = inspect(target)
+            if any(state.attrs[field].history.has_changes() for field in source.fields):
+                self.upsert(connection, kind, target)
+
+        @event.listens_for(model, "after_delete")
+        def index_deleted(mapper, connection, target):
+            self.delete(connection, kind, target.id)
+
+    def create_all(self):
+        if not self.enabled:
+            return
+        try:
+            with self.engine.begin() as connection:
+                for kind in self.sources:
+                    for statement in self._ddl(self.table(kind)):
+                        connection.execute(text(statement))
+        except OperationalError as e:
+            # Misal SQLite tanpa modul FTS5: kembali ke pencarian ILIKE
+            self.enabled = False
+            print(f"⚠️  Full-text search tidak tersedia, memakai ILIKE: {str(e)}")
+
+    def _ddl(self, table: str) -> List[str]:
+        if self.dialect == "sqlite":
+            return [
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {table} USING fts5("
+                f"title, body, tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+            ]
+        return [
+            f"CREATE TABLE IF NOT EXISTS {table} (id INTEGER PRIMARY KEY, document TSVECTOR NOT NULL)",
+            f"CREATE INDEX IF NOT EXISTS ix_{table}_document ON {table} USING GIN (document)",
+        ]
+
+    def _document(self, kind: str, target) -> dict:
+        source = self.sources[kind]
+        return {
+            "id": target.id,
+            "title": index_text(" ".join(str(getattr(target, f) or "") for f in source.title_fields)),
+            "body": index_text(" ".join(str(getattr(target, f) or "") for f in source.body_fields)),
+        }
+
+    def _upsert_sql(self, table: str) -> str:
+        if self.dialect == "sqlite":
+            return f"INSERT INTO {table}(rowid, title, body) VALUES (:id, :title, :body)"
+        return (
+            f"INSERT INTO {table} (id, document) VALUES (:id, "
+            f"setweight(to_tsvector('simple', :title), 'A') || setweight(to_tsvector('simple', :body), 'B')) "
+            f"ON CONFLICT (id) DO UPDATE SET document = EXCLUDED.document"
+        )
+
+    def _delete_sql(self, table: str) -> str:
+        column = "rowid" if self.dialect == "sqlite" else "id"
+        return f"DELETE FROM {table} WHERE {column} = :id"
+
+    def upsert(self, connection, kind: str, target):
+        if not self.enabled:
+            return
+        table = self.table(kind)
+        document = self._document(kind, target)
+        if self.dialect == "sqlite":
+            connection.execute(text(self._delete_sql(table)), {"id": document["id"]})
+        connection.execute(text(self._upsert_sql(table)), document)
+
+    def delete(self, connection, kind: str, doc_id: int):
+        if self.enabled:
+            connection.execute(text(self._delete_sql(self.table(kind))), {"id": doc_id})
+
+    def rebuild(self, db, kind: str, batch_size: int = 1000) -> int:
+        """Isi ulang index satu tabel dari data sumber (dalam transaksi pemanggil)"""
+        if not self.enabled:
+            return 0
+        source = self.sources[kind]
+        table = self.table(kind)
+        db.execute(text(f"DELETE FROM {table}"))
+
+        columns = [source.model.id] + [getattr(source.model, f) for f in source.fields]
+        total = 0
+        batch = []
+        for row in db.query(*columns).order_by(source.model.id).yield_per(batch_size):
+            batch.append(self._document(kind, row))
+            if len(batch) >= batch_size:
+                db.execute(text(self._upsert_sql(table)), batch)
+                total += len(batch)
+                batch = []
+        if batch:
+            db.execute(text(self._upsert_sql(table)), batch)
+            total += len(batch)
+        return total
+
+    def _match_query(self, terms: List[Set[str]]) -> str:
+        if self.dialect == "sqlite":
+            return " AND ".join("(%s)" % " OR ".join(f'"{v}"*' for v in sorted(variants)) for variants in terms)
+        return " & ".join("(%s)" % " | ".join(f"{v}:*" for v in sorted(variants)) for variants in terms)
+
+    def search(self, db, kind: str, q: str, limit: int = 50, offset: int = 0) -> List[int]:
+        """Id dokumen yang cocok, urut berdasarkan relevansi (judul lebih berbobot).
+
+        Hanya mencocokkan awal kata ("para" menemukan "Paracetamol", "amol" tidak);
+        query yang kosong setelah tokenisasi (misal hanya stopword) menghasilkan [].
+        """
+        terms = query_terms(q)
+        if not terms:
+            return []
+        table = self.table(kind)
+        if self.dialect == "sqlite":
+            sql = (
+                f"SELECT rowid FROM {table} WHERE {table} MATCH :q "
+                f"ORDER BY bm25({table}, 10.0, 1.0), rowid DESC LIMIT :limit OFFSET :offset"
+            )
+        else:
+            sql = (
+                f"SELECT id FROM {table}, to_tsquery('simple', :q) query WHERE document @@ query "
+                f"ORDER BY ts_rank(document, query) DESC, id DESC LIMIT :limit OFFSET :offset"
+            )
+        rows = db.execute(text(sql), {"q": self._match_query(terms), "limit": limit, "offset": offset})
+        return [row[0] for row in rows]
@@ -0,0 +1,205 @@
+import heapq
+import threading
+from collections import defaultdict
+from typing import Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+from cache_service import TOKEN_PATTERN
+
+# Node trie dipecah per karakter berikutnya jika menampung lebih dari ini
+BURST_SIZE = 64
+MAX_SUGGESTIONS = 20
+
+EntryKey = Tuple[str, Hashable]
+
+
+def normalize(text: Optional[str]) -> str:
+    return " ".join(TOKEN_PATTERN.findall((text or "").lower()))
+
+
+class _Node:
+    __slots__ = ("pairs", "children", "top")
+
+    def __init__(self):
+        self.pairs: Set[Tuple[str, "EntryKey"]] = set()  # (key teks, entri)
+        self.children: Optional[Dict[str, "_Node"]] = None  # None = belum dipecah
+        self.top: Optional[List["EntryKey"]] = None  # Top-k subtree, None = perlu dihitung ulang
+
+
+class SuggestIndex:
+    """Index autocomplete nama & kategori obat/penyakit.
+
+    Setiap entri didaftarkan dengan beberapa key: teks lengkap dan potongan
+    mulai dari setiap kata ("cold flu" untuk "Panadol Cold & Flu"). Key disimpan
+    di burst trie: node baru dipecah per karakter jika isinya > BURST_SIZE.
+    Tiap node menyimpan top-k subtree-nya, dihitung ulang hanya jika ada
+    perubahan di jalurnya. Urutan hasil: popularitas tertinggi, lalu teks
+    terpendek.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self):
+        self.loaded = False
+        self._root = _Node()
+        # (type, id) -> {"text", "type", "id", "weight"}
+        self._entries: Dict[EntryKey, dict] = {}
+        self._entry_keys: Dict[EntryKey, List[str]] = {}
+        self._popularity: Dict[EntryKey, int] = defaultdict(int)
+        # (type kategori, nama lowercase) -> anggota, dan item -> kategori
+        self._category_members: Dict[EntryKey, Set[EntryKey]] = defaultdict(set)
+        self._item_category: Dict[EntryKey, EntryKey] = {}
+
+    def rebuild(self, items: Iterable[Tuple[str, int, str, Optional[str]]], popularity: Dict[EntryKey, int]):
+        """items: (type, id, nama, kategori), popularity: {(type, id): jumlah}"""
+        with self._lock:
+            self._reset()
+            self._popularity.update(popularity)
+            for kind, ref_id, name, category in items:
+                self._upsert(kind, ref_id, name, category)
+            self.loaded = True
+
+    def upsert(self, kind: str, ref_id: int, name: str, category: Optional[str]):
+        with self._lock:
+            self._upsert(kind, ref_id, name, category)
+
+    def remove(self, kind: str, ref_id: int):
+        with self._lock:
+            self._remove_item((kind, ref_id))
+            self._popularity.pop((kind, ref_id), None)
+
+    def add_popularity(self, kind: str, ref_id: int, amount: int = 1):
+        with self._lock:
+            key = (kind, ref_id)
+            self._popularity[key] += amount
+            if key not in self._entries:
+                return
+            self._set_weight(key, self._entries[key]["weight"] + amount)
+            category_key = self._item_category.get(key)
+            if category_key is not None:
+                self._set_weight(category_key, self._entries[category_key]["weight"] + amount)
+
+    def _upsert(self, kind: str, ref_id: int, name: str, category: Optional[str]):
+        key = (kind, ref_id)
+        self._remove_item(key)
+        weight = self._popularity.get(key, 0)
+        self._add_entry(key, {"text": name, "type": kind, "id": ref_id, "weight": weight})
+
+        if category:
+            # Bobot kategori: total popularitas anggotanya
+            category_key = (f"{kind}_category", category.lower())
+            self._item_category[key] = category_key
+            self._category_members[category_key].add(key)
+            if category_key not in self._entries:
+                self._add_entry(category_key, {"text": category, "type": category_key[0], "id": None, "weight": 0})
+            self._set_weight(category_key, self._entries[category_key]["weight"] + weight)
+
+    def _remove_item(self, key: EntryKey):
+        entry = self._remove_entry(key)
+        category_key = self._item_category.pop(key, None)
+        if category_key is None:
+            return
+        members = self._category_members[category_key]
+        members.discard(key)
+        if members:
+            self._set_weight(category_key, self._entries[category_key]["weight"] - entry["weight"])
+        else:
+            del self._category_members[category_key]
+            self._remove_entry(category_key)
+
+    def _path(self, prefix: str, create: bool = False) -> List[_Node]:
+        """Node dari root sampai node yang menampung (atau akan menampung) key ini"""
+        node = self._root
+        path = [node]
+        depth = 0
+        while node.children is not None and depth < len(prefix):
+            child = node.children.get(prefix[depth])
+            if child is None:
+                if not create:
+                    return path
+                child = node.children[prefix[depth]] = _Node()
+            node = child
+            path.append(node)
+            depth += 1
+        return path
+
+    def _burst(self, node: _Node, depth: int):
+        node.children = {}
+        for pair in list(node.pairs):
+            if len(pair[0]) > depth:
+                node.pairs.discard(pair)
+                child = node.children.setdefault(pair[0][depth], _Node())
+                child.pairs.add(pair)
+        for child in node.children.values():
+            if len(child.pairs) > BURST_SIZE:
+                self._burst(child, depth + 1)
+
+    def _invalidate(self, key: EntryKey):
+        for prefix in self._entry_keys[key]:
+            for node in self._path(prefix):
+                node.top = None
+
+    def _set_weight(self, key: EntryKey, weight: int):
+        self._entries[key]["weight"] = weight
+        self._invalidate(key)
+
+    def _add_entry(self, key: EntryKey, entry: dict):
+        self._entries[key] = entry
+        tokens = normalize(entry["text"]).split()
+        self._entry_keys[key] = [" ".join(tokens[i:]) for i in range(len(tokens))]
+        for prefix in self._entry_keys[key]:
+            path = self._path(prefix, create=True)
+            node = path[-1]
+            node.pairs.add((prefix, key))
+            for visited in path:
+                visited.top = None
+            if node.children is None and len(node.pairs) > BURST_SIZE:
+                self._burst(node, len(path) - 1)
+
+    def _remove_entry(self, key: EntryKey) -> Optional[dict]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        self._invalidate(key)
+        for prefix in self._entry_keys.pop(key):
+            self._path(prefix)[-1].pairs.discard((prefix, key))
+        del self._entries[key]
+        return entry
+
+    def _rank(self, key: EntryKey):
+        entry = self._entries[key]
+        return (-entry["weight"], len(entry["text"]), entry["text"])
+
+    def _top(self, node: _Node) -> List[EntryKey]:
+        # Top-k subtree = top-k dari (entri node ini + top-k tiap anak)
+        if node.top is None:
+            candidates = {key for _, key in node.pairs}
+            for child in (node.children or {}).values():
+                candidates.update(self._top(child))
+            node.top = heapq.nsmallest(MAX_SUGGESTIONS, candidates, key=self._rank)
+        return node.top
+
+    def suggest(self, q: str, limit: int = 8) -> List[dict]:
+        prefix = normalize(q)
+        if not prefix:
+            return []
+
+        with self._lock:
+            path = self._path(prefix)
+            node = path[-1]
+            depth = len(path) - 1
+            if depth == len(prefix):
+                top = self._top(node)
+            elif node.children is None:
+                # Node belum dipecah (isinya <= BURST_SIZE): saring key-nya langsung
+                matched = {key for text, key in node.pairs if text.startswith(prefix)}
+                top = heapq.nsmallest(MAX_SUGGESTIONS, matched, key=self._rank)
+            else:
+                return []
+
+            results = []
+            for key in top[:limit]:
+                entry = self._entries[key]
+                results.append({"text": entry["text"], "type": entry["type"], "id": entry["id"]})
+            return results
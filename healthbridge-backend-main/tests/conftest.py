@@ -0,0 +1,38 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# Konfigurasi test harus terpasang sebelum main.py di-import (engine & singleton dibuat saat import)
+TEST_DIR = tempfile.mkdtemp(prefix="healthbridge-test-")
+os.environ.update({
+    "DATABASE_URL": f"sqlite:///{TEST_DIR}/healthbridge.db",
+    "JOB_WORKERS": "0",
+    "GEMINI_API_KEY": "",
+    "AWS_ACCESS_KEY_ID": "",
+    "AWS_SECRET_ACCESS_KEY": "",
+    "DIAGNOSIS_CACHE_REDIS_URL": "",
+    "AUTH_CACHE_REDIS_URL": "",
+    "BCRYPT_ROUNDS": "4",
+    "PASSWORD_HASH_WORKERS": "0",
+    "INVOICE_RENDER_WORKERS": "0",
+})
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# static/ & data/ dibuat relatif ke working directory, jangan di dalam repo
+os.chdir(TEST_DIR)
+
+
+@pytest.fixture(scope="session")
+def main_module():
+    import main
+    return main
+
+
+@pytest.fixture(scope="session")
+def client(main_module):
+    from fastapi.testclient import TestClient
+
+    # Context manager menjalankan event startup (seed katalog, index, admin)
+    with TestClient(main_module.app) as test_client:
+        yield test_client
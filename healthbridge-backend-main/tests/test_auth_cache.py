@@ -0,0 +1,105 @@
+import uuid
+
+import pytest
+
+from cache_service import PrincipalCache
+
+ADMIN_ENDPOINT = "/api/admin/diagnosis-cache"
+
+
+class SharedRedis:
+    """Pengganti client Redis sync (get/incr/expire) yang dipakai bersama beberapa "worker" """
+
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key):
+        value = self.values.get(key)
+        return None if value is None else str(value).encode()
+
+    def incr(self, key):
+        self.values[key] = self.values.get(key, 0) + 1
+        return self.values[key]
+
+    def expire(self, key, seconds):
+        return True
+
+
+def worker_cache(redis):
+    cache = PrincipalCache(max_entries=100, ttl_seconds=60)
+    cache.redis = redis
+    return cache
+
+
+@pytest.fixture
+def admin(main_module, client):
+    """Admin baru (email unik) beserta header token-nya"""
+    email = f"admin-{uuid.uuid4().hex[:8]}@healthbridge.com"
+    db = main_module.WriteSessionLocal()
+    try:
+        db.add(main_module.User(email=email, password=main_module.hash_password("rahasia"), name="Admin Test",
+                                role="admin", created_at=main_module.utcnow()))
+        db.commit()
+    finally:
+        db.close()
+    response = client.post("/api/auth/login", json={"email": email, "password": "rahasia"})
+    assert response.status_code == 200
+    return email, {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def demote(main_module, email, bulk=False):
+    db = main_module.WriteSessionLocal()
+    try:
+        query = db.query(main_module.User).filter(main_module.User.email == email)
+        if bulk:
+            # UPDATE langsung tanpa event ORM, seperti perubahan yang terjadi di worker lain
+            query.update({main_module.User.role: "user"}, synchronize_session=False)
+        else:
+            query.one().role = "user"
+        db.commit()
+    finally:
+        db.close()
+
+
+def test_demoted_admin_gets_403_on_next_request(main_module, client, admin):
+    email, headers = admin
+    assert client.get(ADMIN_ENDPOINT, headers=headers).status_code == 200
+    assert main_module.principal_cache.get(email) is not None
+
+    demote(main_module, email)
+    assert client.get(ADMIN_ENDPOINT, headers=headers).status_code == 403
+
+
+def test_demotion_in_other_worker_reaches_this_worker(main_module, client, admin, monkeypatch):
+    redis = SharedRedis()
+    monkeypatch.setattr(main_module, "principal_cache", worker_cache(redis))
+    email, headers = admin
+    assert client.get(ADMIN_ENDPOINT, headers=headers).status_code == 200
+    assert client.get(ADMIN_ENDPOINT, headers=headers).status_code == 200
+    assert main_module.principal_cache.hits == 1
+
+    # Worker lain menurunkan role: hanya generasi bersama di Redis yang berubah di sini
+    demote(main_module, email, bulk=True)
+    worker_cache(redis).invalidate(email)
+    assert client.get(ADMIN_ENDPOINT, headers=headers).status_code == 403
+
+
+def test_shared_generation_invalidates_every_worker():
+    redis = SharedRedis()
+    first, second = worker_cache(redis), worker_cache(redis)
+    first.set("budi@example.com", "principal", first.generation("budi@example.com"))
+    assert first.get("budi@example.com", first.generation("budi@example.com")) == "principal"
+
+    second.invalidate("budi@example.com")
+    assert first.get("budi@example.com", first.generation("budi@example.com")) is None
+
+
+def test_unreadable_generation_bypasses_cache():
+    class BrokenRedis(SharedRedis):
+        def get(self, key):
+            raise ConnectionError("redis mati")
+
+    cache = worker_cache(BrokenRedis())
+    generation = cache.generation("budi@example.com")
+    cache.set("budi@example.com", "principal", generation)
+    assert cache.get("budi@example.com", generation) is None
@@ -0,0 +1,19 @@
+from sqlalchemy import insert
+
+
+def test_write_session_uses_writer_from_first_query(main_module):
+    db = main_module.WriteSessionLocal()
+    try:
+        # Query baca pertama pun sudah di koneksi penulis (snapshot sama dengan tulisannya)
+        assert db.get_bind(main_module.Medicine) is main_module.write_engine
+    finally:
+        db.close()
+
+
+def test_read_session_never_switches_to_writer(main_module):
+    db = main_module.SessionLocal()
+    try:
+        db.query(main_module.Medicine.id).first()
+        assert db.get_bind(main_module.Medicine, clause=insert(main_module.Medicine)) is main_module.engine
+    finally:
+        db.close()
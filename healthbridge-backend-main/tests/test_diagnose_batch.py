@@ -0,0 +1,123 @@
+import asyncio
+import json
+import uuid
+
+import pytest
+
+PARTNER_KEY = "mitra-test-key"
+# Keluhan ke-0, 1 & 3 punya bentuk kanonik sama ("demam pusing"): cukup satu panggilan provider
+SYMPTOMS = ["demam pusing", "pusing demam", "batuk kering", "Demam, pusing!", "sakit perut"]
+
+
+class StubProvider:
+    """Pengganti GeminiProvider: mencatat prompt, menjawab teks tetap"""
+
+    def __init__(self, main_module):
+        self.placeholder = main_module.PATIENT_PLACEHOLDER
+        self.prompts = []
+
+    async def generate(self, prompt):
+        self.prompts.append(prompt)
+        await asyncio.sleep(0)
+        return f"Flu biasa. {self.placeholder} sebaiknya istirahat cukup."
+
+
+@pytest.fixture
+def provider(main_module, client, monkeypatch):
+    provider = StubProvider(main_module)
+    main_module.app.dependency_overrides[main_module.get_diagnosis_provider] = lambda: provider
+    main_module.diagnosis_cache.clear()
+    monkeypatch.setattr(main_module, "PARTNER_API_KEYS", [PARTNER_KEY])
+    yield provider
+    main_module.app.dependency_overrides.pop(main_module.get_diagnosis_provider, None)
+    main_module.diagnosis_cache.clear()
+
+
+@pytest.fixture
+def chunks(main_module, monkeypatch):
+    """Ukuran chunk yang disimpan per transaksi (chunk kecil agar batch terpecah)"""
+    sizes = []
+    record_chunk = main_module.record_diagnosis_chunk
+
+    def recording_chunk(db, rows, drafts):
+        sizes.append(len(rows))
+        return record_chunk(db, rows, drafts)
+
+    monkeypatch.setattr(main_module, "DIAGNOSE_BATCH_CHUNK", 2)
+    monkeypatch.setattr(main_module, "record_diagnosis_chunk", recording_chunk)
+    return sizes
+
+
+def batch_rows(prefix):
+    return [{"patient_name": f"{prefix}-{i}", "symptoms": symptoms} for i, symptoms in enumerate(SYMPTOMS)]
+
+
+def stored_names(main_module, prefix):
+    db = main_module.SessionLocal()
+    try:
+        records = db.query(main_module.PatientRecord.name).filter(
+            main_module.PatientRecord.name.like(f"{prefix}-%")
+        ).order_by(main_module.PatientRecord.id)
+        return [name for name, in records]
+    finally:
+        db.close()
+
+
+def test_batch_streams_rows_in_order(main_module, client, provider, chunks):
+    prefix = uuid.uuid4().hex[:8]
+    response = client.post("/api/diagnose/batch", json=batch_rows(prefix), headers={"X-API-Key": PARTNER_KEY})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    results = [json.loads(line) for line in response.text.splitlines()]
+    assert [result["row"] for result in results] == list(range(len(SYMPTOMS)))
+    assert [result["patient"] for result in results] == [f"{prefix}-{i}" for i in range(len(SYMPTOMS))]
+    assert f"{prefix}-3 sebaiknya istirahat" in results[3]["suggestion"]
+
+    # Satu panggilan provider per keluhan kanonik, termasuk duplikat di chunk berikutnya
+    assert len(provider.prompts) == 3
+    # Disimpan per chunk (satu transaksi per chunk), urut sesuai input
+    assert chunks == [2, 2, 1]
+    assert stored_names(main_module, prefix) == [f"{prefix}-{i}" for i in range(len(SYMPTOMS))]
+
+
+@pytest.mark.parametrize("headers", [{}, {"X-API-Key": "salah"}])
+def test_batch_requires_partner_key(client, provider, headers):
+    response = client.post("/api/diagnose/batch", json=batch_rows("tanpa-key"), headers=headers)
+    assert response.status_code == 401
+    assert provider.prompts == []
+
+
+def test_batch_rejects_too_many_rows(main_module, client, provider, monkeypatch):
+    monkeypatch.setattr(main_module, "DIAGNOSE_BATCH_MAX_ROWS", len(SYMPTOMS) - 1)
+    prefix = uuid.uuid4().hex[:8]
+    response = client.post("/api/diagnose/batch", json=batch_rows(prefix), headers={"X-API-Key": PARTNER_KEY})
+    assert response.status_code == 413
+    assert provider.prompts == []
+    assert stored_names(main_module, prefix) == []
+
+
+def test_cli_writes_ndjson_in_input_order(main_module, client, provider, chunks, tmp_path):
+    prefix = uuid.uuid4().hex[:8]
+    csv_file = tmp_path / "keluhan.csv"
+    csv_file.write_text("patient_name,symptoms\n" + "".join(
+        f'{row["patient_name"]},"{row["symptoms"]}"\n' for row in batch_rows(prefix)
+    ), encoding="utf-8")
+    output = tmp_path / "hasil.ndjson"
+
+    rows = main_module.read_symptom_csv(str(csv_file))
+    asyncio.run(main_module.write_diagnose_batch(rows, provider, str(output)))
+
+    results = [json.loads(line) for line in output.read_text(encoding="utf-8").splitlines()]
+    assert [(result["row"], result["patient"]) for result in results] == [
+        (i, f"{prefix}-{i}") for i in range(len(SYMPTOMS))
+    ]
+    assert len(provider.prompts) == 3
+    assert chunks == [2, 2, 1]
+
+
+def test_cli_rejects_csv_without_symptoms_column(main_module, tmp_path):
+    csv_file = tmp_path / "keluhan.csv"
+    csv_file.write_text("patient_name,keluhan\nBudi,demam\n", encoding="utf-8")
+    with pytest.raises(ValueError, match="symptoms"):
+        main_module.read_symptom_csv(str(csv_file))
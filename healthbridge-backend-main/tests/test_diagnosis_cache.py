@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+
+from cache_service import DiagnosisCache
+
+
+class RecordingProvider:
+    """Pengganti GeminiProvider: mencatat prompt, menjawab dengan placeholder nama pasien"""
+
+    def __init__(self, main_module):
+        self.placeholder = main_module.PATIENT_PLACEHOLDER
+        self.prompts = []
+
+    async def generate(self, prompt):
+        self.prompts.append(prompt)
+        return f"Flu biasa. {self.placeholder} sebaiknya istirahat cukup dan minum air putih hangat."
+
+
+@pytest.fixture
+def provider(main_module, client):
+    provider = RecordingProvider(main_module)
+    main_module.app.dependency_overrides[main_module.get_diagnosis_provider] = lambda: provider
+    main_module.diagnosis_cache.clear()
+    yield provider
+    main_module.app.dependency_overrides.pop(main_module.get_diagnosis_provider, None)
+    main_module.diagnosis_cache.clear()
+
+
+def diagnose(client, name, symptoms):
+    response = client.post("/api/diagnose", json={"patient_name": name, "symptoms": symptoms})
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_patient_name_never_sent_to_provider_or_cached(main_module, client, provider):
+    symptoms = "pilek bersin hidung tersumbat sejak kemarin"
+    first = diagnose(client, "Siti Aminah", symptoms)
+    second = diagnose(client, "Budi", symptoms)
+
+    # Pasien kedua dilayani dari cache: satu panggilan provider saja
+    assert len(provider.prompts) == 1
+    assert "Siti" not in provider.prompts[0]
+    assert "Siti Aminah sebaiknya istirahat" in first["suggestion"]
+    assert "Budi sebaiknya istirahat" in second["suggestion"]
+    assert "Siti" not in second["suggestion"] + second["ai_diagnosis"]
+
+    cached = asyncio.run(main_module.diagnosis_cache.get(main_module.diagnosis_cache.make_key(symptoms)))
+    assert "Siti" not in cached["advice"]
+    assert main_module.PATIENT_PLACEHOLDER in cached["advice"]
+
+
+def test_short_patient_name_does_not_corrupt_cached_text(main_module, client, provider):
+    symptoms = "batuk kering tenggorokan gatal"
+    diagnose(client, "a", symptoms)
+    again = diagnose(client, "Rina", symptoms)
+    assert again["suggestion"] == "Rina sebaiknya istirahat cukup dan minum air putih hangat"
+
+
+@pytest.mark.parametrize("text, ready, held", [
+    ("Halo {{nama", "Halo ", "{{nama"),
+    ("Halo {", "Halo ", "{"),
+    ("Halo {{nama_pasien}}", "Halo {{nama_pasien}}", ""),
+    ("tanpa placeholder", "tanpa placeholder", ""),
+])
+def test_split_placeholder_tail(main_module, text, ready, held):
+    assert main_module.split_placeholder_tail(text) == (ready, held)
+
+
+def test_cache_stats_counts_hits_and_misses():
+    cache = DiagnosisCache(max_entries=10, ttl_seconds=60)
+
+    async def exercise():
+        await cache.get("demam")
+        await cache.set("demam", {"diagnosis": "x"})
+        await asyncio.gather(*(cache.get("demam") for _ in range(50)))
+
+    asyncio.run(exercise())
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (50, 1, 1)
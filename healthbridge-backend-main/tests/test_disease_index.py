@@ -0,0 +1,88 @@
+import random
+
+import pytest
+
+from disease_index import DiseaseIndex
+
+WORDS = ("demam panas pusing kepala mual muntah nyeri dada sesak napas batuk pilek gatal kulit merah "
+         "ruam bengkak sakit gigi mata telinga diare lemas kejang berdenyut tenggorokan perut kembung").split()
+
+
+def legacy_best_match(diseases, symptoms, diagnosis_clean):
+    """Scoring loop /api/diagnose sebelum ada DiseaseIndex (acuan hasil)"""
+    best_match = None
+    best_score = 0
+    for disease in diseases:
+        score = 0
+        if disease["name"].lower() in diagnosis_clean.lower() or diagnosis_clean.lower() in disease["name"].lower():
+            score += 10
+        disease_keywords = [k.strip().lower() for k in disease["symptoms"].split(',')]
+        symptom_words = [w.strip().lower() for w in symptoms.lower().split()]
+        for keyword in disease_keywords:
+            for word in symptom_words:
+                if len(word) > 3:
+                    if word in keyword or keyword in word:
+                        score += 2
+                    elif word[:4] == keyword[:4]:
+                        score += 1
+        if score > best_score:
+            best_score = score
+            best_match = disease
+    return (best_match["id"] if best_match else None), best_score
+
+
+def random_catalog(rng, size):
+    def phrase():
+        return " ".join(rng.choice(WORDS) + rng.choice(["", "s", "an", "nya"]) for _ in range(rng.randint(1, 3)))
+
+    diseases = [{
+        "id": i + 1,
+        "name": phrase() + (f" {i}" if rng.random() < 0.9 else ""),
+        # Keyword kosong / koma ganda ikut diuji (keyword "" cocok dengan semua kata)
+        "symptoms": ", ".join(phrase() for _ in range(rng.randint(1, 7))) + rng.choice(["", ", ", ",,"]),
+    } for i in range(size)]
+    queries = [(" ".join(phrase() for _ in range(rng.randint(1, 4))),
+                rng.choice([phrase(), "", "sakit", "Demam (Viral Infection)", "x", phrase().upper()]))
+               for _ in range(150)]
+    return diseases, queries
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_best_match_matches_legacy_loop(seed):
+    rng = random.Random(seed)
+    diseases, queries = random_catalog(rng, 300)
+    index = DiseaseIndex()
+    index.rebuild(diseases)
+    for symptoms, diagnosis in queries:
+        assert index.best_match(symptoms, diagnosis) == legacy_best_match(diseases, symptoms, diagnosis)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_incremental_updates_match_legacy_loop(seed):
+    rng = random.Random(100 + seed)
+    diseases, queries = random_catalog(rng, 300)
+    index = DiseaseIndex()
+    index.rebuild(diseases)
+
+    remaining = []
+    for disease in diseases:
+        if disease["id"] % 7 == 0:
+            index.remove(disease["id"])
+        elif disease["id"] % 11 == 0:
+            disease = dict(disease, name=disease["name"] + " kronis", symptoms="mual, muntah hebat")
+            index.upsert(disease)
+            remaining.append(disease)
+        else:
+            remaining.append(disease)
+
+    for symptoms, diagnosis in queries:
+        assert index.best_match(symptoms, diagnosis) == legacy_best_match(remaining, symptoms, diagnosis)
+
+
+def test_best_matches_equals_best_match_per_row():
+    diseases, queries = random_catalog(random.Random(7), 300)
+    index = DiseaseIndex()
+    index.rebuild(diseases)
+    # Keluhan berulang: cache kata/diagnosa di best_matches tidak boleh mengubah hasil
+    queries = queries + queries[:50]
+    assert index.best_matches(queries) == [index.best_match(symptoms, diagnosis) for symptoms, diagnosis in queries]
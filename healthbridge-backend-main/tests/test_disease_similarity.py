@@ -0,0 +1,39 @@
+import pytest
+
+from disease_similarity import DiseaseSimilarity, np
+
+pytestmark = pytest.mark.skipif(np is None, reason="numpy tidak terpasang")
+
+DISEASES = [
+    {"id": 1, "name": "Flu", "symptoms": "demam, pusing, pilek, bersin", "description": "Infeksi virus"},
+    {"id": 2, "name": "Gastritis", "symptoms": "nyeri perut, mual, kembung", "description": "Radang lambung"},
+    {"id": 3, "name": "Migrain", "symptoms": "sakit kepala sebelah, mual, sensitif cahaya", "description": ""},
+]
+
+
+@pytest.fixture
+def similarity():
+    matcher = DiseaseSimilarity()
+    matcher.load_or_build(DISEASES)
+    return matcher
+
+
+def score(matcher, text, disease_id=1):
+    ids, totals = matcher.scores(text)
+    return float(totals[list(ids).index(disease_id)])
+
+
+def test_unknown_ngrams_weigh_the_same_regardless_of_spelling(similarity):
+    # Kata asing dengan struktur n-gram sama (huruf berbeda semua, tidak ada di katalog) harus
+    # mendapat skor sama, bukan bergantung pada tetangga alfabetisnya di vocabulary
+    scores = {word: score(similarity, f"demam pusing {word}") for word in ("qwxzj", "jzxwq", "xqjwz")}
+    assert max(scores.values()) - min(scores.values()) < 1e-6
+    # Tetap menurunkan skor dibanding keluhan tanpa kata asing
+    assert scores["qwxzj"] < score(similarity, "demam pusing")
+
+
+def test_scores_are_cosine_similarity(similarity):
+    assert score(similarity, "demam pusing pilek bersin flu") > score(similarity, "demam")
+    assert 0 < score(similarity, "demam pusing") <= 1
+    assert score(similarity, "xyzzy qwrtp") == 0
+    assert similarity.best_match("mual nyeri perut kembung", "?")[0] == 2
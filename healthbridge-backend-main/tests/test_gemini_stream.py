@@ -0,0 +1,125 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from gemini_service import CircuitBreaker, DiagnosisProviderError, GeminiProvider
+
+
+def sse(*chunks):
+    return [f"data: {json.dumps(chunk)}\r\n\r\n".encode() for chunk in chunks]
+
+
+def text_chunk(text):
+    return {"candidates": [{"content": {"parts": [{"text": text}]}}]}
+
+
+def make_provider(lines, status_code=200, fail_after=None, breaker=None):
+    """GeminiProvider dengan MockTransport: body SSE dikirim per potongan, opsional putus di tengah"""
+    requests = []
+
+    async def body():
+        for index, line in enumerate(lines):
+            if index == fail_after:
+                raise httpx.ReadError("koneksi terputus")
+            yield line
+            await asyncio.sleep(0)
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(status_code, content=body())
+
+    provider = GeminiProvider(api_key="test-key", breaker=breaker or CircuitBreaker(),
+                              transport=httpx.MockTransport(handler))
+    return provider, requests
+
+
+async def collect(provider, received=None):
+    received = [] if received is None else received
+    try:
+        async for text in provider.generate_stream("prompt"):
+            received.append(text)
+    finally:
+        await provider.aclose()
+    return received
+
+
+def test_stream_yields_text_chunks():
+    provider, requests = make_provider(sse(text_chunk("Flu "), text_chunk("biasa."), {"candidates": [{"finishReason": "STOP"}]}))
+    assert asyncio.run(collect(provider)) == ["Flu ", "biasa."]
+    assert requests[0].url.params["alt"] == "sse"
+    assert provider.breaker.failures == 0
+
+
+def test_mid_stream_error_keeps_yielded_chunks_and_records_failure():
+    provider, _ = make_provider(sse(text_chunk("Flu "), text_chunk("biasa.")), fail_after=1)
+    received = []
+    with pytest.raises(DiagnosisProviderError, match="Koneksi Gagal"):
+        asyncio.run(collect(provider, received))
+    assert received == ["Flu "]
+    assert provider.breaker.failures == 1
+
+
+def test_safety_filter_chunk():
+    provider, _ = make_provider(sse(text_chunk("Anda "), {"promptFeedback": {"blockReason": "SAFETY"}}))
+    received = []
+    with pytest.raises(DiagnosisProviderError, match="Safety Filter"):
+        asyncio.run(collect(provider, received))
+    assert received == ["Anda "]
+
+
+def test_non_200_response_records_failure():
+    provider, _ = make_provider([b"quota"], status_code=429)
+    with pytest.raises(DiagnosisProviderError, match="429"):
+        asyncio.run(collect(provider))
+    assert provider.breaker.failures == 1
+
+
+def test_empty_stream():
+    provider, _ = make_provider(sse({"candidates": [{"finishReason": "STOP"}]}))
+    with pytest.raises(DiagnosisProviderError, match="kosong"):
+        asyncio.run(collect(provider))
+
+
+def test_client_disconnect_mid_stream_closes_response():
+    provider, _ = make_provider(sse(text_chunk("Flu "), text_chunk("biasa."), text_chunk(" Istirahat.")))
+
+    async def disconnect_after_first_chunk():
+        stream = provider.generate_stream("prompt")
+        try:
+            assert await stream.__anext__() == "Flu "
+            # Client disconnect: StreamingResponse menutup generator di tengah jalan
+            await stream.aclose()
+            with pytest.raises(StopAsyncIteration):
+                await stream.__anext__()
+        finally:
+            await provider.aclose()
+
+    asyncio.run(disconnect_after_first_chunk())
+    assert provider.breaker.failures == 0
+    assert provider.breaker.state == "closed"
+
+
+def test_client_disconnect_before_response_releases_half_open_trial():
+    # Breaker half-open: hanya satu request percobaan yang boleh lewat
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    async def scenario():
+        waiting = asyncio.Event()
+
+        async def slow_handler(request):
+            waiting.set()
+            await asyncio.Event().wait()  # Gemini belum menjawab
+
+        provider = GeminiProvider(api_key="test-key", breaker=breaker, transport=httpx.MockTransport(slow_handler))
+        task = asyncio.create_task(collect(provider))
+        await waiting.wait()
+        assert not breaker.allow_request()  # Percobaan sedang berjalan
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(scenario())
+    assert breaker.state == "half-open"
+    assert breaker.allow_request()
@@ -0,0 +1,182 @@
+import random
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import func
+
+
+@pytest.fixture
+def medicine(main_module, client):
+    """Obat baru dengan stok 10 agar test tidak saling memengaruhi stok"""
+    db = main_module.WriteSessionLocal()
+    try:
+        medicine = main_module.Medicine(name=f"Obat Test {uuid.uuid4().hex[:8]}", description="test",
+                                        category="Test", price=1000, stock=10)
+        db.add(medicine)
+        db.commit()
+        medicine_id = medicine.id
+    finally:
+        # Jangan tahan koneksi penulis selama test berjalan
+        db.close()
+    return medicine_id
+
+
+def current_stock(main_module, medicine_id):
+    db = main_module.SessionLocal()
+    try:
+        return main_module.inventory.available(db, medicine_id)
+    finally:
+        db.close()
+
+
+@pytest.mark.parametrize("quantity", [0, -5])
+def test_cart_rejects_non_positive_quantity(main_module, client, medicine, quantity):
+    response = client.post("/api/cart/add", json={"session_id": "neg", "medicine_id": medicine, "quantity": quantity})
+    assert response.status_code == 422
+    assert current_stock(main_module, medicine) == 10
+
+
+def test_reserve_rejects_non_positive_quantity(main_module, medicine):
+    db = main_module.WriteSessionLocal()
+    try:
+        with pytest.raises(ValueError):
+            main_module.inventory.reserve(db, "neg", medicine, -3)
+    finally:
+        db.rollback()
+        db.close()
+    assert current_stock(main_module, medicine) == 10
+
+
+@pytest.fixture
+def admin_headers(client):
+    response = client.post("/api/auth/login", json={"email": "admin@healthbridge.com", "password": "admin123"})
+    assert response.status_code == 200
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def update_stock(client, headers, medicine_id, stock, previous_stock):
+    return client.put(f"/api/admin/medicines/{medicine_id}", headers=headers, json={
+        "name": f"Obat Test {medicine_id}", "description": "test", "category": "Test", "price": 1000,
+        "stock": stock, "previous_stock": previous_stock,
+    })
+
+
+def test_admin_stock_update_keeps_cart_reservations(main_module, client, medicine, admin_headers):
+    # Admin membuka form saat stok 10, lalu pembeli mereservasi 3 sebelum form disimpan
+    assert client.post("/api/cart/add", json={"session_id": "admin-race", "medicine_id": medicine,
+                                              "quantity": 3}).json()["status"] == "success"
+    assert update_stock(client, admin_headers, medicine, 15, previous_stock=10).status_code == 200
+    assert current_stock(main_module, medicine) == 12
+
+    # Tidak bisa mengurangi stok yang sedang ditahan keranjang
+    response = update_stock(client, admin_headers, medicine, 0, previous_stock=15)
+    assert response.status_code == 400
+    assert current_stock(main_module, medicine) == 12
+
+
+def test_delete_medicine_removes_cart_rows(main_module, client, medicine, admin_headers):
+    client.post("/api/cart/add", json={"session_id": "deleted", "medicine_id": medicine, "quantity": 2})
+    assert client.delete(f"/api/admin/medicines/{medicine}", headers=admin_headers).status_code == 200
+
+    # ON DELETE CASCADE hanya berlaku jika PRAGMA foreign_keys aktif di koneksi penulis
+    db = main_module.SessionLocal()
+    try:
+        for model in (main_module.CartItem, main_module.StockReservation):
+            assert db.query(model).filter(model.medicine_id == medicine).count() == 0
+    finally:
+        db.close()
+    assert client.get("/api/cart/deleted").status_code == 200
+
+
+def expire_reservations(main_module, session_id):
+    db = main_module.WriteSessionLocal()
+    try:
+        db.query(main_module.StockReservation).filter(
+            main_module.StockReservation.session_id == session_id
+        ).update({"expires_at": main_module.utcnow() - timedelta(minutes=1)})
+        db.commit()
+    finally:
+        db.close()
+
+
+def checkout(client, session_id):
+    return client.post("/api/order/checkout", json={
+        "session_id": session_id, "customer_name": "Test", "phone": "0800", "address": "Jl. Test",
+    }).json()
+
+
+def test_checkout_after_reservation_expired(main_module, client, medicine):
+    client.post("/api/cart/add", json={"session_id": "late", "medicine_id": medicine, "quantity": 8})
+    expire_reservations(main_module, "late")
+    # Reservasi kedaluwarsa dilepas saat pembeli lain mengambil stoknya
+    client.post("/api/cart/add", json={"session_id": "early", "medicine_id": medicine, "quantity": 5})
+    assert current_stock(main_module, medicine) == 5
+
+    result = checkout(client, "late")
+    assert result["status"] == "error"
+    assert result["shortfalls"][0]["available"] == 5
+    assert current_stock(main_module, medicine) == 5
+
+    assert checkout(client, "early")["status"] == "success"
+    assert current_stock(main_module, medicine) == 5
+
+
+def test_parallel_checkout_never_oversells(main_module, client, medicine):
+    """Banyak pembeli paralel (sebagian reservasinya kedaluwarsa) tidak pernah menjual lebih dari stok"""
+    rng = random.Random(7)
+    buyers = [(f"stress-{i}", rng.randint(1, 3), rng.random() < 0.5) for i in range(60)]
+    start = threading.Barrier(12)
+
+    def buy(buyer):
+        session_id, quantity, reserved = buyer
+        db = main_module.WriteSessionLocal()
+        try:
+            try:
+                start.wait(timeout=5)
+            except threading.BrokenBarrierError:
+                pass
+            if reserved:
+                added = main_module.add_cart_item(db, main_module.CartAddRequest(
+                    session_id=session_id, medicine_id=medicine, quantity=quantity))
+                if added["status"] != "success":
+                    return 0
+            else:
+                # Keranjang yang reservasinya sudah disapu worker: stok diperebutkan langsung di commit_sale
+                db.add(main_module.CartItem(session_id=session_id, medicine_id=medicine, quantity=quantity))
+                db.commit()
+            result = main_module.create_order(db, main_module.CheckoutRequest(
+                session_id=session_id, customer_name="Stress", phone="0899", address="Jl. Paralel"))
+            return quantity if result["status"] == "success" else 0
+        finally:
+            db.close()
+
+    with ThreadPoolExecutor(max_workers=12) as pool:
+        sold = sum(pool.map(buy, buyers))
+
+    db = main_module.SessionLocal()
+    try:
+        held = db.query(func.coalesce(func.sum(main_module.StockReservation.quantity), 0)).filter(
+            main_module.StockReservation.medicine_id == medicine).scalar()
+        ordered = db.query(func.coalesce(func.sum(main_module.OrderItem.quantity), 0)).filter(
+            main_module.OrderItem.medicine_id == medicine).scalar()
+    finally:
+        db.close()
+    stock = current_stock(main_module, medicine)
+    assert stock >= 0
+    assert ordered == sold
+    assert sold + held + stock == 10
+    assert sold > 0
+
+
+def test_cart_activity_keeps_catalog_snapshot(main_module, client, medicine):
+    etag = client.get("/api/medicines").headers["etag"]
+    assert client.post("/api/cart/add", json={"session_id": "etag", "medicine_id": medicine,
+                                              "quantity": 4}).json()["status"] == "success"
+    # Snapshot katalog tetap (304), stok terkini dari /api/medicines/stock
+    assert client.get("/api/medicines", headers={"If-None-Match": etag}).status_code == 304
+    response = client.get("/api/medicines/stock")
+    assert response.headers["cache-control"] == "no-store"
+    assert {"id": medicine, "stock": 6} in response.json()
@@ -0,0 +1,27 @@
+from reportlab import rl_config
+
+from invoice_service import InvoiceRenderer, render_invoice
+
+ORDER = {
+    "customer_name": "Test", "phone": "0800", "address": "Jl. Test", "total_price": 10000,
+    "created_at": "2026-01-02T03:04:05+00:00",
+    "items": [{"name": "Paracetamol 500mg", "quantity": 2, "price": 5000, "subtotal": 10000}],
+}
+
+
+def test_render_without_a85_leaves_global_setting_untouched():
+    before = rl_config.useA85
+    pdf = render_invoice(ORDER, 1)
+    assert pdf.startswith(b"%PDF")
+    assert b"ASCII85Decode" not in pdf
+    assert rl_config.useA85 == before
+
+
+def test_render_many_in_process_pool():
+    renderer = InvoiceRenderer(workers=1)
+    try:
+        pdfs = renderer.render_many([{**ORDER, "order_id": order_id} for order_id in (1, 2, 3)])
+        assert len(pdfs) == 3 and all(pdf.startswith(b"%PDF") for pdf in pdfs)
+        assert renderer._pool._mp_context.get_start_method() in ("forkserver", "spawn")
+    finally:
+        renderer.shutdown()
@@ -0,0 +1,36 @@
+import json
+
+
+def test_backfill_skips_non_list_legacy_items(main_module, client):
+    Order, OrderItem = main_module.Order, main_module.OrderItem
+    payloads = {
+        "valid": json.dumps([{"medicine_id": None, "name": "Obat Lama", "price": 2000, "quantity": 2}]),
+        "null": "null",
+        "object": json.dumps({"name": "Obat Lama", "quantity": 1}),
+        "broken": "[{",
+    }
+    db = main_module.WriteSessionLocal()
+    try:
+        orders = {}
+        for key, payload in payloads.items():
+            order = Order(customer_name=f"Legacy {key}", phone="0700", address="-", total_price=4000,
+                          status="completed", created_at=main_module.utcnow(), legacy_items=payload)
+            db.add(order)
+            orders[key] = order
+        db.commit()
+        order_ids = {key: order.id for key, order in orders.items()}
+
+        assert main_module.backfill_order_items(db) == 1
+
+        items = db.query(OrderItem).filter(OrderItem.order_id == order_ids["valid"]).all()
+        assert [(item.name, item.quantity, item.subtotal) for item in items] == [("Obat Lama", 2, 4000)]
+        legacy = dict(db.query(Order.id, Order.legacy_items).filter(Order.id.in_(order_ids.values())).all())
+        # Yang dilewati tetap menyimpan payload aslinya
+        assert legacy == {
+            order_ids["valid"]: None,
+            order_ids["null"]: "null",
+            order_ids["object"]: payloads["object"],
+            order_ids["broken"]: "[{",
+        }
+    finally:
+        db.close()
@@ -0,0 +1,100 @@
+import json
+from datetime import timedelta
+
+import boto3
+import pytest
+from moto.server import ThreadedMotoServer
+
+BUCKET = "healthbridge-test-orders"
+
+
+@pytest.fixture
+def s3_endpoint():
+    """Server S3 moto lokal, dipakai lewat AWS_S3_ENDPOINT_URL seperti MinIO saat development"""
+    server = ThreadedMotoServer(ip_address="127.0.0.1", port=0, verbose=False)
+    server.start()
+    host, port = server.get_host_and_port()
+    try:
+        yield f"http://{host}:{port}"
+    finally:
+        server.stop()
+
+
+@pytest.fixture
+def s3_manager(main_module, s3_endpoint, monkeypatch):
+    import aws_service
+
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_REGION", "us-east-1")
+    monkeypatch.setenv("AWS_S3_BUCKET", BUCKET)
+    monkeypatch.setenv("AWS_S3_ENDPOINT_URL", s3_endpoint)
+    manager = aws_service.AWSS3Manager()
+    # main.py mengambil s3_manager dari aws_service setiap kali dipakai (checkout & handler job)
+    monkeypatch.setattr(aws_service, "s3_manager", manager)
+    return manager
+
+
+def order_jobs(main_module, order_id):
+    db = main_module.SessionLocal()
+    try:
+        Job = main_module.BackgroundJob
+        return {job.kind: job for job in db.query(Job).filter(Job.order_id == order_id)}
+    finally:
+        db.close()
+
+
+def make_due(main_module, order_id):
+    """Lompati waktu backoff tanpa menunggu"""
+    db = main_module.WriteSessionLocal()
+    try:
+        Job = main_module.BackgroundJob
+        db.query(Job).filter(Job.order_id == order_id).update(
+            {Job.next_run_at: main_module.utcnow() - timedelta(seconds=1)}, synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+
+def test_checkout_jobs_upload_to_s3_with_retry(main_module, client, s3_manager, s3_endpoint):
+    assert s3_manager.enabled
+    assert s3_manager.s3_client.meta.endpoint_url == s3_endpoint
+
+    session_id = "s3-jobs"
+    assert client.post("/api/cart/add", json={"session_id": session_id, "medicine_id": 1}).json()["status"] == "success"
+    result = client.post("/api/order/checkout", json={
+        "session_id": session_id, "customer_name": "Budi", "phone": "0812", "address": "Jl. S3",
+    }).json()
+    assert result["status"] == "success"
+    order_id = result["order"]["id"]
+
+    jobs = order_jobs(main_module, order_id)
+    assert {kind: job.status for kind, job in jobs.items()} == {
+        main_module.JOB_ORDER_BACKUP: "pending", main_module.JOB_ORDER_INVOICE: "pending"}
+
+    # Percobaan pertama gagal karena bucket belum ada: job kembali pending dengan backoff
+    before = main_module.utcnow()
+    assert main_module.job_queue.run_pending() == 2
+    for job in order_jobs(main_module, order_id).values():
+        assert (job.status, job.attempts) == ("pending", 1)
+        assert job.last_error.startswith("RuntimeError")
+        assert job.next_run_at >= before + timedelta(seconds=main_module.job_queue.backoff(1))
+
+    # Belum jatuh tempo: tidak diambil worker
+    boto3.client("s3", endpoint_url=s3_endpoint, region_name="us-east-1", aws_access_key_id="testing",
+                 aws_secret_access_key="testing").create_bucket(Bucket=BUCKET)
+    assert main_module.job_queue.run_pending() == 0
+
+    make_due(main_module, order_id)
+    assert main_module.job_queue.run_pending() == 2
+    for job in order_jobs(main_module, order_id).values():
+        assert (job.status, job.attempts, job.last_error) == ("done", 2, None)
+
+    s3 = s3_manager.s3_client
+    backup = json.loads(s3.get_object(Bucket=BUCKET, Key=f"orders/order_{order_id}.json")["Body"].read())
+    assert backup["order_id"] == order_id
+    assert backup["customer_name"] == "Budi"
+    assert [item["medicine_id"] for item in backup["items"]] == [1]
+    invoice = s3.get_object(Bucket=BUCKET, Key=f"invoices/invoice_{order_id}.pdf")
+    assert invoice["ContentType"] == "application/pdf"
+    assert invoice["Body"].read().startswith(b"%PDF")
@@ -0,0 +1,17 @@
+import asyncio
+
+from password_service import PasswordHasher
+
+
+def test_process_pool_does_not_fork_app_process():
+    hasher = PasswordHasher(rounds=4, workers=1)
+    try:
+        async def roundtrip():
+            hashed = await hasher.hash("rahasia123")
+            return hashed, await hasher.verify("rahasia123", hashed), await hasher.verify("salah", hashed)
+
+        hashed, ok, wrong = asyncio.run(roundtrip())
+        assert ok and not wrong
+        assert hasher._pool._mp_context.get_start_method() in ("forkserver", "spawn")
+    finally:
+        hasher.shutdown()
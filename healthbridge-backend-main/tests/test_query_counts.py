@@ -0,0 +1,93 @@
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+
+@contextmanager
+def count_statements(main_module):
+    """Hitung statement SQL yang dikirim ke engine baca & tulis selama blok berjalan"""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engines = {main_module.engine, main_module.write_engine}
+    if main_module.DB_ASYNC:
+        engines |= {main_module.async_engine.sync_engine, main_module.async_write_engine.sync_engine}
+    for engine in engines:
+        event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        for engine in engines:
+            event.remove(engine, "before_cursor_execute", record)
+
+
+def fill_cart(main_module, client, session_id, size):
+    db = main_module.SessionLocal()
+    try:
+        medicine_ids = [row.id for row in db.query(main_module.Medicine.id).filter(
+            main_module.Medicine.stock >= 1).order_by(main_module.Medicine.id).limit(size)]
+    finally:
+        db.close()
+    assert len(medicine_ids) == size
+    for medicine_id in medicine_ids:
+        response = client.post("/api/cart/add", json={"session_id": session_id, "medicine_id": medicine_id})
+        assert response.json()["status"] == "success"
+
+
+def cart_and_checkout_counts(main_module, client, size):
+    session_id = f"query-count-{size}"
+    fill_cart(main_module, client, session_id, size)
+
+    with count_statements(main_module) as statements:
+        cart = client.get(f"/api/cart/{session_id}").json()
+    assert cart["total_items"] == size
+    cart_count = len(statements)
+
+    with count_statements(main_module) as statements:
+        result = client.post("/api/order/checkout", json={
+            "session_id": session_id, "customer_name": "Query", "phone": "0811", "address": "Jl. Hitung",
+        }).json()
+    assert result["status"] == "success"
+    assert len(result["order"]["items"]) == size
+    return cart_count, len(statements)
+
+
+@pytest.fixture
+def warm_checkout(main_module, client):
+    # Checkout pertama juga membuat baris dashboard_stats, jangan ikut dihitung
+    cart_and_checkout_counts(main_module, client, 1)
+
+
+@pytest.mark.parametrize("size", [5, 20])
+def test_cart_and_checkout_query_count_independent_of_cart_size(main_module, client, warm_checkout, size):
+    # Ukuran 1 sebagai pembanding: statement per item (N+1) akan membuat jumlahnya ikut membesar
+    assert cart_and_checkout_counts(main_module, client, size) == cart_and_checkout_counts(main_module, client, 1)
+
+
+def test_cart_and_checkout_query_count(main_module, client, warm_checkout):
+    cart_count, checkout_count = cart_and_checkout_counts(main_module, client, 3)
+    # GET keranjang: satu SELECT JOIN
+    assert cart_count == 1
+    # Checkout: BEGIN IMMEDIATE (penulis SQLite), isi keranjang, cek reservasi kedaluwarsa,
+    # klaim reservasi, INSERT order, INSERT item (executemany), statistik dashboard,
+    # kosongkan keranjang
+    assert checkout_count == 8
+
+
+@pytest.mark.parametrize("quantity, status", [(1, "success"), (10 ** 6, "error")])
+def test_cart_add_opens_one_writer_transaction(main_module, client, quantity, status):
+    db = main_module.SessionLocal()
+    try:
+        medicine_id = db.query(main_module.Medicine.id).filter(main_module.Medicine.stock >= 1).first().id
+    finally:
+        db.close()
+
+    with count_statements(main_module) as statements:
+        result = client.post("/api/cart/add", json={"session_id": f"begin-{status}", "medicine_id": medicine_id,
+                                                    "quantity": quantity}).json()
+    assert result["status"] == status
+    # Nama obat & jumlah item dibaca sebelum commit/rollback, tidak membuka transaksi penulis kedua
+    assert sum(statement.startswith("BEGIN") for statement in statements) == 1
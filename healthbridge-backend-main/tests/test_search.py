@@ -0,0 +1,44 @@
+import pytest
+
+from search_service import query_terms, tokenize
+
+
+def names(client, q, **params):
+    response = client.get("/api/medicines/search", params={"q": q, **params})
+    assert response.status_code == 200
+    return [medicine["name"] for medicine in response.json()]
+
+
+def test_full_text_ranks_prefix_matches(client):
+    assert names(client, "paracetamol")[0] == "Paracetamol 500mg"
+
+
+def test_substring_fallback_when_full_text_finds_nothing(client):
+    # Potongan di tengah kata tidak cocok di FTS (hanya awal kata)
+    assert "Paracetamol 500mg" in names(client, "amol")
+
+
+def test_stopword_only_query_falls_back_to_substring(client):
+    assert tokenize("dan") and not query_terms("dan")
+    assert "Obat flu dan pilek" in [m["description"] for m in client.get(
+        "/api/medicines/search", params={"q": "dan"}).json()]
+
+
+def test_exhausted_full_text_page_is_not_padded_with_substring_results(client):
+    assert names(client, "paracetamol", offset=500) == []
+
+
+@pytest.fixture
+def accented_medicine(main_module, client):
+    db = main_module.WriteSessionLocal()
+    try:
+        db.add(main_module.Medicine(name="Crème Anti Gatal", description="Krim kulit", category="Kulit",
+                                    price=30000, stock=10))
+        db.commit()
+    finally:
+        db.close()
+
+
+def test_non_ascii_terms_are_indexed(client, accented_medicine):
+    assert tokenize("Crème Anti-Gatal") == ["crème", "anti", "gatal"]
+    assert names(client, "crème") == ["Crème Anti Gatal"]
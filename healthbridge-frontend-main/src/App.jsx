@@ -79,6 +79,12 @@ const formatRupiah = (number) => {
   }).format(number);
 };
 
+// Format timestamp ISO (UTC) dari API ke waktu lokal
+const formatDateTime = (value) => {
+  if (!value) return "-";
+  return new Date(value).toLocaleString('id-ID', { dateStyle: 'medium', timeStyle: 'short' });
+};
+
 function App() {
   // State untuk navigasi
   const [currentPage, setCurrentPage] = useState("landing");
@@ -136,6 +142,7 @@ function App() {
   // Admin state
   const [adminStats, setAdminStats] = useState(null);
   const [adminOrders, setAdminOrders] = useState([]);
+  const [adminOrdersCursor, setAdminOrdersCursor] = useState(null);
   const [adminUsers, setAdminUsers] = useState([]);
   const [adminTab, setAdminTab] = useState("dashboard");
 
@@ -265,10 +272,14 @@ function App() {
     }
   };
 
-  const fetchAdminOrders = async () => {
+  const fetchAdminOrders = async (cursor = null) => {
     try {
-      const response = await axios.get(`${API_URL}/api/admin/orders`, getAuthHeaders());
-      setAdminOrders(response.data);
+      const response = await axios.get(`${API_URL}/api/admin/orders`, {
+        ...getAuthHeaders(),
+        params: cursor ? { cursor } : {}
+      });
+      setAdminOrders(prev => cursor ? [...prev, ...response.data.orders] : response.data.orders);
+      setAdminOrdersCursor(response.data.next_cursor);
     } catch (error) {
       console.error("Error fetching admin orders:", error);
     }
@@ -296,7 +307,7 @@ function App() {
   const handleSaveMedicine = async () => {
     try {
       if (editMedicine) {
-        await axios.put(`${API_URL}/api/admin/medicines/${editMedicine.id}`, medicineForm, getAuthHeaders());
+        await axios.put(`${API_URL}/api/admin/medicines/${editMedicine.id}`, { ...medicineForm, previous_stock: editMedicine.stock }, getAuthHeaders());
       } else {
         await axios.post(`${API_URL}/api/admin/medicines`, medicineForm, getAuthHeaders());
       }
@@ -404,8 +415,13 @@ function App() {
 
   const fetchMedicines = async () => {
     try {
-      const response = await axios.get(`${API_URL}/api/medicines`);
-      setMedicines(response.data);
+      // Katalog di-cache (ETag), stok terkini diambil terpisah agar snapshot tidak berubah tiap checkout
+      const [response, stockResponse] = await Promise.all([
+        axios.get(`${API_URL}/api/medicines`),
+        axios.get(`${API_URL}/api/medicines/stock`)
+      ]);
+      const liveStock = Object.fromEntries(stockResponse.data.map(item => [item.id, item.stock]));
+      setMedicines(response.data.map(med => ({ ...med, stock: liveStock[med.id] ?? med.stock })));
     } catch (error) {
       console.error("Error fetching medicines:", error);
     }
@@ -863,7 +879,7 @@ function App() {
                 <div className="order-header">
                   <div className="order-id">
                     <span className="order-number">Pesanan #{order.id}</span>
-                    <span className="order-date">{order.created_at}</span>
+                    <span className="order-date">{formatDateTime(order.created_at)}</span>
                   </div>
                   {getStatusBadge(order.status)}
                 </div>
@@ -1004,7 +1020,7 @@ function App() {
                         <td>
                           <span className={`status-badge ${order.status}`}>{order.status}</span>
                         </td>
-                        <td>{order.created_at}</td>
+                        <td>{formatDateTime(order.created_at)}</td>
                         <td>
                           <select
                             value={order.status}
@@ -1021,6 +1037,11 @@ function App() {
                     ))}
                   </tbody>
                 </table>
+                {adminOrdersCursor && (
+                  <button className="btn-load-more" onClick={() => fetchAdminOrders(adminOrdersCursor)}>
+                    Muat Lebih Banyak
+                  </button>
+                )}
               </div>
             </div>
           )}
@@ -1236,7 +1257,7 @@ function App() {
                         <td>{u.name}</td>
                         <td>{u.email}</td>
                         <td><span className={`role-badge ${u.role}`}>{u.role}</span></td>
-                        <td>{u.created_at}</td>
+                        <td>{formatDateTime(u.created_at)}</td>
                       </tr>
                     ))}
                   </tbody>